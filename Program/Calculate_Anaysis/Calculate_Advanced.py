@@ -5,12 +5,56 @@
 import pandas as pd
 import numpy as np
 import streamlit as st
-from collections import defaultdict, Counter
-import networkx as nx
+from collections import Counter
 from scipy import stats
 import math
 from datetime import datetime
 
+from Calculate_Anaysis.Community_Detection import DEFAULT_RESOLUTION, detect_communities
+from Calculate_Anaysis.Corpus import as_corpus
+from Calculate_Anaysis.Incidence_Matrix import DEFAULT_MAX_AUTHORS
+from Calculate_Anaysis.Network_Metrics import DEFAULT_TIME_BUDGET, graph_metrics
+
+# 可做共现网络指标的实体类型 -> (结果列名, 原始数据中的字段)
+NETWORK_FIELDS = {
+    'authors': ('作者', 'authors'),
+    'keywords': ('关键词', 'keywords'),
+    'countries': ('国家', 'address'),
+    'institutions': ('机构', 'address'),
+}
+
+
+def _grouped_h_g_index(groups, values, n_groups):
+    """
+    按组批量计算H指数与G指数（不逐个实体循环）
+
+    参数:
+    - groups: 每条记录所属组的编码
+    - values: 每条记录的被引次数
+    - n_groups: 组数
+
+    返回:
+    - (h_index数组, g_index数组)
+    """
+    groups = np.asarray(groups, dtype=np.int64)
+    values = np.asarray(values, dtype=np.int64)
+    h_index = np.zeros(n_groups, dtype=np.int64)
+    g_index = np.zeros(n_groups, dtype=np.int64)
+    if len(groups) == 0:
+        return h_index, g_index
+    # 组内按被引次数降序排列，rank 为组内名次
+    order = np.lexsort((-values, groups))
+    groups, values = groups[order], values[order]
+    starts = np.flatnonzero(np.r_[True, groups[1:] != groups[:-1]])
+    lengths = np.diff(np.r_[starts, len(groups)])
+    rank = np.arange(len(groups)) - np.repeat(starts, lengths) + 1
+    cumulative = np.cumsum(values)
+    cumulative -= np.repeat(cumulative[starts] - values[starts], lengths)
+    np.maximum.at(h_index, groups, np.where(values >= rank, rank, 0))
+    np.maximum.at(g_index, groups, np.where(cumulative >= rank * rank, rank, 0))
+    return h_index, g_index
+
+
 class AdvancedAnalysis:
     """高级分析类"""
     
@@ -73,189 +117,181 @@ class AdvancedAnalysis:
     
     def calculate_author_h_index(self, df):
         """计算每个作者的H指数"""
-        if '作者' not in df.columns or '核心合集的被引频次计数' not in df.columns:
+        corpus = as_corpus(df)
+        if not corpus.has('authors') or not corpus.has('citations'):
             st.warning("缺少作者或引用信息")
             return pd.DataFrame()
         
-        author_h_index = {}
-        
-        for _, row in df.iterrows():
-            authors = str(row['作者']).split(';') if pd.notna(row['作者']) else []
-            citation_count = row['核心合集的被引频次计数']
-            
-            if pd.notna(citation_count) and str(citation_count).isdigit():
-                citation_count = int(citation_count)
-                
-                for author in authors:
-                    author = author.strip()
-                    if author not in author_h_index:
-                        author_h_index[author] = []
-                    author_h_index[author].append(citation_count)
-        
-        # 计算每个作者的H指数
-        h_index_results = []
-        for author, citations in author_h_index.items():
-            h_index = self.calculate_h_index(citations)
-            g_index = self.calculate_g_index(citations)
-            total_citations = sum(citations)
-            paper_count = len(citations)
-            
-            h_index_results.append({
-                '作者': author,
-                'H指数': h_index,
-                'G指数': g_index,
-                '总引用次数': total_citations,
-                '发文数量': paper_count,
-                '平均引用次数': total_citations / paper_count if paper_count > 0 else 0
-            })
-        
-        return pd.DataFrame(h_index_results).sort_values('H指数', ascending=False)
+        authors = corpus.authors
+        citations = corpus.citations[authors.doc]
+        h_index, g_index = _grouped_h_g_index(authors.ids, citations, authors.n_entities)
+        paper_count = authors.doc_counts()
+        total_citations = authors.sum_by_entity(corpus.citations).astype(int)
+        present = paper_count > 0
+        
+        return pd.DataFrame({
+            '作者': authors.labels[present],
+            'H指数': h_index[present],
+            'G指数': g_index[present],
+            '总引用次数': total_citations[present],
+            '发文数量': paper_count[present],
+            '平均引用次数': total_citations[present] / paper_count[present]
+        }).sort_values('H指数', ascending=False)
     
-    def calculate_collaboration_strength(self, df):
-        """计算合作强度指标"""
-        if '作者' not in df.columns:
+    def calculate_collaboration_strength(self, df, mode='full', max_authors=DEFAULT_MAX_AUTHORS,
+                                         betweenness='auto', time_budget=DEFAULT_TIME_BUDGET):
+        """
+        计算合作强度指标
+        mode 为合作计数方式（'full' 或 'fractional'），作者数超过 max_authors 的文献不参与两两合作计数；
+        betweenness 为中介中心性计算方式（'auto' / 'exact' / 'approximate'），精确计算超出 time_budget 秒时回退到枢纽近似
+        """
+        corpus = as_corpus(df)
+        if not corpus.has('authors'):
             st.warning("缺少作者信息")
             return pd.DataFrame()
         
-        # 构建合作网络
-        G = nx.Graph()
-        collaboration_data = defaultdict(int)
+        # 合作矩阵直接由关联矩阵相乘得到，指标在稀疏矩阵上计算（每个指标对整个图只计算一次）
+        authors = corpus.authors
+        matrix = authors.pair_matrix(mode=mode, max_items=max_authors)
+        metrics = graph_metrics(matrix, authors.labels, centralities=True, betweenness=betweenness,
+                                time_budget=time_budget)
+        if metrics.empty:
+            return pd.DataFrame()
+        
+        network_metrics = pd.DataFrame({
+            '作者': metrics['node'],
+            '合作度': metrics['degree'],
+            '合作强度': metrics['strength'],
+            'PageRank': metrics['pagerank'],
+            'K核': metrics['core'],
+            '聚类系数': metrics['clustering'],
+            '中介中心性': metrics['betweenness'],
+            '接近中心性': metrics['closeness']
+        })
+        network_metrics.attrs['betweenness_mode'] = metrics.attrs['betweenness_mode']
         
-        for _, row in df.iterrows():
-            authors = str(row['作者']).split(';') if pd.notna(row['作者']) else []
-            authors = [author.strip() for author in authors if author.strip()]
-            
-            # 添加合作关系
-            for i in range(len(authors)):
-                for j in range(i + 1, len(authors)):
-                    author1, author2 = authors[i], authors[j]
-                    G.add_edge(author1, author2)
-                    collaboration_data[(author1, author2)] += 1
-        
-        # 计算网络指标
-        network_metrics = []
-        for node in G.nodes():
-            degree = G.degree(node)
-            clustering = nx.clustering(G, node)
-            betweenness = nx.betweenness_centrality(G)[node]
-            closeness = nx.closeness_centrality(G)[node]
-            
-            network_metrics.append({
-                '作者': node,
-                '合作度': degree,
-                '聚类系数': clustering,
-                '中介中心性': betweenness,
-                '接近中心性': closeness
-            })
-        
-        return pd.DataFrame(network_metrics).sort_values('合作度', ascending=False)
+        return network_metrics.sort_values('合作度', ascending=False)
+    
+    def calculate_network_metrics(self, df, field='keywords', min_weight=1, mode='full',
+                                  max_authors=DEFAULT_MAX_AUTHORS, resolution=DEFAULT_RESOLUTION, seed=42):
+        """
+        计算共现网络的节点指标（加权度、PageRank、K核、连通分量、聚类系数）与社区聚类编号，不构建networkx图
+        field 为 'authors' / 'keywords' / 'countries' / 'institutions'；作者网络按 mode 与 max_authors 计数；
+        resolution 与 seed 为社区发现的分辨率与随机种子，模块度记录在 attrs['modularity']
+        """
+        corpus = as_corpus(df)
+        if field not in NETWORK_FIELDS or not corpus.has(NETWORK_FIELDS[field][1]):
+            st.warning(f"缺少{NETWORK_FIELDS.get(field, (field,))[0]}信息")
+            return pd.DataFrame()
+        
+        label, _ = NETWORK_FIELDS[field]
+        links = corpus.links[field]
+        if field == 'authors':
+            matrix = links.pair_matrix(min_weight, mode=mode, max_items=max_authors)
+        else:
+            matrix = links.pair_matrix(min_weight)
+        metrics = graph_metrics(matrix, links.labels)
+        if metrics.empty:
+            return pd.DataFrame()
+        
+        position = links.labels.get_indexer(metrics['node'])
+        clusters, modularity_score = detect_communities(matrix, resolution=resolution, seed=seed)
+        network_metrics = pd.DataFrame({
+            label: metrics['node'],
+            '频次': links.doc_counts()[position],
+            '聚类': clusters[position] + 1,
+            '度': metrics['degree'],
+            '加权度': metrics['strength'],
+            'PageRank': metrics['pagerank'],
+            'K核': metrics['core'],
+            '连通分量': metrics['component'],
+            '分量规模': metrics['component_size'],
+            '聚类系数': metrics['clustering']
+        })
+        network_metrics.attrs['modularity'] = modularity_score
+        
+        return network_metrics.sort_values('PageRank', ascending=False)
     
     def calculate_journal_impact_metrics(self, df):
         """计算期刊影响指标"""
-        if '出版物名称' not in df.columns or '核心合集的被引频次计数' not in df.columns:
+        corpus = as_corpus(df)
+        if 'Source' not in corpus.docs.columns or not corpus.has('citations'):
             st.warning("缺少期刊或引用信息")
             return pd.DataFrame()
         
-        journal_metrics = defaultdict(lambda: {
-            '发文数量': 0,
-            '总引用次数': 0,
-            '引用次数列表': [],
-            '作者数量': set()
+        journal_codes, journals = pd.factorize(corpus.docs['Source'])
+        has_journal = journal_codes >= 0
+        n_journals = len(journals)
+        if n_journals == 0:
+            return pd.DataFrame()
+        
+        citations = corpus.citations
+        paper_count = np.bincount(journal_codes[has_journal], minlength=n_journals)
+        total_citations = np.bincount(journal_codes[has_journal], weights=citations[has_journal],
+                                      minlength=n_journals).astype(int)
+        h_index, _ = _grouped_h_g_index(journal_codes[has_journal], citations[has_journal], n_journals)
+        
+        # 期刊的独特作者数：(期刊, 作者) 去重后计数
+        authors = corpus.authors
+        author_journal = journal_codes[authors.doc]
+        valid = author_journal >= 0
+        journal_author_pairs = np.unique(author_journal[valid].astype(np.int64) * max(authors.n_entities, 1)
+                                         + authors.ids[valid])
+        unique_authors = np.bincount(journal_author_pairs // max(authors.n_entities, 1), minlength=n_journals)
+        
+        journal_results = pd.DataFrame({
+            '期刊名称': journals,
+            '发文数量': paper_count,
+            '总引用次数': total_citations,
+            '平均引用次数': total_citations / paper_count,
+            'H指数': h_index,
+            '独特作者数': unique_authors,
+            '作者多样性': unique_authors / paper_count
         })
         
-        for _, row in df.iterrows():
-            journal = row['出版物名称']
-            citation_count = row['核心合集的被引频次计数']
-            authors = str(row['作者']).split(';') if pd.notna(row['作者']) else []
-            
-            if pd.notna(journal):
-                journal_metrics[journal]['发文数量'] += 1
-                
-                if pd.notna(citation_count) and str(citation_count).isdigit():
-                    citation_count = int(citation_count)
-                    journal_metrics[journal]['总引用次数'] += citation_count
-                    journal_metrics[journal]['引用次数列表'].append(citation_count)
-                
-                for author in authors:
-                    journal_metrics[journal]['作者数量'].add(author.strip())
-        
-        # 计算期刊指标
-        journal_results = []
-        for journal, metrics in journal_metrics.items():
-            if metrics['发文数量'] > 0:
-                avg_citations = metrics['总引用次数'] / metrics['发文数量']
-                h_index = self.calculate_h_index(metrics['引用次数列表'])
-                unique_authors = len(metrics['作者数量'])
-                
-                journal_results.append({
-                    '期刊名称': journal,
-                    '发文数量': metrics['发文数量'],
-                    '总引用次数': metrics['总引用次数'],
-                    '平均引用次数': avg_citations,
-                    'H指数': h_index,
-                    '独特作者数': unique_authors,
-                    '作者多样性': unique_authors / metrics['发文数量'] if metrics['发文数量'] > 0 else 0
-                })
-        
-        return pd.DataFrame(journal_results).sort_values('H指数', ascending=False)
+        return journal_results.sort_values('H指数', ascending=False)
     
     def calculate_research_trends(self, df):
         """计算研究趋势指标"""
-        if '出版年' not in df.columns or '作者关键词' not in df.columns:
+        corpus = as_corpus(df)
+        if not corpus.has('year') or not corpus.has('keywords'):
             st.warning("缺少年份或关键词信息")
             return {}
         
-        # 按年份分析
+        # 按年份分析（从 实体×年份 立方体按列切片）
+        cube = corpus.time_cube
+        keyword_active, author_active = cube.active('keywords'), cube.active('authors')
         yearly_data = {}
-        for year in sorted(df['出版年'].unique()):
-            year_data = df[df['出版年'] == year]
-            
-            # 关键词分析
-            keywords = []
-            for kw in year_data['作者关键词'].dropna():
-                keywords.extend([k.strip().lower() for k in str(kw).split(';')])
-            
-            keyword_counts = Counter(keywords)
-            
-            # 作者分析
-            authors = []
-            for author_list in year_data['作者'].dropna():
-                authors.extend([a.strip() for a in str(author_list).split(';')])
-            
-            author_counts = Counter(authors)
-            
-            yearly_data[year] = {
-                '发文数量': len(year_data),
-                '关键词数量': len(keyword_counts),
-                '作者数量': len(author_counts),
-                '热门关键词': dict(keyword_counts.most_common(10)),
-                '活跃作者': dict(author_counts.most_common(10))
+        for year, publications in cube.publications().items():
+            if publications == 0:
+                continue
+            hot_keywords = cube.top('keywords', 10, year, year)
+            active_authors = cube.top('authors', 10, year, year)
+            yearly_data[int(year)] = {
+                '发文数量': int(publications),
+                '关键词数量': int(keyword_active[year]),
+                '作者数量': int(author_active[year]),
+                '热门关键词': {name: int(count) for name, count in hot_keywords.items()},
+                '活跃作者': {name: int(count) for name, count in active_authors.items()}
             }
         
         return yearly_data
     
     def calculate_collaboration_diversity(self, df):
         """计算合作多样性指标"""
-        if '作者' not in df.columns:
+        corpus = as_corpus(df)
+        if not corpus.has('authors'):
             st.warning("缺少作者信息")
             return {}
         
-        # 分析国际合作
-        international_collaboration = 0
-        domestic_collaboration = 0
-        
-        # 分析跨机构合作
-        cross_institutional = 0
+        # 分析国际合作：文献涉及多个国家
+        international_collaboration = int((corpus.countries.per_doc() > 1).sum())
         
-        for _, row in df.iterrows():
-            authors = str(row['作者']).split(';') if pd.notna(row['作者']) else []
-            if len(authors) > 1:
-                # 这里可以添加更复杂的国际合作判断逻辑
-                # 简化处理：假设多作者就是合作
-                if len(authors) > 1:
-                    domestic_collaboration += 1
+        # 多作者但只涉及单一国家（或无地址信息）视为国内合作
+        multi_author = corpus.authors.per_doc() > 1
+        domestic_collaboration = int((multi_author & (corpus.countries.per_doc() <= 1)).sum())
         
-        total_papers = len(df)
+        total_papers = corpus.n_docs
         collaboration_rate = (domestic_collaboration + international_collaboration) / total_papers if total_papers > 0 else 0
         
         return {
@@ -294,6 +330,7 @@ class AdvancedAnalysis:
             if not collaboration_metrics.empty:
                 report['合作分析']['合作强度排名'] = collaboration_metrics.head(20)
                 report['合作分析']['平均合作度'] = collaboration_metrics['合作度'].mean()
+                report['合作分析']['中介中心性计算方式'] = collaboration_metrics.attrs.get('betweenness_mode')
             
             # 趋势分析
             trends = self.calculate_research_trends(df)
@@ -327,31 +364,15 @@ def validate_prices_law(df):
     - 包含Price定律验证结果的字典
     """
     try:
-        # 提取作者信息
-        authors = []
-        author_columns = ['AU', 'Authors', 'Author', '作者']
-        
-        for col in author_columns:
-            if col in df.columns:
-                for author_list in df[col].dropna():
-                    if isinstance(author_list, str):
-                        # 分割作者（支持多种分隔符）
-                        separators = [';', ',', '|', '\n']
-                        for sep in separators:
-                            if sep in author_list:
-                                authors.extend([a.strip() for a in author_list.split(sep) if a.strip()])
-                                break
-                        else:
-                            authors.append(author_list.strip())
-                break
-        
-        if not authors:
+        # 作者发文量直接由作者关联表计数
+        corpus = as_corpus(df)
+        author_links = corpus.authors
+        if len(author_links) == 0:
             return {'error': '未找到作者信息'}
         
-        # 统计作者发文量
-        author_counts = Counter(authors)
+        author_counts = Counter(author_links.value_counts().to_dict())
         total_authors = len(author_counts)
-        total_publications = len(df)
+        total_publications = corpus.n_docs
         
         # Price定律计算（修正：应该基于总文献数，不是总作者数）
         core_authors_expected = math.sqrt(total_publications)
@@ -418,47 +439,23 @@ def calculate_collaboration_index(df):
             'collaboration_distribution': {}
         }
         
-        author_columns = ['AU', 'Authors', 'Author', '作者']
-        
-        for col in author_columns:
-            if col in df.columns:
-                author_counts_per_paper = []
-                
-                for author_list in df[col].dropna():
-                    if isinstance(author_list, str):
-                        # 计算每篇文章的作者数量
-                        separators = [';', ',', '|', '\n']
-                        author_count = 1  # 默认1个作者
-                        
-                        for sep in separators:
-                            if sep in author_list:
-                                author_count = len([a.strip() for a in author_list.split(sep) if a.strip()])
-                                break
-                        
-                        author_counts_per_paper.append(author_count)
-                        
-                        # 统计合作分布
-                        if author_count == 1:
-                            collaboration_data['single_author_papers'] += 1
-                        else:
-                            collaboration_data['multi_author_papers'] += 1
-                        
-                        # 合作规模分布
-                        if author_count in collaboration_data['collaboration_distribution']:
-                            collaboration_data['collaboration_distribution'][author_count] += 1
-                        else:
-                            collaboration_data['collaboration_distribution'][author_count] = 1
-                
-                if author_counts_per_paper:
-                    collaboration_data['average_authors_per_paper'] = round(np.mean(author_counts_per_paper), 2)
-                    collaboration_data['max_authors_per_paper'] = max(author_counts_per_paper)
-                    
-                    total_papers = len(author_counts_per_paper)
-                    collaboration_data['collaboration_rate'] = round(
-                        (collaboration_data['multi_author_papers'] / total_papers) * 100, 2
-                    )
-                
-                break
+        corpus = as_corpus(df)
+        # 每篇文章的作者数量（仅统计有作者信息的文献）
+        author_counts_per_paper = corpus.authors.per_doc()
+        author_counts_per_paper = author_counts_per_paper[author_counts_per_paper > 0]
+        
+        if len(author_counts_per_paper):
+            collaboration_data['single_author_papers'] = int((author_counts_per_paper == 1).sum())
+            collaboration_data['multi_author_papers'] = int((author_counts_per_paper > 1).sum())
+            sizes, counts = np.unique(author_counts_per_paper, return_counts=True)
+            collaboration_data['collaboration_distribution'] = dict(zip(sizes.tolist(), counts.tolist()))
+            collaboration_data['average_authors_per_paper'] = round(float(np.mean(author_counts_per_paper)), 2)
+            collaboration_data['max_authors_per_paper'] = int(author_counts_per_paper.max())
+            
+            total_papers = len(author_counts_per_paper)
+            collaboration_data['collaboration_rate'] = round(
+                (collaboration_data['multi_author_papers'] / total_papers) * 100, 2
+            )
         
         return collaboration_data
         
@@ -487,19 +484,8 @@ def calculate_research_impact_metrics(df):
         }
         
         # 提取引用数据
-        citation_columns = ['TC', 'Citations', 'Times Cited', '被引频次', '引用次数']
-        citations = []
-        
-        for col in citation_columns:
-            if col in df.columns:
-                for citation in df[col].dropna():
-                    try:
-                        cit_count = int(float(str(citation)))
-                        if cit_count >= 0:
-                            citations.append(cit_count)
-                    except (ValueError, TypeError):
-                        citations.append(0)
-                break
+        corpus = as_corpus(df)
+        citations = corpus.citations.tolist() if corpus.has('citations') else []
         
         if not citations:
             return impact_metrics
@@ -1,252 +1,115 @@
-import re
+import numpy as np
 import pandas as pd
 import streamlit as st
-from collections import defaultdict
-import itertools
 
+from Calculate_Anaysis.Corpus import as_corpus
+from Calculate_Anaysis.Incidence_Matrix import DEFAULT_MAX_AUTHORS
 
-from collections import defaultdict
-import itertools
-import plotly.graph_objects as go
+
+def _clean_author_name(author):
+    """作者名统一格式：首字母大写、去掉末尾句点、逗号换成空格"""
+    return author.strip().title().rstrip('.').replace(",", " ")
+
+
+def _author_links(df):
+    """从语料对象取出规范化后的作者关联表（无作者信息时返回 None；规范化结果记忆在语料上，只算一次）"""
+    corpus = as_corpus(df)
+    if len(corpus.authors) == 0:
+        return corpus, None
+    return corpus, corpus.relabeled('authors', _clean_author_name)
+
+
+def warn_hyper_authored(df, max_authors=DEFAULT_MAX_AUTHORS):
+    """
+    在界面提示被视为超多作者的文献（其作者两两合作不计入网络，发文量照常统计）
+    :param df: DataFrame或Corpus
+    :param max_authors: 超多作者文献阈值
+    :return: 超多作者文献表
+    """
+    hyper = as_corpus(df).hyper_authored(max_authors)
+    if not hyper.empty:
+        st.warning(f"⚠️ {len(hyper)} 篇文献作者数超过 {max_authors}，视为超多作者文献，未计入作者两两合作（发文量仍正常统计）")
+        with st.expander("查看超多作者文献"):
+            st.dataframe(hyper, use_container_width=True)
+    return hyper
 
 
 # 数据处理函数：计算作者合作关系
-def process_author_data(df):
+def process_author_data(df, min_weight=None, mode='full', max_authors=DEFAULT_MAX_AUTHORS):
     """
     处理作者数据，计算作者合作关系
-    :param df: 包含作者信息的DataFrame
+    :param df: 包含作者信息的DataFrame或Corpus
+    :param min_weight: 最小合作强度，为空时保留全部合作对
+    :param mode: 合作计数方式，见 COUNTING_MODES（'full' 或 'fractional'）
+    :param max_authors: 作者数超过该值的文献不参与两两合作计数，为空时不限制
     :return: 合作关系DataFrame（source, target, weight）
     """
-    co_occurrence = defaultdict(int)
-
-    # 优先使用"作者"字段，如果没有则尝试"作者地址"字段
-    author_column = None
-    if '作者' in df.columns:
-        author_column = '作者'
-    elif '作者地址' in df.columns:
-        author_column = '作者地址'
-    else:
+    corpus, authors = _author_links(df)
+    if authors is None:
         return pd.DataFrame()
-
-    # 遍历每一行的作者字段
-    for authors in df[author_column].dropna():
-        if author_column == '作者':
-            # 直接从作者字段提取，用分号分隔
-            authors_list = [author.strip() for author in str(authors).split(';') if author.strip()]
-        elif author_column == '作者地址':
-            # 从作者地址字段提取，使用正则表达式
-            pattern = r'\[(.*?)\](.*?)(?=\.)'
-            matches = re.findall(pattern, str(authors))
-            authors_list = []
-            for each in matches:
-                rest_info = each[0].replace("；", ";").replace("，", ",").replace(" ", "")
-                author_info = rest_info.split(";")
-                for author in author_info:
-                    author_cleaned = author.strip().title().rstrip('.').replace(",", " ")
-                    if author_cleaned:
-                        authors_list.append(author_cleaned)
-
-        # 计算每对作者的共现次数
-        if len(authors_list) > 1:
-            for pair in itertools.combinations(set(authors_list), 2):
-                sorted_pair = tuple(sorted(pair))  # 确保作者对的顺序一致
-                co_occurrence[sorted_pair] += 1
-    
-    # 将结果转换为DataFrame
-    edges = [{"source": k[0], "target": k[1], "weight": v} for k, v in co_occurrence.items()]
-    return pd.DataFrame(edges)
+    warn_hyper_authored(corpus, max_authors)
+    edges = authors.pair_counts(min_weight, mode=mode, max_items=max_authors)
+    return edges if not edges.empty else pd.DataFrame()
 
 
 
 #统计每个作者的出版量和引用数
 def calculate_number_of_authors_publication(df):
-    # 优先使用"作者"字段，如果没有则尝试"作者地址"字段
-    author_column = None
-    citation_column = None
-    
-    # 检查作者字段
-    if '作者' in df.columns:
-        author_column = '作者'
-    elif '作者地址' in df.columns:
-        author_column = '作者地址'
-    else:
+    corpus, authors = _author_links(df)
+    if authors is None:
         st.write("DataFrame 中缺少作者相关列。")
         return pd.DataFrame()
-    
-    # 检查引用字段
-    if '核心合集的被引频次计数' in df.columns:
-        citation_column = '核心合集的被引频次计数'
-    else:
+    if not corpus.has('citations'):
         st.write("DataFrame 中缺少引用相关列。")
         return pd.DataFrame()
-    
-    authors_citations = {}  # 存储作者的引用数
-    authors_documents = {}  # 存储作者的文档数量
-    
-    # 处理作者信息
-    for index, row in df.iterrows():
-        authors_text = str(row[author_column])
-        citations = row[citation_column]
-        
-        # 确保citations是数值类型
-        try:
-            if pd.notna(citations):
-                citations_value = float(citations) if str(citations).replace('.', '').replace('-', '').isdigit() else 0
-            else:
-                citations_value = 0
-        except (ValueError, TypeError):
-            citations_value = 0
-        
-        if author_column == '作者':
-            # 直接从作者字段提取，用分号分隔
-            if pd.notna(authors_text) and authors_text.strip():
-                author_list = [author.strip() for author in authors_text.split(';') if author.strip()]
-                for author in author_list:
-                    author_cleaned = author.strip().title().rstrip('.').replace(",", " ")
-                    # 统计引用数
-                    if author_cleaned in authors_citations:
-                        authors_citations[author_cleaned] += citations_value
-                    else:
-                        authors_citations[author_cleaned] = citations_value
-                    # 统计文档数量
-                    if author_cleaned in authors_documents:
-                        authors_documents[author_cleaned] += 1
-                    else:
-                        authors_documents[author_cleaned] = 1
-        
-        elif author_column == '作者地址':
-            # 从作者地址字段提取，使用正则表达式
-            pattern = r'\[(.*?)\](.*?)(?=\.)'
-            matches = re.findall(pattern, authors_text)
-            for each in matches:
-                rest_info = each[0].replace("；", ";").replace("，", ",").replace(" ", "")  # 去除空格
-                author_info = rest_info.split(";")
-                for author in author_info:
-                    author_cleaned = author.strip().title().rstrip('.').replace(",", " ")
-                    if author_cleaned:  # 确保作者名不为空
-                        # 统计引用数
-                        if author_cleaned in authors_citations:
-                            authors_citations[author_cleaned] += citations_value
-                        else:
-                            authors_citations[author_cleaned] = citations_value
-                        # 统计文档数量
-                        if author_cleaned in authors_documents:
-                            authors_documents[author_cleaned] += 1
-                        else:
-                            authors_documents[author_cleaned] = 1
-
-    if authors_citations:
-        authors_stats = pd.DataFrame({
-            '作者': list(authors_citations.keys()),
-            'Citations': list(authors_citations.values()),
-            'Documents': list(authors_documents.values())
-        })
-        return authors_stats
-    else:
+
+    # 在关联表上按作者汇总文档数与引用数
+    documents = authors.doc_counts()
+    citations = authors.sum_by_entity(corpus.citations)
+    present = documents > 0
+    if not present.any():
         st.write("无法从数据中提取作者信息。")
         return pd.DataFrame()
 
+    authors_stats = pd.DataFrame({
+        '作者': authors.labels[present],
+        'Citations': citations[present],
+        'Documents': documents[present]
+    })
+    return authors_stats
+
 
 #计算核心作者的文章数量：
 def calculate_core_author_publication(core_author_df, df):
     core_author_list = core_author_df["作者"].astype('str').unique()  # 获取独特的核心作者名单
-    unique_articles_with_core_authors = set()  # 存储包含核心作者的唯一文章标识
-
-    # 优先使用"作者"字段，如果没有则尝试"作者地址"字段
-    author_column = None
-    if '作者' in df.columns:
-        author_column = '作者'
-    elif '作者地址' in df.columns:
-        author_column = '作者地址'
-    else:
+
+    corpus, authors = _author_links(df)
+    if authors is None:
         raise ValueError("DataFrame 中缺少作者相关列。")
-    
+
     # 检查是否有文献标题列
-    if '文献标题' not in df.columns:
+    if 'Title' not in corpus.docs.columns:
         raise ValueError("DataFrame 中缺少 '文献标题' 列。")
 
-    for index, row in df.iterrows():
-        authors_text = str(row[author_column])
-        author_title = row['文献标题']
-        
-        if author_column == '作者':
-            # 直接从作者字段提取，用分号分隔
-            if pd.notna(authors_text) and authors_text.strip():
-                author_list = [author.strip() for author in authors_text.split(';') if author.strip()]
-                for author in author_list:
-                    author_cleaned = author.strip().title().rstrip('.').replace(",", " ")
-                    if author_cleaned in core_author_list:
-                        unique_articles_with_core_authors.add(author_title)
-                        break  # 找到核心作者后，跳出循环
-        
-        elif author_column == '作者地址':
-            # 从作者地址字段提取，使用正则表达式
-            pattern = r'\[(.*?)\](.*?)(?=\.)'
-            matches = re.findall(pattern, authors_text)
-            for each in matches:
-                rest_info = each[0].replace("；", ";").replace("，", ",").replace(" ", "")  # 去除空格
-                author_info = rest_info.split(";")
-                for author in author_info:
-                    author_cleaned = author.strip().title().rstrip('.').replace(",", " ")
-                    if author_cleaned in core_author_list:
-                        unique_articles_with_core_authors.add(author_title)
-                        break  # 找到核心作者后，跳出循环
+    # 包含至少一位核心作者的文章
+    is_core = authors.labels.isin(core_author_list)
+    core_docs = np.unique(authors.doc[is_core[authors.ids]])
 
     # 返回包含核心作者的独特文章的标题
-    return unique_articles_with_core_authors
+    return set(corpus.docs['Title'].iloc[core_docs])
 
-import pandas as pd
-from collections import defaultdict
 
 def calculate_publication_by_author(df: pd.DataFrame):
-    co_occurrence = defaultdict(int)
-    
-    # 优先使用"作者"字段，如果没有则尝试"作者地址"字段
-    author_column = None
-    if '作者' in df.columns:
-        author_column = '作者'
-    elif '作者地址' in df.columns:
-        author_column = '作者地址'
-    else:
+    corpus, authors = _author_links(df)
+    if authors is None:
         return pd.Series()
-    
-    for authors in df[author_column].dropna():
-        if author_column == '作者':
-            # 直接从作者字段提取，用分号分隔
-            auths = [a.strip() for a in str(authors).split(';') if a.strip()]
-            for a in auths:
-                author_cleaned = a.strip().title().rstrip('.').replace(",", " ")
-                if author_cleaned:
-                    co_occurrence[author_cleaned] += 1
-        elif author_column == '作者地址':
-            # 从作者地址字段提取，使用正则表达式
-            pattern = r'\[(.*?)\](.*?)(?=\.)'
-            matches = re.findall(pattern, str(authors))
-            for each in matches:
-                rest_info = each[0].replace("；", ";").replace("，", ",").replace(" ", "")
-                author_info = rest_info.split(";")
-                for author in author_info:
-                    author_cleaned = author.strip().title().rstrip('.').replace(",", " ")
-                    if author_cleaned:
-                        co_occurrence[author_cleaned] += 1
-    
-    return pd.Series(co_occurrence).sort_values(ascending=False)
+    return authors.value_counts()
 
 
 # Calculate_Anaysis/Calculate_Country.py
-import pandas as pd
-import re
-from collections import Counter
 
 def calculate_publication_by_country(df: pd.DataFrame):
-    if '作者地址' not in df.columns:
+    corpus = as_corpus(df)
+    if len(corpus.countries) == 0:
         return pd.Series()
-    pattern = r"\[(.*?)\](.*?)(?=\.)"
-    countries = []
-    for addr in df['作者地址'].dropna().astype(str):
-        matches = re.findall(pattern, addr)
-        for m in matches:
-            country = m[-1].split(',')[-1].strip()
-            if country == 'Taiwan': country = 'Chinese Taiwan'
-            countries.append(country)
-    return pd.Series(Counter(countries)).sort_values(ascending=False)
\ No newline at end of file
+    return corpus.countries.value_counts()
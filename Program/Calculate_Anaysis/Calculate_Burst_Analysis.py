@@ -1,16 +1,154 @@
 """
 Kleinberg's Burst Detection Algorithm Implementation
 用于文献计量分析中的关键词突现检测
+
+批处理（batched）两状态 Kleinberg 模型，与 CiteSpace 的突现检测相同：
+- 第 t 年共有 d_t 篇文献，其中 r_t 篇含该词；基准状态的比率 p0 = Σr / Σd，突现状态 p1 = s·p0
+- 状态 i 的代价为 −ln[p_i^r_t (1−p_i)^(d_t−r_t)]（二项式系数两状态相同，已略去），
+  进入突现状态的代价为 γ·ln(年数)，退出不计代价
+- Viterbi 解码出代价最小的状态序列，连续的突现状态即一次突现，
+  突现强度为该区间内基准状态与突现状态的代价之差（似然比的对数）
+全部词项的 词项×年份 计数矩阵只构建一次，Viterbi 按年份循环、对所有词项向量化
 """
 
 import pandas as pd
 import numpy as np
+import scipy.sparse as sp
 import streamlit as st
-from collections import defaultdict, Counter
-import math
 from scipy import stats
 from datetime import datetime
 
+from Calculate_Anaysis.Corpus import Corpus, as_corpus
+
+# 突现状态与基准状态的比率之比 s、进入突现状态的代价系数 γ、最短突现年数（CiteSpace 默认值）
+BURST_STATE_RATIO = 2.0
+BURST_GAMMA = 1.0
+MIN_BURST_DURATION = 2
+
+
+def term_year_matrix(terms, years):
+    """
+    词项×年份 计数矩阵（一次 bincount 构建）
+
+    参数:
+    - terms: 逐次出现的词项
+    - years: 对应的年份（缺失的出现记录被忽略）
+
+    返回:
+    - counts: 词项×年份 计数矩阵，年份为最早到最晚的连续区间（没有出现的年份计 0）
+    - labels: 行对应的词项（pd.Index）
+    - year_range: 列对应的年份
+    """
+    years = pd.to_numeric(pd.Series(years, dtype=object), errors='coerce').to_numpy(dtype=np.float64)
+    valid = ~np.isnan(years)
+    codes, labels = pd.factorize(pd.Series(terms, dtype=object)[valid])
+    if not len(labels):
+        return np.zeros((0, 0), dtype=np.int64), pd.Index(labels), np.empty(0, dtype=np.int64)
+    years = years[valid].astype(np.int64)
+    first = years.min()
+    year_range = np.arange(first, years.max() + 1)
+    counts = np.bincount(codes * len(year_range) + (years - first), minlength=len(labels) * len(year_range))
+    return counts.reshape(len(labels), len(year_range)), pd.Index(labels), year_range
+
+
+def kleinberg_states(counts, totals, s=BURST_STATE_RATIO, gamma=BURST_GAMMA):
+    """
+    两状态 Kleinberg 模型的 Viterbi 解码（对所有词项向量化）
+
+    参数:
+    - counts: 词项×年份 矩阵，每年含该词的文献数 r_t
+    - totals: 每年的文献总数 d_t
+    - s: 突现状态与基准状态的比率之比
+    - gamma: 进入突现状态的代价系数
+
+    返回:
+    - states: 词项×年份 布尔矩阵，True 为突现状态
+    - gain: 词项×年份 每年基准状态代价减突现状态代价（突现强度按区间求和）
+    """
+    counts = np.asarray(counts, dtype=np.float64)
+    totals = np.asarray(totals, dtype=np.float64)
+    n_terms, n_years = counts.shape
+    if n_terms == 0 or n_years == 0 or totals.sum() <= 0:
+        return np.zeros(counts.shape, dtype=bool), np.zeros(counts.shape)
+    base = np.clip(counts.sum(axis=1) / totals.sum(), 1e-12, 1 - 1e-12)[:, None]
+    burst = np.minimum(s * base, 1 - 1e-12)
+    misses = np.maximum(totals - counts, 0)
+    base_cost = -(counts * np.log(base) + misses * np.log1p(-base))
+    burst_cost = -(counts * np.log(burst) + misses * np.log1p(-burst))
+    transition = gamma * np.log(n_years) if n_years > 1 else gamma
+
+    # 前向：cost0/cost1 为第 t 年处于基准/突现状态的最小累计代价，from_base 记录突现状态的前驱是否为基准状态
+    cost0 = base_cost[:, 0].copy()
+    cost1 = burst_cost[:, 0] + transition
+    stay_base = np.empty((n_terms, n_years), dtype=bool)
+    from_base = np.empty((n_terms, n_years), dtype=bool)
+    for t in range(1, n_years):
+        stay_base[:, t] = cost0 <= cost1
+        from_base[:, t] = cost0 + transition < cost1
+        cost0, cost1 = (np.minimum(cost0, cost1) + base_cost[:, t],
+                        np.where(from_base[:, t], cost0 + transition, cost1) + burst_cost[:, t])
+
+    # 回溯
+    states = np.empty((n_terms, n_years), dtype=bool)
+    states[:, -1] = cost1 < cost0
+    for t in range(n_years - 1, 0, -1):
+        states[:, t - 1] = np.where(states[:, t], ~from_base[:, t], ~stay_base[:, t])
+    return states, base_cost - burst_cost
+
+
+def detect_bursts(counts, totals, labels, year_range, s=BURST_STATE_RATIO, gamma=BURST_GAMMA,
+                  min_duration=MIN_BURST_DURATION, min_frequency=1):
+    """
+    全部词项的突现区间
+
+    参数:
+    - counts, totals: 同 kleinberg_states
+    - labels: 行对应的词项
+    - year_range: 列对应的年份
+    - s, gamma: 同 kleinberg_states
+    - min_duration: 最短突现年数
+    - min_frequency: 总频次低于该值的词项不参与检测
+
+    返回:
+    - DataFrame: Term, Strength, Begin, End, Frequency（每次突现一行），按突现强度降序
+    """
+    counts = np.asarray(counts)
+    frequency = counts.sum(axis=1) if counts.size else np.zeros(len(counts), dtype=np.int64)
+    rows = np.flatnonzero(frequency >= min_frequency)
+    states, gain = kleinberg_states(counts[rows], totals, s, gamma)
+    # 状态序列两端补 0，上升沿为突现开始、下降沿为突现结束后一年
+    edges = np.diff(np.pad(states.astype(np.int8), ((0, 0), (1, 1))), axis=1)
+    term, begin = np.nonzero(edges == 1)
+    _, end = np.nonzero(edges == -1)
+    cumulative = np.pad(np.cumsum(gain, axis=1), ((0, 0), (1, 0)))
+    strength = cumulative[term, end] - cumulative[term, begin]
+    keep = end - begin >= min_duration
+    term, begin, end, strength = term[keep], begin[keep], end[keep], strength[keep]
+    bursts = pd.DataFrame({
+        'Term': np.asarray(labels, dtype=object)[rows[term]],
+        'Strength': strength,
+        'Begin': np.asarray(year_range)[begin],
+        'End': np.asarray(year_range)[end - 1],
+        'Frequency': frequency[rows[term]],
+    })
+    return bursts.sort_values('Strength', ascending=False, kind='stable').reset_index(drop=True)
+
+
+def entity_bursts(corpus: Corpus, field='keywords', s=BURST_STATE_RATIO, gamma=BURST_GAMMA,
+                  min_duration=MIN_BURST_DURATION, min_frequency=1):
+    """
+    语料中关键词（或作者、参考文献等关联字段）的突现：r_t 为第 t 年含该词的文献数，d_t 为第 t 年的文献数
+
+    返回:
+    - DataFrame: 同 detect_bursts
+    """
+    cube = as_corpus(corpus).time_cube
+    matrix = cube.matrix(field)
+    # 只把达到频次要求的词项展开为稠密矩阵
+    rows = np.flatnonzero(np.asarray(matrix.sum(axis=1)).ravel() >= max(min_frequency, 1))
+    return detect_bursts(matrix[rows].toarray(), cube.documents, cube.labels[field][rows], cube.years, s, gamma,
+                         min_duration)
+
 class BurstDetectionAnalyzer:
     """
     基于Kleinberg算法的突现检测分析器
@@ -18,17 +156,20 @@ class BurstDetectionAnalyzer:
     """
     
     def __init__(self):
-        self.burst_threshold = 1.5  # 突现强度阈值
+        self.burst_threshold = 0.0  # 突现强度阈值（Kleinberg 似然比的对数，检测到的突现均大于 0）
         self.min_frequency = 3      # 最小频率要求
+        self.state_ratio = BURST_STATE_RATIO
+        self.gamma = BURST_GAMMA
+        self.min_duration = MIN_BURST_DURATION
         
     def calculate_keyword_burst(self, keywords, years, time_window=1):
         """
-        计算关键词突现分析
+        计算关键词突现分析（每年的批大小 d_t 为当年的关键词出现总次数）
         
         参数:
         - keywords: 关键词列表
         - years: 对应的年份列表  
-        - time_window: 时间窗口大小
+        - time_window: 时间窗口大小（保留参数，按年检测）
         
         返回:
         - 突现关键词列表，包含突现强度和时间段
@@ -37,127 +178,40 @@ class BurstDetectionAnalyzer:
             return []
         
         try:
-            # 按年份分组关键词
-            keyword_by_year = self._group_keywords_by_year(keywords, years)
-            
-            # 计算每个关键词的突现强度
-            burst_results = []
-            unique_keywords = set(keywords)
-            
-            for keyword in unique_keywords:
-                if keywords.count(keyword) >= self.min_frequency:
-                    burst_data = self._calculate_single_keyword_burst(
-                        keyword, keyword_by_year
-                    )
-                    if burst_data and burst_data['burst_strength'] >= self.burst_threshold:
-                        burst_results.append(burst_data)
-            
-            # 按突现强度排序
-            burst_results.sort(key=lambda x: x['burst_strength'], reverse=True)
-            
-            return burst_results[:50]  # 返回前50个突现关键词
+            terms = pd.Series(keywords, dtype=object)
+            known = terms.notna()
+            terms = terms.astype(str).str.lower().str.strip()
+            counts, labels, year_range = term_year_matrix(terms[known], pd.Series(years, dtype=object)[known])
+            bursts = detect_bursts(counts, counts.sum(axis=0), labels, year_range, self.state_ratio, self.gamma,
+                                   self.min_duration, self.min_frequency)
+            return self._burst_records(bursts, sp.csr_matrix(counts), labels, year_range)
             
         except Exception as e:
             st.warning(f"突现分析计算失败: {str(e)}")
             return []
     
-    def _group_keywords_by_year(self, keywords, years):
-        """按年份分组关键词"""
-        keyword_by_year = defaultdict(list)
-        
-        for keyword, year in zip(keywords, years):
-            if pd.notna(keyword) and pd.notna(year):
-                try:
-                    year_int = int(float(year))
-                    if 1900 <= year_int <= 2030:  # 合理年份范围
-                        keyword_by_year[year_int].append(str(keyword).lower().strip())
-                except (ValueError, TypeError):
-                    continue
-        
-        return keyword_by_year
-    
-    def _calculate_single_keyword_burst(self, keyword, keyword_by_year):
-        """计算单个关键词的突现强度"""
-        try:
-            years_sorted = sorted(keyword_by_year.keys())
-            if len(years_sorted) < 2:
-                return None
-            
-            # 计算每年的关键词频率
-            yearly_counts = []
-            for year in years_sorted:
-                count = keyword_by_year[year].count(keyword.lower())
-                yearly_counts.append(count)
-            
-            # 计算突现强度
-            burst_strength, burst_periods = self._kleinberg_burst_detection(
-                yearly_counts, years_sorted
-            )
-            
-            if burst_strength >= self.burst_threshold and burst_periods:
-                return {
-                    'keyword': keyword,
-                    'burst_strength': round(burst_strength, 2),
-                    'burst_periods': burst_periods,
-                    'burst_years': [years_sorted[i] for i in burst_periods],
-                    'total_frequency': sum(yearly_counts),
-                    'max_frequency': max(yearly_counts),
-                    'years_active': len([c for c in yearly_counts if c > 0])
-                }
-            
-            return None
-            
-        except Exception as e:
-            return None
-    
-    def _kleinberg_burst_detection(self, counts, years):
-        """
-        简化的Kleinberg突现检测算法
-        
-        参数:
-        - counts: 每年的频率计数
-        - years: 对应的年份
-        
-        返回:
-        - burst_strength: 突现强度
-        - burst_periods: 突现时期的索引
-        """
-        if len(counts) < 2 or sum(counts) == 0:
-            return 0, []
-        
-        try:
-            # 计算基准频率（平均频率）
-            baseline_rate = sum(counts) / len(counts)
-            if baseline_rate == 0:
-                return 0, []
-            
-            # 寻找突现期
-            burst_periods = []
-            max_burst_strength = 0
-            
-            # 使用滑动窗口检测突现
-            window_size = min(3, len(counts))  # 窗口大小
-            
-            for i in range(len(counts) - window_size + 1):
-                window_counts = counts[i:i + window_size]
-                window_rate = sum(window_counts) / len(window_counts)
-                
-                # 计算突现强度
-                if baseline_rate > 0:
-                    burst_strength = window_rate / baseline_rate
-                    
-                    # 如果突现强度超过阈值，记录突现期
-                    if burst_strength > self.burst_threshold:
-                        burst_periods.extend(range(i, i + window_size))
-                        max_burst_strength = max(max_burst_strength, burst_strength)
-            
-            # 去重并排序突现期
-            burst_periods = sorted(list(set(burst_periods)))
-            
-            return max_burst_strength, burst_periods
-            
-        except Exception as e:
-            return 0, []
+    def _burst_records(self, bursts, counts, labels, year_range):
+        """把突现表转换为字典列表（按突现强度排序，最多 50 条）；counts 为 词项×年份 CSR 计数矩阵"""
+        bursts = bursts[bursts['Strength'] >= self.burst_threshold].head(50)
+        rows = labels.get_indexer(bursts['Term'])
+        records = []
+        for row, (term, strength, begin, end, frequency) in zip(rows, bursts.itertuples(index=False)):
+            if row < 0:
+                continue
+            periods = list(range(int(begin - year_range[0]), int(end - year_range[0]) + 1))
+            yearly = counts[row].toarray().ravel()
+            records.append({
+                'keyword': term,
+                'burst_strength': round(float(strength), 2),
+                'begin': int(begin),
+                'end': int(end),
+                'burst_periods': periods,
+                'burst_years': [int(year_range[i]) for i in periods],
+                'total_frequency': int(frequency),
+                'max_frequency': int(yearly.max()),
+                'years_active': int((yearly > 0).sum())
+            })
+        return records
     
     def calculate_temporal_burst_analysis(self, df):
         """
@@ -170,110 +224,51 @@ class BurstDetectionAnalyzer:
         - 时间序列突现分析结果
         """
         try:
-            # 提取关键词和年份
-            keywords, years = self._extract_keywords_and_years(df)
-            
-            if not keywords or not years:
+            # 关键词×年份 计数（年份缺失的文献不计入）
+            cube = as_corpus(df).time_cube
+            keyword_totals = cube.totals('keywords')
+            if not keyword_totals.any():
                 return {'error': '无法提取关键词或年份信息'}
             
-            # 计算突现分析
-            burst_results = self.calculate_keyword_burst(keywords, years)
+            # 计算突现分析（r_t 为第 t 年含该关键词的文献数，d_t 为第 t 年的文献数）
+            bursts = entity_bursts(df, 'keywords', self.state_ratio, self.gamma, self.min_duration,
+                                   self.min_frequency)
+            burst_results = self._burst_records(bursts, cube.matrix('keywords'), cube.labels['keywords'], cube.years)
             
             # 生成时间序列统计
-            temporal_stats = self._generate_temporal_statistics(keywords, years)
+            temporal_stats = self._generate_temporal_statistics(cube)
             
             return {
                 'burst_keywords': burst_results,
                 'temporal_stats': temporal_stats,
-                'total_keywords': len(set(keywords)),
-                'time_span': f"{min(years)}-{max(years)}" if years else "N/A",
+                'total_keywords': int((keyword_totals > 0).sum()),
+                'time_span': f"{temporal_stats['start_year']}-{temporal_stats['end_year']}" if 'start_year' in temporal_stats else "N/A",
                 'burst_keywords_count': len(burst_results)
             }
             
         except Exception as e:
             return {'error': f'时间序列分析失败: {str(e)}'}
     
-    def _extract_keywords_and_years(self, df):
-        """从数据框中安全提取关键词和年份"""
-        keywords = []
-        years = []
-        
-        # 尝试提取关键词
-        keyword_columns = ['DE', 'Keywords', 'Keyword', 'ID', '关键词', '主题词']
-        keyword_col = None
-        
-        for col in keyword_columns:
-            if col in df.columns:
-                keyword_col = col
-                break
-        
-        if keyword_col:
-            for kws in df[keyword_col].dropna():
-                if isinstance(kws, str) and kws.strip():
-                    # 尝试不同分隔符
-                    separators = [';', ',', '|', '\n']
-                    for sep in separators:
-                        if sep in kws:
-                            kw_list = [kw.strip().lower() for kw in kws.split(sep) if kw.strip()]
-                            keywords.extend(kw_list)
-                            break
-                    else:
-                        keywords.append(kws.strip().lower())
-        
-        # 尝试提取年份
-        year_columns = ['PY', 'Year', 'Publication Year', '出版年', '年份']
-        year_col = None
-        
-        for col in year_columns:
-            if col in df.columns:
-                year_col = col
-                break
-        
-        if year_col:
-            for year in df[year_col].dropna():
-                try:
-                    year_int = int(float(str(year)))
-                    if 1900 <= year_int <= 2030:
-                        years.append(year_int)
-                except (ValueError, TypeError):
-                    continue
-        
-        # 确保关键词和年份数量匹配
-        if len(keywords) > len(years):
-            # 如果关键词多于年份，重复年份
-            years = (years * (len(keywords) // len(years) + 1))[:len(keywords)]
-        elif len(years) > len(keywords):
-            # 如果年份多于关键词，截断年份
-            years = years[:len(keywords)]
-        
-        return keywords, years
-    
-    def _generate_temporal_statistics(self, keywords, years):
-        """生成时间统计信息"""
-        if not keywords or not years:
-            return {}
-        
+    def _generate_temporal_statistics(self, cube):
+        """生成时间统计信息（从语料的 实体×年份 立方体读取）"""
         try:
-            # 按年份统计关键词数量
-            year_keyword_counts = defaultdict(int)
-            unique_keywords_by_year = defaultdict(set)
-            
-            for keyword, year in zip(keywords, years):
-                year_keyword_counts[year] += 1
-                unique_keywords_by_year[year].add(keyword)
+            # 按年份统计关键词数量（只统计有关键词的年份）
+            year_keyword_counts = pd.Series(np.asarray(cube.matrix('keywords').sum(axis=0)).ravel(), index=cube.years)
+            year_keyword_counts = year_keyword_counts[year_keyword_counts > 0]
+            if year_keyword_counts.empty:
+                return {}
+            unique_keywords_by_year = cube.active('keywords')[year_keyword_counts.index]
             
             # 计算统计指标
-            years_sorted = sorted(year_keyword_counts.keys())
-            
             stats = {
-                'time_span': len(years_sorted),
-                'start_year': min(years_sorted) if years_sorted else None,
-                'end_year': max(years_sorted) if years_sorted else None,
-                'peak_year': max(year_keyword_counts, key=year_keyword_counts.get) if year_keyword_counts else None,
-                'peak_keyword_count': max(year_keyword_counts.values()) if year_keyword_counts else 0,
-                'average_keywords_per_year': sum(year_keyword_counts.values()) / len(year_keyword_counts) if year_keyword_counts else 0,
+                'time_span': len(year_keyword_counts),
+                'start_year': int(year_keyword_counts.index[0]),
+                'end_year': int(year_keyword_counts.index[-1]),
+                'peak_year': int(year_keyword_counts.idxmax()),
+                'peak_keyword_count': int(year_keyword_counts.max()),
+                'average_keywords_per_year': float(year_keyword_counts.mean()),
                 'keyword_diversity_trend': self._calculate_diversity_trend(unique_keywords_by_year),
-                'growth_pattern': self._analyze_growth_pattern(year_keyword_counts)
+                'growth_pattern': self._analyze_growth_pattern(year_keyword_counts.to_dict())
             }
             
             return stats
@@ -282,14 +277,9 @@ class BurstDetectionAnalyzer:
             return {'error': f'统计计算失败: {str(e)}'}
     
     def _calculate_diversity_trend(self, unique_keywords_by_year):
-        """计算关键词多样性趋势"""
+        """计算关键词多样性趋势（unique_keywords_by_year: 年份 -> 不同关键词数）"""
         try:
-            years_sorted = sorted(unique_keywords_by_year.keys())
-            diversity_scores = []
-            
-            for year in years_sorted:
-                unique_count = len(unique_keywords_by_year[year])
-                diversity_scores.append(unique_count)
+            diversity_scores = unique_keywords_by_year.sort_index().tolist()
             
             if len(diversity_scores) > 1:
                 # 计算趋势斜率
@@ -1,22 +1,17 @@
 import streamlit as st
-import pandas as pd
+
+from Calculate_Anaysis.Corpus import as_corpus
 
 # 计算平均每篇文献的被引用次数
 def calculate_number_of_total_Timescitedcount(df):
-    number_of_total_articles = df.shape[0]
+    corpus = as_corpus(df)
+    number_of_total_articles = corpus.n_docs
     number_of_total_Timescitedcount = 0
     average_citations_per_doc = 0
     
-    if '核心合集的被引频次计数' in df.columns:
-        # 安全地处理引用次数数据
-        for index, citations in df['核心合集的被引频次计数'].items():
-            try:
-                if pd.notna(citations):
-                    # 尝试转换为数值
-                    citation_value = float(citations) if str(citations).replace('.', '').replace('-', '').isdigit() else 0
-                    number_of_total_Timescitedcount += max(0, citation_value)  # 确保不为负数
-            except (ValueError, TypeError):
-                continue  # 跳过无法转换的值
+    if corpus.has('citations'):
+        # 语料对象中被引次数已转换为非负整数
+        number_of_total_Timescitedcount = corpus.citations.sum()
         
         if number_of_total_articles > 0:
             average_citations_per_doc = number_of_total_Timescitedcount / number_of_total_articles
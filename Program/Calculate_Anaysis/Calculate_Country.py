@@ -1,65 +1,36 @@
 import streamlit as st
 import re
 import matplotlib.pyplot as plt
+import numpy as np
 import pandas as pd
+
+from Calculate_Anaysis.Corpus import as_corpus, as_frame
 #国际合作
 def calculate_collaboration_countries(df):
-    if '作者地址' in df.columns:
-        total_authors = []#作者地址提取的所有作者:2层嵌套
-        summary_total_authors = []#作者地址提取的所有作者:1层嵌套
-        num_of_single_author_articles=0
-        total_collaboration_countries = []  # 所有文章的所有国家
-        summary_total_countries = []  # 所有文章的所有国家：1层嵌套
-        total_international_papers = 0
-        number_of_single_country_papers = 0
-        # ——————————01:提取每篇文章的所有作者
-        if '作者地址' in df.columns:
-            total_authors = []  # 作者地址提取的所有作者:2层嵌套
-            summary_total_authors = []  # 作者地址提取的所有作者:1层嵌套
-
-            # ——————————01:提取每篇文章的所有作者
-
-            Correspondingauthoraddress = df['作者地址'].astype(str)
-            for each_Correspondingauthoraddress in Correspondingauthoraddress:
-                each_collaboration_countries=[]
-                pattern = r'\[(.*?)\](.*?)(?=\.)'
-                matches = re.findall(pattern, each_Correspondingauthoraddress)
-                for each in matches:
-                    rest_info = each[0].replace("；", ";").replace("，", ",")
-                    author_info = rest_info.split(";")
-                    for i in author_info:
-                        author_info_st = i.strip().title().rstrip(
-                            '.')
-                        total_authors.append([author_info_st])
-                        summary_total_authors.append(author_info_st)
-            # ——————————02:提取每篇文章的国家
-                for each in matches:
-                    rest_info = each[-1]
-                    country_info = rest_info.split(',')[-1].split(' ')[-1]
-                    if country_info == "Taiwan":
-                        country_info = "Chinese Taiwan"
-                    each_collaboration_countries.append(country_info)
-
-                total_collaboration_countries.append(set(each_collaboration_countries))  # 所有文章的所有国家：2层嵌套
-                summary_total_countries.extend(set(each_collaboration_countries))
-
-        unique_total_authors = set(summary_total_authors)  # 不重复的所有作者
-        number_of_total_authors = len(summary_total_authors)  # 统计所有作者数量
-        number_of_total_unique_authors = len(unique_total_authors)  # 统计所有不重复的作者数量
-        average_authors_per_doc=number_of_total_authors/df.shape[0]
-        for i in total_authors:
-            if len(i) == 1:
-                num_of_single_author_articles += 1
-            else:
-                st.write(i)
-        for each in total_collaboration_countries:
-            # __________________03:提取国际合作文献
-            if len(each) == 1:
-                number_of_single_country_papers = number_of_single_country_papers + 1
-            elif len(each) > 1:
-                total_international_papers = total_international_papers + 1
-            # ——————————————————03:计算国际合作文献所占比例
-        international_cooperation_percentage = (total_international_papers / df.shape[0]) * 100
+    corpus = as_corpus(df)
+    total_collaboration_countries = []  # 所有文章的所有国家：2层嵌套
+    summary_total_countries = []  # 所有文章的所有国家：1层嵌套
+    number_of_total_unique_authors = 0
+    average_authors_per_doc = 0
+    if corpus.has('address'):
+        # ——————————01:每篇文章的作者（关联表中已拆分）
+        authors = corpus.authors.relabel(lambda author: author.strip().title().rstrip('.'))
+        authors_per_doc = authors.per_doc()
+        number_of_total_authors = len(authors)  # 统计所有作者数量
+        number_of_total_unique_authors = int((authors.doc_counts() > 0).sum())  # 统计所有不重复的作者数量
+        average_authors_per_doc = number_of_total_authors / corpus.n_docs if corpus.n_docs else 0
+        num_of_single_author_articles = int((authors_per_doc == 1).sum())
+
+        # ——————————02:每篇文章的国家
+        total_collaboration_countries = [set(countries) for countries in corpus.countries.doc_labels()]
+        for countries in total_collaboration_countries:
+            summary_total_countries.extend(countries)
+
+        # __________________03:提取国际合作文献并计算所占比例
+        countries_per_doc = corpus.countries.per_doc()
+        number_of_single_country_papers = int((countries_per_doc == 1).sum())
+        total_international_papers = int((countries_per_doc > 1).sum())
+        international_cooperation_percentage = (total_international_papers / corpus.n_docs) * 100 if corpus.n_docs else 0
     else:
         number_of_single_country_papers=0
         num_of_single_author_articles=0
@@ -71,6 +42,7 @@ def calculate_collaboration_countries(df):
     return (result )
 #计算文章年龄
 def calculate_age(df):
+    df = as_frame(df)
     total_ages= []
     sum_ages=0
     if '出版年' in df.columns:
@@ -91,71 +63,29 @@ import pandas as pd
 import re
 
 def  calculate_publication_by_country(df):
-    # 检查必要的列是否存在
-    if '作者地址' in df.columns and '核心合集的被引频次计数' in df.columns and '出版年' in df.columns:
-        countries_citations = {}  # 存储每个国家的总引用数
-        countries_documents = {}  # 存储每个国家的总文档数
-        countries_years = {}      # 存储每个国家的年份列表
-        total_collaboration_countries = []  # 存储每篇文章的国家列表
-        summary_total_countries = []        # 存储所有文章的国家列表
-
-        # 处理每篇文章的作者地址
-        Correspondingauthoraddress = df['作者地址'].astype(str)
-        for index, each_Correspondingauthoraddress in enumerate(Correspondingauthoraddress):
-            each_collaboration_countries = []
-            pattern = r'\[(.*?)\](.*?)(?=\.)'
-            matches = re.findall(pattern, each_Correspondingauthoraddress)
-            for each in matches:
-                rest_info = each[-1]
-                country_info = rest_info.split(',')[-1].split(' ')[-1]
-                if country_info == "Taiwan":
-                    country_info = "Chinese Taiwan"
-                each_collaboration_countries.append(country_info)
-
-            # 去重并保存每篇文章的国家列表
-            total_collaboration_countries.append(list(set(each_collaboration_countries)))
-            summary_total_countries.extend(list(set(each_collaboration_countries)))
-
-        # 将国家列表添加到DataFrame中
-        df['country'] = total_collaboration_countries
-        total_collaboration_countries = df['country'].astype(str)
-        # 统计每个国家的引用数、文档数和年份
-        for index, each_countries in total_collaboration_countries.items():
-            citations = df.loc[index, '核心合集的被引频次计数'].astype(int)
-            year = df.loc[index, '出版年'].astype(int)
-            each_countries = each_countries.replace("'","").replace("[","").replace("]","").split(", ")
-            for each in each_countries:
-                # 更新引用数
-                if each in countries_citations:
-                    countries_citations[each] += citations
-                else:
-                    countries_citations[each] = citations
-
-                # 更新文档数
-                if each in countries_documents:
-                    countries_documents[each] += 1
-                else:
-                    countries_documents[each] = 1
-
-                # 更新年份列表
-                if each in countries_years:
-                    countries_years[each].append(year)
-                else:
-                    countries_years[each] = [year]
-
-        # 创建包含统计信息的DataFrame
+    corpus = as_corpus(df)
+    # 检查必要的字段是否存在
+    if corpus.has('address') and corpus.has('citations') and corpus.has('year'):
+        countries = corpus.countries
+        present = countries.doc_counts() > 0
+
+        # 每个国家的文档数、引用数与年份列表（直接在关联表上聚合）
+        years = corpus.years[countries.doc]
+        order = np.argsort(countries.ids, kind='stable')
+        bounds = np.cumsum(countries.doc_counts())[:-1]
+        years_by_country = [group[~np.isnan(group)].astype(int).tolist() for group in np.split(years[order], bounds)]
+
+        documents = countries.doc_counts()[present]
+        citations = countries.sum_by_entity(corpus.citations)[present].astype(int)
         countries_stats = pd.DataFrame({
-            'Areas': list(countries_citations.keys()),
-            'Documents': list(countries_documents.values()),
-            'Citations': list(countries_citations.values()),
-            'Years': list(countries_years.values())
+            'Areas': countries.labels[present],
+            'Documents': documents,
+            'Citations': citations,
+            'Years': [years_by_country[i] for i in np.flatnonzero(present)]
         })
 
         # 计算平均引用数
-        countries_stats['Average Citation/Publication'] = [
-            citations / documents if documents > 0 else 0
-            for citations, documents in zip(countries_citations.values(), countries_documents.values())
-        ]
+        countries_stats['Average Citation/Publication'] = np.where(documents > 0, citations / np.maximum(documents, 1), 0)
 
         return countries_stats
 
@@ -165,27 +95,9 @@ def  calculate_publication_by_country(df):
 
 def calculate_number_of_countries_publication(df):
     """计算各国发文数量"""
-    if '作者地址' not in df.columns:
+    corpus = as_corpus(df)
+    if not corpus.has('address'):
         st.warning("数据中缺少'作者地址'列")
         return pd.Series()
     
-    country_counts = {}
-    
-    for _, row in df.iterrows():
-        address = str(row['作者地址'])
-        # 提取国家信息
-        pattern = r'\[(.*?)\](.*?)(?=\.)'
-        matches = re.findall(pattern, address)
-        
-        for each in matches:
-            rest_info = each[-1]
-            country_info = rest_info.split(',')[-1].split(' ')[-1]
-            if country_info == "Taiwan":
-                country_info = "Chinese Taiwan"
-            
-            if country_info in country_counts:
-                country_counts[country_info] += 1
-            else:
-                country_counts[country_info] = 1
-    
-    return pd.Series(country_counts).sort_values(ascending=False)
\ No newline at end of file
+    return corpus.countries.value_counts()
@@ -1,15 +1,15 @@
 import streamlit as st
 import pandas as pd
 
+from Calculate_Anaysis.Corpus import as_corpus
+
 def calculate_number_of_keywords(df):
-    """计算关键词统计信息"""
-    if '作者关键词' in df.columns:
-        total_keywords = []
-        for keywords in df['作者关键词'].dropna():
-            keyword_list = keywords.split(';')
-            for keyword in keyword_list:
-                total_keywords.append(keyword.strip().lower())
-        total_unique_keywords = set(total_keywords)
+    """计算关键词统计信息（df 可为DataFrame或Corpus）"""
+    corpus = as_corpus(df)
+    if corpus.has('keywords'):
+        keywords = corpus.keywords
+        total_keywords = keywords.flat_labels()
+        total_unique_keywords = set(keywords.labels[keywords.doc_counts() > 0])
         number_of_total_keywords = len(total_keywords)
         number_of_unique_keywords = len(total_unique_keywords)
         return total_keywords, total_unique_keywords, number_of_total_keywords, number_of_unique_keywords
@@ -18,13 +18,9 @@ def calculate_number_of_keywords(df):
         return [], set(), 0, 0
 
 def calculate_keywords_frequency(df):
-    """计算关键词频率"""
-    if '作者关键词' in df.columns:
-        total_keywords = []
-        for keywords in df['作者关键词'].dropna():
-            keyword_list = keywords.split(';')
-            for keyword in keyword_list:
-                total_keywords.append(keyword.strip().lower())
-        return pd.Series(total_keywords).value_counts()
+    """计算关键词频率（df 可为DataFrame或Corpus）"""
+    corpus = as_corpus(df)
+    if corpus.has('keywords'):
+        return corpus.keywords.value_counts()
     else:
-        return pd.Series()
\ No newline at end of file
+        return pd.Series()
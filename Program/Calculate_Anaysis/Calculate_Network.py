@@ -1,10 +1,15 @@
 import streamlit as st
 import pandas as pd
-from itertools import combinations
+
+from Calculate_Anaysis.Corpus import as_corpus, as_frame
+from Calculate_Anaysis.Calculate_Author import warn_hyper_authored
+from Calculate_Anaysis.Incidence_Matrix import DEFAULT_MAX_AUTHORS, edge_frame
+from Calculate_Anaysis.Reference_Coupling import coupling_matrix
 
 
 # 根据筛选出指定年份区间内的文章
 def exact_targetarticles_within_yearspan(df, start, stop):
+    df = as_frame(df)
     start,stop=int(start),int(stop)
     if '出版年' in df.columns:
         df['出版年'] = df['出版年'].astype(int)
@@ -14,6 +19,7 @@ def exact_targetarticles_within_yearspan(df, start, stop):
     return filtered_df
 #计算文章年龄
 def calculate_age(df):
+    df = as_frame(df)
     total_ages= []
     sum_ages=0
     if '出版年' in df.columns:
@@ -31,6 +37,7 @@ def calculate_age(df):
 
 
 def calculate_publications_per_year(df: pd.DataFrame):
+    df = as_frame(df)
     if '出版年' in df.columns:
         years = df['出版年'].dropna().astype(int)
         return years.value_counts().sort_index()
@@ -43,47 +50,47 @@ import re
 from collections import defaultdict
 import networkx as nx
 
-def generate_cooccurrence_network(df: pd.DataFrame):
+def generate_cooccurrence_network(df: pd.DataFrame, min_weight: int = 1):
+    """关键词共现网络（关键词关联矩阵 XᵀX，min_weight 为最小共现次数）"""
+    corpus = as_corpus(df)
     G = nx.Graph()
-    if '作者关键词' in df.columns:
-        for keywords in df['作者关键词'].dropna():
-            kws = [k.strip().lower() for k in keywords.split(';')]
-            for u, v in combinations(set(kws), 2):
-                if G.has_edge(u, v):
-                    G[u][v]['weight'] += 1
-                else:
-                    G.add_edge(u, v, weight=1)
+    if corpus.has('keywords'):
+        edges = corpus.keywords.pair_counts(min_weight)
+        G.add_weighted_edges_from(edges.itertuples(index=False, name=None))
     return G
 
-def calculate_coupling(df):
-    """计算作者耦合关系"""
-    if '作者' not in df.columns:
+def calculate_coupling(df, level='documents', min_weight=1, top_n=None, entities=None):
+    """
+    文献耦合分析：两篇文献（或两位作者、两种来源出版物、两个国家）共享的参考文献数
+    level 见 Reference_Coupling.COUPLING_LEVELS；min_weight 为最小耦合强度；
+    top_n / entities 限定参与计算的文献或实体
+    """
+    corpus = as_corpus(df)
+    if len(corpus.references) == 0:
+        st.warning("数据中缺少'引用的参考文献'列，无法计算文献耦合")
+        return pd.DataFrame()
+
+    matrix, labels = coupling_matrix(corpus, level, min_weight=min_weight, entities=entities, top_n=top_n)
+    return edge_frame(matrix, labels, min_weight)
+
+def calculate_coauthorship(df, min_weight=None, mode='full', max_authors=DEFAULT_MAX_AUTHORS):
+    """
+    计算作者合作关系
+    min_weight 为最小合作强度；mode 为 'full'（完全计数）或 'fractional'（1/(n-1) 分数计数）；
+    作者数超过 max_authors 的超多作者文献不参与两两计数
+    """
+    corpus = as_corpus(df)
+    if not corpus.has('authors'):
         st.warning("数据中缺少'作者'列")
         return pd.DataFrame()
     
-    coupling_data = []
-    
-    for _, row in df.iterrows():
-        authors = str(row['作者']).split(';') if pd.notna(row['作者']) else []
-        authors = [author.strip() for author in authors if author.strip()]
-        
-        # 计算每对作者的耦合关系
-        for i in range(len(authors)):
-            for j in range(i + 1, len(authors)):
-                coupling_data.append({
-                    'source': authors[i],
-                    'target': authors[j],
-                    'weight': 1
-                })
-    
-    if coupling_data:
-        coupling_df = pd.DataFrame(coupling_data)
-        # 合并相同的合作关系
-        coupling_df = coupling_df.groupby(['source', 'target']).agg({'weight': 'sum'}).reset_index()
-        return coupling_df
-    else:
+    # 同一文献内作者两两合作次数（在关联表上计数）
+    warn_hyper_authored(corpus, max_authors)
+    coauthorship_df = corpus.authors.pair_counts(min_weight, mode=mode, max_items=max_authors)
+    if coauthorship_df.empty:
         return pd.DataFrame()
+    return coauthorship_df
 
-def calculate_author_collaboration_network(df):
+def calculate_author_collaboration_network(df, mode='full', max_authors=DEFAULT_MAX_AUTHORS):
     """计算作者合作网络"""
-    return calculate_coupling(df)
+    return calculate_coauthorship(df, mode=mode, max_authors=max_authors)
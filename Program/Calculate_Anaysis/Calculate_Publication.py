@@ -1,8 +1,11 @@
 import streamlit as st
 
+from Calculate_Anaysis.Corpus import as_frame
+
 
 # 计算每年文章
 def calculate_publications_per_year(df):
+    df = as_frame(df)
     if '出版年' in df.columns:
         df = df.copy()  # 创建副本避免SettingWithCopyWarning
         df['出版年'] = df['出版年'].astype(int)
@@ -21,6 +24,7 @@ def calculate_publications_per_year(df):
 import pandas as pd
 
 def calculate_publication_by_type(df: pd.DataFrame):
+    df = as_frame(df)
     if '文献类型' in df.columns:
         return df['文献类型'].value_counts()
     else:
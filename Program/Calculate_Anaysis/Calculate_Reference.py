@@ -1,28 +1,28 @@
 import streamlit as st
+import numpy as np
 import pandas as pd
 import re
 import sys
 
-def extract_authors(reference_text):
-    # 正则表达式：匹配作者名（姓+名或名+姓的形式，支持姓+名缩写的组合）
-    # 这里我们假设作者姓名是由字母组成的，且每个名字由空格分隔
-    author_pattern = r'([A-Za-z]+(?: [A-Za-z]+\.)?)+'
+from Calculate_Anaysis.Corpus import as_corpus, as_frame
+from Calculate_Anaysis.Incidence_Matrix import edge_frame
+from Calculate_Anaysis.Reference_Coupling import cocitation_matrix
+from Calculate_Anaysis.Reference_Parser import parse_references
 
-    # 提取所有作者名
-    authors = re.findall(author_pattern, reference_text)
+def extract_authors(reference_text):
+    """
+    提取参考文献字段（分号连接的 CR 条目）中各条目的第一作者
 
-    # 去除无意义的单词（如"Autodesk"等公司名称，通常是多个单词）
-    valid_authors = [author.strip() for author in authors if len(author.split()) > 1]
-    total_valid_authors=[]
-    for i in valid_authors:
-        author_cleaned = i.strip().title().rstrip('.')
-        total_valid_authors.append(author_cleaned)
-    # 去重并排序
-    unique_authors = sorted(set(total_valid_authors))
-    return unique_authors
+    Returns:
+        list: 去重排序后的被引作者（首字母大写，如 "Smith J"）
+    """
+    entries = [entry.strip() for entry in str(reference_text).split(';') if entry.strip()]
+    authors = parse_references(entries)['Author'].dropna()
+    return sorted(set(author.title() for author in authors))
 
 
 def calculate_number_of_total_references_cited(df):
+    df = as_frame(df)
     number_of_total_articles = df.shape[0]
     if '引用的参考文献数' in df.columns:
         total_references_cited = df['引用的参考文献数'].astype(int)
@@ -38,6 +38,7 @@ def calculate_number_of_total_references_cited(df):
 
 # 提取每篇文章的作者引文作者
 def extract_each_article_author_refauthor(df):
+    df = as_frame(df)
     article_author={}#存储每篇文章的作者
     article_refauthor={}#存储每篇文章的引文作者
     if '作者地址' in df.columns and '引用的参考文献' and '文献标题' in df.columns:
@@ -81,67 +82,46 @@ def extract_each_article_author_refauthor(df):
         return pd.DataFrame(),pd.DataFrame()
 
 def extract_reference_info(df):
-    authors_ref_authors = {}  # 存储作者的引文作者
-    co_authorship_dict = {}  # 存储共同引用关系
-    return None
-# def extract_reference_info(df):
-
-#         for author in author_info:
-#                     author_cleaned = author.strip().title().rstrip('.')
-#                     # 统计引用关系：即每个作者引用的作者
-#                     if author_cleaned in article_author_refauthor:
-#                         references_cited_2=references_cited
-#                         references_cited_2=extract_authors(references_cited_2)
-#                         authors_ref_authors[author_cleaned].append(references_cited_2)
-#                     else:
-#                         authors_ref_authors[author_cleaned] = [references_cited_2]
-#
-#                     # 记录共同引用关系：即多个作者共同引用了某个参考文献
-#                     for co_author in author_info:
-#                         co_author_cleaned = co_author.strip().title().rstrip('.')
-#                         if author_cleaned != co_author_cleaned:
-#                             pair = tuple(sorted([author_cleaned, co_author_cleaned]))  # 排序确保无论谁先谁后都一致
-#                             if pair in co_authorship_dict:
-#                                 co_authorship_dict[pair] += 1  # 共同引用次数增加
-#                             else:
-#                                 co_authorship_dict[pair] = 1  # 初始化共同引用次数
-#
-#         # 提取引用作者和共同引用关系
-#         total_authors_in_articles = list(authors_ref_authors.keys())
-#         total_references_cited = list(authors_ref_authors.values())
-#         # 统计每篇引用文献的作者
-#         total_references_info = []
-#         for reference in total_references_cited:
-#             if isinstance(reference, str) and reference.strip():  # 确保是非空字符串
-#                 reference_authors = extract_authors(reference)
-#                 total_references_info.append(reference_authors)
-#             else:
-#                 total_references_info.append([])  # 空值时，返回空列表
-#
-#         authors_df = pd.DataFrame(total_authors_in_articles, columns=["作者"])
-#         references_df_authors = pd.DataFrame(total_references_info)
-#         # 将引用关系和共同引用关系转换为 DataFrame
-#         citation_edges = []
-#         citation_counts = {}  # 存储引用关系的次数
-#         for author_a, cited_references in authors_ref_authors.items():
-#             for reference in cited_references:
-#                 for author_b in extract_authors(reference):  # 假设extract_authors从引用中提取作者
-#                     if author_a != author_b:
-#                         pair = tuple(sorted([author_a, author_b]))  # 确保排序
-#                         citation_counts[pair] = citation_counts.get(pair, 0) + 1
-#
-#         # 使用引用次数作为边的权重
-#         citation_edges = [(author_a, author_b, count) for (author_a, author_b), count in citation_counts.items()]
-#         co_authorship_edges = [(a, b, weight) for (a, b), weight in co_authorship_dict.items()]
-#
-#         # 创建DataFrame
-#         citation_network_df = pd.DataFrame(citation_edges, columns=["author_a", "author_b", "weight"])
-#         co_authorship_network_df = pd.DataFrame(co_authorship_edges, columns=["author_a", "author_b", "weight"])
-#
-#         return authors_stats, authors_df, references_df_authors, citation_network_df, co_authorship_network_df
-#     else:
-#         st.warning("数据中缺少 '引用的参考文献' 列，无法提取引用信息。")
-#         return pd.DataFrame(), pd.DataFrame(), pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
+    """
+    被引参考文献信息表：去重后的参考文献条目、解析出的被引作者、年份、来源、卷、页、DOI 与局部被引次数（本数据集中引用它的文献数）
+
+    Returns:
+        pd.DataFrame: Reference, CitedAuthor, Year, Source, Volume, Page, DOI, LocalCitations，按局部被引次数降序
+    """
+    corpus = as_corpus(df)
+    if len(corpus.references) == 0:
+        st.warning("数据中缺少 '引用的参考文献' 列，无法提取引用信息。")
+        return pd.DataFrame()
+
+    # 在整数编号上计数排序，再按编号取名称与解析字段
+    counts = corpus.references.doc_counts()
+    ids = np.flatnonzero(counts)
+    ids = ids[np.argsort(-counts[ids], kind='stable')]
+    fields = corpus.reference_fields.iloc[ids]
+    return pd.DataFrame({
+        'Reference': corpus.references.labels[ids],
+        'CitedAuthor': fields['Author'].to_numpy(),
+        'Year': fields['Year'].to_numpy(),
+        'Source': fields['Source'].to_numpy(),
+        'Volume': fields['Volume'].to_numpy(),
+        'Page': fields['Page'].to_numpy(),
+        'DOI': fields['DOI'].to_numpy(),
+        'LocalCitations': counts[ids],
+    })
+
+
+def calculate_cocitation(df, level='references', min_weight=1, top_n=30, min_citations=2):
+    """
+    共被引分析：两条参考文献（或两位被引作者、两种被引来源）被同一施引文献同时引用的次数
+    level 见 Reference_Coupling.COCITATION_LEVELS；top_n 为参与计算的高被引对象数
+    """
+    corpus = as_corpus(df)
+    if len(corpus.references) == 0:
+        st.warning("数据中缺少 '引用的参考文献' 列，无法计算共被引。")
+        return pd.DataFrame()
+
+    matrix, labels = cocitation_matrix(corpus, level, min_weight=min_weight, top_n=top_n, min_citations=min_citations)
+    return edge_frame(matrix, labels, min_weight)
 
 
 def filter_references_by_authors(author_list,reference_list):
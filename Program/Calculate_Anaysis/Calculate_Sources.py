@@ -1,5 +1,7 @@
 import streamlit as st
 import pandas as pd
+
+from Calculate_Anaysis.Corpus import as_frame
 # 计算期刊总数
 def custom_title_case(title):
     # 定义不需要大写的单词列表
@@ -23,6 +25,7 @@ def custom_title_case(title):
 
 
 def calculate_number_of_sources(df):
+    df = as_frame(df)
     if '出版物名称' in df.columns:
         total_unique_publicationnames = set(df['出版物名称'].astype(str).dropna())
         for title in total_unique_publicationnames:
@@ -35,6 +38,7 @@ def calculate_number_of_sources(df):
 
 #统计每个sources的出版量和引用数
 def calculate_number_of_sources_publication(df):
+    df = as_frame(df)
     if df.empty or '出版物名称' not in df.columns or '核心合集的被引频次计数' not in df.columns:
         st.write("DataFrame 中缺少必要的列或为空。")
         return pd.DataFrame()
@@ -93,6 +97,7 @@ def filter_and_sort_data(df, min_citations, min_documents, drop_sources, sources
     返回:
     - 筛选和排序后的数据框
     """
+    df = as_frame(df)
     # 筛选满足条件的期刊
     filtered_df = df[
         (df["Citations"] >= min_citations) &
@@ -111,6 +116,7 @@ def filter_and_sort_data(df, min_citations, min_documents, drop_sources, sources
 import pandas as pd
 
 def calculate_number_of_sources(df: pd.DataFrame):
+    df = as_frame(df)
     if '期刊名称' in df.columns:
         return df['期刊名称'].value_counts()
     else:
@@ -1,7 +1,10 @@
 import streamlit as st
 import pandas as pd
+
+from Calculate_Anaysis.Corpus import as_frame
 # 根据筛选出指定年份区间内的文章
 def exact_targetarticles_within_yearspan(df, start, stop):
+    df = as_frame(df)
     start,stop=int(start),int(stop)
     if '出版年' in df.columns:
         df['出版年'] = df['出版年'].astype(int)
@@ -11,6 +14,7 @@ def exact_targetarticles_within_yearspan(df, start, stop):
     return filtered_df
 #计算文章年龄
 def calculate_age(df):
+    df = as_frame(df)
     total_ages= []
     sum_ages=0
     if '出版年' in df.columns:
@@ -28,6 +32,7 @@ def calculate_age(df):
 
 
 def calculate_publications_per_year(df: pd.DataFrame):
+    df = as_frame(df)
     if '出版年' in df.columns:
         df = df.copy()  # 创建副本避免SettingWithCopyWarning
         years = df['出版年'].dropna().astype(int)
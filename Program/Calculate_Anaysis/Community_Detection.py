@@ -0,0 +1,289 @@
+"""
+社区发现
+在稀疏共现/合作矩阵上做模块度优化（Louvain 多层聚合 + Leiden 细化），为每个节点给出聚类编号，
+供网络图按聚类着色（VOSviewer 风格）和导出使用。
+- 局部移动：按轮同步进行，每轮用一次稀疏矩阵运算求出所有节点到各邻居社区的连边权重并向量化计算模块度增益，
+  想移动的节点随机抽取一部分同时移动；模块度下降时撤销本轮并减半移动比例，避免同步移动来回振荡
+- 细化（Leiden）：在每个社区内部从单点重新出发，单点只能并入同一社区内的子簇；按细化后的子簇聚合，
+  聚合节点的初始社区取其所属社区，保证聚合后的每个节点都是社区内连通的一部分
+- 结果中不连通的社区按社区内连边拆分为连通的部分（拆分只会提高模块度）
+多个随机起点可在进程池中并行，取模块度最高的结果；同一 seed 结果确定。
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.csgraph import connected_components
+
+from Calculate_Anaysis.Network_Metrics import symmetric_weights
+
+DEFAULT_RESOLUTION = 1.0
+DEFAULT_STARTS = 1
+
+# 多层聚合的最大层数与每次局部移动的最大轮数
+_MAX_LEVELS = 32
+_MAX_ROUNDS = 200
+
+# 移动比例低于该值、或一轮的模块度提升低于 _TOLERANCE 时停止局部移动
+_MIN_MOVE_FRACTION = 1.0 / 1024
+_TOLERANCE = 1e-6
+
+_WORKER_MATRIX = None
+
+
+def _init_worker(matrix):
+    """进程池初始化：每个进程只接收一次矩阵"""
+    global _WORKER_MATRIX
+    _WORKER_MATRIX = matrix
+
+
+def modularity(matrix: sp.spmatrix, membership: np.ndarray, resolution: float = DEFAULT_RESOLUTION) -> float:
+    """
+    加权模块度 Q = Σc [Lc/2m − γ(Kc/2m)²]
+
+    Args:
+        matrix: 对称加权邻接矩阵（对角线为节点内部权重，聚合图中即子簇内部连边权重的两倍）
+        membership: 每个节点的社区编号
+        resolution: 分辨率 γ，越大社区越小
+
+    Returns:
+        float: 模块度，空图为0
+    """
+    matrix = sp.coo_matrix(matrix)
+    strength = np.bincount(matrix.row, weights=matrix.data, minlength=matrix.shape[0])
+    return _quality(matrix.row, matrix.col, matrix.data, strength, np.asarray(membership), resolution)
+
+
+def _quality(rows: np.ndarray, cols: np.ndarray, weights: np.ndarray, strength: np.ndarray,
+             membership: np.ndarray, resolution: float) -> float:
+    """由边数组直接计算模块度（局部移动每轮调用，避免重复构建稀疏矩阵）"""
+    two_m = strength.sum()
+    if two_m <= 0:
+        return 0.0
+    total = np.bincount(membership, weights=strength)
+    internal = weights[membership[rows] == membership[cols]].sum()
+    return float(internal / two_m - resolution * (total ** 2).sum() / two_m ** 2)
+
+
+def _consecutive(membership: np.ndarray) -> np.ndarray:
+    """社区编号重排为 0..c-1"""
+    return np.unique(membership, return_inverse=True)[1].reshape(-1)
+
+
+def _internal_change(adjacency: sp.csr_matrix, membership: np.ndarray, proposal: np.ndarray,
+                     moved: np.ndarray) -> float:
+    """移动一批节点后社区内部权重（对称矩阵中同社区元素之和）的变化，只遍历被移动节点的边"""
+    rows = adjacency[moved]
+    node = np.repeat(moved, np.diff(rows.indptr))
+    neighbour = rows.indices
+    change = (proposal[node] == proposal[neighbour]).astype(np.float64) \
+        - (membership[node] == membership[neighbour])
+    # 对称矩阵中一条边出现两次：邻居未移动时另一次不在 rows 中，权重计两倍
+    is_moved = np.zeros(len(membership), dtype=bool)
+    is_moved[moved] = True
+    return float((rows.data * change * np.where(is_moved[neighbour], 1.0, 2.0)).sum())
+
+
+def _move_nodes(graph: sp.csr_matrix, membership: np.ndarray, resolution: float, rng: np.random.Generator,
+                parent: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    同步局部移动：反复把节点移到模块度增益最大的邻居社区，直到没有节点想移动或一轮的模块度提升低于阈值
+
+    Args:
+        graph: 聚合图（含对角线）
+        membership: 初始社区
+        resolution: 分辨率
+        rng: 随机数生成器
+        parent: 细化阶段各节点所属的社区；给定时只有单点子簇的节点可以移动，且只能并入同一社区内的子簇
+
+    Returns:
+        np.ndarray: 社区编号（0..c-1）
+    """
+    n = graph.shape[0]
+    edges = graph.tocoo()
+    strength = np.bincount(edges.row, weights=edges.data, minlength=n)
+    two_m = strength.sum()
+    membership = _consecutive(membership)
+    if two_m <= 0 or n <= 1:
+        return membership
+
+    off_diagonal = edges.row != edges.col
+    adjacency = sp.csr_matrix((edges.data[off_diagonal], (edges.row[off_diagonal], edges.col[off_diagonal])),
+                              shape=(n, n))
+    scale = resolution / two_m
+    fraction = 1.0
+    internal = edges.data[membership[edges.row] == membership[edges.col]].sum()
+    quality = _quality(edges.row, edges.col, edges.data, strength, membership, resolution)
+    active = None
+
+    for _ in range(_MAX_ROUNDS):
+        n_communities = membership.max() + 1
+        total = np.bincount(membership, weights=strength, minlength=n_communities)
+        size = np.bincount(membership, minlength=n_communities)
+
+        # 活跃节点到各邻居社区的连边权重 k(i,C)：邻接矩阵的行乘以社区指示矩阵，每行只含邻居所在的社区
+        rows = np.arange(n) if active is None else active
+        indicator = sp.csr_matrix((np.ones(n), membership, np.arange(n + 1)), shape=(n, n_communities))
+        links = (adjacency if active is None else adjacency[active]) @ indicator
+        counts = np.diff(links.indptr)
+        target, k_in = links.indices, links.data
+        own = np.repeat(membership[rows], counts)
+        at_home = target == own
+        k_home = np.bincount(np.repeat(np.arange(len(rows)), counts)[at_home], weights=k_in[at_home],
+                             minlength=len(rows))
+        stay = k_home - scale * (total[membership[rows]] - strength[rows]) * strength[rows]
+
+        # 候选移动：增益超过留在原社区；逐行的量按行展开，先按增益筛掉绝大多数条目
+        improvement = k_in - scale * total[target] * np.repeat(strength[rows], counts) - np.repeat(stay, counts)
+        candidate = np.flatnonzero(~at_home & (improvement > 1e-12 * np.repeat(strength[rows], counts)))
+        node = np.repeat(rows, counts)[candidate]
+        own, target, improvement = own[candidate], target[candidate], improvement[candidate]
+
+        # 单点并入单点时只允许并入编号更小的社区（防止两点互换）
+        keep = ~((size[own] == 1) & (size[target] == 1) & (target > own))
+        if parent is not None:
+            community_parent = np.empty(n_communities, dtype=parent.dtype)
+            community_parent[membership] = parent
+            keep &= (size[own] == 1) & (community_parent[target] == parent[node])
+        node, target, improvement = node[keep], target[keep], improvement[keep]
+        if len(node) == 0:
+            break
+
+        # 每个节点取增益最大的候选社区（候选按节点连续排列，分段求最大值）
+        starts = np.flatnonzero(np.r_[True, node[1:] != node[:-1]])
+        best = np.repeat(np.maximum.reduceat(improvement, starts), np.diff(np.r_[starts, len(node)]))
+        first = np.flatnonzero(improvement == best)
+        first = first[np.r_[True, node[first][1:] != node[first][:-1]]]
+        node, target = node[first], target[first]
+
+        # 随机抽取一部分同时移动，模块度下降则撤销并减半比例，成功后逐步恢复
+        while fraction >= _MIN_MOVE_FRACTION:
+            chosen = rng.random(len(node)) < fraction
+            if not chosen.any():
+                chosen[rng.integers(len(node))] = True
+            moved = node[chosen]
+            proposal = membership.copy()
+            proposal[moved] = target[chosen]
+            new_internal = internal + _internal_change(adjacency, membership, proposal, moved)
+            new_total = np.bincount(proposal, weights=strength)
+            new_quality = new_internal / two_m - resolution * (new_total ** 2).sum() / two_m ** 2
+            if new_quality > quality:
+                break
+            fraction /= 2
+        else:
+            break
+        converged = new_quality - quality < _TOLERANCE
+        membership, quality, internal = _consecutive(proposal), new_quality, new_internal
+        fraction = min(fraction * 2, 1.0)
+        if converged:
+            break
+
+        # 下一轮只重新评估本轮移动的节点及其邻居（其余节点的最优社区基本不变）
+        touched = np.zeros(n, dtype=bool)
+        touched[moved] = True
+        touched[adjacency[moved].indices] = True
+        active = np.flatnonzero(touched)
+
+    return membership
+
+
+def _aggregate(graph: sp.csr_matrix, membership: np.ndarray) -> sp.csr_matrix:
+    """按社区聚合：PᵀAP，社区内部权重落在对角线上"""
+    n = graph.shape[0]
+    projection = sp.csr_matrix((np.ones(n), (np.arange(n), membership)), shape=(n, membership.max() + 1))
+    return sp.csr_matrix(projection.T @ graph @ projection)
+
+
+def _split_disconnected(matrix: sp.csr_matrix, membership: np.ndarray) -> np.ndarray:
+    """把社区拆分为社区内连边构成的连通部分"""
+    edges = matrix.tocoo()
+    inside = membership[edges.row] == membership[edges.col]
+    internal = sp.csr_matrix((np.ones(int(inside.sum())), (edges.row[inside], edges.col[inside])), shape=matrix.shape)
+    return connected_components(internal, directed=False)[1]
+
+
+def _rank_by_size(membership: np.ndarray) -> np.ndarray:
+    """按社区规模降序重新编号（0 为最大社区），同规模按最小节点下标排序"""
+    labels, first, inverse, sizes = np.unique(membership, return_index=True, return_inverse=True, return_counts=True)
+    rank = np.empty(len(labels), dtype=np.int64)
+    rank[np.lexsort((first, -sizes))] = np.arange(len(labels))
+    return rank[inverse.reshape(-1)]
+
+
+def leiden(matrix: sp.csr_matrix, resolution: float = DEFAULT_RESOLUTION, seed: Optional[int] = 42,
+           refine: bool = True) -> Tuple[np.ndarray, float]:
+    """
+    单次多层模块度优化
+
+    Args:
+        matrix: 对称加权邻接矩阵（无对角线）
+        resolution: 分辨率
+        seed: 随机种子
+        refine: 是否做 Leiden 细化，False 时即同步版 Louvain
+
+    Returns:
+        (按规模排序的社区编号, 模块度)
+    """
+    rng = np.random.default_rng(seed)
+    n = matrix.shape[0]
+    graph = sp.csr_matrix(matrix, dtype=np.float64)
+    node_map = np.arange(n)
+    initial = np.arange(n)
+    result = np.arange(n)
+    for _ in range(_MAX_LEVELS):
+        membership = _move_nodes(graph, initial, resolution, rng)
+        result = membership[node_map]
+        n_nodes = graph.shape[0]
+        if membership.max() + 1 == n_nodes:
+            break
+        refined = membership
+        if refine:
+            refined = _move_nodes(graph, np.arange(n_nodes), resolution, rng, parent=membership)
+            if refined.max() + 1 == n_nodes:
+                refined = membership
+        initial = np.empty(refined.max() + 1, dtype=np.int64)
+        initial[refined] = membership
+        graph = _aggregate(graph, refined)
+        node_map = refined[node_map]
+
+    result = _rank_by_size(_split_disconnected(sp.csr_matrix(matrix), result))
+    return result, modularity(matrix, result, resolution)
+
+
+def _leiden_start(resolution: float, seed: Optional[int], refine: bool) -> Tuple[np.ndarray, float]:
+    """进程池任务：用共享矩阵跑一次随机起点"""
+    return leiden(_WORKER_MATRIX, resolution, seed, refine)
+
+
+def detect_communities(matrix: sp.spmatrix, resolution: float = DEFAULT_RESOLUTION, seed: Optional[int] = 42,
+                       n_starts: int = DEFAULT_STARTS, max_workers: Optional[int] = None,
+                       refine: bool = True) -> Tuple[np.ndarray, float]:
+    """
+    共现/合作网络的社区发现
+
+    Args:
+        matrix: 实体×实体对称稀疏矩阵（如 EntityLinks.pair_matrix 的结果），对角线忽略
+        resolution: 分辨率 γ，大于1得到更多更小的聚类
+        seed: 随机种子，第 i 个起点使用 seed+i；为空时每次随机
+        n_starts: 随机起点数，取模块度最高的结果
+        max_workers: 多起点时的进程数，默认等于CPU核数
+        refine: 是否做 Leiden 细化
+
+    Returns:
+        (每个节点的聚类编号（0 为最大聚类，孤立节点各自成类）, 模块度)
+    """
+    graph = symmetric_weights(matrix)
+    if graph.shape[0] == 0:
+        return np.zeros(0, dtype=np.int64), 0.0
+    n_starts = max(int(n_starts), 1)
+    seeds = [None if seed is None else seed + i for i in range(n_starts)]
+    workers = min(max_workers or os.cpu_count() or 1, n_starts)
+    if workers <= 1:
+        results = [leiden(graph, resolution, start, refine) for start in seeds]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(graph,)) as executor:
+            results = list(executor.map(_leiden_start, [resolution] * n_starts, seeds, [refine] * n_starts))
+    return max(results, key=lambda result: result[1])
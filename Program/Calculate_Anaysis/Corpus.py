@@ -0,0 +1,636 @@
+"""
+文献语料对象
+加载时一次性把以分号连接的作者、关键词、地址、参考文献字段拆分为 int32 编码的「文献→实体」关联表，
+实体名称驻留在各自的字典(labels)中（参考文献先解析为规范书目键去重，见 Reference_Parser；
+关键词按来源策略合并作者关键词与 Keywords Plus 后做规范化，见 Keyword_Normalizer）；分析函数直接在关联表上计数、聚合，不再在每次交互时反复拆分字符串。
+同时统一 WOS 字段代码、英文列名与中文列名三套列名
+"""
+
+import hashlib
+import weakref
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+from Calculate_Anaysis.Incidence_Matrix import (DEFAULT_MAX_AUTHORS, collaboration_matrix, cooccurrence, edge_frame,
+                                                 hyper_authored_rows, incidence_matrix)
+from Calculate_Anaysis.Keyword_Normalizer import KeywordNormalizer
+from Calculate_Anaysis.Reference_Parser import intern_references, parse_references
+from Calculate_Anaysis.Time_Cube import TimeCube
+
+# 标准字段 -> 候选列名（按优先级；Load_TXT 会对列名做 title() 处理，如 AU -> Au）
+FIELD_ALIASES = {
+    'authors': ('Authors', 'AU', 'Au', 'Author', '作者'),
+    'title': ('Title', 'TI', 'Ti', '文献标题'),
+    'abstract': ('Abstract', 'AB', 'Ab', '摘要'),
+    'source': ('Source', 'SO', 'So', '出版物名称', '期刊名称'),
+    'year': ('Year', 'PY', 'Py', 'Publication Year', '出版年', '年份'),
+    'citations': ('TimesCited', 'TC', 'Tc', 'Z9', 'Times Cited', 'Citations', '核心合集的被引频次计数', '被引频次'),
+    'keywords': ('Keywords', 'DE', 'De', 'Keyword', '作者关键词', '关键词'),
+    'keywords_plus': ('KeywordsPlus', 'ID', 'Id', 'Keywords Plus', 'Keywords-Plus', '扩展关键词'),
+    'address': ('Address', 'C1', '作者地址', '国家'),
+    'references': ('References', 'CR', 'Cr', '引用的参考文献'),
+    'doi': ('DOI', 'DI', 'Di', '数字对象标识符 (DOI)', '数字对象标识符 (Doi)'),
+    'volume': ('Volume', 'VL', 'Vl', '卷'),
+    'page': ('BeginningPage', 'BP', 'Bp', '起始页', '开始页'),
+    'accession': ('AccessionNumber', 'UT', 'Ut', '入藏号'),
+    'document_type': ('DocumentType', 'DT', 'Dt', '文献类型'),
+}
+
+# 文献表中保留的标准列：标准字段 -> 列名
+DOC_COLUMNS = {
+    'title': 'Title', 'source': 'Source', 'year': 'Year', 'citations': 'TimesCited',
+    'doi': 'DOI', 'accession': 'AccessionNumber', 'document_type': 'DocumentType',
+    'volume': 'Volume', 'page': 'BeginningPage',
+}
+
+# 标准字段缺失时可代替它的字段（如只有 Keywords Plus 时也视为有关键词）
+FIELD_FALLBACKS = {'keywords': ('keywords_plus',)}
+
+# 数据框签名抽样的行数（as_corpus 每次调用都计算，须足够便宜）
+_SIGNATURE_ROWS = 256
+
+# 每个语料最多保留的关键词规范化变体数（切换规范化规则时复用已构建的关键词关联表）
+_MAX_KEYWORD_VARIANTS = 4
+
+# C1 地址块：[作者; 作者] 机构, 院系, 城市, 国家.
+_ADDRESS_BLOCK = r'\[(?P<names>[^\]]*)\]\s*(?P<address>[^\[]*)'
+
+
+def find_column(df: pd.DataFrame, field: str) -> Optional[str]:
+    """按别名优先级查找标准字段在数据框中的列名，未找到返回 None"""
+    for name in FIELD_ALIASES[field]:
+        if name in df.columns:
+            return name
+    return None
+
+
+class EntityLinks:
+    """
+    文献→实体关联表：doc 与 ids 为等长 int32 数组，labels 为实体名称字典（ids 的取值即 labels 的下标）
+    同一文献内重复的实体只保留首次出现，文献内顺序与原字段一致（如第一作者在前）
+    """
+
+    def __init__(self, doc: np.ndarray, ids: np.ndarray, labels: pd.Index, n_docs: int):
+        self.doc = np.asarray(doc, dtype=np.int32)
+        self.ids = np.asarray(ids, dtype=np.int32)
+        self.labels = labels
+        self.n_docs = n_docs
+        self._incidence = None
+
+    @classmethod
+    def from_values(cls, doc: np.ndarray, values: pd.Series, n_docs: int) -> 'EntityLinks':
+        """由（文献下标, 实体名称）对构建关联表，名称驻留为整数编码"""
+        codes, labels = pd.factorize(np.asarray(values, dtype=object))
+        return cls.from_codes(doc, codes, pd.Index(labels, dtype=object), n_docs)
+
+    @classmethod
+    def from_codes(cls, doc: np.ndarray, codes: np.ndarray, labels: pd.Index, n_docs: int) -> 'EntityLinks':
+        """由（文献下标, 实体编码）对与已驻留的名称字典构建关联表，去掉同一文献内的重复实体"""
+        doc = np.asarray(doc, dtype=np.int64)
+        codes = np.asarray(codes, dtype=np.int64)
+        if len(codes):
+            keep = ~pd.Series(doc * len(labels) + codes).duplicated().to_numpy()
+            doc, codes = doc[keep], codes[keep]
+        return cls(doc, codes, labels, n_docs)
+
+    @classmethod
+    def empty(cls, n_docs: int) -> 'EntityLinks':
+        return cls(np.empty(0, np.int32), np.empty(0, np.int32), pd.Index([], dtype=object), n_docs)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def n_entities(self) -> int:
+        return len(self.labels)
+
+    def doc_counts(self) -> np.ndarray:
+        """每个实体出现的文献数"""
+        return np.bincount(self.ids, minlength=self.n_entities)
+
+    def per_doc(self) -> np.ndarray:
+        """每篇文献的实体数"""
+        return np.bincount(self.doc, minlength=self.n_docs)
+
+    def sum_by_entity(self, doc_values) -> np.ndarray:
+        """把文献级数值（如被引次数）按实体求和"""
+        weights = np.asarray(doc_values, dtype=float)[self.doc]
+        return np.bincount(self.ids, weights=weights, minlength=self.n_entities)
+
+    def value_counts(self) -> pd.Series:
+        """实体 -> 文献数，降序"""
+        counts = pd.Series(self.doc_counts(), index=self.labels)
+        return counts[counts > 0].sort_values(ascending=False, kind='stable')
+
+    def flat_labels(self) -> List[str]:
+        """逐条关联的实体名称（按文献顺序展开）"""
+        return self.labels.to_numpy()[self.ids].tolist()
+
+    def doc_labels(self) -> List[List[str]]:
+        """按文献分组的实体名称列表（长度为文献数）"""
+        order = np.argsort(self.doc, kind='stable')
+        names = self.labels.to_numpy()[self.ids[order]]
+        bounds = np.cumsum(self.per_doc())[:-1]
+        return [list(group) for group in np.split(names, bounds)] if self.n_docs else []
+
+    def doc_groups(self) -> List[np.ndarray]:
+        """按文献分组的实体编码数组（长度为文献数）"""
+        order = np.argsort(self.doc, kind='stable')
+        bounds = np.cumsum(self.per_doc())[:-1]
+        return np.split(self.ids[order], bounds) if self.n_docs else []
+
+    def incidence(self) -> sp.csr_matrix:
+        """文献×实体 CSR 0/1 关联矩阵（首次调用时构建并缓存）"""
+        if self._incidence is None:
+            self._incidence = incidence_matrix(self.doc, self.ids, self.n_docs, self.n_entities)
+        return self._incidence
+
+    def cooccurrence(self, min_weight: float = 1) -> sp.csr_matrix:
+        """实体共现矩阵 XᵀX（去除对角线）"""
+        return cooccurrence(self.incidence(), min_weight=min_weight)
+
+    def pair_matrix(self, min_weight: Optional[float] = None, mode: str = 'full',
+                    max_items: Optional[int] = None) -> sp.csr_matrix:
+        """
+        同一文献内实体两两共现矩阵（实体×实体，行列与 labels 对齐，可直接交给 Network_Metrics.graph_metrics）
+
+        Args:
+            min_weight: 最小共现次数（分数计数时为最小合作强度），为空时保留全部共现对
+            mode: 'full' 完全计数，'fractional' 按 1/(n-1) 分数计数
+            max_items: 实体数超过该值的文献不参与两两计数（如超多作者文献），为空时不限制
+
+        Returns:
+            sp.csr_matrix: 去除对角线的对称矩阵
+        """
+        if mode == 'full' and not max_items:
+            return self.cooccurrence(min_weight)
+        return collaboration_matrix(self.incidence(), mode=mode, max_authors=max_items, min_weight=min_weight)
+
+    def pair_counts(self, min_weight: Optional[float] = None, mode: str = 'full',
+                    max_items: Optional[int] = None) -> pd.DataFrame:
+        """
+        同一文献内实体两两共现次数（pair_matrix 的上三角），参数同 pair_matrix
+
+        Returns:
+            pd.DataFrame: source, target, weight（source < target 按名称排序）
+        """
+        return edge_frame(self.pair_matrix(min_weight, mode, max_items), self.labels, min_weight)
+
+    def relabel(self, func: Callable[[str], str]) -> 'EntityLinks':
+        """对实体名称做规范化映射（如大小写、同义词），映射到同一名称的实体合并"""
+        mapped = pd.Index([func(label) for label in self.labels], dtype=object)
+        codes, labels = pd.factorize(mapped)
+        return EntityLinks.from_values(self.doc, labels.to_numpy()[codes[self.ids]], self.n_docs)
+
+    def select_docs(self, mask: np.ndarray) -> 'EntityLinks':
+        """按文献布尔掩码取子集并重新编号文献（实体字典保持不变）"""
+        mask = np.asarray(mask, dtype=bool)
+        new_index = np.cumsum(mask) - 1
+        keep = mask[self.doc]
+        return EntityLinks(new_index[self.doc[keep]], self.ids[keep], self.labels, int(mask.sum()))
+
+    def select_entities(self, mask: np.ndarray) -> 'EntityLinks':
+        """按实体布尔掩码（长度为实体数）保留关联，文献编号与实体字典保持不变"""
+        keep = np.asarray(mask, dtype=bool)[self.ids]
+        return EntityLinks(self.doc[keep], self.ids[keep], self.labels, self.n_docs)
+
+    def to_frame(self) -> pd.DataFrame:
+        """展开为 (doc, entity) 数据框"""
+        return pd.DataFrame({'doc': self.doc, 'entity': self.labels.to_numpy()[self.ids]})
+
+
+def _split_field(series: pd.Series, sep: str = ';'):
+    """把分号连接的字段拆分为 (文献下标, 去空白后的非空值)"""
+    parts = series.reset_index(drop=True).dropna().astype(str).str.split(sep).explode().str.strip()
+    parts = parts[parts.notna() & (parts != '')]
+    return parts.index.to_numpy(), parts
+
+
+def combine_keywords(raw: Dict[str, EntityLinks], source: str) -> Tuple[np.ndarray, np.ndarray, pd.Index]:
+    """
+    按来源策略合并作者关键词（author）与 Keywords Plus（plus）的原始关联表
+
+    Args:
+        raw: 'author' / 'plus' -> 未规范化的关联表
+        source: 见 Keyword_Normalizer.KEYWORD_SOURCES
+
+    Returns:
+        (np.ndarray, np.ndarray, pd.Index): 文献下标、原始关键词编码、原始关键词字典（两种来源的并集），
+            同一文献内作者关键词在前
+    """
+    author, plus = raw['author'], raw['plus']
+    if source == 'author':
+        parts = [author]
+    elif source == 'plus':
+        parts = [plus]
+    elif source == 'author_first':
+        keep = (author.per_doc() == 0)[plus.doc]
+        parts = [author, EntityLinks(plus.doc[keep], plus.ids[keep], plus.labels, plus.n_docs)]
+    else:
+        parts = [author, plus]
+
+    labels = parts[0].labels
+    for part in parts[1:]:
+        labels = labels.append(part.labels[~part.labels.isin(labels)])
+    doc = np.concatenate([part.doc for part in parts]).astype(np.int64)
+    codes = np.concatenate([labels.get_indexer(part.labels)[part.ids] if len(part) else np.empty(0, np.int64)
+                            for part in parts]).astype(np.int64)
+    order = np.argsort(doc, kind='stable')
+    return doc[order], codes[order], labels
+
+
+def normalize_keywords(raw: Dict[str, EntityLinks], normalizer: KeywordNormalizer, n_docs: int) -> EntityLinks:
+    """按规范化规则由原始关键词构建关键词关联表：只规范化去重后的字符串，再按编码一次性映射"""
+    doc, codes, labels = combine_keywords(raw, normalizer.source)
+    if not len(codes):
+        return EntityLinks.empty(n_docs)
+    # 只规范化实际用到的字符串（如 author_first 策略下未被采用的 Keywords Plus 不进入字典）
+    used, codes = np.unique(codes, return_inverse=True)
+    groups, names = normalizer.normalize(labels[used], np.bincount(codes, minlength=len(used)))
+    codes = groups[codes]
+    keep = codes >= 0
+    return EntityLinks.from_codes(doc[keep], codes[keep], names, n_docs)
+
+
+def frame_fingerprint(frame: pd.DataFrame) -> str:
+    """数据框内容指纹：SHA-256(形状、列名、逐列内容哈希)，内容相同的数据框副本得到相同指纹"""
+    digest = hashlib.sha256(repr((frame.shape, [str(column) for column in frame.columns])).encode())
+    for position in range(frame.shape[1]):
+        values = frame.iloc[:, position]
+        try:
+            hashed = pd.util.hash_pandas_object(values, index=False)
+        except TypeError:
+            hashed = pd.util.hash_pandas_object(values.astype(str), index=False)
+        digest.update(hashed.to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def frame_signature(frame: pd.DataFrame) -> tuple:
+    """
+    数据框的廉价签名：长度、列名与等距抽样的至多 _SIGNATURE_ROWS 行的内容指纹；
+    整列改写（如原地改写年份列的类型或取值）会改变签名，个别未抽到的单元格改动识别不到
+    """
+    rows = np.linspace(0, len(frame) - 1, min(len(frame), _SIGNATURE_ROWS)).astype(np.int64)
+    return len(frame), tuple(frame.columns), frame_fingerprint(frame.iloc[rows])
+
+
+def _clean_country(address: pd.Series) -> pd.Series:
+    """地址最后一段的最后一个词即国家（Peoples R China -> China，CA 94305 USA -> USA）"""
+    country = address.str.split(',').str[-1].str.strip().str.split(' ').str[-1]
+    return country.replace({'Taiwan': 'Chinese Taiwan'})
+
+
+def _split_addresses(series: pd.Series):
+    """
+    拆分 C1 地址字段，返回 (文献下标, 地址, 方括号内作者)
+    带作者的地址块按方括号切分（方括号内也含分号），不带方括号的旧格式按分号切分
+    """
+    series = series.reset_index(drop=True).dropna().astype(str)
+    bracketed = series.str.contains('[', regex=False)
+
+    blocks = series[bracketed].str.extractall(_ADDRESS_BLOCK)
+    block_doc = blocks.index.get_level_values(0).to_numpy()
+    block_address = blocks['address']
+    block_names = blocks['names']
+
+    plain_doc, plain_address = _split_field(series[~bracketed])
+    plain_doc = series[~bracketed].index.to_numpy()[plain_doc] if len(plain_doc) else plain_doc
+
+    doc = np.concatenate([block_doc, plain_doc]).astype(np.int64)
+    address = pd.concat([block_address.reset_index(drop=True), plain_address.reset_index(drop=True)],
+                        ignore_index=True)
+    address = address.str.strip().str.rstrip(';').str.strip().str.rstrip('.').str.strip()
+    names = pd.concat([block_names.reset_index(drop=True), pd.Series([None] * len(plain_doc), dtype=object)],
+                      ignore_index=True)
+
+    order = np.argsort(doc, kind='stable')
+    doc, address, names = doc[order], address.iloc[order].reset_index(drop=True), names.iloc[order].reset_index(drop=True)
+    valid = (address != '').to_numpy()
+    return doc[valid], address[valid].reset_index(drop=True), names[valid].reset_index(drop=True)
+
+
+class Corpus:
+    """
+    规范化的语料对象
+    frame: 原始数据框；docs: 标准列名的文献表；authors / keywords / countries / institutions / references / sources: 关联表
+    （links 中还可加入派生的关联表，如标题摘要术语 'terms'，见 add_links）；
+    reference_fields: 参考文献的解析字段（作者、年份、来源、卷、页、DOI、书目键），行与 references.labels 对齐；
+    time_cube: 各关联表的 实体×年份 计数（构建语料时一并生成）；
+    raw_keywords: 未规范化的作者关键词（author）与 Keywords Plus（plus）关联表，keyword_normalizer: 当前的关键词规范化规则；
+    fingerprint: 跨重跑稳定的内容指纹（构建时给定，如上传内容的缓存键；否则由原始数据框内容计算），
+    各分析缓存按它与 links_key 取键，而不是按语料对象身份
+    """
+
+    LINK_FIELDS = ('authors', 'keywords', 'countries', 'institutions', 'references', 'sources')
+
+    def __init__(self, frame: pd.DataFrame, docs: pd.DataFrame, links: Dict[str, EntityLinks],
+                 reference_fields: Optional[pd.DataFrame] = None, raw_keywords: Optional[Dict[str, EntityLinks]] = None,
+                 keyword_normalizer: Optional[KeywordNormalizer] = None, fingerprint: Optional[str] = None,
+                 link_signatures: Optional[Dict[str, object]] = None):
+        self.frame = frame
+        self.docs = docs
+        self.links = links
+        self.raw_keywords = raw_keywords or {'author': EntityLinks.empty(len(docs)), 'plus': EntityLinks.empty(len(docs))}
+        self.keyword_normalizer = keyword_normalizer or KeywordNormalizer()
+        if reference_fields is None:
+            reference_fields = parse_references(links['references'].labels)
+        self.reference_fields = reference_fields
+        self.time_cube = TimeCube.from_links(links, self.years)
+        self.link_signatures = dict(link_signatures or {})
+        self._fingerprint = fingerprint
+        self._fingerprint_source: Optional['Corpus'] = None
+        self._keyword_variants = OrderedDict([(self.keyword_normalizer.signature, self)])
+        self._relabeled: Dict[tuple, Tuple[EntityLinks, EntityLinks]] = {}
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame, keywords: Optional[KeywordNormalizer] = None,
+                       fingerprint: Optional[str] = None) -> 'Corpus':
+        """
+        由任意列名体系（WOS代码/英文/中文）的数据框构建语料对象
+
+        Args:
+            df: 数据框
+            keywords: 关键词规范化规则，默认合并 DE 与 ID 并折叠复数
+            fingerprint: 内容指纹（如 Corpus_Cache.corpus_key 得到的上传内容哈希），为空时按需由数据框内容计算
+        """
+        n_docs = len(df)
+        docs = pd.DataFrame(index=pd.RangeIndex(n_docs))
+        for field, column in DOC_COLUMNS.items():
+            name = find_column(df, field)
+            if name is not None:
+                docs[column] = df[name].to_numpy()
+        if 'Year' in docs.columns:
+            docs['Year'] = pd.to_numeric(docs['Year'], errors='coerce').astype('Int64')
+        docs['TimesCited'] = (pd.to_numeric(docs['TimesCited'], errors='coerce').fillna(0).clip(lower=0).astype('int64')
+                              if 'TimesCited' in docs.columns else np.zeros(n_docs, dtype='int64'))
+
+        links = {field: EntityLinks.empty(n_docs) for field in cls.LINK_FIELDS}
+        reference_fields = None
+
+        address_column = find_column(df, 'address')
+        address_doc, address, address_names = (_split_addresses(df[address_column]) if address_column
+                                               else (np.empty(0, np.int64), pd.Series(dtype=object), pd.Series(dtype=object)))
+        if len(address):
+            # 地址高度重复：只对去重后的地址解析国家与机构，再按编码映射回各文献
+            codes, unique_address = pd.factorize(address)
+            unique_address = pd.Series(unique_address, dtype=object)
+            country = _clean_country(unique_address).to_numpy()[codes]
+            institution = unique_address.str.split(',').str[0].str.strip().to_numpy()[codes]
+            links['countries'] = EntityLinks.from_values(address_doc, country, n_docs)
+            links['institutions'] = EntityLinks.from_values(address_doc, institution, n_docs)
+
+        author_column = find_column(df, 'authors')
+        if author_column is not None:
+            doc, values = _split_field(df[author_column])
+            links['authors'] = EntityLinks.from_values(doc, values, n_docs)
+        elif len(address_names):
+            # 没有作者列时从地址方括号中提取作者
+            named = address_names.notna().to_numpy()
+            doc, values = _split_field(pd.Series(address_names[named].to_numpy(), index=address_doc[named]))
+            links['authors'] = EntityLinks.from_values(address_doc[named][doc], values, n_docs)
+
+        # 关键词先按原始字符串驻留，合并来源、规范化都在去重后的字符串上完成
+        raw_keywords = {'author': EntityLinks.empty(n_docs), 'plus': EntityLinks.empty(n_docs)}
+        for source, field in (('author', 'keywords'), ('plus', 'keywords_plus')):
+            column = find_column(df, field)
+            if column is not None:
+                doc, values = _split_field(df[column])
+                raw_keywords[source] = EntityLinks.from_values(doc, values, n_docs)
+        keywords = keywords or KeywordNormalizer()
+        links['keywords'] = normalize_keywords(raw_keywords, keywords, n_docs)
+
+        reference_column = find_column(df, 'references')
+        if reference_column is not None:
+            # 参考文献按书目键/DOI 去重后驻留为整数编号，解析字段与编号对齐保存
+            doc, values = _split_field(df[reference_column])
+            codes, labels, reference_fields = intern_references(values)
+            links['references'] = EntityLinks.from_codes(doc, codes, labels, n_docs)
+
+        if 'Source' in docs.columns:
+            source = docs['Source'].astype(object).where(docs['Source'].notna())
+            source = source.astype(str).str.strip()[source.notna()]
+            source = source[source != '']
+            links['sources'] = EntityLinks.from_values(source.index.to_numpy(), source, n_docs)
+
+        return cls(df, docs, links, reference_fields, raw_keywords, keywords, fingerprint)
+
+    def add_links(self, field: str, links: EntityLinks, signature=None):
+        """
+        加入（或替换）一种派生的关联表（如从标题摘要抽取的术语），同时加入 time_cube
+
+        Args:
+            field: 关联表名称
+            links: 关联表
+            signature: 派生关联表的构建参数（可哈希），与语料指纹一起组成 links_key
+        """
+        self.links[field] = links
+        self.link_signatures[field] = signature
+        self.time_cube.add(field, links, self.years)
+
+    def relabeled(self, field: str, func: Callable[[str], str]) -> EntityLinks:
+        """
+        按名称映射规范化后的关联表（见 EntityLinks.relabel），按 (字段, 映射函数) 记忆在语料上，
+        同一语料重复调用不再逐个映射名称；该字段的关联表被替换后自动重算
+        """
+        links = self.links[field]
+        cached = self._relabeled.get((field, func))
+        if cached is None or cached[0] is not links:
+            cached = (links, links.relabel(func))
+            self._relabeled[(field, func)] = cached
+        return cached[1]
+
+    def with_keywords(self, keywords: KeywordNormalizer) -> 'Corpus':
+        """
+        按新的关键词规范化规则重建关键词关联表（其余关联表共用，不重新拆分字符串）；
+        同一语料的各规则变体互相记忆，切换回已用过的规则时直接返回原对象
+        """
+        variants = self._keyword_variants
+        corpus = variants.get(keywords.signature)
+        if corpus is not None:
+            variants.move_to_end(keywords.signature)
+            return corpus
+        links = dict(self.links)
+        links['keywords'] = normalize_keywords(self.raw_keywords, keywords, self.n_docs)
+        corpus = Corpus(self.frame, self.docs, links, self.reference_fields, self.raw_keywords, keywords,
+                        self._fingerprint, self.link_signatures)
+        # 共用同一变体表；未给定指纹时各变体共享首次计算的结果
+        corpus._keyword_variants = variants
+        corpus._fingerprint_source = self
+        variants[keywords.signature] = corpus
+        while len(variants) > _MAX_KEYWORD_VARIANTS:
+            variants.popitem(last=False)
+        return corpus
+
+    @property
+    def fingerprint(self) -> str:
+        """内容指纹（跨重跑稳定）：构建时未给定时由原始数据框内容计算一次"""
+        if self._fingerprint is None:
+            source = self._fingerprint_source
+            self._fingerprint = source.fingerprint if source is not None else frame_fingerprint(self.frame)
+        return self._fingerprint
+
+    def links_key(self, field: str) -> tuple:
+        """
+        关联表的稳定标识，供按内容缓存的分析结果取键
+
+        Returns:
+            tuple: (语料指纹, 字段, 构建规则)；关键词的构建规则为规范化规则签名，派生关联表为 add_links 时给定的签名
+        """
+        rule = self.keyword_normalizer.signature if field == 'keywords' else self.link_signatures.get(field)
+        return self.fingerprint, field, rule
+
+    @property
+    def n_docs(self) -> int:
+        return len(self.docs)
+
+    @property
+    def authors(self) -> EntityLinks:
+        return self.links['authors']
+
+    @property
+    def keywords(self) -> EntityLinks:
+        return self.links['keywords']
+
+    @property
+    def countries(self) -> EntityLinks:
+        return self.links['countries']
+
+    @property
+    def institutions(self) -> EntityLinks:
+        return self.links['institutions']
+
+    @property
+    def references(self) -> EntityLinks:
+        return self.links['references']
+
+    @property
+    def sources(self) -> EntityLinks:
+        return self.links['sources']
+
+    @property
+    def years(self) -> np.ndarray:
+        """文献年份（缺失为 NaN）"""
+        if 'Year' not in self.docs.columns:
+            return np.full(self.n_docs, np.nan)
+        return self.docs['Year'].to_numpy(dtype=float, na_value=np.nan)
+
+    @property
+    def citations(self) -> np.ndarray:
+        """文献被引次数"""
+        return self.docs['TimesCited'].to_numpy()
+
+    def has(self, field: str) -> bool:
+        """原始数据中是否存在该标准字段（或可代替它的字段，见 FIELD_FALLBACKS）"""
+        fields = (field,) + FIELD_FALLBACKS.get(field, ())
+        return any(find_column(self.frame, name) is not None for name in fields)
+
+    def column(self, field: str) -> Optional[str]:
+        """标准字段在原始数据框中的列名"""
+        return find_column(self.frame, field)
+
+    def incidence(self, field: str) -> sp.csr_matrix:
+        """指定实体类型的文献×实体关联矩阵（缓存于关联表）"""
+        return self.links[field].incidence()
+
+    def hyper_authored(self, max_authors: Optional[int] = DEFAULT_MAX_AUTHORS) -> pd.DataFrame:
+        """
+        作者数超过 max_authors 的文献（不参与作者两两合作计数）
+
+        Returns:
+            pd.DataFrame: 文献表中对应行，附加 AuthorCount 列，按作者数降序
+        """
+        rows = hyper_authored_rows(self.incidence('authors'), max_authors)
+        hyper = self.docs.iloc[rows].copy()
+        hyper.insert(0, 'AuthorCount', self.authors.per_doc()[rows])
+        return hyper.sort_values('AuthorCount', ascending=False)
+
+    def subset(self, mask) -> 'Corpus':
+        """按文献布尔掩码取子语料（如年份筛选），无需重新拆分字符串"""
+        mask = np.asarray(mask, dtype=bool)
+        links = {field: link.select_docs(mask) for field, link in self.links.items()}
+        raw_keywords = {source: link.select_docs(mask) for source, link in self.raw_keywords.items()}
+        fingerprint = None
+        if self._fingerprint is not None:
+            digest = hashlib.sha256(self._fingerprint.encode())
+            digest.update(np.packbits(mask).tobytes() + str(len(mask)).encode())
+            fingerprint = digest.hexdigest()
+        return Corpus(self.frame[mask], self.docs[mask].reset_index(drop=True), links, self.reference_fields,
+                      raw_keywords, self.keyword_normalizer, fingerprint, self.link_signatures)
+
+
+# 数据框对象 -> 已构建的语料（按对象身份缓存，数据框被回收时自动清除；另以 frame_signature 校验内容未被原地修改）
+_CORPUS_CACHE: Dict[int, tuple] = {}
+
+
+def as_corpus(data, keywords: Optional[KeywordNormalizer] = None) -> Corpus:
+    """
+    接受 Corpus 或数据框，返回 Corpus；同一数据框对象只构建一次（数据框应视为只读：
+    原地改写后按 frame_signature 识别并重建，但只改动个别单元格时可能识别不到，需要修改时请先 copy()）
+
+    Args:
+        data: Corpus 或 pd.DataFrame
+        keywords: 关键词规范化规则；为空时沿用已缓存语料的规则（首次构建时用默认规则），
+            与缓存的规则不同时只重建关键词关联表并替换缓存，之后不带规则的调用都得到新的语料
+
+    Returns:
+        Corpus: 语料对象
+    """
+    def _renormalized(corpus: Corpus) -> Corpus:
+        if keywords is None or keywords.signature == corpus.keyword_normalizer.signature:
+            return corpus
+        return corpus.with_keywords(keywords)
+
+    if isinstance(data, Corpus):
+        return _renormalized(data)
+    key = id(data)
+    signature = frame_signature(data)
+    cached = _CORPUS_CACHE.get(key)
+    if cached is not None and cached[0]() is data and cached[1] == signature:
+        corpus = _renormalized(cached[2])
+        if corpus is not cached[2]:
+            _CORPUS_CACHE[key] = (cached[0], signature, corpus)
+        return corpus
+    corpus = Corpus.from_dataframe(data, keywords)
+    try:
+        reference = weakref.ref(data, lambda _, key=key: _CORPUS_CACHE.pop(key, None))
+    except TypeError:
+        return corpus
+    _CORPUS_CACHE[key] = (reference, signature, corpus)
+    return corpus
+
+
+def bind_corpus(data: pd.DataFrame, corpus: Corpus) -> Corpus:
+    """
+    把已构建的语料登记为该数据框对象的语料，之后 as_corpus(data) 直接返回它
+    （st.cache_data 每次重跑都返回新的数据框副本，由 st.cache_resource 常驻的语料经此对接到本次重跑的数据框）
+
+    Args:
+        data: 本次重跑得到的数据框
+        corpus: 与其内容相同的常驻语料
+
+    Returns:
+        Corpus: 传入的语料
+    """
+    key = id(data)
+    cached = _CORPUS_CACHE.get(key)
+    signature = frame_signature(data)
+    if cached is not None and cached[0]() is data and cached[1] == signature:
+        if cached[2]._keyword_variants is corpus._keyword_variants:
+            return cached[2]
+        _CORPUS_CACHE[key] = (cached[0], signature, corpus)
+        return corpus
+    try:
+        reference = weakref.ref(data, lambda _, key=key: _CORPUS_CACHE.pop(key, None))
+    except TypeError:
+        return corpus
+    _CORPUS_CACHE[key] = (reference, signature, corpus)
+    return corpus
+
+
+def as_frame(data) -> pd.DataFrame:
+    """接受 Corpus 或数据框，返回原始数据框"""
+    return data.frame if isinstance(data, Corpus) else data
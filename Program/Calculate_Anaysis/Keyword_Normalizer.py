@@ -0,0 +1,315 @@
+"""
+关键词规范化
+同一概念的关键词常有多种写法（"carbon emission" / "carbon emissions" / "Carbon-Emissions"），只做小写化会拆成多个节点，
+放大共现网络与两两计数。这里对每个不同的关键词字符串只做一次规范化：
+- 连字符与空白：各种破折号统一为 "-"，连字符两侧与连续空白合并；匹配键中连字符视为空格
+- 复数折叠：按规则把每个词还原为单数（studies -> study，processes -> process，viruses -> virus，SMEs -> SME），大写缩写不折叠
+- 同义词表：用户提供的 CSV/TSV（两列：关键词, 替换为，与 VOSviewer thesaurus 格式相同），替换为空表示删除该关键词
+字符串 -> 匹配键 的映射表按规则版本在进程内记忆（LRU，条目数有上限），新条目以 Parquet 分片追加到磁盘、分片过多时合并
+（同义词表在其后按匹配键替换），
+语料中的关键词先因子化为整数编码，规范化只作用于去重后的字符串，再按编码一次性映射回各条关联
+"""
+
+import glob
+import hashlib
+import io
+import logging
+import os
+import re
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+current_dir = os.path.dirname(os.path.realpath(__file__))
+project_root = os.path.dirname(current_dir).replace("/Program", "")
+
+logger = logging.getLogger(__name__)
+
+# 规范化版本：规则变化时递增，使持久化的映射表失效
+NORMALIZER_VERSION = '3'
+
+# 映射表目录，可通过环境变量覆盖
+DEFAULT_KEYWORD_CACHE_DIR = os.environ.get('WOS_KEYWORD_CACHE_DIR', os.path.join(project_root, 'output', 'cache', 'keywords'))
+
+# 关键词来源：作者关键词 (DE) 与 Keywords Plus (ID) 的合并策略
+KEYWORD_SOURCES = {
+    'merged': '合并作者关键词与 Keywords Plus',
+    'author': '仅作者关键词 (DE)',
+    'plus': '仅 Keywords Plus (ID)',
+    'author_first': '优先作者关键词，缺失时使用 Keywords Plus',
+}
+DEFAULT_KEYWORD_SOURCE = 'merged'
+
+_DASHES = re.compile(r'[‐-―−﹘﹣－]')
+_HYPHEN_SPACES = re.compile(r'\s*-\s*')
+_TOKEN = re.compile(r'[^\s\-/]+|[\s\-/]+')
+
+# 以 s 结尾但不是复数（或单复数同形）的词
+_INVARIANT = frozenset({
+    'series', 'species', 'news', 'means', 'gas', 'bias', 'atlas', 'canvas', 'chaos', 'cosmos', 'ethos', 'kudos',
+    'lens', 'diabetes', 'herpes', 'measles', 'mumps', 'rabies', 'scabies', 'sars', 'aids', 'always', 'perhaps',
+})
+# 不规则复数
+_IRREGULAR = {
+    'analyses': 'analysis', 'hypotheses': 'hypothesis', 'theses': 'thesis', 'crises': 'crisis',
+    'diagnoses': 'diagnosis', 'syntheses': 'synthesis', 'prognoses': 'prognosis', 'emphases': 'emphasis',
+    'indices': 'index', 'matrices': 'matrix', 'vertices': 'vertex', 'appendices': 'appendix',
+    'movies': 'movie', 'cookies': 'cookie', 'calories': 'calorie', 'zombies': 'zombie',
+    'topics': 'topic', 'clinics': 'clinic', 'characteristics': 'characteristic', 'antibiotics': 'antibiotic',
+}
+# 以 -ss、-us、-is、-ics 结尾的词不折叠（process、virus、analysis、economics）
+_SINGULAR_ENDINGS = ('ss', 'us', 'is', 'ics')
+# 以 -use 结尾的单数（causes -> cause，其余 -uses 去掉 es：buses -> bus，viruses -> virus）
+_USE_SINGULARS = ('ause', 'ouse', 'abuse', 'accuse', 'excuse', 'fuse', 'recluse', 'misuse', 'overuse', 'reuse', 'disuse')
+# 以 -che 结尾的单数（niches -> niche 而非 nich），按整词匹配，approaches、coaches 仍去掉 es
+_CHE_SINGULARS = frozenset({'niche', 'cache', 'ache', 'avalanche', 'psyche', 'cliche', 'creche', 'moustache',
+                            'mustache', 'panache'})
+# 以 -ache 结尾的复合词按后缀匹配（migraine headaches -> headache）
+_ACHE_COMPOUNDS = ('headache', 'stomachache', 'toothache', 'backache', 'heartache', 'earache', 'bellyache')
+
+
+def canonical_spacing(keyword: str) -> str:
+    """显示形式：小写、破折号统一为 "-"、去掉连字符两侧与多余的空白及末尾标点"""
+    keyword = _DASHES.sub('-', keyword.lower())
+    keyword = _HYPHEN_SPACES.sub('-', ' '.join(keyword.split()))
+    return keyword.strip(' .,;:-')
+
+
+def singular(word: str) -> str:
+    """
+    单词复数折叠（保留原大小写判断缩写：全大写的 AIDS、GIS 不折叠，SMEs -> SME）
+
+    Returns:
+        str: 小写单数形式
+    """
+    if word.isupper() or not word.isalpha():
+        return word.lower()
+    if len(word) > 2 and word[-1] == 's' and word[:-1].isupper():
+        return word[:-1].lower()
+    word = word.lower()
+    if len(word) <= 3 or word[-1] != 's' or word in _INVARIANT or word.endswith(_SINGULAR_ENDINGS):
+        return _IRREGULAR.get(word, word)
+    if word in _IRREGULAR:
+        return _IRREGULAR[word]
+    if word.endswith('ies'):
+        return word[:-3] + 'y' if len(word) > 4 else word[:-1]
+    if word.endswith(('sses', 'shes', 'xes')):
+        return word[:-2]
+    if word.endswith('ches'):
+        che = word[:-1] in _CHE_SINGULARS or word[:-1].endswith(_ACHE_COMPOUNDS)
+        return word[:-1] if che else word[:-2]
+    if word.endswith('uses') and word != 'uses' and not word[:-1].endswith(_USE_SINGULARS):
+        return word[:-2]
+    if word.endswith('ses') and word[:-2] in _INVARIANT:
+        return word[:-2]
+    return word[:-1]
+
+
+def _fold_plurals(keyword: str) -> str:
+    """逐词复数折叠（分隔符原样保留）；整条关键词全大写时（如 Keywords Plus）无法区分缩写，先转小写"""
+    if keyword.isupper():
+        keyword = keyword.lower()
+    return ''.join(singular(part) if part[0].isalnum() else part.lower() for part in _TOKEN.findall(keyword))
+
+
+def read_thesaurus(files: Iterable) -> Dict[str, str]:
+    """
+    读取同义词表：每个文件两列（关键词, 替换为），逗号、制表符或分号分隔，可带表头（label / replace by）；
+    多个文件依次读取，后出现的条目覆盖先出现的
+
+    Args:
+        files: 文件路径、上传文件或字节串
+
+    Returns:
+        dict: 关键词 -> 替换为（空字符串表示删除）
+    """
+    thesaurus = {}
+    for file in files:
+        if isinstance(file, (bytes, bytearray)):
+            file = io.BytesIO(file)
+        elif hasattr(file, 'getvalue'):
+            file = io.BytesIO(file.getvalue())
+        table = pd.read_csv(file, sep=None, engine='python', header=None, dtype=str, keep_default_na=False,
+                            usecols=[0, 1], encoding='utf-8-sig')
+        if len(table) and table.iloc[0, 0].strip().lower() in ('label', 'term', 'keyword', 'keywords', '关键词'):
+            table = table.iloc[1:]
+        for term, replacement in table.itertuples(index=False, name=None):
+            if term.strip():
+                thesaurus[term.strip()] = replacement.strip()
+    return thesaurus
+
+
+# 映射表标识 -> {原始字符串: 匹配键（未应用同义词表）}，按最近使用排序，每张表最多保留 _MAX_MAPPING_ENTRIES 条
+_MAPPINGS: Dict[str, 'OrderedDict[str, str]'] = {}
+_MAX_MAPPING_ENTRIES = 500_000
+# 磁盘分片数超过该值时合并为一个分片
+_MAX_MAPPING_PARTS = 16
+
+
+class KeywordNormalizer:
+    """关键词规范化规则：来源策略、复数折叠、同义词表"""
+
+    def __init__(self, source: str = DEFAULT_KEYWORD_SOURCE, fold_plurals: bool = True,
+                 thesaurus: Optional[Dict[str, str]] = None, cache_dir: Optional[str] = DEFAULT_KEYWORD_CACHE_DIR):
+        """
+        Args:
+            source: 关键词来源，见 KEYWORD_SOURCES
+            fold_plurals: 是否折叠复数
+            thesaurus: 关键词 -> 替换为（见 read_thesaurus）
+            cache_dir: 映射表持久化目录，为空时只在进程内记忆
+        """
+        if source not in KEYWORD_SOURCES:
+            raise ValueError(f"未知的关键词来源: {source}")
+        self.source = source
+        self.fold_plurals = fold_plurals
+        self.thesaurus = dict(thesaurus or {})
+        self.cache_dir = cache_dir
+        # 同义词表的键与替换值都按同一规则取匹配键，替换值的显示形式保留
+        self._replacements = {self._key(term): self._key(replacement) if replacement else ''
+                              for term, replacement in self.thesaurus.items()}
+        self._preferred = {self._key(replacement): canonical_spacing(replacement)
+                           for replacement in self.thesaurus.values() if replacement}
+        # 映射表只取决于规则版本与是否折叠复数，同义词表在映射之后替换，修改同义词表不会使映射表失效
+        self.mapping_key = f'v{NORMALIZER_VERSION}-{"plural" if fold_plurals else "plain"}'
+        digest = hashlib.sha256(self.mapping_key.encode())
+        for term, replacement in sorted(self._replacements.items()):
+            digest.update(f'\x1f{term}\x1e{replacement}'.encode())
+        self.fingerprint = digest.hexdigest()
+
+    @property
+    def signature(self) -> Tuple[str, str]:
+        """规则签名（来源策略 + 规则与同义词表的指纹），签名相同的规范化结果相同"""
+        return self.source, self.fingerprint
+
+    def _key(self, keyword: str) -> str:
+        """匹配键：显示形式中连字符视为空格，再逐词折叠复数（折叠需要原始大小写判断缩写）"""
+        keyword = _DASHES.sub('-', keyword)
+        keyword = _HYPHEN_SPACES.sub(' ', ' '.join(keyword.split())).strip(' .,;:-')
+        return _fold_plurals(keyword) if self.fold_plurals else keyword.lower()
+
+    def _directory(self) -> Optional[str]:
+        """映射表分片目录（每个规则版本一个目录，分片为 part-*.parquet）"""
+        return os.path.join(self.cache_dir, self.mapping_key) if self.cache_dir else None
+
+    def _mapping(self) -> 'OrderedDict[str, str]':
+        """本规则的映射表（首次使用时从磁盘分片载入，超出上限时只保留最近写入的条目）"""
+        mapping = _MAPPINGS.get(self.mapping_key)
+        if mapping is None:
+            mapping = OrderedDict()
+            directory = self._directory()
+            parts = sorted(glob.glob(os.path.join(directory, 'part-*.parquet'))) if directory else []
+            try:
+                for part in parts:
+                    stored = pd.read_parquet(part)
+                    mapping.update(zip(stored['keyword'], stored['key']))
+            except ImportError as error:
+                logger.warning("关键词映射表未载入，缺少 Parquet 引擎（pip install pyarrow）：%s", error)
+            except Exception:
+                # 损坏的分片不影响结果：缺失的条目会重新计算并追加
+                pass
+            while len(mapping) > _MAX_MAPPING_ENTRIES:
+                mapping.popitem(last=False)
+            _MAPPINGS[self.mapping_key] = mapping
+            if len(parts) > _MAX_MAPPING_PARTS:
+                self._persist(mapping, replace=parts)
+        return mapping
+
+    def _persist(self, entries: Dict[str, str], replace: Sequence[str] = ()):
+        """
+        把新条目追加为一个磁盘分片（先写临时文件再原子改名，失败时只保留进程内记忆）
+
+        Args:
+            entries: 新增的 原始字符串 -> 匹配键
+            replace: 合并分片时被新分片取代、写入后删除的旧分片
+        """
+        directory = self._directory()
+        if not directory or not entries:
+            return
+        name = f'part-{time.time_ns():020d}-{os.getpid()}'
+        path = os.path.join(directory, name + '.parquet')
+        tmp_path = os.path.join(directory, f'.{name}.tmp')
+        try:
+            os.makedirs(directory, exist_ok=True)
+            pd.DataFrame({'keyword': list(entries), 'key': list(entries.values())}).to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, path)
+        except Exception as error:
+            if isinstance(error, ImportError):
+                logger.warning("关键词映射表未写入磁盘，缺少 Parquet 引擎（pip install pyarrow）：%s", error)
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return
+        for part in replace:
+            try:
+                os.remove(part)
+            except OSError:
+                pass
+
+    def keys(self, keywords: Sequence[str]) -> np.ndarray:
+        """
+        每个（去重后的）关键词字符串的匹配键，已应用同义词表；删除的关键词为空字符串
+
+        Args:
+            keywords: 不重复的原始关键词
+
+        Returns:
+            np.ndarray: 匹配键（object）
+        """
+        mapping = self._mapping()
+        missing = {keyword: self._key(keyword) for keyword in keywords if keyword not in mapping}
+        keys = np.asarray([missing[keyword] if keyword in missing else mapping[keyword] for keyword in keywords],
+                          dtype=object)
+        if missing:
+            self._persist(missing)
+        # 命中的条目移到末尾（最近使用），新条目追加后按上限淘汰最久未用的条目
+        for keyword in keywords:
+            if keyword in mapping:
+                mapping.move_to_end(keyword)
+        mapping.update(missing)
+        while len(mapping) > _MAX_MAPPING_ENTRIES:
+            mapping.popitem(last=False)
+        if self._replacements:
+            # 每个键一次字典查找（Series.replace 按同义词表条目逐条扫描，万行同义词表时极慢）
+            replacements = self._replacements
+            keys = np.asarray([replacements.get(key, key) for key in keys], dtype=object)
+        return keys
+
+    def normalize(self, keywords: Sequence[str], counts: Optional[np.ndarray] = None) -> Tuple[np.ndarray, pd.Index]:
+        """
+        把不重复的关键词字符串合并为规范关键词
+
+        Args:
+            keywords: 不重复的原始关键词
+            counts: 每个关键词的出现次数（用于选择显示名称），默认都为 1
+
+        Returns:
+            codes: 每个原始关键词对应的规范关键词编号（删除的为 -1）
+            labels: 规范关键词显示名称：同义词表的替换值，否则为组内出现次数最多的显示形式（次数相同取先出现者）
+        """
+        keywords = pd.Series(keywords, dtype=object)
+        n = len(keywords)
+        if counts is None:
+            counts = np.ones(n, dtype=np.int64)
+        keys = self.keys(keywords.tolist())
+        group, unique_keys = pd.factorize(keys)
+        surfaces = np.asarray([canonical_spacing(keyword) for keyword in keywords], dtype=object)
+
+        order = np.lexsort((np.arange(n), -np.asarray(counts), group))
+        _, first = np.unique(group[order], return_index=True)
+        labels = surfaces[order[first]]
+        preferred = pd.Series(unique_keys).map(self._preferred)
+        labels = np.where(preferred.notna(), preferred.to_numpy(dtype=object), labels)
+
+        # 组编号按首次出现的顺序排列；删除的关键词（空匹配键）编号为 -1
+        dropped = np.asarray(unique_keys == '')
+        keep = np.flatnonzero(~dropped)
+        renumber = np.full(len(unique_keys), -1, dtype=np.int64)
+        renumber[keep] = np.arange(len(keep))
+        # 不同匹配键可能有相同的显示形式（如同义词表把两个键都替换为同一写法），按显示形式再合并一次
+        label_codes, merged = pd.factorize(pd.Index(labels[keep], dtype=object))
+        renumber[keep] = label_codes
+        return renumber[group], pd.Index(merged, dtype=object)
@@ -0,0 +1,250 @@
+"""
+本地引用网络与历史引文图（historiograph）
+把每条解析后的参考文献与语料中的记录匹配：先按 DOI，再按 (来源首字母缩写, 第一作者, 年份, 卷, 页) 书目键，
+两者都是对去重后的键做一次哈希索引查找（pd.Index），不逐行扫描。匹配结果给出：
+- 本地引用矩阵：施引文献×被引文献 CSR（0/1），即 文献×参考文献矩阵 乘以 参考文献→记录 映射
+- LCS（本地被引次数）：被语料中多少篇文献引用；LCR（本地参考文献数）：引用了语料中多少篇文献
+- 历史引文图：LCS 最高的前 N 篇文献按年份排布的直接引用网络
+同一语料只构建一次（按语料内容指纹缓存，跨重跑重建的语料对象也能命中）
+"""
+
+from collections import OrderedDict
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+from Calculate_Anaysis.Corpus import Corpus
+from Calculate_Anaysis.Incidence_Matrix import incidence_matrix
+from Calculate_Anaysis.Reference_Parser import author_key, source_key
+
+# 历史引文图默认显示的文献数
+DEFAULT_HISTORIOGRAPH_SIZE = 20
+
+
+def _clean(values: pd.Series) -> pd.Series:
+    """卷、页等字段：去空白、大写（数值读入的 "5.0" 还原为 "5"），空字符串为缺失"""
+    missing = values.isna()
+    values = values.astype(str).str.strip().str.upper().str.replace(r'\.0$', '', regex=True)
+    return values.where(~missing & values.ne(''))
+
+
+def first_authors(corpus: Corpus) -> np.ndarray:
+    """每篇文献的第一作者（没有作者为 None）"""
+    links = corpus.authors
+    authors = np.full(corpus.n_docs, None, dtype=object)
+    if len(links):
+        order = np.argsort(links.doc, kind='stable')
+        docs, first = np.unique(links.doc[order], return_index=True)
+        authors[docs] = links.labels.to_numpy()[links.ids[order[first]]]
+    return authors
+
+
+def record_keys(corpus: Corpus) -> Tuple[pd.Series, pd.Series]:
+    """
+    语料记录的匹配键
+
+    Returns:
+        (pd.Series, pd.Series): 每篇文献的小写 DOI（缺失为 NaN，下标为文献序号）；
+            书目键（下标为文献序号，可重复：同时有卷和页的文献还登记只有卷、只有页的键，
+            以匹配缺少页码或卷号的 CR 条目）
+    """
+    docs = corpus.docs
+    if 'DOI' in docs.columns:
+        doi = docs['DOI'].astype(object).where(docs['DOI'].notna()).str.strip().str.lower().str.replace(r'^(?:https?://(?:dx\.)?doi\.org/|doi:\s*)', '', regex=True)
+    else:
+        doi = pd.Series(np.nan, index=docs.index, dtype=object)
+
+    authors = pd.Series([author_key(author) for author in first_authors(corpus)], index=docs.index, dtype=object)
+    year = docs['Year'].astype('Int64').astype(str) if 'Year' in docs.columns else pd.Series('<NA>', index=docs.index)
+    volume = _clean(docs['Volume']) if 'Volume' in docs.columns else pd.Series(np.nan, index=docs.index, dtype=object)
+    page = _clean(docs['BeginningPage']) if 'BeginningPage' in docs.columns else \
+        pd.Series(np.nan, index=docs.index, dtype=object)
+    if 'Source' in docs.columns:
+        source = docs['Source'].astype(object)
+        source = source.map({name: source_key(name) for name in source.dropna().unique()}).fillna('')
+    else:
+        source = pd.Series('', index=docs.index, dtype=object)
+    valid = authors.notna() & (year != '<NA>')
+    prefix = source + '|' + authors + '|' + year + '|'
+    keys = [
+        (prefix + volume + '|' + page)[valid & volume.notna() & page.notna()],
+        (prefix + volume + '|')[valid & volume.notna()],
+        (prefix + '|' + page)[valid & page.notna()],
+    ]
+    return doi, pd.concat(keys)
+
+
+def _lookup(record_index: pd.Series, queries: pd.Series) -> np.ndarray:
+    """哈希查找：键 -> 记录序号（同一键对应多篇记录时取第一篇），找不到为 -1"""
+    record_index = record_index.dropna()
+    table = pd.Series(record_index.index.to_numpy(), index=record_index.to_numpy())
+    table = table[~table.index.duplicated()]
+    found = table.reindex(queries.to_numpy())
+    return found.fillna(-1).to_numpy(dtype=np.int64)
+
+
+def match_references(corpus: Corpus) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    参考文献 -> 语料记录
+
+    Returns:
+        (np.ndarray, np.ndarray): 每个参考文献编号匹配到的文献序号（未匹配为 -1）；
+            匹配方式（'doi' / 'key' / None）
+    """
+    fields = corpus.reference_fields
+    n_references = corpus.references.n_entities
+    matched = np.full(n_references, -1, dtype=np.int64)
+    method = np.full(n_references, None, dtype=object)
+    if n_references == 0:
+        return matched, method
+    record_doi, record_key = record_keys(corpus)
+
+    by_doi = _lookup(record_doi, fields['DOI'].astype(object))
+    matched[by_doi >= 0] = by_doi[by_doi >= 0]
+    method[by_doi >= 0] = 'doi'
+
+    pending = matched < 0
+    by_key = _lookup(record_key, fields['Key'].astype(object)[pending])
+    rows = np.flatnonzero(pending)[by_key >= 0]
+    matched[rows] = by_key[by_key >= 0]
+    method[rows] = 'key'
+    return matched, method
+
+
+class LocalCitations:
+    """语料的本地引用网络：施引×被引矩阵、LCS、LCR"""
+
+    def __init__(self, corpus: Corpus):
+        self.reference_doc, self.method = match_references(corpus)
+        links = corpus.references
+        cited = self.reference_doc[links.ids] if len(links) else np.empty(0, dtype=np.int64)
+        known = (cited >= 0) & (cited != links.doc)
+        matrix = incidence_matrix(links.doc[known], cited[known], corpus.n_docs, corpus.n_docs)
+        # 同一施引文献通过不同写法引用同一记录只计 1 次
+        matrix.data[:] = 1
+        self.matrix = matrix
+        self.lcs = np.bincount(matrix.indices, minlength=corpus.n_docs)
+        self.local_references = np.diff(matrix.indptr)
+
+    @property
+    def n_links(self) -> int:
+        return self.matrix.nnz
+
+    def match_summary(self) -> dict:
+        """匹配统计：按 DOI / 书目键匹配到的参考文献数与未匹配数"""
+        return {
+            'doi': int((self.method == 'doi').sum()),
+            'key': int((self.method == 'key').sum()),
+            'unmatched': int((self.reference_doc < 0).sum()),
+            'links': self.n_links,
+        }
+
+
+# 语料指纹 -> 本地引用网络（只依赖文献与参考文献，与关键词规范化无关），超出上限时按最近使用淘汰
+_LOCAL_CITATIONS: 'OrderedDict[str, LocalCitations]' = OrderedDict()
+_MAX_CACHED_NETWORKS = 4
+
+
+def local_citations(corpus: Corpus) -> LocalCitations:
+    """语料的本地引用网络（同一语料内容只构建一次）"""
+    key = corpus.fingerprint
+    cached = _LOCAL_CITATIONS.get(key)
+    if cached is None:
+        cached = _LOCAL_CITATIONS[key] = LocalCitations(corpus)
+        while len(_LOCAL_CITATIONS) > _MAX_CACHED_NETWORKS:
+            _LOCAL_CITATIONS.popitem(last=False)
+    _LOCAL_CITATIONS.move_to_end(key)
+    return cached
+
+
+def document_names(corpus: Corpus) -> np.ndarray:
+    """文献简称 "第一作者, 年份"（如 "SMITH J, 2010"），缺失部分省略"""
+    authors = first_authors(corpus)
+    years = corpus.years
+    names = []
+    for index, (author, year) in enumerate(zip(authors, years)):
+        parts = [author_key(author) or author] if author else []
+        if year == year:
+            parts.append(str(int(year)))
+        names.append(', '.join(parts) if parts else f"Doc {index + 1}")
+    return np.asarray(names, dtype=object)
+
+
+def local_citation_scores(corpus: Corpus) -> pd.DataFrame:
+    """
+    每篇文献的本地被引次数（LCS）与全局被引次数（GCS）
+
+    Returns:
+        pd.DataFrame: Document, Title, Year, DOI, LCS, GCS, LCR，按 LCS、GCS 降序
+    """
+    network = local_citations(corpus)
+    docs = corpus.docs
+    scores = pd.DataFrame({
+        'Document': document_names(corpus),
+        'Title': docs['Title'].to_numpy() if 'Title' in docs.columns else None,
+        'Year': docs['Year'].to_numpy() if 'Year' in docs.columns else None,
+        'DOI': docs['DOI'].to_numpy() if 'DOI' in docs.columns else None,
+        'LCS': network.lcs,
+        'GCS': corpus.citations,
+        'LCR': network.local_references,
+    })
+    return scores.sort_values(['LCS', 'GCS'], ascending=False, kind='stable')
+
+
+def year_layout(node_years: np.ndarray, citing: np.ndarray, cited: np.ndarray, priority: np.ndarray) -> np.ndarray:
+    """
+    按年份排布的引用网络纵坐标：按年份从早到晚逐列排布，每列内按其引用的已排布文献纵坐标的均值（重心）排序，
+    减少连线交叉；没有已排布引用的文献排在列尾，按 priority 降序
+
+    Args:
+        node_years: 每个节点的年份
+        citing, cited: 每条边施引、被引节点的下标
+        priority: 重心相同时的排序依据（越大越靠前）
+
+    Returns:
+        np.ndarray: 每个节点的纵坐标，每列以 0 为中心
+    """
+    y = np.full(len(node_years), np.nan)
+    for year in np.unique(node_years):
+        column = np.flatnonzero(node_years == year)
+        barycenter = np.full(len(column), np.inf)
+        for position, node in enumerate(column):
+            references = cited[citing == node]
+            placed = y[references][~np.isnan(y[references])]
+            if len(placed):
+                barycenter[position] = placed.mean()
+        order = np.lexsort((-priority[column], barycenter))
+        y[column[order]] = np.arange(len(column)) - (len(column) - 1) / 2
+    return y
+
+
+def historiograph(corpus: Corpus, top_n: int = DEFAULT_HISTORIOGRAPH_SIZE) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    历史引文图：LCS 最高的前 top_n 篇文献（LCS 为 0 的不入选）之间的直接引用关系，横轴为年份
+
+    纵坐标见 year_layout
+
+    Returns:
+        (pd.DataFrame, pd.DataFrame): 节点表 doc, Document, Title, Year, LCS, GCS, x, y；
+            边表 source（施引文献序号）, target（被引文献序号）
+    """
+    network = local_citations(corpus)
+    scores = local_citation_scores(corpus)
+    years = corpus.years
+    candidates = scores.index.to_numpy()[(scores['LCS'].to_numpy() > 0) & ~np.isnan(years[scores.index.to_numpy()])]
+    selected = np.sort(candidates[:top_n])
+    nodes = scores.loc[selected, ['Document', 'Title', 'Year', 'LCS', 'GCS']].copy()
+    nodes.insert(0, 'doc', selected)
+    if len(selected) == 0:
+        nodes['x'], nodes['y'] = [], []
+        return nodes.reset_index(drop=True), pd.DataFrame(columns=['source', 'target'])
+
+    sub = network.matrix[selected][:, selected].tocoo()
+    edges = pd.DataFrame({'source': selected[sub.row], 'target': selected[sub.col]})
+
+    node_years = years[selected]
+    y = year_layout(node_years, sub.row, sub.col, nodes['LCS'].to_numpy())
+    nodes['x'] = node_years
+    nodes['y'] = y
+    return nodes.reset_index(drop=True), edges
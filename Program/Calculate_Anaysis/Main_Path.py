@@ -0,0 +1,270 @@
+"""
+主路径分析（main path analysis）
+在本地直接引用网络上沿知识流方向（被引文献 -> 施引文献）计算遍历权重，并提取主路径，与 Pajek 的结果一致：
+- SPC（search path count）：从所有源点（不引用本地文献）到所有汇点（未被本地引用）的路径中经过该边的条数
+- SPLC（search path link count）：以每个节点为起点、汇点为终点的路径中经过该边的条数
+- SPNP（search path node pair）：以每个节点为起点、每个节点为终点的路径中经过该边的条数
+边 (u, v) 的权重 = N⁻(u) × N⁺(v)，N⁻、N⁺ 为到达 u、从 v 出发的路径数，按拓扑层次逐层做动态规划（每层一次稀疏矩阵乘向量）。
+路径数随网络深度指数增长，权重用浮点数表示。
+主路径：
+- local：从权重最大的源点出边出发，每步沿权重最大的出边前进直到汇点（并列时全部保留）
+- global：源点到汇点权重总和最大的一条路径
+- key_route：权重最高的前 k 条边（关键路线）分别向前、向后沿权重最大的边延伸到汇点、源点，取并集
+引用网络因同年互引或匹配误差可能含环：强连通分量内只保留从较早（年份、记录顺序）指向较晚文献的边
+"""
+
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from scipy.sparse import csgraph
+
+from Calculate_Anaysis.Corpus import Corpus
+from Calculate_Anaysis.Local_Citation import local_citation_scores, local_citations, year_layout
+
+# 遍历权重
+SEARCH_PATH_WEIGHTS = {
+    'spc': 'SPC（源点到汇点的路径数）',
+    'splc': 'SPLC（任一节点到汇点的路径数）',
+    'spnp': 'SPNP（任意节点对之间的路径数）',
+}
+
+# 主路径提取方式
+MAIN_PATH_METHODS = {
+    'key_route': '关键路线主路径（前 k 条关键边双向延伸）',
+    'local': '局部主路径（从源点逐步选择权重最大的边）',
+    'global': '全局主路径（权重总和最大的源点-汇点路径）',
+}
+
+DEFAULT_KEY_ROUTES = 10
+
+# 比较浮点权重时视为并列的相对误差
+_TIE_TOLERANCE = 1e-9
+
+
+def citation_dag(corpus: Corpus) -> Tuple[sp.csr_matrix, int]:
+    """
+    知识流方向的本地引用网络（被引文献 -> 施引文献），去除构成环的边
+
+    Returns:
+        (sp.csr_matrix, int): 文献×文献 0/1 邻接矩阵（无环）；为消除环删除的边数
+    """
+    flow = local_citations(corpus).matrix.T.tocsr()
+    n_components, component = csgraph.connected_components(flow, directed=True, connection='strong')
+    if n_components == flow.shape[0]:
+        return flow, 0
+    years = corpus.years
+    rank = np.empty(flow.shape[0], dtype=np.int64)
+    rank[np.lexsort((np.arange(flow.shape[0]), np.nan_to_num(years, nan=np.inf)))] = np.arange(flow.shape[0])
+    entries = flow.tocoo()
+    keep = (component[entries.row] != component[entries.col]) | (rank[entries.row] < rank[entries.col])
+    dag = sp.csr_matrix((entries.data[keep], (entries.row[keep], entries.col[keep])), shape=flow.shape)
+    return dag, int((~keep).sum())
+
+
+def topological_levels(dag: sp.csr_matrix) -> List[np.ndarray]:
+    """
+    拓扑层次：第 0 层为没有入边的节点，其余节点的层次为其最长入路径的长度
+
+    Args:
+        dag: 有向无环图的 CSR 邻接矩阵（行 -> 列）
+
+    Returns:
+        list[np.ndarray]: 每层的节点下标
+    """
+    dag = sp.csr_matrix(dag)
+    indegree = np.bincount(dag.indices, minlength=dag.shape[0])
+    frontier = np.flatnonzero(indegree == 0)
+    levels, reached = [], 0
+    while len(frontier):
+        levels.append(frontier)
+        reached += len(frontier)
+        successors, counts = np.unique(dag[frontier].indices, return_counts=True)
+        indegree[successors] -= counts
+        frontier = successors[indegree[successors] == 0]
+    if reached < dag.shape[0]:
+        raise ValueError("网络中存在环，无法进行拓扑排序")
+    return levels
+
+
+def _path_counts(adjacency: sp.csr_matrix, levels: List[np.ndarray], initial: np.ndarray) -> np.ndarray:
+    """按 levels 的顺序逐层累加路径数：count[v] = initial[v] + Σ count[u]（adjacency[v, u] 非零）"""
+    counts = initial.astype(np.float64)
+    for level in levels:
+        rows = adjacency[level]
+        if rows.nnz:
+            counts[level] += rows @ counts
+    return counts
+
+
+def search_path_weights(dag: sp.csr_matrix, weight: str = 'spc',
+                        levels: Optional[List[np.ndarray]] = None) -> sp.csr_matrix:
+    """
+    遍历权重（SPC / SPLC / SPNP）
+
+    Args:
+        dag: 有向无环图的 CSR 邻接矩阵（知识流方向）
+        weight: SEARCH_PATH_WEIGHTS 中的一种
+        levels: 拓扑层次（为空时计算）
+
+    Returns:
+        sp.csr_matrix: 与 dag 结构相同、值为遍历权重的矩阵（浮点）
+    """
+    if weight not in SEARCH_PATH_WEIGHTS:
+        raise ValueError(f"未知的遍历权重: {weight}，可选 {list(SEARCH_PATH_WEIGHTS)}")
+    dag = sp.csr_matrix(dag, dtype=np.float64)
+    dag.sum_duplicates()
+    dag.eliminate_zeros()
+    dag.data[:] = 1
+    if levels is None:
+        levels = topological_levels(dag)
+    n = dag.shape[0]
+    indegree = np.bincount(dag.indices, minlength=n)
+    outdegree = np.diff(dag.indptr)
+    # N⁻：从起点到达每个节点的路径数；N⁺：从每个节点到达终点的路径数
+    origins = np.ones(n) if weight in ('splc', 'spnp') else (indegree == 0).astype(np.float64)
+    destinations = np.ones(n) if weight == 'spnp' else (outdegree == 0).astype(np.float64)
+    forward = _path_counts(dag.T.tocsr(), levels, origins)
+    backward = _path_counts(dag, levels[::-1], destinations)
+    rows = np.repeat(np.arange(n), outdegree)
+    weights = dag.copy()
+    weights.data = forward[rows] * backward[dag.indices]
+    return weights
+
+
+def _row_maxima(rows: sp.csr_matrix) -> Tuple[np.ndarray, np.ndarray]:
+    """每个非空行中权重最大（含并列）的元素：(行内下标, 列)"""
+    nonempty = np.diff(rows.indptr) > 0
+    maxima = np.zeros(rows.shape[0])
+    if not nonempty.any():
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=rows.indices.dtype)
+    maxima[nonempty] = np.maximum.reduceat(rows.data, rows.indptr[:-1][nonempty])
+    row_of = np.repeat(np.arange(rows.shape[0]), np.diff(rows.indptr))
+    selected = rows.data >= maxima[row_of] * (1 - _TIE_TOLERANCE)
+    return row_of[selected], rows.indices[selected]
+
+
+def _follow(weights: sp.csr_matrix, start: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """从 start 出发每步沿权重最大的出边（并列时全部）前进直到没有出边，返回经过的边 (起点, 终点)"""
+    visited = np.zeros(weights.shape[0], dtype=bool)
+    frontier = np.unique(start)
+    sources, targets = [], []
+    while len(frontier):
+        visited[frontier] = True
+        row, column = _row_maxima(weights[frontier])
+        sources.append(frontier[row])
+        targets.append(column)
+        frontier = np.unique(column[~visited[column]])
+    if not sources:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    return np.concatenate(sources), np.concatenate(targets)
+
+
+def _local_main_path(weights: sp.csr_matrix, levels: List[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+    sources = levels[0]
+    rows = weights[sources]
+    if rows.nnz == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    row_of = np.repeat(np.arange(len(sources)), np.diff(rows.indptr))
+    start = rows.data >= rows.data.max() * (1 - _TIE_TOLERANCE)
+    tails, heads = _follow(weights, rows.indices[start])
+    return np.concatenate([sources[row_of[start]], tails]), np.concatenate([rows.indices[start], heads])
+
+
+def _global_main_path(weights: sp.csr_matrix, levels: List[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+    incoming = weights.T.tocsr()
+    # best[v]：从任一源点到 v 的路径权重总和的最大值
+    best = np.zeros(weights.shape[0])
+    for level in levels[1:]:
+        rows = incoming[level]
+        best[level] = np.maximum.reduceat(best[rows.indices] + rows.data, rows.indptr[:-1])
+    sinks = np.flatnonzero((np.diff(weights.indptr) == 0) & (np.diff(incoming.indptr) > 0))
+    if not len(sinks):
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    node = sinks[np.argmax(best[sinks])]
+    tails, heads = [], []
+    while incoming.indptr[node + 1] > incoming.indptr[node]:
+        segment = slice(incoming.indptr[node], incoming.indptr[node + 1])
+        predecessors = incoming.indices[segment]
+        previous = predecessors[np.argmax(best[predecessors] + incoming.data[segment])]
+        tails.append(previous)
+        heads.append(node)
+        node = previous
+    return np.asarray(tails[::-1], dtype=np.int64), np.asarray(heads[::-1], dtype=np.int64)
+
+
+def _key_route_main_path(weights: sp.csr_matrix, key_routes: int) -> Tuple[np.ndarray, np.ndarray]:
+    entries = weights.tocoo()
+    top = np.argsort(-entries.data, kind='stable')[:key_routes]
+    forward_tails, forward_heads = _follow(weights, entries.col[top])
+    # 反向延伸：在转置网络上前进，再把边换回知识流方向
+    backward_heads, backward_tails = _follow(weights.T.tocsr(), entries.row[top])
+    return (np.concatenate([entries.row[top], forward_tails, backward_tails]),
+            np.concatenate([entries.col[top], forward_heads, backward_heads]))
+
+
+def main_path_edges(weights: sp.csr_matrix, method: str = 'key_route', key_routes: int = DEFAULT_KEY_ROUTES,
+                    levels: Optional[List[np.ndarray]] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    在加权有向无环图上提取主路径
+
+    Args:
+        weights: 遍历权重矩阵（search_path_weights 的结果）
+        method: MAIN_PATH_METHODS 中的一种
+        key_routes: key_route 方式的关键边数
+        levels: 拓扑层次（为空时计算）
+
+    Returns:
+        (np.ndarray, np.ndarray, np.ndarray): 主路径上各边的起点、终点与权重（去重，按起点、终点排序）
+    """
+    if method not in MAIN_PATH_METHODS:
+        raise ValueError(f"未知的主路径方式: {method}，可选 {list(MAIN_PATH_METHODS)}")
+    weights = sp.csr_matrix(weights)
+    if weights.nnz == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0)
+    if levels is None:
+        levels = topological_levels(weights)
+    if method == 'local':
+        tails, heads = _local_main_path(weights, levels)
+    elif method == 'global':
+        tails, heads = _global_main_path(weights, levels)
+    else:
+        tails, heads = _key_route_main_path(weights, key_routes)
+    pairs = np.unique(np.stack([tails, heads], axis=1).astype(np.int64), axis=0)
+    return pairs[:, 0], pairs[:, 1], np.asarray(weights[pairs[:, 0], pairs[:, 1]]).ravel()
+
+
+def main_path(corpus: Corpus, weight: str = 'spc', method: str = 'key_route',
+              key_routes: int = DEFAULT_KEY_ROUTES) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    语料本地引用网络的主路径
+
+    Args:
+        corpus: 语料对象
+        weight: SEARCH_PATH_WEIGHTS 中的一种
+        method: MAIN_PATH_METHODS 中的一种
+        key_routes: key_route 方式的关键边数
+
+    Returns:
+        (pd.DataFrame, pd.DataFrame): 节点表 doc, Document, Title, Year, LCS, GCS, x, y（横轴为年份，纵坐标见 year_layout）；
+            边表 source（被引文献序号）, target（施引文献序号）, weight（遍历权重），按权重降序
+    """
+    dag, _ = citation_dag(corpus)
+    levels = topological_levels(dag)
+    weights = search_path_weights(dag, weight, levels)
+    tails, heads, values = main_path_edges(weights, method, key_routes, levels)
+    edges = pd.DataFrame({'source': tails, 'target': heads, 'weight': values})
+    edges = edges.sort_values('weight', ascending=False, kind='stable').reset_index(drop=True)
+
+    selected = np.unique(np.concatenate([tails, heads]))
+    scores = local_citation_scores(corpus)
+    nodes = scores.loc[selected, ['Document', 'Title', 'Year', 'LCS', 'GCS']].copy()
+    nodes.insert(0, 'doc', selected)
+    position = np.searchsorted(selected, np.concatenate([heads, tails]))
+    n_edges = len(tails)
+    node_years = corpus.years[selected]
+    nodes['x'] = node_years
+    nodes['y'] = year_layout(node_years, position[:n_edges], position[n_edges:], nodes['LCS'].to_numpy()) \
+        if len(selected) else []
+    return nodes.reset_index(drop=True), edges
@@ -0,0 +1,410 @@
+"""
+网络指标
+直接在 scipy.sparse 共现/合作矩阵上计算节点指标，不需要先构建 networkx 图：
+- 度与加权度、PageRank（幂迭代）、k-core 分解（按层剥离）、连通分量、局部聚类系数（稀疏矩阵三角形计数）
+- 中介中心性与接近中心性（可选，基于最短路径）
+每个图只计算一次全部指标，返回一张按节点对齐的数据框；networkx 只作为已建好的小型图的入口（compute_centralities）。
+最短路径统计采用按层同步的批量 Brandes 算法：一批源节点的 BFS 前沿与路径数保存在稠密矩阵中，
+每一层用一次稀疏矩阵乘法推进，反向累积依赖值时同样逐层相乘；同一遍 BFS 的距离顺带得到接近中心性。
+中介中心性支持三种方式：
+- exact：以全部节点为源，源节点分块后在进程池中并行计算再求和
+- approximate：随机抽取 k 个枢纽源节点估计（Brandes-Pich），结果按 n/k 缩放
+- auto：节点数不多时精确计算；否则先用枢纽估计，按枢纽耗时外推精确计算耗时，预计不超出时间预算才精确计算
+精确计算超出时间预算时回退到枢纽估计结果
+"""
+
+import os
+import time
+from concurrent.futures import FIRST_EXCEPTION, ProcessPoolExecutor, wait
+from typing import Optional, Tuple
+
+import networkx as nx
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from scipy.sparse.csgraph import connected_components
+
+# 默认枢纽数与精确计算的时间预算（秒）
+DEFAULT_PIVOTS = 256
+DEFAULT_TIME_BUDGET = 30.0
+
+# 节点数不超过该值时 auto 模式直接精确计算
+EXACT_NODE_LIMIT = 2000
+
+# 一批源节点的稠密矩阵（节点数×批大小）最大元素数，每个矩阵约32MB
+_BATCH_CELLS = 1 << 22
+
+# 计算量（源节点数×(节点数+非零元数)）低于该值时在本进程内计算，设了截止时间也不启动进程池
+_INPROCESS_WORK = 1 << 26
+
+BETWEENNESS_MODES = ('auto', 'exact', 'approximate')
+
+_WORKER_ADJACENCY = None
+
+
+def _init_worker(adjacency):
+    """进程池初始化：每个进程只接收一次邻接矩阵"""
+    global _WORKER_ADJACENCY
+    _WORKER_ADJACENCY = adjacency
+
+
+def _shortest_path_batch(adjacency: sp.csr_matrix, sources: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    一批源节点的最短路径统计（无权无向图）
+
+    Returns:
+        (依赖值之和, 到各源节点的距离之和, 可达的源节点数)，均为长度 n 的数组
+    """
+    n = adjacency.shape[0]
+    batch = len(sources)
+    rows = np.arange(batch)
+    sigma = np.zeros((n, batch))
+    sigma[sources, rows] = 1.0
+    depth = np.full((n, batch), -1, dtype=np.int32)
+    depth[sources, rows] = 0
+
+    # 前向：逐层推进 BFS 前沿，累计最短路径条数
+    frontier = sigma.copy()
+    level = 0
+    while True:
+        reached = adjacency @ frontier
+        reached[depth >= 0] = 0.0
+        new = reached > 0
+        if not new.any():
+            break
+        level += 1
+        depth[new] = level
+        sigma += reached
+        frontier = reached
+
+    # 反向：从最深层开始累积依赖值 δ(v) = Σ σ(v)/σ(w)·(1+δ(w))
+    delta = np.zeros((n, batch))
+    safe_sigma = np.where(sigma > 0, sigma, 1.0)
+    for current in range(level, 0, -1):
+        coefficient = np.where(depth == current, (1.0 + delta) / safe_sigma, 0.0)
+        delta += np.where(depth == current - 1, sigma * (adjacency @ coefficient), 0.0)
+    delta[sources, rows] = 0.0
+
+    reachable = depth > 0
+    return delta.sum(axis=1), np.where(reachable, depth, 0).sum(axis=1).astype(float), reachable.sum(axis=1).astype(float)
+
+
+def _shortest_path_chunk(sources: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """进程池任务：按内存上限把一组源节点再分批计算"""
+    return _accumulate_batches(_WORKER_ADJACENCY, sources)
+
+
+def _accumulate_batches(adjacency: sp.csr_matrix, sources: np.ndarray,
+                        deadline: Optional[float] = None) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """在本进程内分批累加最短路径统计，每批之前检查截止时间，超时返回 None"""
+    n = adjacency.shape[0]
+    batch_size = max(_BATCH_CELLS // max(n, 1), 1)
+    totals = [np.zeros(n), np.zeros(n), np.zeros(n)]
+    for start in range(0, len(sources), batch_size):
+        if deadline is not None and time.monotonic() >= deadline:
+            return None
+        for total, part in zip(totals, _shortest_path_batch(adjacency, sources[start:start + batch_size])):
+            total += part
+    return tuple(totals)
+
+
+def shortest_path_statistics(adjacency: sp.csr_matrix, sources: np.ndarray, max_workers: Optional[int] = None,
+                             deadline: Optional[float] = None) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """
+    以给定源节点计算最短路径统计，源节点较多时分块在进程池中并行
+
+    Args:
+        adjacency: 无权对称邻接矩阵（CSR）
+        sources: 源节点下标
+        max_workers: 进程数，默认等于CPU核数
+        deadline: time.monotonic() 截止时间，超时返回 None
+
+    Returns:
+        (依赖值之和, 距离之和, 可达源节点数)；超时返回 None
+    """
+    sources = np.asarray(sources, dtype=np.int64)
+    workers = min(max_workers or os.cpu_count() or 1, max(len(sources) // 64, 1))
+    work = len(sources) * (adjacency.shape[0] + adjacency.nnz)
+    if work < _INPROCESS_WORK or (workers <= 1 and deadline is None):
+        # 小图启动进程池的开销大于计算本身，截止时间在批与批之间检查
+        return _accumulate_batches(adjacency, sources, deadline)
+
+    # 每个进程分得多个小块；超时后取消未开始的块，并强制结束仍在计算的进程
+    chunks = [chunk for chunk in np.array_split(sources, workers * 4) if len(chunk)]
+    n = adjacency.shape[0]
+    totals = [np.zeros(n), np.zeros(n), np.zeros(n)]
+    executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(adjacency,))
+    timed_out = False
+    try:
+        futures = [executor.submit(_shortest_path_chunk, chunk) for chunk in chunks]
+        timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+        done, pending = wait(futures, timeout=timeout, return_when=FIRST_EXCEPTION)
+        if pending:
+            timed_out = True
+            return None
+        for future in done:
+            for total, part in zip(totals, future.result()):
+                total += part
+    finally:
+        if timed_out:
+            _terminate_workers(executor)
+        executor.shutdown(wait=False, cancel_futures=True)
+    return tuple(totals)
+
+
+def _terminate_workers(executor: ProcessPoolExecutor):
+    """强制结束进程池中的工作进程（shutdown 只能取消尚未开始的任务，已开始的块会一直算完）"""
+    for process in list((executor._processes or {}).values()):
+        process.terminate()
+
+
+def _betweenness(dependency: np.ndarray, n: int, n_sources: int) -> np.ndarray:
+    """与 networkx 一致的归一化（无向图），抽样时按 n/k 放大"""
+    if n <= 2:
+        return np.zeros(n)
+    return dependency * (n / n_sources) / ((n - 1) * (n - 2))
+
+
+def _closeness(distance_sum: np.ndarray, reached: np.ndarray, component_size: np.ndarray,
+               exact: bool) -> np.ndarray:
+    """接近中心性（Wasserman-Faust 连通分量修正，与 networkx 默认一致）；抽样时用到枢纽的平均距离估计"""
+    n = len(distance_sum)
+    if n <= 1:
+        return np.zeros(n)
+    samples = component_size - 1 if exact else reached
+    average = np.divide(distance_sum, samples, out=np.zeros(n), where=samples > 0)
+    closeness = np.divide(1.0, average, out=np.zeros(n), where=average > 0)
+    return closeness * (component_size - 1) / (n - 1)
+
+
+def triangle_counts(adjacency: sp.csr_matrix) -> np.ndarray:
+    """
+    每个节点所在的三角形数（稀疏矩阵三角形计数）
+
+    边按度排序定向为 L（低度指向高度，出度不超过 √(2m)），每个三角形 a→b→c（a→c）只出现一次：
+    (L·L)∘L 的行和计入 a，(Lᵀ·L)∘L 的行和计入 b、列和计入 c，比 (A·A)∘A 少展开大量楔形
+    """
+    n = adjacency.shape[0]
+    degree = np.diff(adjacency.indptr)
+    rank = np.empty(n, dtype=np.int64)
+    rank[np.lexsort((np.arange(n), degree))] = np.arange(n)
+    edges = adjacency.tocoo()
+    forward = rank[edges.row] < rank[edges.col]
+    oriented = sp.csr_matrix((np.ones(int(forward.sum())), (edges.row[forward], edges.col[forward])), shape=(n, n))
+    first = (oriented @ oriented).multiply(oriented)
+    middle = (oriented.T @ oriented).multiply(oriented)
+    return (np.asarray(first.sum(axis=1)).ravel() + np.asarray(middle.sum(axis=1)).ravel()
+            + np.asarray(middle.sum(axis=0)).ravel())
+
+
+def local_clustering(adjacency: sp.csr_matrix, degree: np.ndarray) -> np.ndarray:
+    """局部聚类系数（无权）：三角形数除以 d(d-1)/2"""
+    triangles = triangle_counts(adjacency)
+    pairs = degree * (degree - 1) / 2
+    return np.divide(triangles, pairs, out=np.zeros(len(degree)), where=pairs > 0)
+
+
+def symmetric_weights(matrix: sp.spmatrix) -> sp.csr_matrix:
+    """把共现矩阵整理为去掉对角线的浮点 CSR 加权邻接矩阵"""
+    matrix = sp.coo_matrix(matrix)
+    off_diagonal = matrix.row != matrix.col
+    return sp.csr_matrix((matrix.data[off_diagonal].astype(np.float64),
+                          (matrix.row[off_diagonal], matrix.col[off_diagonal])), shape=matrix.shape)
+
+
+def unweighted(matrix: sp.csr_matrix) -> sp.csr_matrix:
+    """同结构的 0/1 邻接矩阵"""
+    adjacency = matrix.copy()
+    adjacency.data = np.ones(len(adjacency.data))
+    return adjacency
+
+
+def strength(matrix: sp.csr_matrix) -> np.ndarray:
+    """加权度（节点全部边权之和）"""
+    return np.asarray(matrix.sum(axis=1)).ravel()
+
+
+def pagerank(matrix: sp.csr_matrix, damping: float = 0.85, tol: float = 1e-6, max_iter: int = 100) -> np.ndarray:
+    """
+    加权 PageRank（幂迭代，与 networkx 默认参数一致）
+
+    每步 x ← d·(Wᵀ(x/s) + 悬挂节点的值均分) + (1-d)/n，s 为加权度；
+    相邻两步的 L1 差小于 n·tol 时收敛，达到 max_iter 时返回最后一次迭代结果
+
+    Args:
+        matrix: 对称加权邻接矩阵
+        damping: 阻尼系数
+        tol: 收敛阈值
+        max_iter: 最大迭代次数
+
+    Returns:
+        np.ndarray: 各节点 PageRank 值，总和为1
+    """
+    n = matrix.shape[0]
+    if n == 0:
+        return np.zeros(0)
+    out_strength = strength(matrix)
+    dangling = out_strength == 0
+    inverse = np.divide(1.0, out_strength, out=np.zeros(n), where=~dangling)
+    transposed = sp.csr_matrix(matrix.T)
+    x = np.full(n, 1.0 / n)
+    for _ in range(max_iter):
+        previous = x
+        x = damping * (transposed @ (x * inverse) + x[dangling].sum() / n) + (1.0 - damping) / n
+        if np.abs(x - previous).sum() < n * tol:
+            break
+    return x
+
+
+def core_numbers(matrix: sp.csr_matrix) -> np.ndarray:
+    """
+    k-core 分解（无权度）：按层剥离，每轮一次性删除度不超过当前 k 的全部节点，
+    被删节点的邻居度数用被删行的列下标计数更新，总代价与边数成正比
+
+    Returns:
+        np.ndarray: 各节点的核数（与 networkx.core_number 一致）
+    """
+    adjacency = sp.csr_matrix(matrix)
+    n = adjacency.shape[0]
+    degree = np.diff(adjacency.indptr).astype(np.int64)
+    core = np.zeros(n, dtype=np.int64)
+    alive = np.ones(n, dtype=bool)
+    k = 0
+    while alive.any():
+        k = max(k, degree[alive].min())
+        while True:
+            removed = np.flatnonzero(alive & (degree <= k))
+            if len(removed) == 0:
+                break
+            core[removed] = k
+            alive[removed] = False
+            neighbours = adjacency[removed].indices
+            degree -= np.bincount(neighbours, minlength=n)
+    return core
+
+
+def components(matrix: sp.csr_matrix) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    连通分量
+
+    Returns:
+        (分量编号, 所在分量的节点数)：分量按节点数降序编号，0 为最大连通分量
+    """
+    n = matrix.shape[0]
+    if n == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    _, labels = connected_components(matrix, directed=False)
+    sizes = np.bincount(labels)
+    rank = np.empty(len(sizes), dtype=np.int64)
+    rank[np.argsort(-sizes, kind='stable')] = np.arange(len(sizes))
+    return rank[labels], sizes[labels]
+
+
+def _path_centralities(adjacency: sp.csr_matrix, component_size: np.ndarray, betweenness: str, k: int,
+                       seed: Optional[int], max_workers: Optional[int],
+                       time_budget: Optional[float]) -> Tuple[np.ndarray, np.ndarray, str]:
+    """中介中心性与接近中心性，返回 (中介中心性, 接近中心性, 实际计算方式)"""
+    n = adjacency.shape[0]
+    all_sources = np.arange(n)
+    started = time.monotonic()
+    deadline = None if time_budget is None else started + time_budget
+    statistics, mode = None, 'exact'
+    if betweenness == 'exact' or (betweenness == 'auto' and n <= EXACT_NODE_LIMIT) or k >= n:
+        if deadline is None:
+            statistics = shortest_path_statistics(adjacency, all_sources, max_workers)
+        else:
+            # 先算枢纽估计作为超时回退
+            pivots = np.sort(np.random.default_rng(seed).choice(n, size=min(k, n), replace=False))
+            fallback = shortest_path_statistics(adjacency, pivots)
+            statistics = shortest_path_statistics(adjacency, all_sources, max_workers, deadline)
+            if statistics is None:
+                statistics, mode = fallback, 'approximate'
+    else:
+        pivots = np.sort(np.random.default_rng(seed).choice(n, size=k, replace=False))
+        statistics, mode = shortest_path_statistics(adjacency, pivots), 'approximate'
+        if betweenness == 'auto' and deadline is not None:
+            # 每个源节点耗时近似相同：按枢纽耗时外推精确计算耗时
+            elapsed = time.monotonic() - started
+            workers = max_workers or os.cpu_count() or 1
+            if elapsed * n / k / workers <= time_budget - elapsed:
+                exact = shortest_path_statistics(adjacency, all_sources, max_workers, deadline)
+                if exact is not None:
+                    statistics, mode = exact, 'exact'
+
+    dependency, distance_sum, reached = statistics
+    n_sources = n if mode == 'exact' else min(k, n)
+    return (_betweenness(dependency, n, n_sources),
+            _closeness(distance_sum, reached, component_size, mode == 'exact'), mode)
+
+
+def graph_metrics(matrix: sp.spmatrix, labels=None, centralities: bool = False, betweenness: str = 'auto',
+                  k: int = DEFAULT_PIVOTS, seed: Optional[int] = 42, max_workers: Optional[int] = None,
+                  time_budget: Optional[float] = DEFAULT_TIME_BUDGET, drop_isolates: bool = True) -> pd.DataFrame:
+    """
+    直接在共现/合作矩阵上计算节点指标，不构建 networkx 图
+
+    Args:
+        matrix: 实体×实体对称稀疏矩阵（如 collaboration_matrix、cooccurrence 的结果），对角线忽略
+        labels: 行列对应的名称，默认为下标
+        centralities: 是否同时计算中介中心性与接近中心性（基于最短路径，代价远高于其他指标）
+        betweenness: 'auto' / 'exact' / 'approximate'
+        k: 近似模式的枢纽数
+        seed: 枢纽抽样随机种子
+        max_workers: 精确模式的进程数
+        time_budget: 精确计算的时间预算（秒），超时回退到近似结果；为空时不限时
+        drop_isolates: 是否去掉没有任何边的节点
+
+    Returns:
+        pd.DataFrame: node, degree, strength, pagerank, core, component, component_size, clustering，
+        centralities 为 True 时追加 betweenness, closeness 并在 attrs['betweenness_mode'] 记录实际计算方式
+    """
+    if betweenness not in BETWEENNESS_MODES:
+        raise ValueError(f"未知的中介中心性计算方式: {betweenness}，可选 {BETWEENNESS_MODES}")
+    weighted = symmetric_weights(matrix)
+    nodes = np.arange(weighted.shape[0]) if labels is None else np.asarray(labels, dtype=object)
+    if drop_isolates:
+        connected = np.flatnonzero(np.diff(weighted.indptr) > 0)
+        weighted = weighted[connected][:, connected]
+        nodes = nodes[connected]
+    columns = ['node', 'degree', 'strength', 'pagerank', 'core', 'component', 'component_size', 'clustering']
+    if centralities:
+        columns += ['betweenness', 'closeness']
+    if weighted.shape[0] == 0:
+        return pd.DataFrame(columns=columns)
+
+    adjacency = unweighted(weighted)
+    degree = np.diff(adjacency.indptr)
+    component, component_size = components(adjacency)
+    metrics = pd.DataFrame({
+        'node': nodes,
+        'degree': degree,
+        'strength': strength(weighted),
+        'pagerank': pagerank(weighted),
+        'core': core_numbers(adjacency),
+        'component': component,
+        'component_size': component_size,
+        'clustering': local_clustering(adjacency, degree),
+    })
+    if centralities:
+        metrics['betweenness'], metrics['closeness'], metrics.attrs['betweenness_mode'] = _path_centralities(
+            adjacency, component_size, betweenness, k, seed, max_workers, time_budget)
+    return metrics
+
+
+def compute_centralities(G: nx.Graph, betweenness: str = 'auto', k: int = DEFAULT_PIVOTS, seed: Optional[int] = 42,
+                         max_workers: Optional[int] = None,
+                         time_budget: Optional[float] = DEFAULT_TIME_BUDGET) -> pd.DataFrame:
+    """
+    一次性计算 networkx 网络的全部节点指标（用于已经建好图的小型网络，大网络请直接用 graph_metrics）
+
+    Args:
+        G: 无向网络（边权重 weight 只用于加权度与 PageRank，最短路径按跳数计算）
+        其余参数同 graph_metrics
+
+    Returns:
+        pd.DataFrame: 同 graph_metrics(centralities=True)，保留孤立节点
+    """
+    nodes = list(G)
+    matrix = nx.to_scipy_sparse_array(G, nodelist=nodes, weight='weight', format='coo') if nodes else sp.coo_matrix((0, 0))
+    return graph_metrics(matrix, nodes, centralities=True, betweenness=betweenness, k=k, seed=seed,
+                         max_workers=max_workers, time_budget=time_budget, drop_isolates=False)
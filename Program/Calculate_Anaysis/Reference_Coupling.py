@@ -0,0 +1,191 @@
+"""
+文献耦合与共被引
+在语料的文献×参考文献 CSR 矩阵 X 上用稀疏矩阵乘法计算：
+- 文献耦合：XXᵀ，两篇文献共享的（规范化后的）参考文献数
+- 作者/来源出版物/国家耦合：先把 X 聚合为 实体×参考文献 的 0/1 矩阵 M = [EᵀX > 0]（E 为文献×实体关联矩阵），
+  再计算 MMᵀ，即两个实体引用过的相同参考文献数
+- 参考文献共被引：XᵀX，两条参考文献被同一施引文献同时引用的次数
+- 被引作者/被引来源共被引：X 按参考文献解析出的第一作者或来源合并列后计算 XᵀX（同一施引文献内只计 1 次）
+只被一篇文献（一个实体）引用的参考文献对耦合没有贡献，在乘法之前剔除；
+高被引参考文献会让乘积接近稠密，乘法按行分块、只算上三角，每块乘完立即删除低于阈值的元素，中间结果的内存只取决于块大小
+"""
+
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+from Calculate_Anaysis.Corpus import Corpus
+
+# 耦合分析的层级（施引方）
+COUPLING_LEVELS = {
+    'documents': '文献耦合（共享参考文献数）',
+    'authors': '作者耦合（作者引用过的相同参考文献数）',
+    'sources': '来源出版物耦合',
+    'countries': '国家耦合',
+}
+
+# 共被引分析的层级（被引方）
+COCITATION_LEVELS = {
+    'references': '参考文献共被引',
+    'authors': '被引作者共被引（参考文献第一作者）',
+    'sources': '被引来源共被引（参考文献出版物）',
+}
+
+# 分块乘法每块的乘加次数上限（约等于每块中间结果的非零元素数上限）
+_BLOCK_PRODUCTS = 20_000_000
+
+
+def document_labels(corpus: Corpus) -> np.ndarray:
+    """文献节点名称：标题，缺失时为 "Doc 序号" """
+    labels = np.array([f"Doc {i + 1}" for i in range(corpus.n_docs)], dtype=object)
+    if 'Title' in corpus.docs.columns:
+        titles = corpus.docs['Title'].astype(object)
+        known = titles.notna().to_numpy() & (titles.astype(str).str.strip() != '').to_numpy()
+        labels[known] = titles[known].astype(str).str.strip().to_numpy()
+    return labels
+
+
+def _shared_columns(matrix: sp.csr_matrix) -> sp.csr_matrix:
+    """剔除只出现在一行中的列（对行与行之间的耦合没有贡献）"""
+    matrix = sp.csr_matrix(matrix)
+    shared = np.bincount(matrix.indices, minlength=matrix.shape[1]) > 1
+    return matrix[:, np.flatnonzero(shared)]
+
+
+def _binary(matrix: sp.spmatrix) -> sp.csr_matrix:
+    matrix = sp.csr_matrix(matrix)
+    matrix.sum_duplicates()
+    matrix.eliminate_zeros()
+    return sp.csr_matrix((np.ones(matrix.nnz, dtype=np.int32), matrix.indices, matrix.indptr), shape=matrix.shape)
+
+
+def _product(matrix: sp.csr_matrix, min_weight: Optional[float]) -> sp.csr_matrix:
+    """
+    MMᵀ（行×行），按行分块只计算上三角，每块内删除低于 min_weight 的元素，最后对称化
+
+    Args:
+        matrix: 行×列 0/1 CSR 矩阵
+        min_weight: 最小权重，为空时保留全部非零元素
+
+    Returns:
+        sp.csr_matrix: 去除对角线的对称矩阵
+    """
+    matrix = _shared_columns(matrix)
+    n = matrix.shape[0]
+    # 每行的乘加次数 = 该行各列的非零行数之和，按累计次数切分行块
+    column_counts = np.bincount(matrix.indices, minlength=matrix.shape[1])
+    row_products = np.zeros(n, dtype=np.int64)
+    nonempty = np.diff(matrix.indptr) > 0
+    if matrix.nnz:
+        row_products[nonempty] = np.add.reduceat(column_counts[matrix.indices], matrix.indptr[:-1][nonempty])
+    block_of = np.cumsum(row_products) // _BLOCK_PRODUCTS
+    starts = np.flatnonzero(np.diff(block_of, prepend=-1) != 0)
+    rows, columns, weights = [], [], []
+    for start, stop in zip(starts, np.append(starts[1:], n)):
+        block = (matrix[start:stop] @ matrix[start:].T.tocsr()).tocoo()
+        keep = block.col > block.row
+        if min_weight and min_weight > 0:
+            keep &= block.data >= min_weight
+        rows.append(block.row[keep] + start)
+        columns.append(block.col[keep] + start)
+        weights.append(block.data[keep])
+    if not rows:
+        return sp.csr_matrix((n, n), dtype=np.int32)
+    upper = sp.csr_matrix((np.concatenate(weights), (np.concatenate(rows), np.concatenate(columns))), shape=(n, n))
+    return (upper + upper.T).tocsr()
+
+
+def _select(labels: pd.Index, counts: np.ndarray, entities: Optional[Sequence], top_n: Optional[int]) -> np.ndarray:
+    """按名称列表或出现次数前 top_n 选出实体下标（都为空时选出全部出现过的实体）"""
+    if entities is not None:
+        index = labels.get_indexer(list(entities))
+        return index[index >= 0]
+    candidates = np.flatnonzero(counts > 0)
+    if top_n:
+        candidates = candidates[np.argsort(-counts[candidates], kind='stable')[:top_n]]
+    return candidates
+
+
+def coupling_matrix(corpus: Corpus, level: str = 'documents', min_weight: float = 1,
+                    entities: Optional[Sequence] = None, top_n: Optional[int] = None) -> Tuple[sp.csr_matrix, np.ndarray]:
+    """
+    文献耦合矩阵（或按作者/来源出版物/国家聚合的耦合矩阵）
+
+    Args:
+        corpus: 语料对象
+        level: COUPLING_LEVELS 中的一种
+        min_weight: 最小耦合强度（共享参考文献数）
+        entities: 只计算这些实体（documents 层级为文献下标）
+        top_n: 未指定 entities 时只计算发文量（documents 层级为参考文献数）最多的前 top_n 个
+
+    Returns:
+        (sp.csr_matrix, np.ndarray): 去除对角线的对称耦合矩阵及行列对应的名称
+    """
+    if level not in COUPLING_LEVELS:
+        raise ValueError(f"未知的耦合层级: {level}，可选 {list(COUPLING_LEVELS)}")
+    references = corpus.incidence('references')
+    if level == 'documents':
+        labels = pd.RangeIndex(corpus.n_docs)
+        rows = _select(labels, corpus.references.per_doc(), entities, top_n)
+        matrix = _binary(references[rows])
+        names = document_labels(corpus)[rows]
+    else:
+        links = corpus.links[level]
+        rows = _select(links.labels, links.doc_counts(), entities, top_n)
+        matrix = _binary(links.incidence()[:, rows].T.tocsr() @ references)
+        names = links.labels.to_numpy()[rows]
+    return _product(matrix, min_weight), names
+
+
+def cited_incidence(corpus: Corpus, level: str = 'references') -> Tuple[sp.csr_matrix, pd.Index]:
+    """
+    文献×被引对象 0/1 矩阵：references 层级即文献×参考文献矩阵，authors/sources 层级按参考文献的第一作者/来源合并列
+
+    Returns:
+        (sp.csr_matrix, pd.Index): 关联矩阵及列对应的名称
+    """
+    if level not in COCITATION_LEVELS:
+        raise ValueError(f"未知的共被引层级: {level}，可选 {list(COCITATION_LEVELS)}")
+    links = corpus.references
+    if level == 'references':
+        return links.incidence(), links.labels
+    column = corpus.reference_fields['Author' if level == 'authors' else 'Source']
+    codes, names = pd.factorize(column.to_numpy(dtype=object))
+    known = codes >= 0
+    grouping = sp.csr_matrix((np.ones(known.sum(), dtype=np.int32), (np.flatnonzero(known), codes[known])),
+                             shape=(links.n_entities, len(names)))
+    return _binary(links.incidence() @ grouping), pd.Index(names, dtype=object)
+
+
+def cited_counts(corpus: Corpus, level: str = 'references') -> pd.Series:
+    """被引对象 -> 施引文献数（局部被引次数），降序"""
+    matrix, labels = cited_incidence(corpus, level)
+    counts = pd.Series(np.bincount(matrix.indices, minlength=matrix.shape[1]), index=labels)
+    return counts[counts > 0].sort_values(ascending=False, kind='stable')
+
+
+def cocitation_matrix(corpus: Corpus, level: str = 'references', min_weight: float = 1,
+                      entities: Optional[Sequence] = None, top_n: Optional[int] = None,
+                      min_citations: int = 2) -> Tuple[sp.csr_matrix, np.ndarray]:
+    """
+    共被引矩阵（参考文献、被引作者或被引来源）
+
+    Args:
+        corpus: 语料对象
+        level: COCITATION_LEVELS 中的一种
+        min_weight: 最小共被引次数
+        entities: 只计算这些被引对象
+        top_n: 未指定 entities 时只计算被引次数最多的前 top_n 个
+        min_citations: 未指定 entities 时被引次数低于该值的对象不参与计算
+
+    Returns:
+        (sp.csr_matrix, np.ndarray): 去除对角线的对称共被引矩阵及行列对应的名称
+    """
+    matrix, labels = cited_incidence(corpus, level)
+    counts = np.bincount(matrix.indices, minlength=matrix.shape[1])
+    if entities is None and min_citations:
+        counts = np.where(counts >= min_citations, counts, 0)
+    columns = _select(labels, counts, entities, top_n)
+    return _product(matrix.T.tocsr()[columns], min_weight), labels.to_numpy()[columns]
@@ -0,0 +1,179 @@
+"""
+被引参考文献（WOS CR）解析与去重
+CR 条目形如 "SMITH J, 2010, NATURE, V5, P1, DOI 10.1038/xyz"，同一文献常有多种写法（是否带 DOI、作者缩写、大小写、标点）。
+这里用预编译的正则一次性（只对去重后的条目）拆出第一作者、年份、来源缩写、卷、页与 DOI，并生成规范键：
+- 书目键：来源首字母缩写 | 第一作者姓 + 名首字母 | 年份 | 卷 | 页（有年份且有卷或页时）
+- DOI 键：小写 DOI
+共享任一键的条目视为同一参考文献（连通分量合并），其余条目按规范化后的全文去重；
+两个不同的 DOI 永不合并：同一书目键下出现多个 DOI 时，该书目键不再连接带 DOI 的条目；
+合并后的参考文献驻留为整数编号，计数、共被引、本地引用匹配都在整数上完成
+"""
+
+import re
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from scipy.sparse import csgraph
+
+# 解析出的字段
+CR_FIELDS = ('Author', 'Year', 'Source', 'Volume', 'Page', 'DOI')
+
+# 一条 CR：[第一作者,] [年份,] [来源,] [V卷,] [P页,] ... [DOI xxx]，各段均可缺省
+_CR = re.compile(r'''
+    ^\s*
+    (?:(?!\d{4}\s*(?:,|$))(?P<Author>[^,]*),\s*)?
+    (?:(?P<Year>\d{4})\s*(?:,\s*|$))?
+    (?:(?![Vv]\s*\d|[Pp]{1,2}\.?\s*[^\s,]*\d|DOI\b)(?P<Source>[^,]*)(?:,\s*|$))?
+    (?:[Vv]\s*(?P<Volume>\d[^\s,]*)\s*(?:,\s*|$))?
+    (?:[Pp]{1,2}\.?\s*(?P<Page>[^\s,]*\d[^\s,]*)\s*(?:,\s*|$))?
+    (?:.*?[Dd][Oo][Ii]\s*:?\s*\[?\s*(?P<DOI>10\.[^\s,\]]+))?
+''', re.VERBOSE)
+_AUTHOR_PUNCTUATION = re.compile(r"[.\-'\[\]]")
+
+# 匿名作者不参与书目键
+_ANONYMOUS = {'ANONYMOUS', 'ANON'}
+
+# 来源首字母缩写忽略的虚词与最多保留的字母数
+_SOURCE_STOPWORDS = {'A', 'AN', 'AND', 'AT', 'FOR', 'IN', 'OF', 'ON', 'THE', 'TO'}
+_SOURCE_INITIALS = 4
+_SOURCE_WORD = re.compile(r'[A-Z0-9]+')
+
+
+def _text_key(entry: str) -> str:
+    """全文规范化：大写、合并空白、去掉末尾标点"""
+    return ' '.join(entry.upper().split()).rstrip('.,; ')
+
+
+def author_key(author) -> Optional[str]:
+    """
+    作者匹配键：姓 + 名首字母（"Smith J.A." / "SMITH JA" / "Smith, John A." -> "SMITH J"，
+    "VAN DER BERG A" -> "VAN DER BERG A"），匿名或缺失为 None；CR 条目与记录的 AU 字段使用同一键
+    """
+    if not isinstance(author, str):
+        return None
+    if ',' in author:
+        # AU 格式 "姓, 名"
+        surname, given = author.upper().split(',', 1)
+        surname = ' '.join(_AUTHOR_PUNCTUATION.sub(' ', surname).split())
+        given = _AUTHOR_PUNCTUATION.sub(' ', given).split()
+        if not surname or surname in _ANONYMOUS:
+            return None
+        return f"{surname} {given[0][0]}" if given else surname
+    names = _AUTHOR_PUNCTUATION.sub(' ', author.upper()).split()
+    if not names or names[0] in _ANONYMOUS:
+        return None
+    # 末尾连续的短词（不超过2个字母）为名字缩写，其余为姓
+    split = len(names)
+    while split > 1 and len(names[split - 1]) <= 2:
+        split -= 1
+    surname = ' '.join(names[:split])
+    return f"{surname} {names[split][0]}" if split < len(names) else surname
+
+
+def source_key(source) -> str:
+    """
+    来源匹配键：实词首字母（最多 4 个），CR 的期刊缩写与记录的期刊全称得到同一键
+    （"J CLEAN PROD" / "Journal of Cleaner Production" -> "JCP"，"APPL ENERG" -> "AE"，"ENERGY" -> "E"），缺失为空串
+    """
+    if not isinstance(source, str):
+        return ''
+    words = [word for word in _SOURCE_WORD.findall(source.upper()) if word not in _SOURCE_STOPWORDS]
+    return ''.join(word[0] for word in words[:_SOURCE_INITIALS])
+
+
+def _tokenize(entry: str) -> tuple:
+    """拆分一条 CR 为 (作者, 年份, 来源, 卷, 页, DOI)，无法识别的字段为 None；没有年份时不识别来源"""
+    author, year, source, volume, page, doi = _CR.match(entry.upper()).groups()
+    if author is not None:
+        author = author.strip().strip('[]').rstrip('.').strip() or None
+    if year is None:
+        source = None
+    elif source is not None:
+        source = source.strip() or None
+    return author, int(year) if year else None, source, volume, page, doi.rstrip('.;').lower() if doi else None
+
+
+def parse_references(entries: Sequence) -> pd.DataFrame:
+    """
+    解析 CR 条目
+
+    Args:
+        entries: CR 条目（单条，不含分号）
+
+    Returns:
+        pd.DataFrame: Author, Year, Source, Volume, Page, DOI（无法识别为缺失值，文本字段为大写、DOI 为小写），
+            以及规范书目键 Key（来源|作者|年份|卷|页，缺少作者、年份或卷页时为缺失值），与 entries 等长
+    """
+    tokens = [_tokenize(str(entry)) for entry in entries]
+    # 作者、来源高度重复：每个不同的名称只计算一次匹配键
+    author_keys = {author: author_key(author) for author in {token[0] for token in tokens}}
+    source_keys = {source: source_key(source) for source in {token[2] for token in tokens}}
+    keys = []
+    for author, year, source, volume, page, _ in tokens:
+        author = author_keys[author]
+        has_key = author is not None and year is not None and (volume or page)
+        keys.append(f"{source_keys[source]}|{author}|{year}|{volume or ''}|{page or ''}" if has_key else None)
+    fields = pd.DataFrame(tokens, columns=list(CR_FIELDS), dtype=object)
+    fields['Year'] = pd.array(fields['Year'].tolist(), dtype='Int64')
+    fields['Key'] = pd.Series(keys, dtype=object)
+    return fields
+
+
+def intern_references(values: Sequence) -> Tuple[np.ndarray, pd.Index, pd.DataFrame]:
+    """
+    CR 条目去重并驻留为整数编号：共享书目键或 DOI 的条目合并（不同 DOI 的条目不会合并），其余按规范化全文合并
+
+    Args:
+        values: 逐条出现的 CR 条目（可重复）
+
+    Returns:
+        codes: 每个条目的参考文献编号（int32）
+        labels: 参考文献显示名称（同一参考文献最常见的写法，次数相同取最长者，如带 DOI 的写法）
+        fields: 每个参考文献的解析字段（CR_FIELDS 与 Key，缺失字段从同组其他写法补齐），行与 labels 对齐
+    """
+    codes, unique = pd.factorize(np.asarray(values, dtype=object))
+    if not len(unique):
+        return (np.empty(0, np.int32), pd.Index([], dtype=object),
+                pd.DataFrame(columns=list(CR_FIELDS) + ['Key']))
+    unique = pd.Series(unique, dtype=object)
+    fields = parse_references(unique)
+
+    # 条目—键二部图的连通分量即合并后的参考文献；解析结果只取决于大写后的全文，
+    # 有书目键或 DOI 的条目无需再比较全文
+    keyless = fields['Key'].isna() & fields['DOI'].isna()
+    text = pd.Series(['T:' + _text_key(entry) for entry in unique[keyless]], index=unique.index[keyless], dtype=object)
+    # 同一书目键下有多个不同 DOI 时，带 DOI 的条目不经该书目键相连，各自留在 DOI 组中；
+    # 这样每个书目键最多连到一个 DOI，任何连通分量都不会含两个不同的 DOI
+    with_doi = fields['DOI'].notna() & fields['Key'].notna()
+    doi_counts = fields.loc[with_doi].groupby('Key')['DOI'].nunique()
+    conflicting = fields['Key'].isin(doi_counts.index[doi_counts > 1])
+    bibliographic = fields['Key'].where(~(conflicting & fields['DOI'].notna()))
+    keys = pd.concat([text, ('K:' + bibliographic).dropna(), ('D:' + fields['DOI']).dropna()])
+    key_codes, key_labels = pd.factorize(keys)
+    entry = keys.index.to_numpy()
+    n = len(unique)
+    graph = sp.csr_matrix((np.ones(len(entry), dtype=np.int8), (entry, n + key_codes)),
+                          shape=(n + len(key_labels), n + len(key_labels)))
+    _, component = csgraph.connected_components(graph, directed=False)
+    component = component[:n]
+
+    # 每组按出现次数、长度排序，首个写法作为显示名称
+    counts = np.bincount(codes, minlength=n)
+    lengths = np.fromiter(map(len, unique), dtype=np.int64, count=n)
+    order = np.lexsort((-lengths, -counts, component))
+    group, first_seen = np.unique(component[order], return_index=True)
+    reference_of_entry = np.searchsorted(group, component)
+    # 编号按各组首次出现的顺序排列，与 pd.factorize 的习惯一致
+    first_entry = np.full(len(group), n)
+    np.minimum.at(first_entry, reference_of_entry, np.arange(n))
+    renumber = np.empty(len(group), dtype=np.int64)
+    renumber[np.argsort(first_entry, kind='stable')] = np.arange(len(group))
+    reference_of_entry = renumber[reference_of_entry]
+
+    preferred = order[first_seen]
+    labels = unique.to_numpy()[preferred[np.argsort(renumber)]]
+    merged = fields.iloc[order].groupby(reference_of_entry[order], sort=True).first()
+    merged = merged.reindex(np.arange(len(group)))
+    return reference_of_entry[codes].astype(np.int32), pd.Index(labels, dtype=object), merged.reset_index(drop=True)
@@ -0,0 +1,330 @@
+"""
+标题与摘要的术语抽取（TF-IDF）
+标题（TI）与摘要（AB）按标点与停用词切分为短语片段，片段内取 1~max_ngram 个连续词为候选术语（逐词折叠复数，见 Keyword_Normalizer）。
+候选术语在生成器中逐篇产生；文献按块分给进程池，分两遍：
+- 第一遍每块只返回 (术语 64 位哈希, 文献频次, 总词频)，主进程合并后按文献频次（DF）剪枝：
+  少于 min_df 篇或超过 max_df 比例的术语丢弃，其余按 TF-IDF 总分保留前 max_terms 个
+- 第二遍每块只返回已选术语的 (文献, 术语, 词频) 与术语名称
+主进程不驻留候选术语字符串，也不保存被剪掉术语的 (文献, 术语) 对；第一遍的频次表最多跟踪 MAX_TRACKED_TERMS 个哈希，
+超出时按 Lossy Counting 丢弃低文献频次的哈希（之后再出现的术语 DF 至多少计各次丢弃阈值之和），内存与语料规模无关。
+第二遍重新切分文本是有意为之：用一次重复的纯 Python 切分换取不保存全部候选术语；
+串行执行且候选术语对不多时（见 _RESCAN_CACHE_PAIRS）直接复用第一遍的切分结果。
+结果为 文献×术语 CSR 词频矩阵；其 0/1 关联表以 'terms' 字段加入语料，可直接用于共现、突现检测与主题图
+"""
+
+import os
+import re
+from collections import Counter, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+from Calculate_Anaysis.Corpus import Corpus, EntityLinks
+from Calculate_Anaysis.Keyword_Normalizer import singular
+
+DEFAULT_MAX_NGRAM = 3
+DEFAULT_MIN_DF = 5
+DEFAULT_MAX_DF = 0.5
+DEFAULT_MAX_TERMS = 2000
+# 每块的文献数；文献数不超过一块时不启动进程池
+DEFAULT_CHUNK_SIZE = 1000
+# 第一遍频次表最多跟踪的术语哈希数（每个哈希 24 字节，合并时有数倍的临时副本）
+MAX_TRACKED_TERMS = 1 << 22
+# 串行时第一遍切分结果的缓存上限（候选 (文献, 术语) 对数），不超过时第二遍不再重新切分
+_RESCAN_CACHE_PAIRS = 1 << 20
+
+# 参与抽取的字段
+TERM_FIELDS = {
+    'title': '标题 (TI)',
+    'abstract': '摘要 (AB)',
+}
+
+# 停用词：英文功能词与摘要中常见的套话
+STOPWORDS = frozenset('''
+a about above across after again against all almost along already also although always am among an and another any
+are around as at based be became because been before being below between both but by can cannot could did do does
+doing done due during each either else et etc even ever every few for from further had has have having he her here
+hers him his how however i if in into is it its itself just least less may me might more most much must my neither
+no nor not now of off often on once one only or other others otherwise our ours out over own per rather s same
+several shall she should since so some such than that the their theirs them themselves then there therefore these
+they this those though through thus to too toward towards under until up upon us use used uses using very via was
+we well were what whatever when where whereas whether which while who whom whose why will with within without would
+yet you your
+al approach article paper present presented presents propose proposed proposes research result results show showed
+shown shows studied studies study finding findings aim aims purpose method methods conclusion conclusions
+copyright elsevier springer wiley ltd inc reserved rights taylor francis author authors
+'''.split())
+
+# 版权声明（"(C) 2020 Elsevier Ltd. All rights reserved." / "© 2021 ..."）到句末
+_COPYRIGHT = re.compile(r'(?:\(c\)|©|copyright)\s*\d{4}.*?(?:\.|$)', re.IGNORECASE)
+# 词（字母开头，可含数字与内部连字符/撇号）或单个片段分隔符（标点、数字等其余非空白字符，匹配为空串）
+_TOKEN = re.compile(r"([^\W\d_]\w*(?:[-'’]\w+)*)|\S")
+
+
+@lru_cache(maxsize=200_000)
+def _fold(token: str) -> str:
+    """词的复数折叠（连字符词逐段折叠），同一进程内按词记忆"""
+    return '-'.join(map(singular, token.split('-')))
+
+
+def phrase_segments(text: str) -> Iterator[List[str]]:
+    """把一段文本切分为不含停用词与标点的短语片段（每个片段为复数折叠后的词列表）"""
+    segment: List[str] = []
+    for token in _TOKEN.findall(_COPYRIGHT.sub('.', text).lower()):
+        if len(token) > 1 and token not in STOPWORDS:
+            segment.append(_fold(token))
+        elif segment:
+            yield segment
+            segment = []
+    if segment:
+        yield segment
+
+
+def document_terms(text: str, max_ngram: int = DEFAULT_MAX_NGRAM) -> Iterator[str]:
+    """一篇文献的候选术语（片段内 1~max_ngram 个连续词，按出现顺序逐个产生，可重复）"""
+    for segment in phrase_segments(text):
+        yield from segment
+        for size in range(2, min(max_ngram, len(segment)) + 1):
+            for start in range(len(segment) - size + 1):
+                yield ' '.join(segment[start:start + size])
+
+
+def iter_document_terms(texts: Sequence, max_ngram: int = DEFAULT_MAX_NGRAM) -> Iterator[Counter]:
+    """逐篇产生候选术语的词频（缺失文本为空计数）"""
+    for text in texts:
+        yield Counter(document_terms(text, max_ngram)) if isinstance(text, str) else Counter()
+
+
+def hash_terms(terms: Sequence[str]) -> np.ndarray:
+    """术语 -> 64 位哈希（固定密钥，各进程一致）"""
+    return pd.util.hash_array(np.asarray(terms, dtype=object))
+
+
+def _chunk_terms(texts: Sequence, max_ngram: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    一块文献的候选术语（逐篇产生，块内因子化）
+
+    Returns:
+        doc: 块内文献下标；codes: 块内术语编号；tf: 词频；unique: 块内术语（按编号）
+    """
+    docs: List[int] = []
+    terms: List[str] = []
+    tf: List[int] = []
+    for index, counts in enumerate(iter_document_terms(texts, max_ngram)):
+        docs.extend([index] * len(counts))
+        terms.extend(counts)
+        tf.extend(counts.values())
+    codes, unique = pd.factorize(np.asarray(terms, dtype=object))
+    return np.asarray(docs, dtype=np.int32), codes, np.asarray(tf, dtype=np.int32), np.asarray(unique, dtype=object)
+
+
+def _frequencies(chunk_terms: Tuple[np.ndarray, ...]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """块内每个术语哈希的文献频次与总词频"""
+    _, codes, tf, unique = chunk_terms
+    return (hash_terms(unique), np.bincount(codes, minlength=len(unique)),
+            np.bincount(codes, tf, minlength=len(unique)).astype(np.int64))
+
+
+def _chunk_frequencies(texts: Sequence, max_ngram: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """第一遍（进程池任务）：块内每个术语哈希的文献频次与总词频"""
+    return _frequencies(_chunk_terms(texts, max_ngram))
+
+
+def _select_pairs(offset: int, chunk_terms: Tuple[np.ndarray, ...],
+                  kept: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    只保留已选术语的 (文献, 术语) 对
+
+    Args:
+        offset: 块的起始文献下标
+        chunk_terms: _chunk_terms 的结果
+        kept: 已选术语的哈希（升序）
+
+    Returns:
+        doc, column（kept 中的位置）, tf；以及块内出现的已选术语的位置与名称
+    """
+    doc, codes, tf, unique = chunk_terms
+    hashes = hash_terms(unique)
+    position = np.searchsorted(kept, hashes)
+    position[position == len(kept)] = 0
+    found = kept[position] == hashes if len(kept) else np.zeros(len(unique), dtype=bool)
+    column = np.where(found, position, -1)[codes]
+    selected = column >= 0
+    return doc[selected] + offset, column[selected], tf[selected], position[found], unique[found]
+
+
+def _chunk_pairs(offset: int, texts: Sequence, max_ngram: int,
+                 kept: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """第二遍（进程池任务）：重新切分一块文献，只保留已选术语的 (文献, 术语) 对，参数同 _select_pairs"""
+    return _select_pairs(offset, _chunk_terms(texts, max_ngram), kept)
+
+
+def _merge_frequencies(parts: List[Tuple[np.ndarray, np.ndarray, np.ndarray]]) -> Tuple[np.ndarray, ...]:
+    """合并若干块的 (哈希, 文献频次, 总词频)"""
+    hashes, inverse = np.unique(np.concatenate([part[0] for part in parts]), return_inverse=True)
+    document_frequency = np.bincount(inverse, np.concatenate([part[1] for part in parts]), minlength=len(hashes))
+    frequency = np.bincount(inverse, np.concatenate([part[2] for part in parts]), minlength=len(hashes))
+    return hashes, document_frequency.astype(np.int64), frequency.astype(np.int64)
+
+
+def _bound_frequencies(merged: Tuple[np.ndarray, ...], max_tracked: int) -> Tuple[np.ndarray, ...]:
+    """频次表超过 max_tracked 个哈希时，丢弃文献频次不超过最小阈值的哈希，使剩余数不超过上限（Lossy Counting）"""
+    document_frequency = merged[1]
+    if len(document_frequency) <= max_tracked:
+        return merged
+    # 每个 DF 值的哈希数从高到低累计，找到保留数不超过上限的最小阈值
+    counts = np.bincount(document_frequency)
+    above = np.cumsum(counts[::-1])[::-1]
+    threshold = int(np.argmax(above <= max_tracked)) if (above <= max_tracked).any() else len(counts)
+    keep = document_frequency >= threshold
+    return tuple(values[keep] for values in merged)
+
+
+def _serial_frequencies(chunks: List[Sequence], max_ngram: int, cache: Dict[int, tuple]):
+    """串行第一遍：逐块切分并统计频次，候选术语对总数不超过 _RESCAN_CACHE_PAIRS 时把切分结果留给第二遍"""
+    cached_pairs = 0
+    for index, chunk in enumerate(chunks):
+        chunk_terms = _chunk_terms(chunk, max_ngram)
+        if cached_pairs + len(chunk_terms[0]) <= _RESCAN_CACHE_PAIRS:
+            cache[index] = chunk_terms
+            cached_pairs += len(chunk_terms[0])
+        yield _frequencies(chunk_terms)
+
+
+def extract_terms(texts: Sequence, max_ngram: int = DEFAULT_MAX_NGRAM, min_df: int = DEFAULT_MIN_DF,
+                  max_df: float = DEFAULT_MAX_DF, max_terms: Optional[int] = DEFAULT_MAX_TERMS,
+                  chunk_size: int = DEFAULT_CHUNK_SIZE, max_workers: Optional[int] = None,
+                  max_tracked: int = MAX_TRACKED_TERMS) -> Tuple[sp.csr_matrix, pd.DataFrame]:
+    """
+    从文本中抽取术语（两遍：先统计各术语哈希的文献频次并剪枝，再只为保留的术语生成 (文献, 术语) 对）
+
+    Args:
+        texts: 每篇文献的文本（缺失为 None/NaN）
+        max_ngram: 术语的最大词数
+        min_df: 术语的最少文献频次
+        max_df: 术语的最大文献频次比例（超过即视为通用词）
+        max_terms: 按 TF-IDF 总分保留的术语数，为空时不限
+        chunk_size: 每个进程池任务的文献数
+        max_workers: 进程数，默认等于CPU核数
+        max_tracked: 第一遍频次表最多跟踪的术语哈希数（超出时丢弃低频哈希）
+
+    Returns:
+        matrix: 文献×术语 CSR 词频矩阵（列按 TF-IDF 总分降序）
+        terms: 术语表 Term, Documents（文献频次）, Frequency（总词频）, TF-IDF（Σ tf·log(N/df)）
+    """
+    texts = list(texts)
+    n_docs = len(texts)
+    columns = ['Term', 'Documents', 'Frequency', 'TF-IDF']
+    offsets = list(range(0, n_docs, chunk_size))
+    chunks = [texts[offset:offset + chunk_size] for offset in offsets]
+    workers = min(max_workers or os.cpu_count() or 1, len(chunks))
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        # 第一遍：各块的频次按累计规模倍增（或达到跟踪上限）时才合并一次，合并后的频次表不超过 max_tracked
+        rescan_cache: Dict[int, tuple] = {}
+        if executor:
+            parts = executor.map(_chunk_frequencies, chunks, [max_ngram] * len(chunks))
+        else:
+            parts = _serial_frequencies(chunks, max_ngram, rescan_cache)
+        merged, pending, pending_size = None, [], 0
+        for part in parts:
+            pending.append(part)
+            pending_size += len(part[0])
+            if pending_size > min(len(merged[0]) if merged else 0, max_tracked):
+                merged = _bound_frequencies(_merge_frequencies(([merged] if merged else []) + pending), max_tracked)
+                pending, pending_size = [], 0
+        if pending:
+            merged = _bound_frequencies(_merge_frequencies(([merged] if merged else []) + pending), max_tracked)
+        if merged is None or not len(merged[0]):
+            return sp.csr_matrix((n_docs, 0), dtype=np.int32), pd.DataFrame(columns=columns)
+        hashes, document_frequency, frequency = merged
+
+        # DF 剪枝后按 TF-IDF 总分排序截断
+        score = frequency * np.log(n_docs / document_frequency)
+        candidates = np.flatnonzero((document_frequency >= min_df) & (document_frequency <= max_df * n_docs))
+        ranked = candidates[np.argsort(-score[candidates], kind='stable')]
+        if max_terms is not None:
+            ranked = ranked[:max_terms]
+        kept = np.sort(hashes[ranked])
+        column_of = np.empty(len(ranked), dtype=np.int64)
+        column_of[np.searchsorted(kept, hashes[ranked])] = np.arange(len(ranked))
+
+        # 第二遍：只生成已选术语的 (文献, 术语) 对，同时取回术语名称（重新切分，串行时优先复用第一遍的结果）
+        if executor:
+            results = executor.map(_chunk_pairs, offsets, chunks, [max_ngram] * len(chunks), [kept] * len(chunks))
+        else:
+            results = (_select_pairs(offset, rescan_cache.pop(index, None) or _chunk_terms(chunk, max_ngram), kept)
+                       for index, (offset, chunk) in enumerate(zip(offsets, chunks)))
+        names = np.empty(len(kept), dtype=object)
+        docs, cols, tfs = [], [], []
+        for doc, column, tf, position, labels in results:
+            docs.append(doc)
+            cols.append(column_of[column])
+            tfs.append(tf)
+            names[position] = labels
+    finally:
+        if executor:
+            executor.shutdown()
+
+    matrix = sp.csr_matrix((np.concatenate(tfs), (np.concatenate(docs), np.concatenate(cols))),
+                           shape=(n_docs, len(ranked)), dtype=np.int32)
+    terms = pd.DataFrame({
+        'Term': names[np.searchsorted(kept, hashes[ranked])],
+        'Documents': document_frequency[ranked],
+        'Frequency': frequency[ranked],
+        'TF-IDF': score[ranked],
+    })
+    return matrix, terms
+
+
+def corpus_texts(corpus: Corpus, fields: Sequence[str] = tuple(TERM_FIELDS)) -> List[Optional[str]]:
+    """每篇文献的待抽取文本：所选字段以句号连接（术语不跨字段），全部缺失为 None"""
+    parts = []
+    for field in fields:
+        column = corpus.column(field)
+        if column is not None:
+            parts.append(corpus.frame[column].astype(object).where(corpus.frame[column].notna()).tolist())
+    texts = []
+    for values in zip(*parts) if parts else [()] * corpus.n_docs:
+        values = [value for value in values if isinstance(value, str) and value.strip()]
+        texts.append('. '.join(values) if values else None)
+    return texts
+
+
+# (语料指纹, 参数) -> (关联表, 术语表)；按内容指纹取键，跨重跑重建的语料对象也能命中，超出上限时按最近使用淘汰
+_TERM_CACHE: 'OrderedDict[tuple, Tuple[EntityLinks, pd.DataFrame]]' = OrderedDict()
+_MAX_CACHED_EXTRACTIONS = 4
+
+
+def corpus_terms(corpus: Corpus, fields: Sequence[str] = tuple(TERM_FIELDS), max_ngram: int = DEFAULT_MAX_NGRAM,
+                 min_df: int = DEFAULT_MIN_DF, max_df: float = DEFAULT_MAX_DF,
+                 max_terms: Optional[int] = DEFAULT_MAX_TERMS) -> Tuple[EntityLinks, pd.DataFrame]:
+    """
+    从语料的标题、摘要抽取术语并以 'terms' 字段加入语料（按语料指纹与参数缓存；参数改变时替换 'terms'）
+
+    Args:
+        corpus: 语料对象
+        fields: 文本字段，见 TERM_FIELDS
+        其余参数同 extract_terms
+
+    Returns:
+        (EntityLinks, pd.DataFrame): 文献→术语关联表（labels 为术语名称）；术语表（同 extract_terms）
+    """
+    params = (tuple(fields), max_ngram, min_df, max_df, max_terms)
+    key = (corpus.fingerprint, params)
+    cached = _TERM_CACHE.get(key)
+    if cached is None:
+        matrix, terms = extract_terms(corpus_texts(corpus, fields), max_ngram, min_df, max_df, max_terms)
+        coo = matrix.tocoo()
+        links = EntityLinks(coo.row, coo.col, pd.Index(terms['Term'], dtype=object), corpus.n_docs)
+        cached = _TERM_CACHE[key] = (links, terms)
+        while len(_TERM_CACHE) > _MAX_CACHED_EXTRACTIONS:
+            _TERM_CACHE.popitem(last=False)
+    _TERM_CACHE.move_to_end(key)
+    if corpus.links.get('terms') is not cached[0]:
+        corpus.add_links('terms', cached[0], params)
+    return cached
@@ -0,0 +1,260 @@
+"""
+主题图（thematic map）与主题演化（thematic evolution），与 bibliometrix 的 thematicMap / thematicEvolution 相同：
+- 时间切片内取高频关键词，共现矩阵 C = XᵀX（X 为切片文献×关键词 0/1 矩阵）按等价系数 e_ij = c_ij² / (c_i·c_j) 标准化，
+  在 e 上做社区发现（Leiden），每个聚类即一个主题
+- Callon 中心度 = 10 × 主题内关键词与主题外关键词的 e 之和（与其他主题的联系强度，发展程度）；
+  Callon 密度 = 100 × 主题内部 e 之和 / 关键词数（内部凝聚程度，相关程度）
+- 以中心度、密度的中位数把主题分入四个象限：motor（高、高）、niche（低、高）、emerging（低、低）、basic（高、低）
+- 主题演化：按用户给定的切分年份划分时间切片，相邻切片的主题之间按包含指数 |A∩B| / min(|A|, |B|)（A、B 为主题关键词集合）
+  连线，得到桑基图的节点与连线；关键词集合为 主题×关键词 0/1 稀疏矩阵，一次矩阵乘法得到全部交集
+每个时间切片的主题图按（切片起止年份、参数）缓存在语料对象上：移动一个切分年份只重新计算与之相邻的两个切片；
+field 可换为其他词项关联表（如标题摘要术语 'terms'），默认为关键词
+"""
+
+from collections import OrderedDict
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+from Calculate_Anaysis.Community_Detection import DEFAULT_RESOLUTION, detect_communities
+from Calculate_Anaysis.Corpus import Corpus
+from Calculate_Anaysis.Incidence_Matrix import cooccurrence
+
+# 主题象限
+THEMATIC_QUADRANTS = {
+    'motor': '驱动主题（高中心度、高密度）',
+    'niche': '小众主题（低中心度、高密度）',
+    'emerging': '新兴或衰退主题（低中心度、低密度）',
+    'basic': '基础主题（高中心度、低密度）',
+}
+
+DEFAULT_THEME_KEYWORDS = 250
+DEFAULT_THEME_MIN_FREQUENCY = 5
+DEFAULT_MIN_CLUSTER_SIZE = 2
+DEFAULT_MIN_INCLUSION = 0.1
+
+# 最多缓存的切片主题图数
+_MAX_CACHED_SLICES = 32
+
+
+class ThematicMap:
+    """一个时间切片的主题图：主题表与关键词所属主题"""
+
+    def __init__(self, start: Optional[int], end: Optional[int], keywords: np.ndarray, occurrences: np.ndarray,
+                 clusters: np.ndarray, themes: pd.DataFrame):
+        """
+        Args:
+            start, end: 切片起止年份（含端点，为空表示不限）
+            keywords: 参与聚类的关键词编号（corpus.links[field].labels 的下标）
+            occurrences: 每个关键词在切片内的出现文献数
+            clusters: 每个关键词的主题编号（-1 为被过滤掉的小聚类）
+            themes: 主题表
+        """
+        self.start = start
+        self.end = end
+        self.keywords = keywords
+        self.occurrences = occurrences
+        self.clusters = clusters
+        self.themes = themes
+
+    @property
+    def n_themes(self) -> int:
+        return len(self.themes)
+
+    def membership(self, n_keywords: int) -> sp.csr_matrix:
+        """主题×关键词（全部关键词编号）0/1 矩阵"""
+        kept = self.clusters >= 0
+        return sp.csr_matrix((np.ones(kept.sum(), dtype=np.int32), (self.clusters[kept], self.keywords[kept])),
+                             shape=(self.n_themes, n_keywords))
+
+
+def _equivalence(matrix: sp.csr_matrix) -> sp.csr_matrix:
+    """共现矩阵（含对角线）-> 等价系数矩阵（去除对角线）"""
+    occurrences = matrix.diagonal().astype(np.float64)
+    entries = sp.triu(matrix, k=1).tocoo()
+    weights = entries.data.astype(np.float64) ** 2 / (occurrences[entries.row] * occurrences[entries.col])
+    upper = sp.csr_matrix((weights, (entries.row, entries.col)), shape=matrix.shape)
+    return (upper + upper.T).tocsr()
+
+
+def quadrants(centrality: np.ndarray, density: np.ndarray) -> np.ndarray:
+    """以中位数为界划分四个象限（见 THEMATIC_QUADRANTS）"""
+    high_centrality = centrality >= np.median(centrality) if len(centrality) else np.zeros(0, dtype=bool)
+    high_density = density >= np.median(density) if len(density) else np.zeros(0, dtype=bool)
+    return np.where(high_centrality, np.where(high_density, 'motor', 'basic'),
+                    np.where(high_density, 'niche', 'emerging'))
+
+
+def _build_map(corpus: Corpus, field: str, start: Optional[int], end: Optional[int], n_keywords: int,
+               min_frequency: int, resolution: float, seed: Optional[int], min_cluster_size: int) -> ThematicMap:
+    labels = corpus.links[field].labels
+    years = corpus.years
+    in_slice = ~np.isnan(years)
+    if start is not None:
+        in_slice &= years >= start
+    if end is not None:
+        in_slice &= years <= end
+    top = corpus.time_cube.top(field, n_keywords, start, end)
+    top = top[top >= min_frequency]
+    keywords = labels.get_indexer(top.index)
+    columns = ['Theme', 'Label', 'Keywords', 'Size', 'Frequency', 'Centrality', 'Density', 'Quadrant']
+    if len(keywords) < 2:
+        return ThematicMap(start, end, keywords, top.to_numpy(), np.full(len(keywords), -1),
+                           pd.DataFrame(columns=columns))
+
+    matrix = corpus.incidence(field)[np.flatnonzero(in_slice)]
+    equivalence = _equivalence(cooccurrence(matrix, keep_diagonal=True, columns=keywords))
+    communities, _ = detect_communities(equivalence, resolution=resolution, seed=seed)
+
+    # 去掉过小的聚类，其余按大小重新编号（0 为最大的主题）
+    sizes = np.bincount(communities)
+    kept = np.flatnonzero(sizes >= min_cluster_size)
+    kept = kept[np.argsort(-sizes[kept], kind='stable')]
+    renumber = np.full(len(sizes), -1)
+    renumber[kept] = np.arange(len(kept))
+    clusters = renumber[communities]
+
+    entries = equivalence.tocoo()
+    row_theme, col_theme = clusters[entries.row], clusters[entries.col]
+    valid = row_theme >= 0
+    internal = valid & (row_theme == col_theme)
+    n_themes = len(kept)
+    # 对称矩阵中内部连线计了两次
+    internal_weight = np.bincount(row_theme[internal], entries.data[internal], minlength=n_themes) / 2
+    external_weight = np.bincount(row_theme[valid & ~internal], entries.data[valid & ~internal], minlength=n_themes)
+    size = np.bincount(clusters[clusters >= 0], minlength=n_themes)
+    occurrences = top.to_numpy()
+    centrality = 10 * external_weight
+    density = 100 * internal_weight / np.maximum(size, 1)
+
+    names, members = [], []
+    for theme in range(n_themes):
+        rows = np.flatnonzero(clusters == theme)
+        rows = rows[np.argsort(-occurrences[rows], kind='stable')]
+        names.append(labels[keywords[rows[0]]])
+        members.append('; '.join(labels[keywords[rows[:5]]]))
+    themes = pd.DataFrame({
+        'Theme': np.arange(n_themes),
+        'Label': names,
+        'Keywords': members,
+        'Size': size,
+        'Frequency': np.bincount(clusters[clusters >= 0], occurrences[clusters >= 0], minlength=n_themes).astype(int),
+        'Centrality': centrality,
+        'Density': density,
+        'Quadrant': quadrants(centrality, density),
+    })
+    return ThematicMap(start, end, keywords, occurrences, clusters, themes)
+
+
+# (关联表标识, 起止年份, 参数) -> ThematicMap；关联表标识见 Corpus.links_key（语料指纹 + 字段 + 构建规则），
+# 跨重跑重建的语料对象也能命中，超出上限时按最近使用淘汰
+_THEMATIC_CACHE: 'OrderedDict[tuple, ThematicMap]' = OrderedDict()
+
+
+def thematic_map(corpus: Corpus, start: Optional[int] = None, end: Optional[int] = None,
+                 n_keywords: int = DEFAULT_THEME_KEYWORDS, min_frequency: int = DEFAULT_THEME_MIN_FREQUENCY,
+                 resolution: float = DEFAULT_RESOLUTION, seed: Optional[int] = 42,
+                 min_cluster_size: int = DEFAULT_MIN_CLUSTER_SIZE, field: str = 'keywords') -> ThematicMap:
+    """
+    时间切片 [start, end] 的主题图（按切片与参数缓存）
+
+    Args:
+        corpus: 语料对象
+        start, end: 起止年份（含端点），为空表示不限
+        n_keywords: 参与聚类的高频关键词数
+        min_frequency: 关键词在切片内的最少出现文献数
+        resolution: 社区发现的分辨率
+        seed: 社区发现的随机种子
+        min_cluster_size: 主题的最少关键词数
+        field: 词项关联表（'keywords' 或 'terms' 等）
+
+    Returns:
+        ThematicMap: themes 为主题表 Theme, Label（最高频关键词）, Keywords（前 5 个关键词）, Size, Frequency,
+            Centrality, Density, Quadrant（THEMATIC_QUADRANTS 的键）
+    """
+    # 关联表的构建规则参与缓存键：关键词规范化或术语抽取参数改变后不会取到旧结果
+    key = (corpus.links_key(field), start, end, n_keywords, min_frequency, resolution, seed, min_cluster_size)
+    cached = _THEMATIC_CACHE.get(key)
+    if cached is None:
+        cached = _THEMATIC_CACHE[key] = _build_map(corpus, field, *key[1:])
+        while len(_THEMATIC_CACHE) > _MAX_CACHED_SLICES:
+            _THEMATIC_CACHE.popitem(last=False)
+    _THEMATIC_CACHE.move_to_end(key)
+    return cached
+
+
+def time_slices(first_year: int, last_year: int, cuts: Sequence[int]) -> List[Tuple[int, int]]:
+    """
+    切分年份 -> 时间切片：每个切分年份是一个切片的最后一年
+
+    Args:
+        first_year, last_year: 数据的起止年份
+        cuts: 切分年份（区间外的忽略）
+
+    Returns:
+        list: [(起始年份, 结束年份)]
+    """
+    first_year, last_year = int(first_year), int(last_year)
+    bounds = sorted({int(cut) for cut in cuts if first_year <= cut < last_year})
+    starts = [first_year] + [cut + 1 for cut in bounds]
+    ends = bounds + [last_year]
+    return list(zip(starts, ends))
+
+
+def thematic_evolution(corpus: Corpus, cuts: Sequence[int], min_inclusion: float = DEFAULT_MIN_INCLUSION,
+                       **params) -> Tuple[List[ThematicMap], pd.DataFrame, pd.DataFrame]:
+    """
+    主题演化：按切分年份划分时间切片，相邻切片的主题按包含指数连线
+
+    Args:
+        corpus: 语料对象
+        cuts: 切分年份（每个为一个切片的最后一年）
+        min_inclusion: 最小包含指数
+        **params: 传给 thematic_map 的参数（n_keywords、min_frequency、resolution、seed、min_cluster_size、field）
+
+    Returns:
+        maps: 每个切片的 ThematicMap
+        nodes: 桑基图节点 Node, Period, Theme, Label, Frequency（Node 为连线中使用的下标）
+        links: 桑基图连线 source, target（Node 下标）, Inclusion, Shared（共有关键词数）, Keywords（共有的高频关键词）
+    """
+    years = corpus.time_cube.years
+    node_columns = ['Node', 'Period', 'Theme', 'Label', 'Frequency']
+    link_columns = ['source', 'target', 'Inclusion', 'Shared', 'Keywords']
+    if not len(years):
+        return [], pd.DataFrame(columns=node_columns), pd.DataFrame(columns=link_columns)
+
+    maps = [thematic_map(corpus, start, end, **params) for start, end in time_slices(years[0], years[-1], cuts)]
+    labels = corpus.links[params.get('field', 'keywords')].labels
+    n_keywords = len(labels)
+    offsets = np.cumsum([0] + [theme_map.n_themes for theme_map in maps])
+    nodes = pd.concat([
+        pd.DataFrame({
+            'Node': offsets[index] + theme_map.themes['Theme'].to_numpy(dtype=np.int64),
+            'Period': f"{theme_map.start}-{theme_map.end}",
+            'Theme': theme_map.themes['Theme'].to_numpy(dtype=np.int64),
+            'Label': theme_map.themes['Label'].to_numpy(dtype=object),
+            'Frequency': theme_map.themes['Frequency'].to_numpy(dtype=np.int64),
+        }) for index, theme_map in enumerate(maps)
+    ], ignore_index=True) if maps else pd.DataFrame(columns=node_columns)
+
+    links = []
+    for index, (previous, current) in enumerate(zip(maps, maps[1:])):
+        if not previous.n_themes or not current.n_themes:
+            continue
+        before, after = previous.membership(n_keywords), current.membership(n_keywords)
+        shared = (before @ after.T).tocoo()
+        smaller = np.minimum(np.diff(before.indptr)[shared.row], np.diff(after.indptr)[shared.col])
+        inclusion = shared.data / smaller
+        keep = inclusion >= min_inclusion
+        # 共有关键词按后一切片的出现次数排序
+        weights = np.zeros(n_keywords)
+        weights[current.keywords] = current.occurrences
+        for row, col, value, count in zip(shared.row[keep], shared.col[keep], inclusion[keep], shared.data[keep]):
+            common = np.intersect1d(before[row].indices, after[col].indices)
+            common = common[np.argsort(-weights[common], kind='stable')][:3]
+            links.append((offsets[index] + row, offsets[index + 1] + col, float(value), int(count),
+                          '; '.join(labels[common])))
+    links = pd.DataFrame(links, columns=link_columns)
+    return maps, nodes, links
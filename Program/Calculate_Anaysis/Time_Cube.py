@@ -0,0 +1,195 @@
+"""
+实体×年份 计数立方体
+语料加载时对作者、关键词、国家、机构、参考文献、来源出版物各做一次稀疏构建（关联表的文献下标映射为年份列），
+（标题摘要术语等派生关联表可随后加入），得到 实体×年份 CSR 矩阵，值为当年含该实体的文献数（关联表已在文献内去重）。
+年份为最早到最晚的连续区间，没有文献的年份计 0；年份缺失的文献不计入。
+趋势、累计曲线、增长率、突现检测都从这里切片读取，不再逐年筛选数据框或用嵌套字典重复计数
+"""
+
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+
+class TimeCube:
+    """实体×年份 计数立方体（每种实体一个 CSR 矩阵，列为 years）"""
+
+    def __init__(self, years: np.ndarray, documents: np.ndarray, counts: Dict[str, sp.csr_matrix],
+                 labels: Dict[str, pd.Index]):
+        """
+        Args:
+            years: 连续的年份区间
+            documents: 每年的文献数
+            counts: 实体类型 -> 实体×年份 CSR 矩阵
+            labels: 实体类型 -> 行对应的实体名称
+        """
+        self.years = years
+        self.documents = documents
+        self.counts = counts
+        self.labels = labels
+        self._columns: Dict[str, sp.csc_matrix] = {}
+
+    @classmethod
+    def from_links(cls, links: Dict, doc_years: np.ndarray) -> 'TimeCube':
+        """
+        由语料的关联表构建（每种实体一次稀疏构建）
+
+        Args:
+            links: 实体类型 -> EntityLinks
+            doc_years: 每篇文献的年份（缺失为 NaN）
+        """
+        dated = ~np.isnan(doc_years)
+        if not dated.any():
+            years = np.empty(0, dtype=np.int64)
+        else:
+            years = np.arange(int(doc_years[dated].min()), int(doc_years[dated].max()) + 1)
+        documents = np.bincount(_year_columns(doc_years, years)[dated], minlength=len(years))
+        cube = cls(years, documents, {}, {})
+        for field, link in links.items():
+            cube.add(field, link, doc_years)
+        return cube
+
+    def add(self, field: str, link, doc_years: np.ndarray):
+        """
+        加入（或替换）一种实体的计数矩阵
+
+        Args:
+            field: 实体类型
+            link: EntityLinks
+            doc_years: 每篇文献的年份（缺失为 NaN）
+        """
+        year_of = _year_columns(doc_years, self.years)[link.doc]
+        known = year_of >= 0
+        self.counts[field] = sp.csr_matrix((np.ones(known.sum(), dtype=np.int32), (link.ids[known], year_of[known])),
+                                           shape=(link.n_entities, self.n_years))
+        self.labels[field] = link.labels
+        self._columns.pop(field, None)
+
+    @property
+    def n_years(self) -> int:
+        return len(self.years)
+
+    def matrix(self, field: str) -> sp.csr_matrix:
+        """实体×年份 CSR 计数矩阵"""
+        return self.counts[field]
+
+    def _by_year(self, field: str) -> sp.csc_matrix:
+        """按列（年份）切片用的 CSC 副本（首次调用时构建）"""
+        if field not in self._columns:
+            self._columns[field] = self.counts[field].tocsc()
+        return self._columns[field]
+
+    def _span(self, start: Optional[int], end: Optional[int]) -> slice:
+        """年份区间 [start, end] -> 列切片（端点为空表示不限）"""
+        if not self.n_years:
+            return slice(0, 0)
+        first = 0 if start is None else int(np.clip(start - self.years[0], 0, self.n_years))
+        last = self.n_years if end is None else int(np.clip(end - self.years[0] + 1, 0, self.n_years))
+        return slice(first, last)
+
+    def publications(self) -> pd.Series:
+        """每年的文献数（年份 -> 文献数）"""
+        return pd.Series(self.documents, index=self.years)
+
+    def totals(self, field: str, start: Optional[int] = None, end: Optional[int] = None) -> np.ndarray:
+        """每个实体在年份区间 [start, end] 内的文献数"""
+        return np.asarray(self._by_year(field)[:, self._span(start, end)].sum(axis=1)).ravel()
+
+    def top(self, field: str, n: Optional[int] = 10, start: Optional[int] = None, end: Optional[int] = None,
+            mask: Optional[np.ndarray] = None) -> pd.Series:
+        """
+        年份区间内文献数最多的前 n 个实体
+
+        Args:
+            field: 实体类型
+            n: 返回的实体数，为空时返回全部
+            start, end: 年份区间（含端点，为空表示不限）
+            mask: 实体布尔掩码，只在其中选取
+
+        Returns:
+            pd.Series: 实体名称 -> 文献数，降序（不含 0）
+        """
+        totals = self.totals(field, start, end)
+        if mask is not None:
+            totals = np.where(mask, totals, 0)
+        candidates = np.flatnonzero(totals > 0)
+        order = candidates[np.argsort(-totals[candidates], kind='stable')]
+        if n is not None:
+            order = order[:n]
+        return pd.Series(totals[order], index=self.labels[field][order])
+
+    def series(self, field: str, entities: Optional[Sequence] = None, top_n: int = 10,
+               cumulative: bool = False) -> pd.DataFrame:
+        """
+        实体的年度文献数时间序列
+
+        Args:
+            field: 实体类型
+            entities: 实体名称（为空时取总文献数最多的前 top_n 个）
+            top_n: 未指定 entities 时的实体数
+            cumulative: 是否返回累计曲线
+
+        Returns:
+            pd.DataFrame: 行为年份，列为实体
+        """
+        if entities is None:
+            entities = self.top(field, top_n).index
+        rows = self.labels[field].get_indexer(list(entities))
+        rows = rows[rows >= 0]
+        values = self.counts[field][rows].toarray().T
+        if cumulative:
+            values = values.cumsum(axis=0)
+        return pd.DataFrame(values, index=self.years, columns=self.labels[field][rows])
+
+    def in_year(self, field: str, year: int) -> pd.Series:
+        """某一年出现的实体及文献数，降序"""
+        return self.top(field, None, year, year)
+
+    def active(self, field: str) -> pd.Series:
+        """每年出现的不同实体数（年份 -> 实体数）"""
+        return pd.Series(np.diff(self._by_year(field).indptr), index=self.years)
+
+    def growth(self, field: Optional[str] = None, entities: Optional[Sequence] = None,
+               top_n: int = 10) -> pd.DataFrame:
+        """
+        逐年增长率（相对上一年的变化比例，上一年为 0 时为 NaN）
+
+        Args:
+            field: 实体类型，为空时为文献总数
+            entities, top_n: 同 series
+
+        Returns:
+            pd.DataFrame: 行为年份；field 为空时只有 Publications 一列
+        """
+        values = (self.publications().to_frame('Publications') if field is None
+                  else self.series(field, entities, top_n))
+        previous = values.shift(1)
+        return (values - previous) / previous.where(previous > 0)
+
+
+def _year_columns(doc_years: np.ndarray, years: np.ndarray) -> np.ndarray:
+    """文献 -> 年份列下标（年份缺失为 -1）"""
+    column = np.full(len(doc_years), -1, dtype=np.int64)
+    dated = ~np.isnan(doc_years)
+    if len(years):
+        column[dated] = doc_years[dated].astype(np.int64) - years[0]
+    return column
+
+
+def annual_growth_rate(counts: pd.Series) -> float:
+    """
+    年均增长率（%）：首末两个非零年份之间的复合增长率
+
+    Args:
+        counts: 年份 -> 计数
+
+    Returns:
+        float: 不足两个非零年份时为 0
+    """
+    counts = counts[counts > 0]
+    if len(counts) < 2 or counts.index[-1] == counts.index[0]:
+        return 0.0
+    span = counts.index[-1] - counts.index[0]
+    return float(((counts.iloc[-1] / counts.iloc[0]) ** (1 / span) - 1) * 100)
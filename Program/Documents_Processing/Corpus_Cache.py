@@ -0,0 +1,238 @@
+"""
+解析结果的持久化缓存
+已解析、已标准化的语料以Parquet快照保存在磁盘上，键为「原始上传字节的SHA-256 + 解析器版本 + 加载方式」，
+重复上传同一导出文件或重启服务后可直接读取；目录总大小超过上限时按最近使用时间(LRU)淘汰
+"""
+
+import argparse
+import hashlib
+import logging
+import os
+import sys
+import time
+from typing import Callable, Iterable, List, Optional
+
+import pandas as pd
+
+from Documents_Processing.WOS_Stream_Parser import PARSER_VERSION
+
+current_dir = os.path.dirname(os.path.realpath(__file__))
+project_root = os.path.dirname(current_dir).replace("/Program", "")
+
+# 缓存目录与大小上限，可通过环境变量覆盖
+DEFAULT_CACHE_DIR = os.environ.get('WOS_CORPUS_CACHE_DIR', os.path.join(project_root, 'output', 'cache', 'corpus'))
+DEFAULT_MAX_BYTES = int(os.environ.get('WOS_CORPUS_CACHE_MAX_MB', '2048')) * 1024 * 1024
+
+_SUFFIX = '.parquet'
+
+logger = logging.getLogger(__name__)
+
+
+def _raw_bytes(uploaded_file) -> bytes:
+    """读取上传文件的原始字节（不移动调用方的文件指针）"""
+    if isinstance(uploaded_file, (bytes, bytearray)):
+        return bytes(uploaded_file)
+    if hasattr(uploaded_file, 'getvalue'):
+        return uploaded_file.getvalue()
+    position = uploaded_file.tell()
+    uploaded_file.seek(0)
+    data = uploaded_file.read()
+    uploaded_file.seek(position)
+    return data
+
+
+def corpus_key(uploaded_files, namespace: str) -> str:
+    """
+    计算缓存键：SHA-256(解析器版本、加载方式、各文件原始字节)
+
+    Args:
+        uploaded_files: 单个上传文件/字节串，或其列表（多文件合并时按顺序参与计算）
+        namespace: 加载方式标识，不同加载函数的输出列不同，需分别缓存
+
+    Returns:
+        str: 十六进制缓存键
+    """
+    if not isinstance(uploaded_files, (list, tuple)):
+        uploaded_files = [uploaded_files]
+    digest = hashlib.sha256(f'{PARSER_VERSION}:{namespace}:{len(uploaded_files)}'.encode())
+    for uploaded_file in uploaded_files:
+        digest.update(hashlib.sha256(_raw_bytes(uploaded_file)).digest())
+    return digest.hexdigest()
+
+
+class CorpusCache:
+    """基于目录的Parquet快照缓存，文件修改时间即最近使用时间"""
+
+    def __init__(self, directory: Optional[str] = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        Args:
+            directory: 缓存目录，默认 output/cache/corpus
+            max_bytes: 缓存目录总大小上限（字节）
+        """
+        self.directory = directory or DEFAULT_CACHE_DIR
+        self.max_bytes = max_bytes
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + _SUFFIX)
+
+    def get(self, key: str) -> Optional[pd.DataFrame]:
+        """读取快照；命中时刷新其使用时间，损坏的快照直接删除（缺少 Parquet 引擎时抛出 ImportError，不删除快照）"""
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            df = pd.read_parquet(path)
+        except ImportError:
+            raise
+        except Exception:
+            self._remove(path)
+            return None
+        os.utime(path)
+        return df
+
+    def put(self, key: str, df: pd.DataFrame) -> bool:
+        """
+        写入快照（先写临时文件再原子替换），随后按LRU淘汰超出上限的快照
+
+        Returns:
+            bool: 是否写入成功（存在无法序列化的列时放弃缓存）
+
+        Raises:
+            ImportError: 缺少 Parquet 引擎（pyarrow）
+        """
+        if df is None or df.empty:
+            return False
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(key)
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        try:
+            df.to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, path)
+        except ImportError:
+            self._remove(tmp_path)
+            raise
+        except Exception:
+            self._remove(tmp_path)
+            return False
+        self.evict()
+        return True
+
+    def entries(self) -> List[dict]:
+        """列出全部快照，按最近使用时间从新到旧排序"""
+        if not os.path.isdir(self.directory):
+            return []
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(_SUFFIX):
+                continue
+            stat = os.stat(os.path.join(self.directory, name))
+            entries.append({'key': name[:-len(_SUFFIX)], 'size': stat.st_size, 'last_used': stat.st_mtime})
+        return sorted(entries, key=lambda entry: entry['last_used'], reverse=True)
+
+    def evict(self) -> int:
+        """按最近使用时间淘汰旧快照直到总大小不超过上限，返回删除数量"""
+        total = 0
+        removed = 0
+        for entry in self.entries():
+            total += entry['size']
+            if total > self.max_bytes:
+                self._remove(self._path(entry['key']))
+                removed += 1
+        return removed
+
+    def purge(self, keys: Optional[Iterable[str]] = None, older_than: Optional[float] = None) -> int:
+        """
+        删除快照
+
+        Args:
+            keys: 要删除的缓存键（可为前缀），为空时删除全部
+            older_than: 仅删除超过该秒数未使用的快照
+
+        Returns:
+            int: 删除数量
+        """
+        prefixes = tuple(keys) if keys else None
+        now = time.time()
+        removed = 0
+        for entry in self.entries():
+            if prefixes and not entry['key'].startswith(prefixes):
+                continue
+            if older_than is not None and now - entry['last_used'] < older_than:
+                continue
+            self._remove(self._path(entry['key']))
+            removed += 1
+        return removed
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def load_with_cache(uploaded_files, namespace: str, loader: Callable[[], pd.DataFrame],
+                    cache: Optional[CorpusCache] = None, key: Optional[str] = None) -> pd.DataFrame:
+    """
+    先查磁盘快照，未命中时调用 loader 解析并写入快照
+
+    Args:
+        uploaded_files: 上传文件或其列表（用于计算缓存键）
+        namespace: 加载方式标识
+        loader: 无参解析函数，返回数据框
+        cache: 缓存实例，默认使用 DEFAULT_CACHE_DIR
+        key: 调用方已算好的 corpus_key，为空时在此计算
+
+    Returns:
+        pd.DataFrame: 解析结果
+    """
+    cache = cache or CorpusCache()
+    if key is None:
+        try:
+            key = corpus_key(uploaded_files, namespace)
+        except Exception:
+            return loader()
+    try:
+        df = cache.get(key)
+    except ImportError as error:
+        logger.warning("解析缓存不可用，缺少 Parquet 引擎（pip install pyarrow）：%s", error)
+        return loader()
+    if df is not None:
+        return df
+    df = loader()
+    if df is not None and not df.empty:
+        try:
+            cache.put(key, df)
+        except ImportError as error:
+            logger.warning("解析结果未写入缓存，缺少 Parquet 引擎（pip install pyarrow）：%s", error)
+    return df
+
+
+def main(argv=None):
+    """命令行入口：列出或清理解析缓存"""
+    parser = argparse.ArgumentParser(description="管理已解析语料的Parquet缓存")
+    parser.add_argument('--dir', default=None, help="缓存目录，默认 output/cache/corpus")
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('list', help="列出缓存快照")
+    purge_parser = commands.add_parser('purge', help="删除缓存快照")
+    purge_parser.add_argument('keys', nargs='*', help="要删除的缓存键或前缀，默认全部")
+    purge_parser.add_argument('--older-than', type=float, default=None, help="仅删除超过该天数未使用的快照")
+    args = parser.parse_args(argv)
+
+    cache = CorpusCache(args.dir)
+    if args.command == 'list':
+        entries = cache.entries()
+        for entry in entries:
+            last_used = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(entry['last_used']))
+            print(f"{entry['key'][:16]}  {entry['size'] / 1024 / 1024:8.2f} MB  {last_used}")
+        total = sum(entry['size'] for entry in entries)
+        print(f"共 {len(entries)} 个快照，{total / 1024 / 1024:.2f} MB / 上限 {cache.max_bytes / 1024 / 1024:.0f} MB ({cache.directory})")
+    else:
+        older_than = args.older_than * 86400 if args.older_than is not None else None
+        removed = cache.purge(args.keys or None, older_than=older_than)
+        print(f"已删除 {removed} 个快照")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -22,6 +22,10 @@ from scipy import stats
 import sys
 import os
 
+from Calculate_Anaysis.Calculate_Burst_Analysis import entity_bursts
+from Calculate_Anaysis.Corpus import as_corpus
+from Calculate_Anaysis.Time_Cube import annual_growth_rate
+
 class EnhancedBibliometricReportGenerator:
     """增强版文献计量分析报告生成器"""
     
@@ -29,6 +33,8 @@ class EnhancedBibliometricReportGenerator:
         self.df = df
         self.research_field = research_field
         self.total_articles = len(df)
+        # 实体关联表只构建一次，各提取函数优先从中读取
+        self.corpus = as_corpus(df)
         
         # 安全地提取数据，避免KeyError
         self.years = self._safe_extract_years()
@@ -43,6 +49,11 @@ class EnhancedBibliometricReportGenerator:
         
     def _safe_extract_years(self):
         """安全提取发表年份"""
+        if self.corpus.has('year'):
+            years = self.corpus.years
+            years = years[(years >= 1900) & (years <= 2030)]
+            return years.astype(int).tolist()
+        
         possible_columns = ['PY', 'Year', 'Publication Year', '出版年', '年份']
         
         for col in possible_columns:
@@ -68,6 +79,9 @@ class EnhancedBibliometricReportGenerator:
     
     def _safe_extract_authors(self):
         """安全提取作者信息"""
+        if self.corpus.has('authors'):
+            return self.corpus.authors.flat_labels()
+        
         possible_columns = ['AU', 'Authors', 'Author', '作者', '第一作者']
         
         for col in possible_columns:
@@ -95,6 +109,9 @@ class EnhancedBibliometricReportGenerator:
     
     def _safe_extract_countries(self):
         """安全提取国家信息"""
+        if len(self.corpus.countries):
+            return self.corpus.countries.flat_labels()
+        
         possible_columns = ['C1', 'Countries', 'Country', 'Affiliation', '国家', '机构']
         
         countries = []
@@ -139,6 +156,9 @@ class EnhancedBibliometricReportGenerator:
     
     def _safe_extract_journals(self):
         """安全提取期刊信息"""
+        if self.corpus.has('source'):
+            return self.corpus.docs['Source'].dropna().str.strip().loc[lambda journals: journals != ''].tolist()
+        
         possible_columns = ['SO', 'Source', 'Journal', 'Publication', '期刊', '来源']
         
         for col in possible_columns:
@@ -169,6 +189,9 @@ class EnhancedBibliometricReportGenerator:
     
     def _safe_extract_keywords(self):
         """安全提取关键词"""
+        if self.corpus.has('keywords'):
+            return self.corpus.keywords.flat_labels()
+        
         possible_columns = ['DE', 'Keywords', 'Keyword', 'ID', '关键词', '主题词']
         
         for col in possible_columns:
@@ -204,6 +227,9 @@ class EnhancedBibliometricReportGenerator:
     
     def _safe_extract_citations(self):
         """安全提取引用次数"""
+        if self.corpus.has('citations'):
+            return self.corpus.citations.tolist()
+        
         possible_columns = ['TC', 'Citations', 'Times Cited', '被引频次', '引用次数']
         
         for col in possible_columns:
@@ -257,27 +283,20 @@ class EnhancedBibliometricReportGenerator:
         self.burst_keywords = []
     
     def _calculate_annual_growth(self):
-        """计算年度增长率"""
-        if not self.years or len(self.years) < 2:
+        """计算年度增长率（从语料的 实体×年份 立方体读取年度发文量）"""
+        year_counts = self.corpus.time_cube.publications()
+        year_counts = year_counts[(year_counts > 0) & (year_counts.index >= 1900) & (year_counts.index <= 2030)]
+        if year_counts.sum() < 2:
             return {'growth_rate': 0, 'trend': 'insufficient_data'}
         
-        year_counts = Counter(self.years)
-        years_sorted = sorted(year_counts.keys())
+        years_sorted = year_counts.index.tolist()
+        years_span = years_sorted[-1] - years_sorted[0]
         
         # 计算年均增长率
-        start_year = years_sorted[0]
-        end_year = years_sorted[-1]
-        start_count = year_counts[start_year]
-        end_count = year_counts[end_year]
-        
-        years_span = end_year - start_year
-        if years_span > 0 and start_count > 0:
-            growth_rate = ((end_count / start_count) ** (1/years_span) - 1) * 100
-        else:
-            growth_rate = 0
+        growth_rate = annual_growth_rate(year_counts)
         
         # 判断增长趋势
-        publications = [year_counts.get(year, 0) for year in years_sorted]
+        publications = year_counts.tolist()
         if len(publications) > 2:
             # 线性回归分析趋势
             x = np.arange(len(publications))
@@ -303,9 +322,9 @@ class EnhancedBibliometricReportGenerator:
             'growth_rate': round(growth_rate, 2),
             'trend': trend,
             'total_years': years_span + 1,
-            'peak_year': max(year_counts, key=year_counts.get),
-            'peak_publications': max(year_counts.values()),
-            'annual_average': round(sum(year_counts.values()) / len(year_counts), 2)
+            'peak_year': int(year_counts.idxmax()),
+            'peak_publications': int(year_counts.max()),
+            'annual_average': round(float(year_counts.mean()), 2)
         }
     
     def _calculate_core_authors(self):
@@ -425,58 +444,18 @@ class EnhancedBibliometricReportGenerator:
             return {'unique_countries': 0, 'international_collaboration_rate': 0, 'error': str(e)}
     
     def _calculate_keyword_burst(self):
-        """计算关键词突现分析"""
-        if not self.keywords or not self.years:
+        """计算关键词突现分析（Kleinberg 突现检测，读取语料的 关键词×年份 计数）"""
+        if not self.corpus.has('keywords') or not self.corpus.has('year'):
             return []
         
         try:
-            # 按年份分组关键词
-            keyword_by_year = defaultdict(list)
-            
-            # 简化处理：将关键词与年份对应
-            keywords_per_year = len(self.keywords) // len(set(self.years))
-            
-            for i, year in enumerate(sorted(set(self.years))):
-                start_idx = i * keywords_per_year
-                end_idx = min((i + 1) * keywords_per_year, len(self.keywords))
-                year_keywords = self.keywords[start_idx:end_idx]
-                keyword_by_year[year].extend(year_keywords)
-            
-            # 计算关键词突现强度
-            keyword_trends = {}
-            years_sorted = sorted(keyword_by_year.keys())
-            
-            for keyword in set(self.keywords):
-                yearly_counts = []
-                for year in years_sorted:
-                    count = keyword_by_year[year].count(keyword)
-                    yearly_counts.append(count)
-                
-                if len(yearly_counts) > 1 and sum(yearly_counts) > 0:
-                    max_count = max(yearly_counts)
-                    avg_count = sum(yearly_counts) / len(yearly_counts)
-                    
-                    if avg_count > 0:
-                        burst_strength = max_count / avg_count
-                        burst_years = [years_sorted[i] for i, count in enumerate(yearly_counts) if count == max_count]
-                        
-                        keyword_trends[keyword] = {
-                            'burst_strength': round(burst_strength, 2),
-                            'burst_years': burst_years,
-                            'total_frequency': sum(yearly_counts)
-                        }
-            
-            # 排序并返回突现关键词
-            sorted_keywords = sorted(keyword_trends.items(), 
-                                   key=lambda x: x[1]['burst_strength'], 
-                                   reverse=True)[:20]
-            
+            bursts = entity_bursts(self.corpus, 'keywords', min_frequency=3).head(20)
             return [{
-                'keyword': kw,
-                'burst_strength': data['burst_strength'],
-                'burst_years': data['burst_years'],
-                'frequency': data['total_frequency']
-            } for kw, data in sorted_keywords if data['burst_strength'] > 1.2]
+                'keyword': burst.Term,
+                'burst_strength': round(float(burst.Strength), 2),
+                'burst_years': list(range(int(burst.Begin), int(burst.End) + 1)),
+                'frequency': int(burst.Frequency)
+            } for burst in bursts.itertuples(index=False)]
             
         except Exception as e:
             return []
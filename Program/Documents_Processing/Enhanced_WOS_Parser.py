@@ -8,6 +8,29 @@ import streamlit as st
 from typing import Tuple, Optional
 import re
 
+from Documents_Processing.WOS_Stream_Parser import build_column_schema, parse_wos_columns
+
+# WOS字段代码 -> 标准英文列名（AU/AF 合并为 Authors）
+WOS_FIELD_MAPPING = {
+    'AU': 'Authors', 'AF': 'Authors', 'TI': 'Title', 'SO': 'Source', 'PY': 'Year',
+    'AB': 'Abstract', 'DE': 'Keywords', 'ID': 'KeywordsPlus', 'C1': 'Address',
+    'CR': 'References', 'TC': 'TimesCited', 'Z9': 'TotalTimesCited',
+    'J9': 'JournalAbbreviation', 'JI': 'JournalISO', 'VL': 'Volume', 'IS': 'Issue',
+    'BP': 'BeginningPage', 'EP': 'EndingPage', 'DI': 'DOI', 'SN': 'ISSN',
+    'EI': 'eISSN', 'PU': 'Publisher', 'PI': 'PublisherCity', 'PA': 'PublisherAddress',
+    'RP': 'ReprintAddress', 'EM': 'EmailAddresses', 'RI': 'ResearcherID',
+    'OI': 'ORCID', 'WC': 'WebOfScienceCategory', 'SC': 'SubjectCategory',
+    'LA': 'Language', 'DT': 'DocumentType', 'PT': 'PublicationType',
+    'UT': 'AccessionNumber', 'PM': 'PubMedID', 'AR': 'ArticleNumber',
+    'PG': 'PageCount', 'PD': 'PublicationDate', 'FU': 'FundingAgency',
+    'FX': 'FundingText', 'U1': 'UsageCount180', 'U2': 'UsageCountSince2013',
+    'CT': 'ConferenceTitle', 'CY': 'ConferenceDate', 'CL': 'ConferenceLocation',
+    'HO': 'ConferenceHost', 'BN': 'ISBN', 'BA': 'BookAuthors', 'BE': 'Editors',
+    'TA': 'BookTitle', 'DA': 'DateAdded', 'OA': 'OpenAccess', 'HC': 'HighlyCited',
+    'HP': 'HotPaper', 'GA': 'DocumentDeliveryNumber', 'SE': 'Series',
+    'SI': 'SpecialIssue', 'WE': 'WebOfScienceEdition'
+}
+
 class EnhancedWOSParser:
     """增强的WOS文件解析器"""
     
@@ -40,114 +63,38 @@ class EnhancedWOSParser:
             'LA', 'DT', 'OA', 'PM', 'GA', 'SE', 'SI', 'DA', 'EA', 'EY', 'ES', 'ET', 'WE'
         }
         
-        # 字段映射到中文名称
-        self.field_mapping = {
-            'AU': 'Authors', 'AF': 'Authors', 'TI': 'Title', 'SO': 'Source', 'PY': 'Year',
-            'AB': 'Abstract', 'DE': 'Keywords', 'ID': 'KeywordsPlus', 'C1': 'Address',
-            'CR': 'References', 'TC': 'TimesCited', 'Z9': 'TotalTimesCited',
-            'J9': 'JournalAbbreviation', 'JI': 'JournalISO', 'VL': 'Volume', 'IS': 'Issue',
-            'BP': 'BeginningPage', 'EP': 'EndingPage', 'DI': 'DOI', 'SN': 'ISSN',
-            'EI': 'eISSN', 'PU': 'Publisher', 'PI': 'PublisherCity', 'PA': 'PublisherAddress',
-            'RP': 'ReprintAddress', 'EM': 'EmailAddresses', 'RI': 'ResearcherID',
-            'OI': 'ORCID', 'WC': 'WebOfScienceCategory', 'SC': 'SubjectCategory',
-            'LA': 'Language', 'DT': 'DocumentType', 'PT': 'PublicationType',
-            'UT': 'AccessionNumber', 'PM': 'PubMedID', 'AR': 'ArticleNumber',
-            'PG': 'PageCount', 'PD': 'PublicationDate', 'FU': 'FundingAgency',
-            'FX': 'FundingText', 'U1': 'UsageCount180', 'U2': 'UsageCountSince2013',
-            'CT': 'ConferenceTitle', 'CY': 'ConferenceDate', 'CL': 'ConferenceLocation',
-            'HO': 'ConferenceHost', 'BN': 'ISBN', 'BA': 'BookAuthors', 'BE': 'Editors',
-            'TA': 'BookTitle', 'DA': 'DateAdded', 'OA': 'OpenAccess', 'HC': 'HighlyCited',
-            'HP': 'HotPaper', 'GA': 'DocumentDeliveryNumber', 'SE': 'Series',
-            'SI': 'SpecialIssue', 'WE': 'WebOfScienceEdition'
-        }
+        # 字段映射到标准列名
+        self.field_mapping = dict(WOS_FIELD_MAPPING)
     
-    def parse_wos_file(self, file_content: str) -> Tuple[str, str, pd.DataFrame]:
+    def column_schema(self) -> dict:
+        """
+        列式构建使用的固定字段模式：有效字段代码 -> 目标列名（未映射的字段保留原代码）
+        """
+        return build_column_schema(self.field_mapping, self.valid_fields)
+    
+    def parse_wos_file(self, file_content) -> Tuple[str, str, pd.DataFrame]:
         """
         解析WOS文件内容
         
         Args:
-            file_content: WOS文件内容字符串
+            file_content: WOS文件内容字符串，或上传文件/二进制流（流式逐条解析）
             
         Returns:
             Tuple[str, str, pd.DataFrame]: (文件名, 版本, 数据框)
         """
+        filename = "Unknown"
+        version = "Unknown"
         try:
-            # 解析文件头和版本信息
-            filename = "Unknown"
-            version = "Unknown"
-            
-            lines = file_content.split('\n')
-            for line in lines[:10]:  # 只检查前10行
-                if line.startswith('FN '):
-                    filename = line[3:].strip()
-                elif line.startswith('VR '):
-                    version = line[3:].strip()
-            
-            # 解析记录
-            records = []
-            current_record = {}
-            
-            for line in lines:
-                line = line.strip()
-                if not line:
-                    continue
-                
-                # 检查记录分隔符
-                if line == 'ER':
-                    if current_record:
-                        records.append(current_record)
-                        current_record = {}
-                    continue
-                elif line == 'EF':
-                    if current_record:
-                        records.append(current_record)
-                    break
-                
-                # 解析字段
-                if len(line) >= 3 and line[2] == ' ':
-                    field_code = line[:2]
-                    field_value = line[3:].strip()
-                    
-                    if field_code in self.valid_fields:
-                        if field_code in current_record:
-                            current_record[field_code] += '; ' + field_value
-                        else:
-                            current_record[field_code] = field_value
+            # 流式解析记录并直接写入列缓冲区，文件头信息在解析过程中写入header
+            header = {}
+            df = parse_wos_columns(file_content, self.column_schema(), header=header)
+            filename = header.get('FN', filename)
+            version = header.get('VR', version)
             
-            if not records:
+            if df.empty:
                 st.warning("未找到有效的文献记录")
                 return filename, version, pd.DataFrame()
             
-            # 转换为DataFrame
-            df = pd.DataFrame(records)
-            
-            # 重命名列
-            for old_col, new_col in self.field_mapping.items():
-                if old_col in df.columns:
-                    df = df.rename(columns={old_col: new_col})
-            
-            # 合并相同功能的列
-            if 'AF' in df.columns and 'Authors' in df.columns:
-                df['Authors'] = df['Authors'].fillna('') + ';' + df['AF'].fillna('')
-                df = df.drop(columns=['AF'])
-            elif 'AF' in df.columns:
-                df = df.rename(columns={'AF': 'Authors'})
-            
-            # 处理重复的Authors列
-            if df.columns.duplicated().any():
-                authors_cols = [col for col in df.columns if col == 'Authors']
-                if len(authors_cols) > 1:
-                    df['Authors'] = df[authors_cols].apply(lambda x: ';'.join(x.dropna().astype(str)), axis=1)
-                    df = df.loc[:, ~df.columns.duplicated()]
-            
-            # 数据类型转换
-            if 'Year' in df.columns:
-                df['Year'] = pd.to_numeric(df['Year'], errors='coerce')
-                df = df.dropna(subset=['Year'])
-            
-            if 'TimesCited' in df.columns:
-                df['TimesCited'] = pd.to_numeric(df['TimesCited'], errors='coerce').fillna(0)
-            
             return filename, version, df
             
         except Exception as e:
@@ -165,24 +112,9 @@ def load_wos_file_enhanced(uploaded_file) -> pd.DataFrame:
         pd.DataFrame: 解析后的数据框
     """
     try:
-        # 读取文件内容
-        try:
-            data = uploaded_file.read().decode("utf-8")
-        except UnicodeDecodeError:
-            try:
-                uploaded_file.seek(0)
-                data = uploaded_file.read().decode("utf-8-sig")
-            except UnicodeDecodeError:
-                try:
-                    uploaded_file.seek(0)
-                    data = uploaded_file.read().decode("latin-1")
-                except UnicodeDecodeError:
-                    uploaded_file.seek(0)
-                    data = uploaded_file.read().decode("cp1252")
-        
-        # 使用增强解析器
+        # 使用增强解析器（直接流式读取上传文件，不整体解码）
         parser = EnhancedWOSParser()
-        filename, version, df = parser.parse_wos_file(data)
+        filename, version, df = parser.parse_wos_file(uploaded_file)
         
         if not df.empty:
             st.info(f"✅ 成功解析 {len(df)} 条文献记录")
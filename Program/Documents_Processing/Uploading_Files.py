@@ -5,6 +5,8 @@ import pandas as pd
 import bibtexparser
 import re
 from Documents_Processing.Data_Validator import validate_and_display_data_info
+from Documents_Processing.WOS_Stream_Parser import iter_wos_records
+from Documents_Processing.Corpus_Cache import load_with_cache
 
 def Extract_Info_From_Refine(df_refine):
     """处理Refine文件生成统计数据和正则优化模式"""
@@ -27,411 +29,60 @@ def Extract_Info_From_Refine(df_refine):
     return {'stats': refine_stats, 'regex': regex_patterns}
 
 
-def Extract_Info_From_TXT(text):
-    info_list=[]
-    current_info = {}
-    lines = text.splitlines()
-    current_field = None
-    current_content = []
-    Filename=None
-    Versionnumber=None
-    for line in lines:
-        # FN 文件名,VR 版本号,,EF 文件结束
-        if line.startswith("FN ") :
-            Filename = line[3:].strip()  # 文件名
-        elif line.startswith("VR ") :
-            Versionnumber = line[3:].strip()  # 版本号
-        #AB 摘要，AR 文献编号，AU 作者，AF 作者全名
-        if line.startswith("AB "):
-            if current_field:
-                current_info[current_field] = " ".join(current_content).strip()
-            current_field = "摘要"
-            current_content = [line[3:].strip()]
-        elif line.startswith("AU "):
-            if current_field:
-                current_info[current_field] = " ".join(current_content).strip()
-            current_field = "作者"
-            # 如果已经有作者信息，用分号分隔多个作者
-            if "作者" in current_info:
-                current_content = [current_info["作者"] + ";" + line[3:].strip()]
-            else:
-                current_content = [line[3:].strip()]
-        elif line.startswith("AF "):
-            if current_field:
-                current_info[current_field] = " ".join(current_content).strip()
-            current_field = "作者全名"
-            # 如果已经有作者全名信息，用分号分隔多个作者
-            if "作者全名" in current_info:
-                current_content = [current_info["作者全名"] + ";" + line[3:].strip()]
-            else:
-                current_content = [line[3:].strip()]
-        elif line.startswith("AR "):
-            if current_field:
-                current_info[current_field] = " ".join(current_content).strip()
-            current_field = "文章编号"
-            current_content = [line[3:].strip()]
-        # BA 书籍作者， BF 书籍作者全名， BE 编者，BN 国际标准书号 (ISBN)，BP 开始页，BS 丛书副标题
-        elif line.startswith("BA "):
-            if current_field:
-                current_info[current_field] = " ".join(current_content).strip()
-            current_field = "书籍作者"
-            current_content = [line[3:].strip()]
-        elif line.startswith("BF "):
-            if current_field:
-                current_info[current_field] = " ".join(current_content).strip()
-            current_field = "作者全名"
-            current_content = [line[3:].strip()]
-        elif line.startswith("BE "):
-            if current_field:
-                current_info[current_field] = " ".join(current_content).strip()
-            current_field = "编者"
-            current_content = [line[3:].strip()]
-        elif line.startswith("BN "):
-            if current_field:
-                current_info[current_field] = " ".join(current_content).strip()
-            current_field = "国际标准书号 (ISBN)"
-            current_content = [line[3:].strip()]
-        elif line.startswith("BP "):
-            if current_field:
-                current_info[current_field] = " ".join(current_content).strip()
-            current_field = "开始页页码"
-            current_content = [line[3:].strip()]
-        elif line.startswith("BS "):
-            if current_field:
-                current_info[current_field] = " ".join(current_content).strip()
-            current_field = "丛书副标题"
-            current_content = [line[3:].strip()]
-        #CA团体作者，CT会议标题，CY会议日期，CL，会议地点，CR 引用的参考文献，C1作者地址
-        elif line.startswith("C1 "):
-            if current_field:
-                current_info[current_field] = " ".join(current_content).strip()
-            current_field = "国家"  # 修改为国家字段
-            # 如果已经有地址信息，用分号分隔多个地址
-            if "国家" in current_info:
-                current_content = [current_info["国家"] + ";" + line[3:].strip()]
-            else:
-                current_content = [line[3:].strip()]
-        elif line.startswith("CA "):
-            if current_field:
-                current_info[current_field] = " ".join(current_content).strip()
-            current_field = "团体作者"
-            current_content = [line[3:].strip()]
-        elif line.startswith("CT "):
-            if current_field:
-                current_info[current_field] = " ".join(current_content).strip()
-            current_field = "会议标题"
-            current_content = [line[3:].strip()]
-        elif line.startswith("CY "):
-            if current_field:
-                current_info[current_field] = " ".join(current_content).strip()
-            current_field = "会议日期"
-            current_content = [line[3:].strip()]
-        elif line.startswith("CL "):
-            if current_field:
-                current_info[current_field] = " ".join(current_content).strip()
-            current_field = "会议地点"
-            current_content = [line[3:].strip()]
-        elif line.startswith("CR "):
-            if current_field:
-                current_info[current_field] = " ".join(current_content).strip()
-            current_field = "引用的参考文献"
-            current_content = [line[3:].strip()]
-        #DA 生成此报告的日期，DE 作者关键词，DI 数字对象标识符 (DOI)，D2 书籍的数字对象标识符 (DOI)，DT 文献类型
-        elif line.startswith("DA "):
-            if current_field:
-                current_info[current_field] = " ".join(current_content).strip()
-            current_field = "生成此报告的日期"
-            current_content = [line[3:].strip()]
-        elif line.startswith("DE "):
-            if current_field:
-                current_info[current_field] = " ".join(current_content).strip()
-            current_field = "关键词"  # 修改为关键词字段
-            # 如果有关键词信息，用分号分隔多个关键词
-            if "关键词" in current_info:
-                current_content = [current_info["关键词"] + ";" + line[3:].strip()]
-            else:
-                current_content = [line[3:].strip()]
-        elif line.startswith("DI "):
-            if current_field:
-                current_info[current_field] = " ".join(current_content).strip()
-            current_field = "数字对象标识符 (DOI)"
-            current_content = [line[3:].strip()]
-        elif line.startswith("D2 "):
-            if current_field:
-                current_info[current_field] = " ".join(current_content).strip()
-            current_field = "书籍的数字对象标识符 (DOI)"
-            current_content = [line[3:].strip()]
-        elif line.startswith("DT "):
-            if current_field:
-                current_info[current_field] = " ".join(current_content).strip()
-            current_field = "文献类型"
-            current_content = [line[3:].strip()]
-        # EA 提前访问日期，EI 电子国际标准期刊号 (eISSN)，EM 电子邮件地址，EP 结束页，ER 记录结束，EF 文件结束，ES ESI 热门论文。
-        # ET ESI 常被引用的论文，EY 提前访问年份
-        elif line.startswith("EA "):
-            if current_field:
-                current_info[current_field] = " ".join(current_content).strip()
-            current_field = "提前访问日期"
-            current_content = [line[3:].strip()]
-        elif line.startswith("EI "):
-            if current_field:
-                current_info[current_field] = " ".join(current_content).strip()
-            current_field = "电子国际标准期刊号 (eISSN)"
-            current_content = [line[3:].strip()]
-        elif line.startswith("EM "):
-            if current_field:
-                current_info[current_field] = " ".join(current_content).strip()
-            current_field = "电子邮件地址"
-            current_content = [line[3:].strip()]
-        elif line.startswith("EP "):
-                if current_field:
-                    current_info[current_field] = " ".join(current_content).strip()
-                current_field = "结束页"
-                current_content = [line[3:].strip()]
-        elif line.startswith("ES "):
-            if current_field:
-                current_info[current_field] = " ".join(current_content).strip()
-            current_field = "ES热门"
-            current_content = [line[3:].strip()]
-        elif line.startswith("ET "):
-            if current_field:
-                current_info[current_field] = " ".join(current_content).strip()
-            current_field = "ES常被引用的论文"
-            current_content = [line[3:].strip()]
-        elif line.startswith("EY "):
-            if current_field:
-                current_info[current_field] = " ".join(current_content).strip()
-            current_field = "提前访问年份"
-            current_content = [line[3:].strip()]
-        #FU基金资助机构和授权号，FX基金资助正文
-        elif line.startswith("FU "):
-            if current_field:
-                current_info[current_field] = " ".join(current_content).strip()
-            current_field = "基金资助机构和授权号"
-            current_content = [line[3:].strip()]
-        elif line.startswith("FX "):
-            if current_field:
-                current_info[current_field] = " ".join(current_content).strip()
-            current_field = "基金资助正文"
-            current_content = [line[3:].strip()]
-        #GA文献传递号，GP 书籍团体作者
-        elif line.startswith("GA "):
-            if current_field:
-                current_info[current_field] = " ".join(current_content).strip()
-            current_field = "文献传递号"
-            current_content = [line[3:].strip()]
-        elif line.startswith("GP "):
-            if current_field:
-                current_info[current_field] = " ".join(current_content).strip()
-            current_field = "BookGroupAuthors"
-            current_content = [line[3:].strip()]
-        #HO 会议主办方,ID Keywords Plus®,IS 期,JI ISO 来源文献名称缩写,J9 长度为 29 个字符的来源文献名称缩写
-        elif line.startswith("HO "):
-            if current_field:
-                current_info[current_field] = " ".join(current_content).strip()
-            current_field = "ConferenceHost"
-            current_content = [line[3:].strip()]
-        elif line.startswith("ID "):
-            if current_field:
-                current_info[current_field] = " ".join(current_content).strip()
-            current_field = "Keywords Plus®"
-            # 如果有关键词信息，用分号分隔多个关键词
-            if "Keywords Plus®" in current_info:
-                current_content = [current_info["Keywords Plus®"] + ";" + line[3:].strip()]
-            else:
-                current_content = [line[3:].strip()]
-        elif line.startswith("IS "):
-            if current_field:
-                current_info[current_field] = " ".join(current_content).strip()
-            current_field = "期"
-            current_content = [line[3:].strip()]
-        elif line.startswith("JI "):
-            if current_field:
-                current_info[current_field] = " ".join(current_content).strip()
-            current_field = "ISO 来源文献名称缩写"
-            current_content = [line[3:].strip()]
-        elif line.startswith("J9 "):
-            if current_field:
-                current_info[current_field] = " ".join(current_content).strip()
-            current_field = "期刊名称"  # 修改为期刊名称字段
-            current_content = [line[3:].strip()]
-        #LA 语种,MA 会议摘要,NR 引用的参考文献数
-        elif line.startswith("LA "):
-            if current_field:
-                current_info[current_field] = " ".join(current_content).strip()
-            current_field = "语种"
-            current_content = [line[3:].strip()]
-        elif line.startswith("MA "):
-            if current_field:
-                current_info[current_field] = " ".join(current_content).strip()
-            current_field = "会议摘要"
-            current_content = [line[3:].strip()]
-        elif line.startswith("NR "):
-            if current_field:
-                current_info[current_field] = " ".join(current_content).strip()
-            current_field = "引用的参考文献数"
-            current_content = [line[3:].strip()]
-        #OA 公开访问指示符，PA 出版商地址，PI 出版商所在城市，PN 子辑，PM PubMed ID，PT 出版物类型（J=期刊；B=书籍；S=丛书；P=专利），
-        #PU 出版商，PY 出版年
-        elif line.startswith("OA "):
-            if current_field:
-                current_info[current_field] = " ".join(current_content).strip()
-            current_field = "公开访问指示符"
-            current_content = [line[3:].strip()]
-        elif line.startswith("PA "):
-            if current_field:
-                current_info[current_field] = " ".join(current_content).strip()
-            current_field = "出版商地址"
-            current_content = [line[3:].strip()]
-        elif line.startswith("PI "):
-            if current_field:
-                current_info[current_field] = " ".join(current_content).strip()
-            current_field = "出版商所在城市"
-            current_content = [line[3:].strip()]
-        elif line.startswith("PN "):
-            if current_field:
-                current_info[current_field] = " ".join(current_content).strip()
-            current_field = "子辑"
-            current_content = [line[3:].strip()]
-        elif line.startswith("PM "):
-            if current_field:
-                current_info[current_field] = " ".join(current_content).strip()
-            current_field = "PubMed ID"
-            current_content = [line[3:].strip()]
-        elif line.startswith("PT "):
-            if current_field:
-                current_info[current_field] = " ".join(current_content).strip()
-            current_field = "出版物类型"
-            current_content = [line[3:].strip()]
-        elif line.startswith("PU "):
-            if current_field:
-                current_info[current_field] = " ".join(current_content).strip()
-            current_field = "出版商"
-            current_content = [line[3:].strip()]
-        elif line.startswith("PY "):
-            if current_field:
-                current_info[current_field] = " ".join(current_content).strip()
-            current_field = "出版年"
-            current_content = [line[3:].strip()]
-        #RI ResearcherID 号，RP 通讯作者地址
-        elif line.startswith("RI "):
-            if current_field:
-                current_info[current_field] = " ".join(current_content).strip()
-            current_field = "ResearcherID 号"
-            current_content = [line[3:].strip()]
-        elif line.startswith("RP "):
-            if current_field:
-                current_info[current_field] = " ".join(current_content).strip()
-            current_field = "通讯作者地址"
-            current_content = [line[3:].strip()]
-        #SC 研究方向，SE 丛书标题，SI 特刊，SN 国际标准期刊号 (ISSN)，SO 出版物名称，SP 会议赞助方，
-        elif line.startswith("SC "):
-            if current_field:
-                current_info[current_field] = " ".join(current_content).strip()
-            current_field = "研究方向"
-            current_content = [line[3:].strip()]
-        elif line.startswith("SE "):
-            if current_field:
-                current_info[current_field] = " ".join(current_content).strip()
-            current_field = "丛书标题"
-            current_content = [line[3:].strip()]
-        elif line.startswith("SI "):
-            if current_field:
-                current_info[current_field] = " ".join(current_content).strip()
-            current_field = "特刊"
-            current_content = [line[3:].strip()]
-        elif line.startswith("SN "):
-            if current_field:
-                current_info[current_field] = " ".join(current_content).strip()
-            current_field = "国际标准期刊号 (ISSN)"
-            current_content = [line[3:].strip()]
-        elif line.startswith("SO "):
-            if current_field:
-                current_info[current_field] = " ".join(current_content).strip()
-            current_field = "出版物名称"
-            current_content = [line[3:].strip()]
-        # 添加期刊名称的别名映射
-        elif line.startswith("J9 "):
-            if current_field:
-                current_info[current_field] = " ".join(current_content).strip()
-            current_field = "期刊名称"  # 添加期刊名称字段
-            current_content = [line[3:].strip()]
-        elif line.startswith("SP "):
-            if current_field:
-                current_info[current_field] = " ".join(current_content).strip()
-            current_field = "会议赞助方"
-            current_content = [line[3:].strip()]
-        #TC Web of Science 核心合集的被引频次计数，TI 文献标题
-        elif line.startswith("TC "):
-            if current_field:
-                current_info[current_field] = " ".join(current_content).strip()
-            current_field = '核心合集的被引频次计数'
-            current_content = [line[3:].strip()]
-        # 添加引用次数的别名映射
-        elif line.startswith("Z9 "):
-            if current_field:
-                current_info[current_field] = " ".join(current_content).strip()
-            current_field = '核心合集的被引频次计数'  # 添加引用次数字段
-            current_content = [line[3:].strip()]
-        elif line.startswith("TI "):
-            if current_field:
-                current_info[current_field] = " ".join(current_content).strip()
-            current_field = "文献标题"
-            current_content = [line[3:].strip()]
-        #U1 使用次数（最近 180 天）,U2 使用次数（2013 年至今）,UT 入藏号
-        elif line.startswith("U1 "):
-            if current_field:
-                current_info[current_field] = " ".join(current_content).strip()
-            current_field = "使用次数（最近 180 天）"
-            current_content = [line[3:].strip()]
-        elif line.startswith("U2 "):
-            if current_field:
-                current_info[current_field] = " ".join(current_content).strip()
-            current_field = "使用次数（2013 年至今"
-            current_content = [line[3:].strip()]
-        elif line.startswith("UT "):
-            if current_field:
-                current_info[current_field] = " ".join(current_content).strip()
-            current_field = "入藏号"
-            current_content = [line[3:].strip()]
-        #VL 卷,WC Web of Science 类别,
-        elif line.startswith("VL "):
-                if current_field:
-                    current_info[current_field] = " ".join(current_content).strip()
-                current_field = "卷"
-                current_content = [line[3:].strip()]
-        elif line.startswith("WC "):
-            if current_field:
-                current_info[current_field] = " ".join(current_content).strip()
-            current_field = "Web of Science 类别"
-            current_content = [line[3:].strip()]
-        #Z9 被引频次合计 (已在上面处理)
-        elif line == "ER":
-        # 当读取到文章结束标识时，将当前文章信息添加到列表中
-            if current_field:
-                current_info[current_field] = " ".join(current_content).strip()
-            info_list.append(current_info)
-            current_info = {}
-            current_field = None
-            current_content = []
-
-        elif line == "EF":
-            # 当读取到文件结束标识时，返回文件名和文章信息列表
-            if current_field:
-                current_info[current_field] = " ".join(current_content).strip()
-            if current_info:
-                info_list.append(current_info)
-            break
+# WOS字段代码 -> 中文列名（同名列以后出现的字段为准，如 Z9 覆盖 TC、BF 覆盖 AF）
+WOS_TAG_CHINESE_NAMES = {
+    # AB 摘要，AR 文献编号，AU 作者，AF 作者全名
+    'AB': '摘要', 'AU': '作者', 'AF': '作者全名', 'AR': '文章编号',
+    # BA 书籍作者，BF 书籍作者全名，BE 编者，BN ISBN，BP 开始页，BS 丛书副标题
+    'BA': '书籍作者', 'BF': '作者全名', 'BE': '编者', 'BN': '国际标准书号 (ISBN)',
+    'BP': '开始页页码', 'BS': '丛书副标题',
+    # C1 作者地址，CA 团体作者，CT 会议标题，CY 会议日期，CL 会议地点，CR 引用的参考文献
+    'C1': '国家', 'CA': '团体作者', 'CT': '会议标题', 'CY': '会议日期', 'CL': '会议地点',
+    'CR': '引用的参考文献',
+    # DA 报告日期，DE 作者关键词，DI DOI，D2 书籍DOI，DT 文献类型
+    'DA': '生成此报告的日期', 'DE': '关键词', 'DI': '数字对象标识符 (DOI)',
+    'D2': '书籍的数字对象标识符 (DOI)', 'DT': '文献类型',
+    # EA 提前访问日期，EI eISSN，EM 电子邮件地址，EP 结束页，ES ESI 热门论文，ET ESI 常被引用的论文，EY 提前访问年份
+    'EA': '提前访问日期', 'EI': '电子国际标准期刊号 (eISSN)', 'EM': '电子邮件地址', 'EP': '结束页',
+    'ES': 'ES热门', 'ET': 'ES常被引用的论文', 'EY': '提前访问年份',
+    # FU 基金资助机构和授权号，FX 基金资助正文，GA 文献传递号，GP 书籍团体作者
+    'FU': '基金资助机构和授权号', 'FX': '基金资助正文', 'GA': '文献传递号', 'GP': 'BookGroupAuthors',
+    # HO 会议主办方，ID Keywords Plus®，IS 期，JI ISO 来源文献名称缩写，J9 29字符来源文献名称缩写
+    'HO': 'ConferenceHost', 'ID': 'Keywords Plus®', 'IS': '期', 'JI': 'ISO 来源文献名称缩写',
+    'J9': '期刊名称',
+    # LA 语种，MA 会议摘要，NR 引用的参考文献数
+    'LA': '语种', 'MA': '会议摘要', 'NR': '引用的参考文献数',
+    # OA 公开访问指示符，PA 出版商地址，PI 出版商所在城市，PN 子辑，PM PubMed ID，PT 出版物类型，PU 出版商，PY 出版年
+    'OA': '公开访问指示符', 'PA': '出版商地址', 'PI': '出版商所在城市', 'PN': '子辑',
+    'PM': 'PubMed ID', 'PT': '出版物类型', 'PU': '出版商', 'PY': '出版年',
+    # RI ResearcherID 号，RP 通讯作者地址
+    'RI': 'ResearcherID 号', 'RP': '通讯作者地址',
+    # SC 研究方向，SE 丛书标题，SI 特刊，SN ISSN，SO 出版物名称，SP 会议赞助方
+    'SC': '研究方向', 'SE': '丛书标题', 'SI': '特刊', 'SN': '国际标准期刊号 (ISSN)',
+    'SO': '出版物名称', 'SP': '会议赞助方',
+    # TC/Z9 被引频次，TI 文献标题
+    'TC': '核心合集的被引频次计数', 'Z9': '核心合集的被引频次计数', 'TI': '文献标题',
+    # U1 使用次数（最近 180 天），U2 使用次数（2013 年至今），UT 入藏号
+    'U1': '使用次数（最近 180 天）', 'U2': '使用次数（2013 年至今', 'UT': '入藏号',
+    # VL 卷，WC Web of Science 类别
+    'VL': '卷', 'WC': 'Web of Science 类别',
+}
 
-        else:
-            if current_field:
-                current_content.append(line.strip())
 
-    # 处理最后一个字段
-    if current_field and current_content:
-        current_info[current_field] = " ".join(current_content).strip()
-    if current_info:
+def Extract_Info_From_TXT(text):
+    """
+    解析WOS纯文本，返回 (文件名, 版本号, 中文列名的DataFrame)
+    text 可以是已解码的字符串，也可以是上传文件/二进制流（流式逐条解析）
+    """
+    header = {}
+    info_list = []
+    for record in iter_wos_records(text, tags=WOS_TAG_CHINESE_NAMES.keys(), header=header):
+        current_info = {}
+        for tag, value in record.items():
+            current_info[WOS_TAG_CHINESE_NAMES[tag]] = value
         info_list.append(current_info)
+    Filename = header.get('FN')
+    Versionnumber = header.get('VR')
 
     # 确保返回有效的DataFrame
     if not info_list:
@@ -468,37 +119,26 @@ def  Parse_Bib_File(bib_text):
 
     return fn_values, entries
 
+def _Parse_TXT_Titled(uploaded_file):
+    """解析WOS文本并统一列名大小写"""
+    filename, versionnumber, df = Extract_Info_From_TXT(uploaded_file)
+    if df is not None and not df.empty:
+        df.columns = df.columns.str.title()
+    return df
+
+
 @st.cache_data
 def Load_TXT(uploaded_file):
     try:
         if uploaded_file.name.endswith('.txt'):
-            # 尝试多种编码方式读取文件
-            try:
-                data = uploaded_file.read().decode("utf-8")
-            except UnicodeDecodeError:
-                try:
-                    # 重置文件指针
-                    uploaded_file.seek(0)
-                    data = uploaded_file.read().decode("utf-8-sig")  # 处理BOM
-                except UnicodeDecodeError:
-                    try:
-                        uploaded_file.seek(0)
-                        data = uploaded_file.read().decode("latin-1")  # 备用编码
-                    except UnicodeDecodeError:
-                        uploaded_file.seek(0)
-                        data = uploaded_file.read().decode("cp1252")  # Windows编码
-            
-            filename, versionnumber, df = Extract_Info_From_TXT(data)
+            # 直接流式解析上传文件，不整体解码；结果按上传内容持久化缓存
+            df = load_with_cache(uploaded_file, 'Load_TXT', lambda: _Parse_TXT_Titled(uploaded_file))
             
             # 检查返回的DataFrame是否有效
             if df is None or df.empty:
                 st.warning("文件解析成功，但未找到有效的文献数据。请检查文件格式。")
                 return pd.DataFrame()
             
-            # 安全地处理列名
-            if hasattr(df, 'columns'):
-                df.columns = df.columns.str.title()
-            
             # 添加数据验证（静默验证，不显示信息）
             validation_result = validate_and_display_data_info(df)
             
@@ -530,6 +170,54 @@ def Load_TXT_Enhanced(uploaded_file):
         return Load_TXT(uploaded_file)
 
 
+def Load_TXT_Batch(uploaded_files, max_workers=None, progress=None):
+    """
+    并行加载多个WOS导出文件（进程池逐文件解析），按入藏号(UT)与DOI去重后合并
+    不创建界面元素，也不做 st.cache_data 缓存（缓存命中时 Streamlit 会重放函数内的进度条）；
+    进度由调用方通过 progress 回调显示，见 Load_TXT_Batch_With_Progress
+
+    Args:
+        uploaded_files: Streamlit上传文件对象列表
+        max_workers: 并行进程数，默认等于CPU核数
+        progress: 每解析完一个文件回调一次 progress(已完成数, 总数, 文件名, 记录数)
+
+    Returns:
+        Tuple[pd.DataFrame, int]: (合并后的标准英文列名数据框, 去除的重复记录数)
+    """
+    from Documents_Processing.WOS_Batch_Loader import load_wos_files
+
+    return load_wos_files(uploaded_files, max_workers=max_workers, progress=progress)
+
+
+def Load_TXT_Batch_With_Progress(uploaded_files, max_workers=None):
+    """
+    带进度条与结果提示的 Load_TXT_Batch，须在缓存函数之外调用
+
+    Returns:
+        pd.DataFrame: 合并后的数据框，解析失败时为空数据框
+    """
+    progress_bar = st.progress(0.0, text="🔄 正在并行解析文件...")
+
+    def report(done, total, name, n_records):
+        progress_bar.progress(done / total, text=f"[{done}/{total}] {name}: {n_records} 条记录")
+
+    try:
+        df, removed = Load_TXT_Batch(uploaded_files, max_workers=max_workers, progress=report)
+    except Exception as e:
+        st.error(f"批量解析文件时出错: {str(e)}")
+        return pd.DataFrame()
+    finally:
+        progress_bar.empty()
+
+    if df.empty:
+        st.warning("未找到有效的文献记录")
+        return df
+    st.info(f"✅ 合并 {len(uploaded_files)} 个文件，共 {len(df)} 条文献记录（去除重复 {removed} 条）")
+    return df
+    st.info(f"✅ 合并 {len(uploaded_files)} 个文件，共 {len(df)} 条文献记录（去除重复 {removed} 条）")
+    return df
+
+
 @st.cache_data()
 def load_image(image_path):
     return image_path
@@ -0,0 +1,271 @@
+"""
+WOS多文件并行导入
+WOS每次最多导出500/1000条记录，完整语料通常由几十到几百个 savedrecs*.txt 组成；
+本模块在进程池中并行解析各文件，按输入顺序合并，并按入藏号(UT)与DOI去重。
+单个超大文件（或拼接的多个导出文件）按 ER 记录边界切分为字节区间，由各进程通过内存映射并行解析
+"""
+
+import argparse
+import mmap
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+from Documents_Processing.WOS_Stream_Parser import (ENCODING_SAMPLE_SIZE, WOS_CATEGORICAL_COLUMNS,
+                                                    detect_encoding, parse_wos_columns)
+
+# 超过该大小的单个文件改用按记录切分的多进程解析
+PARALLEL_PARSE_THRESHOLD = 32 * 1024 * 1024
+
+# 去重依据的列（按顺序依次去重）
+DEDUP_COLUMNS = ('AccessionNumber', 'DOI')
+
+
+# 记录结束行：行首的 ER（兼容 \n 与 \r\n 换行）
+_RECORD_END = re.compile(rb'^ER[ \t]*\r?$\n?', re.MULTILINE)
+
+
+def _default_schema() -> Dict[str, str]:
+    """默认字段模式：EnhancedWOSParser 的字段集与标准英文列名"""
+    from Documents_Processing.Enhanced_WOS_Parser import EnhancedWOSParser
+    return EnhancedWOSParser().column_schema()
+
+
+def _parse_one(task: Tuple[int, str, object, Dict[str, str]]) -> Tuple[int, str, pd.DataFrame]:
+    """进程池任务：解析单个文件（payload 为文件路径或原始字节）"""
+    index, name, payload, schema = task
+    if isinstance(payload, str):
+        with open(payload, 'rb') as stream:
+            df = parse_wos_columns(stream, schema)
+    else:
+        df = parse_wos_columns(payload, schema)
+    return index, name, df
+
+
+def _parse_range(task: Tuple[int, object, int, int, Dict[str, str], str]) -> Tuple[int, str, pd.DataFrame]:
+    """
+    进程池任务：解析 [start, end) 字节区间（payload 为文件路径时在子进程内内存映射，否则为该区间的字节），
+    编码由整个文件开头统一探测后传入（区间开头没有 BOM，各自探测可能得出不同结果）
+    """
+    index, payload, start, end, schema, encoding = task
+    if isinstance(payload, str):
+        with open(payload, 'rb') as stream, mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            df = parse_wos_columns(mapped[start:end], schema, encoding=encoding)
+    else:
+        df = parse_wos_columns(payload, schema, encoding=encoding)
+    return index, f'{start}-{end}', df
+
+
+def split_record_ranges(buffer, n_chunks: int) -> List[Tuple[int, int]]:
+    """
+    按 ER 记录边界把缓冲区切分为约 n_chunks 个连续字节区间，区间不会截断任何记录
+
+    Args:
+        buffer: 支持 find/切片的字节缓冲区（mmap 或 bytes）
+        n_chunks: 目标区间数
+
+    Returns:
+        List[Tuple[int, int]]: 按文件顺序排列的 (start, end) 区间
+    """
+    size = len(buffer)
+    if size == 0:
+        return []
+    step = max(size // max(n_chunks, 1), 1)
+    ranges = []
+    start = 0
+    while start < size:
+        target = start + step
+        if target >= size:
+            ranges.append((start, size))
+            break
+        # 从目标位置所在行的行首开始查找下一个 ER 行
+        line_start = buffer.rfind(b'\n', start, target) + 1 or start
+        match = _RECORD_END.search(buffer, line_start)
+        end = match.end() if match else size
+        ranges.append((start, end))
+        start = end
+    return ranges
+
+
+def parse_wos_file_parallel(source, schema: Optional[Dict[str, str]] = None, max_workers: Optional[int] = None,
+                            progress: Optional[Callable[[int, int, str, int], None]] = None,
+                            deduplicate: bool = True) -> Tuple[pd.DataFrame, int]:
+    """
+    并行解析单个超大WOS文件：按 ER 边界切分字节区间，各进程分别列式解析后按顺序合并
+
+    Args:
+        source: 文件路径（子进程通过内存映射读取，仅传递区间偏移）或原始字节
+        schema: 字段代码 -> 列名，默认使用 EnhancedWOSParser 的字段集
+        max_workers: 进程数，默认等于CPU核数
+        progress: 每完成一个区间回调一次 progress(已完成数, 总数, 区间, 记录数)
+        deduplicate: 是否按入藏号与DOI去重（拼接的导出文件可能互相重叠）
+
+    Returns:
+        Tuple[pd.DataFrame, int]: (合并后的数据框, 删除的重复记录数)
+    """
+    schema = schema or _default_schema()
+    workers = max_workers or os.cpu_count() or 1
+
+    if isinstance(source, (str, os.PathLike)):
+        path = os.fspath(source)
+        if os.path.getsize(path) == 0:
+            return pd.DataFrame(), 0
+        with open(path, 'rb') as stream, mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            encoding = detect_encoding(mapped[:ENCODING_SAMPLE_SIZE])
+            ranges = split_record_ranges(mapped, workers * 2)
+        tasks = [(index, path, start, end, schema, encoding) for index, (start, end) in enumerate(ranges)]
+    else:
+        buffer = bytes(source)
+        encoding = detect_encoding(buffer[:ENCODING_SAMPLE_SIZE])
+        ranges = split_record_ranges(buffer, workers * 2)
+        tasks = [(index, buffer[start:end], start, end, schema, encoding) for index, (start, end) in enumerate(ranges)]
+    if not tasks:
+        return pd.DataFrame(), 0
+
+    frames: List[Optional[pd.DataFrame]] = [None] * len(tasks)
+    workers = min(workers, len(tasks))
+    if workers <= 1:
+        for done, task in enumerate(tasks, 1):
+            index, name, df = _parse_range(task)
+            frames[index] = df
+            if progress:
+                progress(done, len(tasks), name, len(df))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(_parse_range, task) for task in tasks]
+            for done, future in enumerate(as_completed(futures), 1):
+                index, name, df = future.result()
+                frames[index] = df
+                if progress:
+                    progress(done, len(tasks), name, len(df))
+
+    return merge_frames(frames, deduplicate=deduplicate)
+
+
+def _as_task(index: int, source, schema: Dict[str, str]):
+    """把路径或上传文件转换为可序列化的进程池任务"""
+    if isinstance(source, (str, os.PathLike)):
+        path = os.fspath(source)
+        return index, os.path.basename(path), path, schema
+    name = getattr(source, 'name', f'file_{index + 1}')
+    if hasattr(source, 'getvalue'):
+        payload = source.getvalue()
+    else:
+        source.seek(0)
+        payload = source.read()
+    return index, name, payload, schema
+
+
+def deduplicate_records(df: pd.DataFrame, id_columns: Iterable[str] = DEDUP_COLUMNS) -> Tuple[pd.DataFrame, int]:
+    """
+    按标识列依次去重，保留首次出现的记录；空值不参与去重
+
+    Args:
+        df: 合并后的数据框
+        id_columns: 去重依据的列，默认先按入藏号(UT)再按DOI
+
+    Returns:
+        Tuple[pd.DataFrame, int]: (去重后的数据框, 删除的记录数)
+    """
+    before = len(df)
+    for column in id_columns:
+        if column not in df.columns or df.empty:
+            continue
+        key = df[column].astype('string').str.strip().str.lower()
+        duplicated = key.duplicated() & key.notna() & (key != '')
+        if duplicated.any():
+            df = df[~duplicated.to_numpy()]
+    return df.reset_index(drop=True), before - len(df)
+
+
+def merge_frames(frames: List[pd.DataFrame], deduplicate: bool = True) -> Tuple[pd.DataFrame, int]:
+    """
+    按顺序合并多个解析结果，恢复分类列类型并去重
+
+    Returns:
+        Tuple[pd.DataFrame, int]: (合并后的数据框, 删除的重复记录数)
+    """
+    frames = [frame for frame in frames if frame is not None and not frame.empty]
+    if not frames:
+        return pd.DataFrame(), 0
+    df = pd.concat(frames, ignore_index=True, sort=False)
+    for column in WOS_CATEGORICAL_COLUMNS:
+        if column in df.columns and df[column].dtype != 'category':
+            df[column] = df[column].astype('category')
+    if not deduplicate:
+        return df, 0
+    return deduplicate_records(df)
+
+
+def load_wos_files(sources, schema: Optional[Dict[str, str]] = None, max_workers: Optional[int] = None,
+                   progress: Optional[Callable[[int, int, str, int], None]] = None,
+                   deduplicate: bool = True) -> Tuple[pd.DataFrame, int]:
+    """
+    并行解析多个WOS导出文件并合并
+
+    Args:
+        sources: 文件路径或Streamlit上传文件对象的列表
+        schema: 字段代码 -> 列名，默认使用标准英文列名
+        max_workers: 进程数，默认等于CPU核数（不超过文件数）
+        progress: 每完成一个文件回调一次 progress(已完成数, 总数, 文件名, 记录数)
+        deduplicate: 是否按入藏号与DOI去重
+
+    Returns:
+        Tuple[pd.DataFrame, int]: (合并后的数据框, 删除的重复记录数)
+    """
+    schema = schema or _default_schema()
+    tasks = [_as_task(index, source, schema) for index, source in enumerate(sources)]
+    if not tasks:
+        return pd.DataFrame(), 0
+
+    frames: List[Optional[pd.DataFrame]] = [None] * len(tasks)
+    workers = min(max_workers or os.cpu_count() or 1, len(tasks))
+
+    if workers <= 1:
+        for done, task in enumerate(tasks, 1):
+            index, name, df = _parse_one(task)
+            frames[index] = df
+            if progress:
+                progress(done, len(tasks), name, len(df))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(_parse_one, task) for task in tasks]
+            for done, future in enumerate(as_completed(futures), 1):
+                index, name, df = future.result()
+                frames[index] = df
+                if progress:
+                    progress(done, len(tasks), name, len(df))
+
+    return merge_frames(frames, deduplicate=deduplicate)
+
+
+def main(argv=None):
+    """命令行入口：合并多个WOS导出文件并保存为CSV"""
+    parser = argparse.ArgumentParser(description="并行解析并合并WOS纯文本导出文件（单个大文件按记录切分并行解析；按UT与DOI去重）")
+    parser.add_argument('files', nargs='+', help="WOS导出文件，如 savedrecs*.txt")
+    parser.add_argument('-o', '--output', default='merged_wos.csv', help="输出CSV文件路径")
+    parser.add_argument('-j', '--workers', type=int, default=None, help="并行进程数，默认等于CPU核数")
+    parser.add_argument('--keep-duplicates', action='store_true', help="不去重")
+    args = parser.parse_args(argv)
+
+    def report(done, total, name, n_records):
+        print(f"[{done}/{total}] {name}: {n_records} 条记录", file=sys.stderr)
+
+    if len(args.files) == 1:
+        # 单个文件：按记录边界切分后多进程并行解析
+        df, removed = parse_wos_file_parallel(args.files[0], max_workers=args.workers, progress=report,
+                                              deduplicate=not args.keep_duplicates)
+    else:
+        df, removed = load_wos_files(args.files, max_workers=args.workers, progress=report,
+                                     deduplicate=not args.keep_duplicates)
+    df.to_csv(args.output, index=False)
+    print(f"合并 {len(df)} 条记录（去除重复 {removed} 条）-> {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,318 @@
+"""
+WOS纯文本流式记录解析器
+单遍扫描二进制流，按字段标签分派表逐条产出文献记录，
+供 main.parse_wos_file、EnhancedWOSParser 与 Extract_Info_From_TXT 共用
+"""
+
+import codecs
+import io
+import re
+from typing import Dict, FrozenSet, Iterable, Iterator, Optional
+
+import pandas as pd
+
+# 解析器版本：解析结果（列、类型、清洗规则）变化时递增，使持久化缓存失效
+PARSER_VERSION = '6'
+
+# 续行为独立条目的字段（每行一个作者/地址/参考文献），续行以分号连接
+WOS_LIST_TAGS = frozenset({'AU', 'AF', 'BA', 'BF', 'BE', 'CA', 'GP', 'C1', 'C3', 'CR'})
+
+# 文件头字段
+WOS_HEADER_TAGS = frozenset({'FN', 'VR'})
+
+# 支持的全部WOS字段代码
+WOS_FIELD_TAGS = frozenset({
+    'PT', 'UT', 'AR', 'AU', 'AF', 'BA', 'BF', 'BE', 'CA', 'GP', 'RI', 'OI',
+    'TI', 'AB', 'MA', 'SO', 'J9', 'JI', 'SN', 'EI', 'BN', 'BS', 'SE', 'SI', 'SU',
+    'PY', 'PD', 'VL', 'IS', 'BP', 'EP', 'PG', 'PN', 'PS', 'DI', 'D2',
+    'PU', 'PI', 'PA', 'DE', 'ID', 'WC', 'SC', 'C1', 'C3', 'RP', 'EM',
+    'CT', 'CY', 'CL', 'HO', 'SP', 'TA', 'CR', 'NR', 'TC', 'Z9', 'U1', 'U2',
+    'FU', 'FX', 'LA', 'DT', 'OA', 'PM', 'GA', 'DA', 'EA', 'EY', 'ES', 'ET',
+    'HC', 'HP', 'DB', 'GE', 'UN', 'WE',
+})
+
+_DISPATCH_CACHE: Dict[FrozenSet[str], Dict[str, str]] = {}
+
+
+def build_tag_dispatch(tags: Optional[Iterable[str]] = None) -> Dict[str, str]:
+    """
+    构建字段标签分派表：字段代码 -> 续行连接符
+
+    Args:
+        tags: 需要保留的字段代码，默认使用 WOS_FIELD_TAGS
+
+    Returns:
+        Dict[str, str]: 分派表，未出现在表中的字段会被跳过
+    """
+    key = WOS_FIELD_TAGS if tags is None else frozenset(tags)
+    dispatch = _DISPATCH_CACHE.get(key)
+    if dispatch is None:
+        dispatch = {tag: ('; ' if tag in WOS_LIST_TAGS else ' ') for tag in key - WOS_HEADER_TAGS}
+        _DISPATCH_CACHE[key] = dispatch
+    return dispatch
+
+
+# 编码探测读取的样本大小
+ENCODING_SAMPLE_SIZE = 8192
+
+_BOMS = (
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+
+
+def _latin1_fallback(error: UnicodeDecodeError):
+    """解码错误处理：探测样本之后出现的个别非法字节按latin-1解码（不会失败）"""
+    return error.object[error.start:error.end].decode('latin-1'), error.end
+
+
+codecs.register_error('wos_latin1_fallback', _latin1_fallback)
+
+
+def detect_encoding(sample: bytes) -> str:
+    """
+    根据文件开头的样本判断编码：BOM > UTF-8有效性 > cp1252启发式 > latin-1
+
+    Args:
+        sample: 文件开头的若干字节
+
+    Returns:
+        str: Python编解码器名称
+    """
+    for bom, encoding in _BOMS:
+        if sample.startswith(bom):
+            return encoding
+    try:
+        # 样本末尾可能截断多字节字符，使用增量解码器且不结束输入
+        codecs.getincrementaldecoder('utf-8')().decode(sample, final=False)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        pass
+    # 0x80-0x9F 在latin-1中是控制字符，出现即视为Windows-1252（弯引号、破折号等）
+    if re.search(rb'[\x80-\x9f]', sample):
+        try:
+            sample.decode('cp1252')
+            return 'cp1252'
+        except UnicodeDecodeError:
+            pass
+    return 'latin-1'
+
+
+def iter_text_lines(source, encoding: Optional[str] = None) -> Iterator[str]:
+    """
+    将上传文件、字节串或字符串转换为逐行文本迭代器
+
+    二进制输入只读取一次开头样本探测编码，之后边读边增量解码，不整体解码、不重复尝试多种编码
+
+    Args:
+        source: Streamlit上传文件/二进制文件对象、bytes 或 str
+        encoding: 已知编码（如并行解析时由整个文件开头探测一次），为空时从 source 开头探测
+
+    Yields:
+        str: 去掉行尾换行符的文本行
+    """
+    if isinstance(source, str):
+        for line in io.StringIO(source.lstrip('\ufeff')):
+            yield line.rstrip('\r\n')
+        return
+
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source = io.BytesIO(source)
+    elif not (hasattr(source, 'seekable') and source.seekable()):
+        source = io.BytesIO(source.read())
+
+    source.seek(0)
+    if encoding is None:
+        encoding = detect_encoding(source.read(ENCODING_SAMPLE_SIZE))
+        source.seek(0)
+
+    text = io.TextIOWrapper(source, encoding=encoding, errors='wos_latin1_fallback')
+    try:
+        for line in text:
+            yield line.rstrip('\r\n')
+    finally:
+        # 不关闭调用方的文件对象
+        text.detach()
+
+
+def iter_wos_records(source, tags: Optional[Iterable[str]] = None,
+                     header: Optional[dict] = None, encoding: Optional[str] = None) -> Iterator[Dict[str, str]]:
+    """
+    单遍流式解析WOS纯文本导出文件，逐条产出记录
+
+    字段行格式为「两位字段代码 + 空格 + 内容」，以三个空格开头的行为上一字段的续行；
+    ER 表示记录结束，EF 表示文件结束（拼接的多个导出文件会依次解析）。同一记录内重复出现的字段以分号连接。
+
+    Args:
+        source: Streamlit上传文件/二进制文件对象、bytes 或 str
+        tags: 需要保留的字段代码，默认使用 WOS_FIELD_TAGS
+        header: 可选字典，解析过程中写入文件头的 FN / VR 信息
+        encoding: 已知编码，为空时自动探测（见 iter_text_lines）
+
+    Yields:
+        Dict[str, str]: 以WOS字段代码为键的单条记录
+    """
+    dispatch = build_tag_dispatch(tags)
+    parts: Dict[str, list] = {}
+    current = None
+
+    for line in iter_text_lines(source, encoding):
+        if not line:
+            continue
+
+        if line[0] == ' ':
+            # 续行：归入上一个字段
+            if current is not None:
+                value = line.strip()
+                if value:
+                    current.append(value)
+            continue
+
+        tag = line[:2]
+        if len(line) == 2 or line[2] == ' ':
+            if tag == 'ER' and line.rstrip() == 'ER':
+                if parts:
+                    yield {t: dispatch[t].join(v) for t, v in parts.items()}
+                parts = {}
+                current = None
+                continue
+            if tag == 'EF' and line.rstrip() == 'EF':
+                # 文件结束：多个导出文件拼接时其后可能紧跟下一个文件，继续扫描
+                parts = {}
+                current = None
+                continue
+            if tag in dispatch:
+                value = line[3:].strip()
+                current = parts.get(tag)
+                if current is None:
+                    current = parts[tag] = []
+                if value:
+                    current.append(value)
+                continue
+            if tag in WOS_HEADER_TAGS and header is not None:
+                header[tag] = line[3:].strip()
+        # 未识别的字段：丢弃其续行
+        current = None
+
+    if parts:
+        yield {t: dispatch[t].join(v) for t, v in parts.items()}
+
+
+# 列构建器默认的整数列与分类列（按重命名后的列名）
+WOS_INTEGER_COLUMNS = ('Year', 'TimesCited', 'TotalTimesCited')
+WOS_CATEGORICAL_COLUMNS = (
+    'Source', 'JournalAbbreviation', 'JournalISO', 'Language', 'DocumentType',
+    'PublicationType', 'Publisher', 'PublisherCity', 'WebOfScienceCategory',
+    'SubjectCategory', 'OpenAccess', 'WebOfScienceEdition',
+)
+
+
+def build_column_schema(field_mapping: Dict[str, str], tags: Optional[Iterable[str]] = None) -> Dict[str, str]:
+    """
+    构建列式解析的固定字段模式：字段代码 -> 目标列名
+
+    先按 field_mapping 的顺序放置已映射字段，其余有效字段按代码排序并保留原代码作为列名
+
+    Args:
+        field_mapping: 字段代码 -> 目标列名
+        tags: 有效字段代码，默认使用 WOS_FIELD_TAGS
+
+    Returns:
+        Dict[str, str]: 有序的字段模式
+    """
+    tags = (WOS_FIELD_TAGS if tags is None else frozenset(tags)) - WOS_HEADER_TAGS
+    schema = {tag: column for tag, column in field_mapping.items() if tag in tags}
+    for tag in sorted(tags - schema.keys()):
+        schema[tag] = tag
+    return schema
+
+
+class WOSColumnBuilder:
+    """
+    列式记录构建器：按固定字段模式把每条记录直接写入各列缓冲区，
+    最后一次性构建已重命名、已定型的DataFrame（不经过 list-of-dicts）
+    """
+
+    def __init__(self, field_mapping: Dict[str, str],
+                 integer_columns: Iterable[str] = WOS_INTEGER_COLUMNS,
+                 categorical_columns: Iterable[str] = WOS_CATEGORICAL_COLUMNS,
+                 required_columns: Iterable[str] = ('Year',)):
+        """
+        Args:
+            field_mapping: 字段代码 -> 目标列名；多个字段映射到同一列时以分号合并
+            integer_columns: 需转换为整数的列
+            categorical_columns: 需转换为分类类型的重复文本列
+            required_columns: 缺失即丢弃该记录的列
+        """
+        column_tags: Dict[str, list] = {}
+        for tag, column in field_mapping.items():
+            column_tags.setdefault(column, []).append(tag)
+        self.tags = frozenset(field_mapping)
+        self.columns = list(column_tags)
+        self._column_tags = [(column, tuple(tags)) for column, tags in column_tags.items()]
+        self._buffers = {column: [] for column in self.columns}
+        self._slots = [(self._buffers[column], tags) for column, tags in self._column_tags]
+        self.integer_columns = tuple(integer_columns)
+        self.categorical_columns = tuple(categorical_columns)
+        self.required_columns = tuple(required_columns)
+        self.n_records = 0
+
+    def append(self, record: Dict[str, str]):
+        """将单条记录写入列缓冲区"""
+        get = record.get
+        for buffer, tags in self._slots:
+            if len(tags) == 1:
+                buffer.append(get(tags[0]))
+            else:
+                values = [record[tag] for tag in tags if tag in record]
+                buffer.append(';'.join(values) if values else None)
+        self.n_records += 1
+
+    def extend(self, records: Iterable[Dict[str, str]]):
+        """批量写入记录"""
+        for record in records:
+            self.append(record)
+        return self
+
+    def to_frame(self) -> pd.DataFrame:
+        """一次性构建DataFrame：丢弃全空列，整数列与分类列直接定型"""
+        data = {column: buffer for column, buffer in self._buffers.items()
+                if any(value is not None for value in buffer)}
+        df = pd.DataFrame(data)
+        if df.empty:
+            return df
+
+        for column in self.integer_columns:
+            if column in df.columns:
+                df[column] = pd.to_numeric(df[column], errors='coerce')
+        required = [column for column in self.required_columns if column in df.columns]
+        if required:
+            df = df.dropna(subset=required).reset_index(drop=True)
+        for column in self.integer_columns:
+            if column in df.columns:
+                df[column] = df[column].fillna(0).astype('int64')
+        for column in self.categorical_columns:
+            if column in df.columns:
+                df[column] = df[column].astype('category')
+        return df
+
+
+def parse_wos_columns(source, field_mapping: Dict[str, str], header: Optional[dict] = None,
+                      encoding: Optional[str] = None, **builder_options) -> pd.DataFrame:
+    """
+    流式解析WOS文件并直接构建列式DataFrame
+
+    Args:
+        source: Streamlit上传文件/二进制文件对象、bytes 或 str
+        field_mapping: 字段代码 -> 目标列名（同时决定保留哪些字段）
+        header: 可选字典，解析过程中写入文件头的 FN / VR 信息
+        encoding: 已知编码，为空时自动探测（见 iter_text_lines）
+        **builder_options: 传递给 WOSColumnBuilder 的类型选项
+
+    Returns:
+        pd.DataFrame: 已重命名、已定型的数据框
+    """
+    builder = WOSColumnBuilder(field_mapping, **builder_options)
+    builder.extend(iter_wos_records(source, tags=builder.tags, header=header, encoding=encoding))
+    return builder.to_frame()
@@ -609,7 +609,7 @@ def st_multiselect(label, options, default):
 
 
 # File Upload
-def st_file_uploader(content, type,label_visibility="collapsed"):
+def st_file_uploader(content, type,label_visibility="collapsed", accept_multiple_files=False):
     st.markdown(f"""
         <style>
             .stFileUploader>div>div {{
@@ -621,7 +621,7 @@ def st_file_uploader(content, type,label_visibility="collapsed"):
             }}
         </style>
     """, unsafe_allow_html=True)
-    return st.file_uploader(content, type, label_visibility="collapsed")
+    return st.file_uploader(content, type, accept_multiple_files=accept_multiple_files, label_visibility="collapsed")
 
 
 # Warning
@@ -34,7 +34,7 @@ from Calculate_Anaysis.Calculate_Citiation import calculate_number_of_total_Time
 from Calculate_Anaysis.Calculate_Year import exact_targetarticles_within_yearspan,calculate_age
 from Result_Visualization.Descriptive_Statistics import Form_Information_Description,shift_edited_df_into_list
 from Result_Visualization.Publications_and_Authors import draw_author_density_visualiaztion,draw_author_overlay_visualiaztion,draw_author_network_visualiaztion
-from Documents_Processing.Uploading_Files import Load_TXT,Load_CSV,Load_Refine,Extract_Info_From_Refine
+from Documents_Processing.Uploading_Files import Load_TXT,Load_TXT_Batch_With_Progress,Load_CSV,Load_Refine,Extract_Info_From_Refine
 from Documents_Processing.Web_Format import st_header, st_subheader, st_selectbox, st_card, st_tags, st_radio, st_button, st_slider, st_checkbox, st_text_area, st_text_input, \
     st_multiselect, st_warning, st_markdown, st_latex, st_table, st_dataframe, st_sidebar_slider, st_file_uploader, st_expander,st_subsubheader,set_page_title_with_image
 
@@ -60,10 +60,11 @@ def slider_callback():
 def process_wos_page_upload():
     st.subheader("📁 Upload Literature Data File")
     st.markdown("**请上传文献数据文件**")
-    st.info("💡 支持WOS导出文件(.txt)、CSV数据文件(.csv)、BibTeX文献文件(.bib)")
-    uploaded_file = st.file_uploader(
+    st.info("💡 支持WOS导出文件(.txt)、CSV数据文件(.csv)、BibTeX文献文件(.bib)；可同时选择多个WOS导出文件并行解析合并")
+    uploaded_files = st.file_uploader(
         "选择文献数据文件", 
         type=["txt", "csv", "bib"], 
+        accept_multiple_files=True,
         key="wos_main_file"
     )
     
@@ -77,11 +78,18 @@ def process_wos_page_upload():
         key="wos_refine_file"
     )
 
-    if uploaded_file is not None:
+    if uploaded_files:
         file_exists = True
+        uploaded_file = uploaded_files[0]
         try:
             # 根据文件类型选择解析器
-            if uploaded_file.name.endswith('.txt'):
+            if len(uploaded_files) > 1:
+                # 多个WOS导出文件：进程池并行解析，按UT与DOI去重后合并
+                if not all(f.name.endswith('.txt') for f in uploaded_files):
+                    st.error("多文件上传仅支持WOS导出的.txt文件")
+                    return pd.DataFrame(), False
+                df = Load_TXT_Batch_With_Progress(uploaded_files)
+            elif uploaded_file.name.endswith('.txt'):
                 # 使用增强的WOS解析器
                 try:
                     from .Uploading_Files import Load_TXT_Enhanced
@@ -9,11 +9,16 @@ from plotly.subplots import make_subplots
 import pandas as pd
 import numpy as np
 from wordcloud import WordCloud
-import networkx as nx
 from collections import Counter
 import re
 import seaborn as sns
 
+from Calculate_Anaysis.Community_Detection import DEFAULT_RESOLUTION
+from Calculate_Anaysis.Corpus import as_corpus
+from Calculate_Anaysis.Incidence_Matrix import DEFAULT_MAX_AUTHORS
+from Result_Visualization.Network_Cache import cached_network
+from Result_Visualization.Network_Visualization import line_segments, scatter_class
+
 class EnhancedVisualization:
     """Enhanced visualization class for literature analysis"""
     
@@ -66,61 +71,41 @@ class EnhancedVisualization:
             print(f"Error creating timeline: {e}")
             return None
     
-    def create_author_network(self, df, min_collab=2):
-        """Create author collaboration network"""
+    def create_author_network(self, df, min_collab=2, mode='full', max_authors=DEFAULT_MAX_AUTHORS,
+                              resolution=DEFAULT_RESOLUTION):
+        """
+        Create author collaboration network
+
+        mode: 'full' counts every co-authored paper once per pair, 'fractional' weights each paper by 1/(n-1);
+        papers with more than max_authors authors are skipped when counting pairs.
+        Nodes are coloured by collaboration cluster (modularity optimisation at the given resolution).
+        """
         try:
-            if '作者' not in df.columns:
+            corpus = as_corpus(df)
+            if not corpus.has('authors'):
                 return None
             
-            # Extract author collaborations
-            collaborations = []
-            for authors in df['作者'].dropna():
-                author_list = [author.strip() for author in str(authors).split(';')]
-                if len(author_list) > 1:
-                    for i in range(len(author_list)):
-                        for j in range(i+1, len(author_list)):
-                            collaborations.append((author_list[i], author_list[j]))
+            # Collaboration matrix (sparse XᵀX on the doc×author matrix); thresholding, clusters and layout are
+            # cached by graph fingerprint, so raising min_collab filters the stored layout instead of recomputing it
+            authors = corpus.authors
+            view = cached_network(authors.pair_matrix(mode=mode, max_items=max_authors), authors.labels,
+                                  min_weight=min_collab, resolution=resolution, k=1)
             
-            if not collaborations:
+            if view is None:
                 return None
             
-            # Count collaborations
-            collab_counts = Counter(collaborations)
-            filtered_collabs = {k: v for k, v in collab_counts.items() if v >= min_collab}
-            
-            if not filtered_collabs:
-                return None
+            # Create plotly network: every edge in one NaN-separated line, node arrays straight from the cached view
+            trace_class = scatter_class(len(view.nodes))
+            source, target = view.edge_pairs
+            edge_x, edge_y = line_segments(view.positions[source], view.positions[target])
             
-            # Create network graph
-            G = nx.Graph()
-            for (author1, author2), weight in filtered_collabs.items():
-                G.add_edge(author1, author2, weight=weight)
-            
-            # Get layout
-            pos = nx.spring_layout(G, k=1, iterations=50)
-            
-            # Create plotly network
-            edge_x = []
-            edge_y = []
-            for edge in G.edges():
-                x0, y0 = pos[edge[0]]
-                x1, y1 = pos[edge[1]]
-                edge_x.extend([x0, x1, None])
-                edge_y.extend([y0, y1, None])
-            
-            node_x = []
-            node_y = []
-            node_text = []
-            for node in G.nodes():
-                x, y = pos[node]
-                node_x.append(x)
-                node_y.append(y)
-                node_text.append(node)
+            palette = np.array(px.colors.qualitative.Plotly, dtype=object)
+            node_hover = [f"{node}<br>Cluster {cluster + 1}" for node, cluster in zip(view.nodes, view.clusters)]
             
             fig = go.Figure()
             
             # Add edges
-            fig.add_trace(go.Scatter(
+            fig.add_trace(trace_class(
                 x=edge_x, y=edge_y,
                 line=dict(width=2, color='#888'),
                 hoverinfo='none',
@@ -129,13 +114,14 @@ class EnhancedVisualization:
             ))
             
             # Add nodes
-            fig.add_trace(go.Scatter(
-                x=node_x, y=node_y,
+            fig.add_trace(trace_class(
+                x=view.positions[:, 0], y=view.positions[:, 1],
                 mode='markers+text',
                 hoverinfo='text',
-                text=node_text,
+                text=list(view.nodes),
+                hovertext=node_hover,
                 textposition="middle center",
-                marker=dict(size=20, color=self.plotly_colors[0]),
+                marker=dict(size=20, color=list(palette[view.clusters % len(palette)])),
                 name='Authors'
             ))
             
@@ -145,7 +131,8 @@ class EnhancedVisualization:
                 hovermode='closest',
                 margin=dict(b=20,l=5,r=5,t=40),
                 annotations=[ dict(
-                    text="Author collaboration network based on co-authorship",
+                    text=f"Author collaboration network based on co-authorship "
+                         f"({view.n_clusters} clusters, Q = {view.modularity:.3f})",
                     showarrow=False,
                     xref="paper", yref="paper",
                     x=0.005, y=-0.002,
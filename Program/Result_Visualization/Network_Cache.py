@@ -0,0 +1,251 @@
+"""
+网络与布局缓存
+Streamlit 每次调整筛选控件都会重新运行脚本；这里把阈值筛选后的网络、社区划分与节点坐标缓存在进程内，
+键为「未筛选矩阵的边集指纹 + 布局参数」（同一网络族）加上阈值与分辨率：
+- 完全相同的请求直接返回缓存结果
+- 阈值提高只删除边和节点时，从同族已缓存的布局中按节点筛选坐标，不再重新布局（社区在小网络上重新计算）
+- 阈值降低出现新节点时，用同族已有坐标热启动布局
+可选在阈值筛选之后剪枝（top-k、最大生成树、Pathfinder 等），剪枝方式不同的布局互不复用坐标，只用于热启动
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional, Sequence
+
+import networkx as nx
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+from Calculate_Anaysis.Community_Detection import DEFAULT_RESOLUTION, detect_communities
+from Calculate_Anaysis.Incidence_Matrix import edge_frame
+from Calculate_Anaysis.Network_Pruning import DEFAULT_TOP_K, prune_network
+from Result_Visualization.Network_Layout import DEFAULT_ITERATIONS, force_layout
+
+# 缓存的网络族数与每族保留的阈值视图数
+MAX_FAMILIES = 16
+MAX_VIEWS_PER_FAMILY = 8
+
+
+def graph_fingerprint(matrix: sp.spmatrix, labels: Sequence, **params) -> str:
+    """
+    边集指纹：SHA-1(矩阵结构与权重、节点名称、参数)
+
+    Args:
+        matrix: 实体×实体稀疏矩阵
+        labels: 行列对应的名称
+        **params: 参与计算的其他参数（如布局参数）
+
+    Returns:
+        str: 十六进制指纹
+    """
+    matrix = sp.csr_matrix(matrix)
+    matrix.sum_duplicates()
+    matrix.sort_indices()
+    digest = hashlib.sha1(repr((matrix.shape, sorted(params.items()))).encode())
+    for array in (matrix.indptr, matrix.indices, matrix.data.astype(np.float64)):
+        digest.update(np.ascontiguousarray(array).tobytes())
+    digest.update('\x1f'.join(map(str, labels)).encode())
+    return digest.hexdigest()
+
+
+class NetworkView:
+    """阈值筛选后的网络：节点、邻接矩阵、社区划分与坐标"""
+
+    def __init__(self, labels: np.ndarray, node_ids: np.ndarray, matrix: sp.csr_matrix, clusters: np.ndarray,
+                 modularity: float, positions: np.ndarray, reused_layout: bool):
+        """
+        Args:
+            labels: 族内全部节点名称
+            node_ids: 本视图节点在 labels 中的下标
+            matrix: 本视图节点间的邻接矩阵
+            clusters: 每个节点的聚类编号（0 为最大的聚类）
+            modularity: 模块度
+            positions: (节点数, 2) 坐标
+            reused_layout: 坐标是否直接取自已缓存的布局
+        """
+        self.node_ids = node_ids
+        self.nodes = np.asarray(labels, dtype=object)[node_ids]
+        self.matrix = matrix
+        self.clusters = clusters
+        self.modularity = modularity
+        self.positions = positions
+        self.reused_layout = reused_layout
+        self._graph = None
+
+    @property
+    def pos(self) -> Dict[Hashable, np.ndarray]:
+        """{节点: 坐标}，与 nx.spring_layout 的返回格式相同"""
+        return dict(zip(self.nodes, self.positions))
+
+    @property
+    def cluster_of(self) -> Dict[Hashable, int]:
+        """{节点: 聚类编号}"""
+        return dict(zip(self.nodes, self.clusters))
+
+    @property
+    def n_clusters(self) -> int:
+        return len(np.unique(self.clusters))
+
+    @property
+    def edge_pairs(self):
+        """每条边（上三角）两端节点在 nodes 中的下标 (source, target)"""
+        upper = sp.triu(self.matrix, k=1).tocoo()
+        return upper.row, upper.col
+
+    def edges(self) -> pd.DataFrame:
+        """边表 source, target, weight"""
+        return edge_frame(self.matrix, self.nodes, min_weight=None)
+
+    @property
+    def graph(self) -> nx.Graph:
+        """对应的 networkx 网络（首次访问时构建）"""
+        if self._graph is None:
+            graph = nx.Graph()
+            graph.add_nodes_from(self.nodes)
+            graph.add_weighted_edges_from(self.edges().itertuples(index=False, name=None))
+            self._graph = graph
+        return self._graph
+
+
+class _Family:
+    """同一未筛选矩阵、同一布局参数下的各阈值视图"""
+
+    def __init__(self, matrix: sp.csr_matrix, labels: np.ndarray):
+        self.matrix = matrix
+        self.labels = labels
+        # (阈值, 是否去掉孤立节点, 剪枝方式) -> (节点下标, 坐标)
+        self.layouts: 'OrderedDict[float, tuple]' = OrderedDict()
+        # (阈值, 分辨率, 是否去掉孤立节点, 剪枝方式) -> NetworkView
+        self.views: 'OrderedDict[tuple, NetworkView]' = OrderedDict()
+
+
+class NetworkCache:
+    """进程内的网络/布局缓存（按最近使用淘汰），Streamlit 各会话共享"""
+
+    def __init__(self, max_families: int = MAX_FAMILIES, max_views: int = MAX_VIEWS_PER_FAMILY):
+        self.max_families = max_families
+        self.max_views = max_views
+        self._families: 'OrderedDict[str, _Family]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def clear(self):
+        with self._lock:
+            self._families.clear()
+
+    def _family(self, key: str, matrix: sp.csr_matrix, labels: np.ndarray) -> _Family:
+        with self._lock:
+            family = self._families.get(key)
+            if family is None:
+                family = self._families[key] = _Family(matrix, labels)
+                while len(self._families) > self.max_families:
+                    self._families.popitem(last=False)
+            self._families.move_to_end(key)
+            return family
+
+    def network(self, matrix: sp.spmatrix, labels: Sequence, min_weight: float = 1,
+                resolution: float = DEFAULT_RESOLUTION, drop_isolates: bool = True, seed: Optional[int] = 42,
+                k: Optional[float] = None, iterations: int = DEFAULT_ITERATIONS, pruning: Optional[str] = None,
+                top_k: int = DEFAULT_TOP_K, max_edges: Optional[int] = None) -> Optional[NetworkView]:
+        """
+        取阈值筛选（及剪枝）后的网络视图（社区划分 + 布局），尽量复用缓存
+
+        Args:
+            matrix: 未筛选的实体×实体对称矩阵（如 EntityLinks.pair_matrix()）
+            labels: 行列对应的名称
+            min_weight: 边的最小权重
+            resolution: 社区发现的分辨率
+            drop_isolates: 是否去掉筛选后没有边的节点
+            seed: 布局与社区发现的随机种子
+            k, iterations: 布局参数，同 force_layout
+            pruning: 剪枝方式（见 PRUNING_METHODS），为空时不剪枝
+            top_k: top_k 剪枝每个节点保留的边数
+            max_edges: 剪枝后最多保留的边数，为空时不限制
+
+        Returns:
+            NetworkView: 筛选后没有任何边时返回 None
+        """
+        matrix = sp.csr_matrix(matrix)
+        labels = np.asarray(labels, dtype=object)
+        key = graph_fingerprint(matrix, labels, seed=seed, k=k, iterations=iterations)
+        family = self._family(key, matrix, labels)
+        pruning_key = (pruning or 'none', top_k if pruning == 'top_k' else None, max_edges)
+        view_key = (min_weight, resolution, drop_isolates, pruning_key)
+        with self._lock:
+            view = family.views.get(view_key)
+            if view is not None:
+                family.views.move_to_end(view_key)
+                return view
+
+        entries = family.matrix.tocoo()
+        keep = entries.row != entries.col
+        if min_weight:
+            keep &= entries.data >= min_weight
+        filtered = sp.csr_matrix((entries.data[keep], (entries.row[keep], entries.col[keep])), shape=entries.shape)
+        if pruning or max_edges:
+            filtered = prune_network(filtered, pruning, k=top_k, max_edges=max_edges)
+        if filtered.nnz == 0:
+            return None
+        if drop_isolates:
+            node_ids = np.flatnonzero(np.diff(filtered.indptr) > 0)
+        else:
+            node_ids = np.arange(len(labels))
+        filtered = filtered[node_ids][:, node_ids]
+
+        positions, reused = self._positions(family, (min_weight, drop_isolates, pruning_key), node_ids, filtered,
+                                            seed=seed, k=k, iterations=iterations)
+        clusters, modularity = detect_communities(filtered, resolution=resolution, seed=seed)
+        view = NetworkView(labels, node_ids, filtered, clusters, modularity, positions, reused)
+        with self._lock:
+            family.views[view_key] = view
+            while len(family.views) > self.max_views:
+                family.views.popitem(last=False)
+        return view
+
+    def _positions(self, family: _Family, layout_key: tuple, node_ids: np.ndarray, matrix: sp.csr_matrix,
+                   **layout_params):
+        """布局坐标：同族缓存中有覆盖全部节点、阈值不高于本次的布局时直接筛选，否则（热启动）重新布局"""
+        min_weight = layout_key[0] or 0
+        with self._lock:
+            cached = list(family.layouts.items())
+        best_superset, best_overlap = None, None
+        for (cached_weight, cached_isolates, cached_pruning), (cached_ids, cached_positions) in cached:
+            if (cached_weight, cached_isolates, cached_pruning) == layout_key:
+                return cached_positions, True
+            position_of = np.full(len(family.labels), -1, dtype=np.int64)
+            position_of[cached_ids] = np.arange(len(cached_ids))
+            index = position_of[node_ids]
+            known = index >= 0
+            # 阈值提高只会删除边：剪枝方式相同、节点全部已定位即可复用
+            if known.all() and (cached_weight or 0) <= min_weight and cached_pruning == layout_key[2]:
+                if best_superset is None or len(cached_ids) < best_superset[0]:
+                    best_superset = (len(cached_ids), cached_positions[index])
+            elif known.any() and (best_overlap is None or known.sum() > best_overlap[0]):
+                initial = np.full((len(node_ids), 2), np.nan)
+                initial[known] = cached_positions[index[known]]
+                best_overlap = (known.sum(), initial)
+
+        if best_superset is not None:
+            return best_superset[1], True
+        initial = best_overlap[1] if best_overlap is not None else None
+        positions = force_layout(matrix, initial=initial, **layout_params)
+        with self._lock:
+            family.layouts[layout_key] = (node_ids, positions)
+            while len(family.layouts) > self.max_views:
+                family.layouts.popitem(last=False)
+        return positions, False
+
+
+# 进程内共享的默认缓存
+_NETWORK_CACHE = NetworkCache()
+
+
+def cached_network(matrix: sp.spmatrix, labels: Sequence, min_weight: float = 1,
+                   resolution: float = DEFAULT_RESOLUTION, drop_isolates: bool = True, seed: Optional[int] = 42,
+                   k: Optional[float] = None, iterations: int = DEFAULT_ITERATIONS, pruning: Optional[str] = None,
+                   top_k: int = DEFAULT_TOP_K, max_edges: Optional[int] = None) -> Optional[NetworkView]:
+    """使用默认缓存的 NetworkCache.network"""
+    return _NETWORK_CACHE.network(matrix, labels, min_weight=min_weight, resolution=resolution,
+                                  drop_isolates=drop_isolates, seed=seed, k=k, iterations=iterations,
+                                  pruning=pruning, top_k=top_k, max_edges=max_edges)
@@ -0,0 +1,264 @@
+"""
+网络布局
+Fruchterman-Reingold 力导向布局的 NumPy 实现，用于替换 nx.spring_layout（力模型、k 与温度退火与 networkx 一致）：
+- 引力：只沿稀疏矩阵中的边计算，O(边数)
+- 斥力：节点数不多时两两精确计算；否则用 Barnes-Hut 近似。四叉树按层展开为 2^L×2^L 网格，
+  每层用 bincount 得到各格子的质量与质心，节点只与"父格子相邻、自身不相邻"的格子按质心计算斥力
+  （其中整块不相邻的父格子合并为一次计算），最细一层相邻格子内的节点两两精确计算；
+  每层都是整批向量化运算，单次迭代 O(n log n)
+- 支持用已有坐标热启动（缺失节点放在已定位邻居的均值附近，并降低初始温度）、固定随机种子、
+  平均位移低于阈值时提前停止
+"""
+
+from typing import Dict, Hashable, Optional
+
+import networkx as nx
+import numpy as np
+import scipy.sparse as sp
+
+# 节点数不超过该值时斥力两两精确计算
+EXACT_LAYOUT_LIMIT = 1000
+
+DEFAULT_ITERATIONS = 50
+
+# 热启动时的初始温度（相对冷启动）
+_WARM_TEMPERATURE = 0.2
+
+# 最细网格每个节点平均近场节点对数的上限，超出时网格再细分一层
+_NEAR_PAIRS_PER_NODE = 32
+_MAX_DEPTH = 10
+
+
+# 节点所在格子位于父格子左下角时的相互作用表（其他位置按奇偶镜像）：
+# 父格子相邻的 3×3 个父格子中，与自身格子相邻的 4 个父格子逐个子格子计算（去掉相邻的 3×3），其余 5 个按父格子整体计算
+_CHILD_OFFSETS = np.array([(dx, dy) for dx in range(-2, 2) for dy in range(-2, 2) if max(abs(dx), abs(dy)) > 1])
+_PARENT_OFFSETS = np.array([(dx, dy) for dx in range(-1, 2) for dy in range(-1, 2) if dx == 1 or dy == 1])
+
+# 网格四周补的空格子圈数，以及空格子的质心（质量为0，只需保证不与求值点重合）
+_PAD = 2
+_FAR = 1e9
+
+
+def _grid(points: np.ndarray, unit: np.ndarray, level: int):
+    """
+    第 level 层网格：每个节点的格子坐标，以及四周补两圈空格子后的各格子质量与质心
+    坐标用复数 x+iy 表示；空格子质心放在远处，邻格查找无需越界判断
+    """
+    side = 1 << level
+    padded = side + 2 * _PAD
+    cell = np.minimum((unit * side).astype(np.int64), side - 1)
+    flat = (cell[:, 0] + _PAD) * padded + cell[:, 1] + _PAD
+    mass = np.bincount(flat, minlength=padded * padded).astype(np.float64)
+    occupied = mass > 0
+    com = np.full(padded * padded, _FAR, dtype=np.complex128)
+    com.real[occupied] = np.bincount(flat, weights=points.real, minlength=padded * padded)[occupied] / mass[occupied]
+    com.imag[occupied] = np.bincount(flat, weights=points.imag, minlength=padded * padded)[occupied] / mass[occupied]
+    return cell, mass, com
+
+
+def _level_force(points: np.ndarray, cell: np.ndarray, level: int, grids, k2: float) -> np.ndarray:
+    """求值点受到第 level 层相互作用表中全部格子的斥力（父格子整体计算的部分取第 level-1 层）"""
+    force = np.zeros_like(points)
+    sign = 1 - 2 * (cell & 1)
+    for offsets, grid_level, origin in ((_CHILD_OFFSETS, level, cell), (_PARENT_OFFSETS, level - 1, cell >> 1)):
+        padded = (1 << grid_level) + 2 * _PAD
+        mass, com = grids[grid_level][1], grids[grid_level][2]
+        base = (origin[:, 0] + _PAD) * padded + origin[:, 1] + _PAD
+        for offset_x, offset_y in offsets:
+            target = base + sign[:, 0] * (offset_x * padded) + sign[:, 1] * offset_y
+            # Δ/|Δ|² = 1/conj(Δ)；远场格子与求值点至少相隔一个格子，无需截断距离
+            force += mass[target] / np.conj(points - com[target])
+    return force * k2
+
+
+def _far_field(pos: np.ndarray, unit: np.ndarray, depth: int, k2: float) -> np.ndarray:
+    """
+    Barnes-Hut 远场斥力：逐层按格子质心近似
+    最细两层逐节点求值；更粗的层在细两层的格子质心处求值后分给格子内的节点（格子远小于相互作用距离）
+    """
+    points = pos[:, 0] + 1j * pos[:, 1]
+    grids = {level: _grid(points, unit, level) for level in range(1, depth + 1)}
+    force = np.zeros_like(points)
+    for level in range(2, depth + 1):
+        evaluation = level + 2
+        if evaluation > depth:
+            force += _level_force(points, grids[level][0], level, grids, k2)
+            continue
+        # 求值点：第 evaluation 层的非空格子质心
+        cell, mass, com = grids[evaluation]
+        padded = (1 << evaluation) + 2 * _PAD
+        flat = (cell[:, 0] + _PAD) * padded + cell[:, 1] + _PAD
+        occupied, node_index = np.unique(flat, return_inverse=True)
+        ancestor = (np.stack([occupied // padded, occupied % padded], axis=1) - _PAD) >> (evaluation - level)
+        force += _level_force(com[occupied], ancestor, level, grids, k2)[node_index.reshape(-1)]
+    return np.stack([force.real, force.imag], axis=1)
+
+
+def _near_field(pos: np.ndarray, unit: np.ndarray, depth: int, k2: float) -> Optional[np.ndarray]:
+    """最细一层相邻格子（3×3）内的节点两两精确斥力；节点对过多时返回 None 以便细分网格"""
+    n = len(pos)
+    side = 1 << depth
+    cell = np.minimum((unit * side).astype(np.int64), side - 1)
+    flat = cell[:, 0] * side + cell[:, 1]
+    order = np.argsort(flat, kind='stable')
+    # 每个格子在排序后节点序列中的起点，末尾多一个哨兵
+    starts = np.concatenate([[0], np.cumsum(np.bincount(flat, minlength=side * side))])
+    pair_sources, pair_targets = [], []
+    total_pairs = 0
+    # 斥力成对相反，只需查自身格子和一半邻格，另一半由反向累加得到
+    for offset_x, offset_y in ((0, 0), (0, 1), (1, -1), (1, 0), (1, 1)):
+        other_x = cell[:, 0] + offset_x
+        other_y = cell[:, 1] + offset_y
+        rows = np.flatnonzero((other_x < side) & (other_y >= 0) & (other_y < side))
+        target = other_x[rows] * side + other_y[rows]
+        start = starts[target]
+        count = starts[target + 1] - start
+        total_pairs += count.sum()
+        if total_pairs > _NEAR_PAIRS_PER_NODE * n / 2 and depth < _MAX_DEPTH:
+            return None
+        # 不等长区间展开：每个节点与目标格子中的全部节点配对
+        source = np.repeat(rows, count)
+        within = np.arange(count.sum()) - np.repeat(np.cumsum(count) - count, count)
+        other = order[np.repeat(start, count) + within]
+        if offset_x == 0 and offset_y == 0:
+            keep = source < other
+            source, other = source[keep], other[keep]
+        pair_sources.append(source)
+        pair_targets.append(other)
+    source = np.concatenate(pair_sources)
+    other = np.concatenate(pair_targets)
+    delta = pos[source] - pos[other]
+    delta *= (k2 / np.maximum((delta * delta).sum(axis=1), 1e-4))[:, None]
+    force = np.empty((n, 2))
+    for axis in range(2):
+        force[:, axis] = (np.bincount(source, weights=delta[:, axis], minlength=n)
+                          - np.bincount(other, weights=delta[:, axis], minlength=n))
+    return force
+
+
+def _repulsion(pos: np.ndarray, k: float, exact: bool) -> np.ndarray:
+    """斥力位移 Σ k²/d²·(xi−xj)"""
+    k2 = k * k
+    if exact:
+        delta = pos[:, None, :] - pos[None, :, :]
+        distance2 = np.maximum((delta * delta).sum(axis=2), 1e-4)
+        np.fill_diagonal(distance2, np.inf)
+        return np.einsum('ijk,ij->ik', delta, k2 / distance2)
+
+    lower = pos.min(axis=0)
+    span = max(float((pos.max(axis=0) - lower).max()), 1e-9) * (1 + 1e-9)
+    unit = (pos - lower) / span
+    depth = int(np.clip(np.ceil(np.log2(np.sqrt(len(pos)))), 2, _MAX_DEPTH))
+    near = _near_field(pos, unit, depth, k2)
+    while near is None:
+        depth += 1
+        near = _near_field(pos, unit, depth, k2)
+    return near + _far_field(pos, unit, depth, k2)
+
+
+def _initial_positions(adjacency: sp.csr_matrix, initial: Optional[np.ndarray],
+                       rng: np.random.Generator) -> np.ndarray:
+    """初始坐标（单位正方形内）：未给定的节点放在已定位邻居的均值附近，没有已定位邻居时随机"""
+    n = adjacency.shape[0]
+    pos = rng.random((n, 2))
+    if initial is None:
+        return pos
+    known = ~np.isnan(initial).any(axis=1)
+    if not known.any():
+        return pos
+    placed = initial[known]
+    lower = placed.min(axis=0)
+    span = max(float((placed.max(axis=0) - lower).max()), 1e-9)
+    pos[known] = (placed - lower) / span
+    unknown = np.flatnonzero(~known)
+    if len(unknown):
+        neighbours = adjacency[unknown][:, known]
+        count = np.asarray(neighbours.sum(axis=1)).ravel()
+        has_neighbour = count > 0
+        mean = (neighbours @ pos[known]) / np.maximum(count, 1e-12)[:, None]
+        jitter = (rng.random((len(unknown), 2)) - 0.5) * 0.05
+        pos[unknown[has_neighbour]] = mean[has_neighbour] + jitter[has_neighbour]
+    return pos
+
+
+def force_layout(matrix: sp.spmatrix, initial: Optional[np.ndarray] = None, k: Optional[float] = None,
+                 iterations: int = DEFAULT_ITERATIONS, seed: Optional[int] = 42, threshold: float = 1e-4,
+                 exact_limit: int = EXACT_LAYOUT_LIMIT) -> np.ndarray:
+    """
+    力导向布局
+
+    Args:
+        matrix: 对称加权邻接矩阵（边权越大引力越强），对角线忽略
+        initial: 热启动坐标 (n, 2)，未知节点为 NaN；全部已知时初始温度降低以保持原布局
+        k: 最佳边长，默认 1/√n（与 networkx 一致）
+        iterations: 最大迭代次数
+        seed: 随机种子
+        threshold: 平均位移低于该值时提前停止
+        exact_limit: 节点数不超过该值时斥力精确计算
+
+    Returns:
+        np.ndarray: (n, 2) 坐标，居中并缩放到 [-1, 1]
+    """
+    adjacency = sp.coo_matrix(matrix)
+    n = adjacency.shape[0]
+    if n == 0:
+        return np.zeros((0, 2))
+    if n == 1:
+        return np.zeros((1, 2))
+    off_diagonal = adjacency.row != adjacency.col
+    source, target = adjacency.row[off_diagonal], adjacency.col[off_diagonal]
+    weight = adjacency.data[off_diagonal].astype(np.float64)
+    adjacency = sp.csr_matrix((weight, (source, target)), shape=(n, n))
+
+    rng = np.random.default_rng(seed)
+    pos = _initial_positions(adjacency, initial, rng)
+    k = np.sqrt(1.0 / n) if k is None else k
+    warm = initial is not None and not np.isnan(initial).any()
+    temperature = 0.1 * max(float(np.ptp(pos[:, 0])), float(np.ptp(pos[:, 1])))
+    if warm:
+        temperature *= _WARM_TEMPERATURE
+    cooling = temperature / (iterations + 1)
+    exact = n <= exact_limit
+
+    for _ in range(iterations):
+        displacement = _repulsion(pos, k, exact)
+        # 引力：每条边 −w·d/k·(xi−xj)
+        delta = pos[source] - pos[target]
+        distance = np.maximum(np.sqrt((delta * delta).sum(axis=1)), 0.01)
+        pull = weight * distance / k
+        displacement[:, 0] -= np.bincount(source, weights=pull * delta[:, 0], minlength=n)
+        displacement[:, 1] -= np.bincount(source, weights=pull * delta[:, 1], minlength=n)
+
+        length = np.maximum(np.sqrt((displacement * displacement).sum(axis=1)), 0.01)
+        step = displacement * (temperature / length)[:, None]
+        pos += step
+        temperature -= cooling
+        if np.linalg.norm(step) / n < threshold:
+            break
+
+    pos -= pos.mean(axis=0)
+    limit = np.abs(pos).max()
+    return pos / limit if limit > 0 else pos
+
+
+def spring_layout(G: nx.Graph, pos: Optional[Dict[Hashable, np.ndarray]] = None, k: Optional[float] = None,
+                  iterations: int = DEFAULT_ITERATIONS, seed: Optional[int] = 42, weight: Optional[str] = 'weight',
+                  threshold: float = 1e-4) -> Dict[Hashable, np.ndarray]:
+    """
+    nx.spring_layout 的替代：参数含义相同，返回 {节点: 坐标}
+
+    Args:
+        G: 网络
+        pos: 热启动坐标 {节点: (x, y)}，可只包含部分节点
+        k, iterations, seed, threshold: 同 force_layout
+        weight: 作为引力权重的边属性，为空时所有边权重为1
+    """
+    nodes = list(G)
+    if not nodes:
+        return {}
+    matrix = nx.to_scipy_sparse_array(G, nodelist=nodes, weight=weight, format='csr')
+    initial = None
+    if pos:
+        initial = np.array([pos.get(node, (np.nan, np.nan)) for node in nodes], dtype=np.float64)
+    coordinates = force_layout(matrix, initial, k=k, iterations=iterations, seed=seed, threshold=threshold)
+    return dict(zip(nodes, coordinates))
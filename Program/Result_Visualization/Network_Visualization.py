@@ -1,23 +1,140 @@
+"""
+网络图绘制
+所有边打包成一条以 NaN 分隔的折线（按线宽分成少数几组，每组一条 trace），节点坐标一次性组装为数组；
+节点数超过阈值时改用 WebGL（Scattergl），避免每条边一个 trace 导致浏览器卡死
+"""
+
+from typing import Dict, Hashable, Iterable, List, Optional, Sequence
+
+import numpy as np
 import plotly.graph_objects as go
 
+# 节点数超过该值时使用 WebGL 渲染
+WEBGL_NODE_THRESHOLD = 1000
+
+# 边按线宽分组的默认组数
+DEFAULT_WIDTH_BUCKETS = 4
+
+
+def use_webgl(n_nodes: int, threshold: int = WEBGL_NODE_THRESHOLD) -> bool:
+    """节点数超过阈值时使用 WebGL"""
+    return n_nodes > threshold
+
+
+def scatter_class(n_nodes: int, threshold: int = WEBGL_NODE_THRESHOLD):
+    """按节点数选择 go.Scatter 或 go.Scattergl"""
+    return go.Scattergl if use_webgl(n_nodes, threshold) else go.Scatter
+
+
+def node_positions(pos: Dict[Hashable, Sequence[float]], nodes: Iterable[Hashable]) -> np.ndarray:
+    """
+    节点坐标数组
+
+    Args:
+        pos: {节点: (x, y)}
+        nodes: 节点顺序
+
+    Returns:
+        np.ndarray: (节点数, 2)
+    """
+    coordinates = np.array([pos[node] for node in nodes], dtype=np.float64)
+    return coordinates.reshape(-1, 2)
+
+
+def line_segments(start: np.ndarray, end: np.ndarray):
+    """
+    线段的折线坐标：每段 (起点, 终点, NaN)，整体一个数组
+
+    Args:
+        start: (线段数, 2) 起点坐标
+        end: (线段数, 2) 终点坐标
+
+    Returns:
+        tuple: (x, y) 两个长度为 3×线段数 的数组
+    """
+    start = np.asarray(start, dtype=np.float64).reshape(-1, 2)
+    end = np.asarray(end, dtype=np.float64).reshape(-1, 2)
+    x = np.full((len(start), 3), np.nan)
+    y = np.full((len(start), 3), np.nan)
+    x[:, 0], x[:, 1] = start[:, 0], end[:, 0]
+    y[:, 0], y[:, 1] = start[:, 1], end[:, 1]
+    return x.ravel(), y.ravel()
+
+
+def edge_traces(pos: Dict[Hashable, Sequence[float]], edges: Iterable, width_scale: float = 1.0,
+                color: str = '#888', buckets: Optional[int] = DEFAULT_WIDTH_BUCKETS, webgl: bool = False,
+                width: Optional[float] = None) -> List[go.Scatter]:
+    """
+    网络边的 trace：全部边按线宽分组，每组一条 NaN 分隔的折线
+
+    Args:
+        pos: {节点: (x, y)}
+        edges: (source, target, weight) 三元组序列，如 G.edges(data='weight', default=1)
+        width_scale: 线宽 = 权重 × width_scale
+        color: 线条颜色
+        buckets: 线宽分组数；不同线宽不超过该值时每种线宽一组，否则按分位数分组、取组内平均线宽；
+                 为空或 1 时所有边一组
+        webgl: 是否使用 Scattergl
+        width: 指定统一线宽（忽略权重）
+
+    Returns:
+        list: trace 列表（没有边时为空）
+    """
+    edges = list(edges)
+    if not edges:
+        return []
+    sources, targets, weights = zip(*edges)
+    start, end = node_positions(pos, sources), node_positions(pos, targets)
+    if width is not None:
+        widths = np.full(len(edges), float(width))
+    else:
+        widths = np.asarray(weights, dtype=np.float64) * width_scale
+
+    distinct = np.unique(widths)
+    if not buckets or buckets <= 1:
+        group = np.zeros(len(widths), dtype=np.int64)
+        group_widths = np.array([widths.mean()])
+    elif len(distinct) <= buckets:
+        group = np.searchsorted(distinct, widths)
+        group_widths = distinct
+    else:
+        bounds = np.unique(np.quantile(widths, np.linspace(0, 1, buckets + 1))[1:-1])
+        group = np.searchsorted(bounds, widths, side='right')
+        group_widths = np.bincount(group, weights=widths) / np.maximum(np.bincount(group), 1)
+
+    trace_class = go.Scattergl if webgl else go.Scatter
+    traces = []
+    for index, group_width in enumerate(group_widths):
+        selected = np.flatnonzero(group == index)
+        if len(selected) == 0:
+            continue
+        x, y = line_segments(start[selected], end[selected])
+        traces.append(trace_class(
+            x=x, y=y,
+            mode='lines',
+            line=dict(width=float(group_width), color=color),
+            hoverinfo='none'
+        ))
+    return traces
+
 
 def draw_network_visualization(nodes_df, edges_df):
     fig = go.Figure()
 
+    # 节点沿一条直线排列（按在边、节点中首次出现的顺序）
+    order = list(dict.fromkeys(list(np.column_stack([edges_df["source"], edges_df["target"]]).ravel())
+                               + list(nodes_df["node"])))
+    pos = {node: (index, 1) for index, node in enumerate(order)}
+
     # 添加边
-    for _, row in edges_df.iterrows():
-        fig.add_trace(go.Scatter(
-            x=[row["source"], row["target"], None],
-            y=[1, 1, None],
-            mode="lines",
-            line=dict(width=row["weight"] / 2, color="#888"),
-            hoverinfo="none"
-        ))
+    for trace in edge_traces(pos, zip(edges_df["source"], edges_df["target"], edges_df["weight"]),
+                             width_scale=0.5, webgl=use_webgl(len(order))):
+        fig.add_trace(trace)
 
     # 添加节点
-    fig.add_trace(go.Scatter(
-        x=nodes_df["node"],
-        y=[1] * len(nodes_df),
+    fig.add_trace(scatter_class(len(order))(
+        x=[pos[node][0] for node in nodes_df["node"]],
+        y=np.ones(len(nodes_df)),
         mode="markers+text",
         marker=dict(
             size=nodes_df["size"],
@@ -47,10 +164,14 @@ def draw_author_network(nodes, edges):
     :param edges: 边数据（source, target, weight）
     :return: Plotly Figure对象
     """
-    # 创建节点数据
-    node_trace = go.Scatter(
-        x=[], y=[],  # 节点位置
-        text=[],  # 节点标签
+    nodes = list(nodes)
+    edges = list(edges)
+
+    # 创建节点数据（坐标一次性组装）
+    node_trace = scatter_class(len(nodes))(
+        x=np.array([node["x"] for node in nodes], dtype=np.float64),
+        y=np.array([node["y"] for node in nodes], dtype=np.float64),
+        text=[node["name"] for node in nodes],
         mode="markers+text",
         hoverinfo="text",
         marker=dict(
@@ -60,26 +181,17 @@ def draw_author_network(nodes, edges):
         )
     )
 
-    # 创建边数据
-    edge_trace = go.Scatter(
-        x=[], y=[],  # 边的起点和终点
+    # 创建边数据：所有边一条 NaN 分隔的折线
+    segments = np.array([(edge["source"]["x"], edge["source"]["y"], edge["target"]["x"], edge["target"]["y"])
+                         for edge in edges], dtype=np.float64).reshape(-1, 4)
+    edge_x, edge_y = line_segments(segments[:, :2], segments[:, 2:])
+    edge_trace = scatter_class(len(nodes))(
+        x=edge_x, y=edge_y,
         line=dict(width=1, color="#888"),
         hoverinfo="none",
         mode="lines"
     )
 
-    # 添加节点和边的位置信息
-    for node in nodes:
-        node_trace["x"] += (node["x"],)
-        node_trace["y"] += (node["y"],)
-        node_trace["text"] += (node["name"],)
-
-    for edge in edges:
-        x0, y0 = edge["source"]["x"], edge["source"]["y"]
-        x1, y1 = edge["target"]["x"], edge["target"]["y"]
-        edge_trace["x"] += (x0, x1, None)
-        edge_trace["y"] += (y0, y1, None)
-
     # 创建图
     fig = go.Figure(data=[edge_trace, node_trace])
 
@@ -1,6 +1,8 @@
 import networkx as nx
 import plotly.graph_objects as go
 import streamlit as st
+from Result_Visualization.Network_Layout import spring_layout
+from Result_Visualization.Network_Visualization import line_segments, node_positions, scatter_class
 def draw_author_network_visualiaztion():
     G = nx.Graph()
     # 添加节点和边，这里只是一个示例
@@ -14,13 +16,20 @@ def draw_author_network_visualiaztion():
     G.add_edges_from(edges)
 
     # 使用布局算法确定节点位置
-    pos = nx.spring_layout(G)
+    pos = spring_layout(G)
+
+    # 节点与边的坐标一次性组装为数组，所有边一条 NaN 分隔的折线
+    nodes = list(G.nodes())
+    node_xy = node_positions(pos, nodes)
+    edge_x, edge_y = line_segments(node_positions(pos, [edge[0] for edge in G.edges()]),
+                                   node_positions(pos, [edge[1] for edge in G.edges()]))
+    trace_class = scatter_class(len(nodes))
 
     # 创建节点的trace
-    node_trace = go.Scatter(
-        x=[],
-        y=[],
-        text=[],
+    node_trace = trace_class(
+        x=node_xy[:, 0],
+        y=node_xy[:, 1],
+        text=nodes,
         mode='markers+text',
         textposition="top center",
         hoverinfo='text',
@@ -30,39 +39,24 @@ def draw_author_network_visualiaztion():
             size=10,
             colorbar=dict(
                 thickness=15,
-                title='Node Connections',
-                xanchor='left',
-                titleside='right'
+                title=dict(text='Node Connections', side='right'),
+                xanchor='left'
             ),
             line_width=2)
     )
 
     # 创建边的trace
-    edge_trace = go.Scatter(
-        x=[],
-        y=[],
+    edge_trace = trace_class(
+        x=edge_x,
+        y=edge_y,
         line=dict(width=0.5, color='#888'),
         hoverinfo='none',
         mode='lines')
 
-    # 添加节点和边到trace
-    for edge in G.edges():
-        x0, y0 = pos[edge[0]]
-        x1, y1 = pos[edge[1]]
-        edge_trace['x'] += (x0, x1, None)
-        edge_trace['y'] += (y0, y1, None)
-
-    for node in G.nodes():
-        x, y = pos[node]
-        node_trace['x'] += (x,)
-        node_trace['y'] += (y,)
-        node_trace['text'] += (node,)
-
     # 创建Plotly图表
     fig = go.Figure(data=[edge_trace, node_trace],
                     layout=go.Layout(
-                        title='<br>Author Collaboration Network',
-                        titlefont_size=16,
+                        title=dict(text='<br>Author Collaboration Network', font=dict(size=16)),
                         showlegend=False,
                         hovermode='closest',
                         margin=dict(b=20, l=5, r=5, t=40),
@@ -102,7 +96,7 @@ def draw_author_overlay_visualiaztion():
     G.add_edges_from(edges)
 
     # 设置节点位置
-    pos = nx.spring_layout(G)
+    pos = spring_layout(G)
 
     # 创建节点和边的数据
     node_x = []
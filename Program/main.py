@@ -25,27 +25,44 @@ except ImportError:
         return st.selectbox(menu_title, options, index=default_index)
 import sys
 import os
+from Calculate_Anaysis.Calculate_Burst_Analysis import entity_bursts
 from Calculate_Anaysis.Calculate_Network import calculate_coupling
+from Calculate_Anaysis.Community_Detection import DEFAULT_RESOLUTION
+from Calculate_Anaysis.Corpus import Corpus, as_corpus, bind_corpus, combine_keywords
+from Calculate_Anaysis.Keyword_Normalizer import KEYWORD_SOURCES, KeywordNormalizer, read_thesaurus
+from Calculate_Anaysis.Incidence_Matrix import COUNTING_MODES, DEFAULT_MAX_AUTHORS, edge_frame
+from Calculate_Anaysis.Network_Pruning import DEFAULT_MAX_EDGES, DEFAULT_TOP_K, PRUNING_METHODS, limit_edges, threshold_edges
+from Calculate_Anaysis.Term_Extraction import DEFAULT_MAX_DF, DEFAULT_MAX_NGRAM, DEFAULT_MAX_TERMS, DEFAULT_MIN_DF, TERM_FIELDS, corpus_terms
+from Calculate_Anaysis.Thematic_Map import DEFAULT_MIN_INCLUSION, DEFAULT_THEME_KEYWORDS, DEFAULT_THEME_MIN_FREQUENCY, THEMATIC_QUADRANTS, thematic_evolution, thematic_map
+from Calculate_Anaysis.Main_Path import DEFAULT_KEY_ROUTES, MAIN_PATH_METHODS, SEARCH_PATH_WEIGHTS, citation_dag, main_path
+from Calculate_Anaysis.Local_Citation import DEFAULT_HISTORIOGRAPH_SIZE, historiograph, local_citation_scores, local_citations
+from Calculate_Anaysis.Reference_Coupling import COCITATION_LEVELS, cited_counts, cocitation_matrix, coupling_matrix
 try:
     from st_on_hover_tabs import on_hover_tabs
 except ImportError:
     # 如果导入失败，使用简单的替代方案
     def on_hover_tabs(tabName, iconName, default_choice=0):
         return st.selectbox("选择页面", tabName, index=default_choice)
-from Calculate_Anaysis.Calculate_Author import calculate_core_author_publication,calculate_number_of_authors_publication,process_author_data
+from Calculate_Anaysis.Calculate_Author import calculate_core_author_publication,calculate_number_of_authors_publication,process_author_data,warn_hyper_authored
 from Calculate_Anaysis.Calculate_Country import calculate_collaboration_countries
 from Calculate_Anaysis.Calculate_Publication import calculate_publications_per_year
 from Calculate_Anaysis.Calculate_Sources import calculate_number_of_sources
 from Calculate_Anaysis.Calculate_Keywords import calculate_number_of_keywords
-from Calculate_Anaysis.Calculate_Reference import calculate_number_of_total_references_cited,filter_references_by_authors,extract_each_article_author_refauthor
+from Calculate_Anaysis.Calculate_Reference import calculate_number_of_total_references_cited,filter_references_by_authors,extract_each_article_author_refauthor,extract_reference_info
 from Calculate_Anaysis.Calculate_Citiation import calculate_number_of_total_Timescitedcount
 from Calculate_Anaysis.Calculate_Year import exact_targetarticles_within_yearspan,calculate_age
 from Calculate_Anaysis.Calculate_Advanced import AdvancedAnalysis, calculate_advanced_metrics
 from Result_Visualization.Descriptive_Statistics import Form_Information_Description,shift_edited_df_into_list
 from Result_Visualization.Publications_and_Authors import draw_author_density_visualiaztion,draw_author_overlay_visualiaztion,draw_author_network_visualiaztion
 from Result_Visualization.Enhanced_Visualization import EnhancedVisualization, create_dashboard_summary
+from Result_Visualization.Network_Cache import cached_network
+from Result_Visualization.Network_Layout import spring_layout
 from Result_Visualization.Plot_Config import get_plot_config
-from Documents_Processing.Uploading_Files import Load_TXT,Load_CSV
+from Documents_Processing.Uploading_Files import Load_TXT,Load_TXT_Batch,Load_CSV
+from Documents_Processing.WOS_Stream_Parser import build_column_schema, parse_wos_columns
+from Documents_Processing.Enhanced_WOS_Parser import WOS_FIELD_MAPPING
+from Documents_Processing.WOS_Batch_Loader import PARALLEL_PARSE_THRESHOLD, parse_wos_file_parallel
+from Documents_Processing.Corpus_Cache import corpus_key, load_with_cache
 from Documents_Processing.Export_Functions import DataExporter, export_analysis_data, create_download_link, create_interactive_dashboard_export
 from Documents_Processing.Web_Format import st_header, st_subheader, st_selectbox, st_card, st_tags, st_radio, st_button, st_slider, st_checkbox, st_text_area, st_text_input, \
     st_multiselect, st_warning, st_markdown, st_latex, st_table, st_dataframe, st_sidebar_slider, st_file_uploader, st_expander,st_subsubheader,set_page_title_with_image
@@ -53,7 +70,7 @@ from Documents_Processing.Web_Process import process_wos_page_upload, process_da
     process_Journay_Analysis_Tab, process_Publication_Author_Tab_Most_Productive, project_root
 from Documents_Processing.Tab_Process import process_tabledescribe_tab,process_Publication_Author_Analysis_Tab,process_Publication_Author_Tab_Most_Productive,process_Overall_Information_Overview_Tab,process_Journay_Analysis_Tab,process_Country_Analysis_Tab
 from Documents_Processing.Report_Generator import create_report_generator_tab
-from Result_Visualization.Network_Visualization import draw_network_visualization,draw_author_network
+from Result_Visualization.Network_Visualization import draw_network_visualization,draw_author_network,edge_traces,node_positions,use_webgl
 
 #————————————————————————————————————————————————————————————path
 current_dir = os.path.dirname(os.path.realpath(__file__))
@@ -70,116 +87,113 @@ css_file=library_dir+"style.css"
 #______________________________________________________________________________________________________________________ 设置页面配置
 
 # 数据加载缓存
+def _upload_key(uploaded_files, namespace):
+    """上传内容的缓存键（见 Corpus_Cache.corpus_key），无法计算时返回 None"""
+    try:
+        return corpus_key(uploaded_files, namespace)
+    except Exception:
+        return None
+
 @st.cache_data
 def load_data(uploaded_file):
-    """加载和预处理数据"""
+    """
+    加载和预处理数据（结果按上传内容持久化缓存为Parquet快照）
+    返回 (数据框, 上传内容缓存键)，键用于跨重跑复用语料对象（见 load_corpus）
+    """
     if uploaded_file is None:
-        return None
+        return None, None
     
     try:
-        if uploaded_file.name.endswith('.txt'):
-            df = parse_txt_with_llm(uploaded_file)
-        elif uploaded_file.name.endswith('.csv'):
-            df = Load_CSV(uploaded_file)
-        elif uploaded_file.name.endswith('.bib'):
-            # 使用增强的文件上传器加载BIB文件
-            try:
-                from Documents_Processing.Enhanced_File_Uploader import load_file_universal
-                df = load_file_universal(uploaded_file)
-            except ImportError:
-                st.error("BIB文件解析功能不可用，请检查模块导入")
-                return None
-        else:
-            st.error("不支持的文件格式，请上传.txt、.csv或.bib文件")
-            return None
+        key = _upload_key(uploaded_file, 'main.load_data')
+        df = load_with_cache(uploaded_file, 'main.load_data', lambda: parse_and_clean_file(uploaded_file), key=key)
         
         if df is None or df.empty:
             st.warning("文件解析失败或文件为空")
-            return None
-        
-        # 数据清洗和标准化
-        df = clean_and_standardize_data(df)
-        return df
+            return None, None
+        return df, key
     except Exception as e:
         st.error(f"数据加载失败: {str(e)}")
-        return None
+        return None, None
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def load_corpus(key, _df):
+    """
+    按上传内容缓存键构建并常驻语料对象：st.cache_data 每次重跑返回新的数据框副本，
+    语料放在 st.cache_resource 中跨重跑复用，同一上传只构建一次
+    """
+    return Corpus.from_dataframe(_df, fingerprint=key)
+
+def parse_and_clean_file(uploaded_file):
+    """按文件类型解析并清洗标准化，失败时返回空数据框"""
+    if uploaded_file.name.endswith('.txt'):
+        df = parse_txt_with_llm(uploaded_file)
+    elif uploaded_file.name.endswith('.csv'):
+        df = Load_CSV(uploaded_file)
+    elif uploaded_file.name.endswith('.bib'):
+        # 使用增强的文件上传器加载BIB文件
+        try:
+            from Documents_Processing.Enhanced_File_Uploader import load_file_universal
+            df = load_file_universal(uploaded_file)
+        except ImportError:
+            st.error("BIB文件解析功能不可用，请检查模块导入")
+            return pd.DataFrame()
+    else:
+        st.error("不支持的文件格式，请上传.txt、.csv或.bib文件")
+        return pd.DataFrame()
+    
+    if df is None or df.empty:
+        return pd.DataFrame()
+    
+    # 数据清洗和标准化
+    return clean_and_standardize_data(df)
+
+@st.cache_data
+def load_data_batch(uploaded_files):
+    """并行加载多个WOS导出文件，合并去重后预处理，返回 (数据框, 上传内容缓存键)"""
+    if not uploaded_files:
+        return None, None
+    
+    if not all(f.name.endswith('.txt') for f in uploaded_files):
+        st.error("多文件上传仅支持WOS导出的.txt文件")
+        return None, None
+    
+    def parse_batch():
+        # 缓存函数内不放进度条（命中缓存时会被重放），进度由外层 st.spinner 提示
+        df, removed = Load_TXT_Batch(uploaded_files)
+        if df.empty:
+            return df
+        st.info(f"✅ 合并 {len(uploaded_files)} 个文件，共 {len(df)} 条文献记录（去除重复 {removed} 条）")
+        return clean_and_standardize_data(df)
+    
+    try:
+        key = _upload_key(list(uploaded_files), 'main.load_data_batch')
+        df = load_with_cache(list(uploaded_files), 'main.load_data_batch', parse_batch, key=key)
+        if df is None or df.empty:
+            st.warning("文件解析失败或文件为空")
+            return None, None
+        return df, key
+    except Exception as e:
+        st.error(f"数据加载失败: {str(e)}")
+        return None, None
 
 def parse_wos_file(uploaded_file):
     """
     解析Web of Science (WOS) 格式的TXT文件
-    WOS文件格式：每行以2-3个字符的字段代码开头，后跟空格和内容
+    WOS文件格式：每行以2个字符的字段代码开头，后跟空格和内容，续行以空格缩进
     """
     try:
-        # 读取文件内容
-        try:
-            data = uploaded_file.read().decode("utf-8")
-        except UnicodeDecodeError:
-            try:
-                uploaded_file.seek(0)
-                data = uploaded_file.read().decode("utf-8-sig")
-            except UnicodeDecodeError:
-                try:
-                    uploaded_file.seek(0)
-                    data = uploaded_file.read().decode("latin-1")
-                except UnicodeDecodeError:
-                    uploaded_file.seek(0)
-                    data = uploaded_file.read().decode("cp1252")
-        
-        # 解析WOS格式
-        records = []
-        current_record = {}
-        
-        lines = data.split('\n')
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-            
-            # 检查记录分隔符
-            if line == 'ER':
-                # 记录结束，保存当前记录
-                if current_record:
-                    records.append(current_record)
-                    current_record = {}
-                continue
-            elif line == 'EF':
-                # 文件结束
-                if current_record:
-                    records.append(current_record)
-                break
-            
-            # 解析字段 - 只处理标准的WOS字段代码
-            if len(line) >= 3 and line[2] == ' ':
-                field_code = line[:2]
-                field_value = line[3:].strip()
-                
-                # 只处理有效的WOS字段代码
-                valid_fields = {
-                    'AU', 'AF', 'TI', 'SO', 'LA', 'DT', 'DE', 'ID', 'AB', 'C1', 'RP', 'EM', 'RI', 
-                    'CR', 'NR', 'TC', 'Z9', 'U1', 'U2', 'PU', 'PI', 'PA', 'SN', 'EI', 'J9', 'JI', 
-                    'PD', 'PY', 'VL', 'IS', 'BP', 'EP', 'DI', 'PG', 'WC', 'SC', 'GA', 'UT', 'PM', 
-                    'DA', 'OA', 'AR', 'FU', 'FX', 'BN', 'BS', 'BA', 'BF', 'BE', 'HO', 'CT', 'CY', 
-                    'CL', 'SP', 'SU', 'TA', 'PS', 'PN', 'MA', 'GE', 'UN', 'SE', 'SI', 'CA', 'WE',
-                    'VR', 'PT', 'C3', 'OI', 'EA', 'HC', 'HP', 'DB', 'D2', 'PG', 'WC', 'SC', 'GA',
-                    'UT', 'PM', 'DA', 'OA', 'AR', 'FU', 'FX', 'BN', 'BS', 'BA', 'BF', 'BE', 'HO',
-                    'CT', 'CY', 'CL', 'SP', 'SU', 'TA', 'PS', 'PN', 'MA', 'GE', 'UN', 'SE', 'SI',
-                    'CA', 'WE', 'VR', 'PT', 'C3', 'OI', 'EA', 'HC', 'HP', 'DB', 'D2'
-                }
-                
-                if field_code in valid_fields:
-                    # 处理多行字段（如作者、地址等）
-                    if field_code in current_record:
-                        current_record[field_code] += '; ' + field_value
-                    else:
-                        current_record[field_code] = field_value
-        
-        if not records:
+        # 流式解析WOS格式：逐行读取上传文件，记录直接写入列缓冲区，一次性构建已重命名、已定型的DataFrame
+        schema = build_column_schema(WOS_FIELD_MAPPING)
+        if getattr(uploaded_file, 'size', 0) >= PARALLEL_PARSE_THRESHOLD:
+            # 超大文件：按 ER 记录边界切分，多进程并行解析后按顺序合并
+            df, _ = parse_wos_file_parallel(uploaded_file.getvalue(), schema, deduplicate=False)
+        else:
+            df = parse_wos_columns(uploaded_file, schema)
+        
+        if df.empty:
             st.warning("未找到有效的文献记录")
             return pd.DataFrame()
         
-        # 转换为DataFrame
-        df = pd.DataFrame(records)
-        
         # 显示解析结果
         st.info(f"✅ 成功解析 {len(df)} 条文献记录")
         st.info(f"📋 识别到字段: {', '.join(df.columns.tolist())}")
@@ -288,10 +302,8 @@ def clean_and_standardize_data(df):
         'HP': 'HotPaper',  # 热点论文
     }
     
-    # 重命名列 - 只重命名存在的列
-    for old_col, new_col in column_mapping.items():
-        if old_col in df.columns:
-            df = df.rename(columns={old_col: new_col})
+    # 重命名列 - 一次性重命名存在的列（WOS解析结果已是标准列名，此处主要处理CSV/BIB）
+    df = df.rename(columns={old_col: new_col for old_col, new_col in column_mapping.items() if old_col in df.columns})
     
     # 合并相同功能的列
     # 合并作者全名到作者列
@@ -312,12 +324,7 @@ def clean_and_standardize_data(df):
             # 删除重复的Authors列
             df = df.loc[:, ~df.columns.duplicated()]
     
-    # 合并关键词和扩展关键词
-    if 'KeywordsPlus' in df.columns and 'Keywords' in df.columns:
-        df['Keywords'] = df['Keywords'].fillna('') + ';' + df['KeywordsPlus'].fillna('')
-        df = df.drop(columns=['KeywordsPlus'])
-    elif 'KeywordsPlus' in df.columns:
-        df = df.rename(columns={'KeywordsPlus': 'Keywords'})
+    # 关键词与扩展关键词分列保留，按用户选择的来源策略在构建语料时合并（见 Keyword_Normalizer）
     
     # 合并被引次数和总被引次数
     if 'TotalTimesCited' in df.columns and 'TimesCited' in df.columns:
@@ -354,6 +361,37 @@ def safe_get_column(df, possible_names, default_value=""):
             return df[name]
     return pd.Series([default_value] * len(df))
 
+def configure_keyword_normalization(df):
+    """关键词规范化选项（来源策略、复数折叠、同义词表），按所选规则重建语料的关键词关联表"""
+    with st.expander("🔤 关键词规范化", expanded=False):
+        col1, col2 = st.columns(2)
+        with col1:
+            keyword_source = st.selectbox(
+                "关键词来源",
+                options=list(KEYWORD_SOURCES),
+                format_func=KEYWORD_SOURCES.get,
+                key="keyword_source"
+            )
+        with col2:
+            fold_plurals = st.checkbox("合并单复数（studies → study）", value=True, key="keyword_fold_plurals")
+        thesaurus_files = st.file_uploader(
+            "同义词表（CSV/TSV，两列：关键词, 替换为；替换为空表示删除）",
+            type=["csv", "tsv", "txt"],
+            accept_multiple_files=True,
+            key="keyword_thesaurus"
+        )
+        try:
+            thesaurus = read_thesaurus(thesaurus_files or [])
+        except Exception as e:
+            st.error(f"同义词表读取失败: {str(e)}")
+            thesaurus = {}
+        
+        corpus = as_corpus(df, KeywordNormalizer(keyword_source, fold_plurals, thesaurus))
+        raw_codes = combine_keywords(corpus.raw_keywords, keyword_source)[1]
+        st.caption(f"原始关键词 {len(np.unique(raw_codes))} 个，规范化后 {corpus.keywords.n_entities} 个"
+                   + (f"（同义词表 {len(thesaurus)} 条）" if thesaurus else ""))
+    return corpus
+
 def create_download_button(data, filename, file_type="csv"):
     """创建下载按钮"""
     if file_type == "csv":
@@ -371,37 +409,25 @@ def analyze_overview_statistics(df):
     """总体信息概览分析"""
     st.subheader("📊 Overall Information Overview")
     
-    # 基本统计信息
-    total_articles = len(df)
-    total_authors = len(set([author for authors in safe_get_column(df, ['Authors']) for author in str(authors).split(';') if author.strip()]))
+    corpus = as_corpus(df)
+    df = corpus.frame
+    
+    # 基本统计信息（实体数直接取自关联表）
+    total_articles = corpus.n_docs
+    total_authors = int((corpus.authors.doc_counts() > 0).sum())
     total_sources = safe_get_column(df, ['Source']).nunique()
-    total_keywords = len(set([kw for keywords in safe_get_column(df, ['Keywords']) for kw in str(keywords).split(';') if kw.strip()]))
-    
-    # 国际合作比例
-    international_collab = 0
-    if 'Address' in df.columns:
-        addresses = safe_get_column(df, ['Address'])
-        for addr in addresses:
-            if pd.notna(addr) and len(str(addr).split(';')) > 1:
-                countries = set()
-                for country_addr in str(addr).split(';'):
-                    if '[' in country_addr and ']' in country_addr:
-                        country = country_addr.split('[')[-1].split(']')[0].strip()
-                        countries.add(country)
-                if len(countries) > 1:
-                    international_collab += 1
+    total_keywords = int((corpus.keywords.doc_counts() > 0).sum())
     
+    # 国际合作比例：涉及两个及以上国家的文献
+    international_collab = int((corpus.countries.per_doc() > 1).sum())
     international_ratio = (international_collab / total_articles * 100) if total_articles > 0 else 0
     
     # 平均作者数
     avg_authors = 0
-    if 'Authors' in df.columns:
-        author_counts = []
-        for authors in safe_get_column(df, ['Authors']):
-            if pd.notna(authors):
-                author_count = len([a for a in str(authors).split(';') if a.strip()])
-                author_counts.append(author_count)
-        avg_authors = np.mean(author_counts) if author_counts else 0
+    if corpus.has('authors'):
+        author_counts = corpus.authors.per_doc()
+        author_counts = author_counts[author_counts > 0]
+        avg_authors = np.mean(author_counts) if len(author_counts) else 0
     
     # 显示统计信息
     col1, col2, col3, col4 = st.columns(4)
@@ -460,6 +486,8 @@ def analyze_authors(df):
     """作者分析"""
     st.subheader("👥 Author Analysis")
     
+    corpus = as_corpus(df)
+    df = corpus.frame
     if 'Authors' not in df.columns:
         st.warning("未找到作者信息列")
         return
@@ -493,21 +521,33 @@ def analyze_authors(df):
             help="在图表中显示前N位作者"
         )
     
+    col4, col5 = st.columns(2)
+    with col4:
+        counting_mode = st.selectbox(
+            "合作计数方式",
+            options=list(COUNTING_MODES),
+            format_func=COUNTING_MODES.get,
+            help="分数计数下每篇文献的每对作者计 1/(n-1)，大团队文献不再主导合作网络"
+        )
+    
+    with col5:
+        max_authors = st.number_input(
+            "超多作者文献阈值",
+            min_value=0,
+            value=DEFAULT_MAX_AUTHORS,
+            help="作者数超过此值的文献不参与两两合作计数（0 表示不限制）"
+        )
+    
     # 处理作者数据
-    all_authors = []
-    for authors in safe_get_column(df, ['Authors']):
-        if pd.notna(authors):
-            for author in str(authors).split(';'):
-                author = author.strip()
-                if author:
-                    all_authors.append(author)
+    author_links = corpus.authors
+    all_authors = author_links.flat_labels()
     
     if not all_authors:
         st.warning("暂无作者数据")
         return
     
     # 作者发文量统计
-    author_counts = pd.Series(all_authors).value_counts()
+    author_counts = author_links.value_counts()
     
     # 应用发表数量筛选
     filtered_author_counts = author_counts[author_counts >= min_publications]
@@ -543,14 +583,7 @@ def analyze_authors(df):
     st.subheader(f"⭐ Highly Cited Authors (Top {top_n_authors})")
     if 'TimesCited' in df.columns:
         # 计算每个作者的总被引次数
-        author_citations = defaultdict(int)
-        for idx, row in df.iterrows():
-            if pd.notna(row.get('Authors')) and pd.notna(row.get('TimesCited')):
-                citations = int(row['TimesCited']) if str(row['TimesCited']).isdigit() else 0
-                for author in str(row['Authors']).split(';'):
-                    author = author.strip()
-                    if author:
-                        author_citations[author] += citations
+        author_citations = dict(zip(author_links.labels, author_links.sum_by_entity(corpus.citations).astype(int)))
         
         # 应用被引次数筛选
         filtered_author_citations = {author: citations for author, citations in author_citations.items() 
@@ -593,41 +626,27 @@ def analyze_authors(df):
         for author in filtered_authors:
             G.add_node(author)
         
-        # 添加边（同一篇文章的作者之间建立连接）
-        for authors in safe_get_column(df, ['Authors']):
-            if pd.notna(authors):
-                author_list = [a.strip() for a in str(authors).split(';') if a.strip()]
-                for i in range(len(author_list)):
-                    for j in range(i+1, len(author_list)):
-                        if G.has_edge(author_list[i], author_list[j]):
-                            G[author_list[i]][author_list[j]]['weight'] += 1
-                        else:
-                            G.add_edge(author_list[i], author_list[j], weight=1)
+        # 添加边（同一篇文章的作者之间建立连接，超多作者文献不展开作者对）
+        warn_hyper_authored(corpus, max_authors or None)
+        collaboration_edges = author_links.pair_counts(mode=counting_mode, max_items=max_authors or None)
+        G.add_weighted_edges_from(collaboration_edges.itertuples(index=False, name=None))
         
         if G.number_of_edges() > 0:
             # 使用spring布局
-            pos = nx.spring_layout(G, k=1, iterations=50)
+            pos = spring_layout(G, k=1, iterations=50)
             
-            # 创建网络图
-            edge_trace = []
-            for edge in G.edges():
-                x0, y0 = pos[edge[0]]
-                x1, y1 = pos[edge[1]]
-                weight = G[edge[0]][edge[1]]['weight']
-                edge_trace.append(go.Scatter(
-                    x=[x0, x1, None],
-                    y=[y0, y1, None],
-                    mode='lines',
-                    line=dict(width=weight*0.5, color='#888'),
-                    hoverinfo='none'
-                ))
+            # 创建网络图（全部边按线宽分组打包为少数几条折线，节点多时使用 WebGL）
+            webgl = use_webgl(G.number_of_nodes())
+            edge_trace = edge_traces(pos, G.edges(data='weight', default=1), width_scale=0.5,
+                                     color='#888', webgl=webgl)
             
             # 节点大小基于发文量
             node_sizes = [author_counts[node] * 10 for node in G.nodes()]
             
-            node_trace = go.Scatter(
-                x=[pos[node][0] for node in G.nodes()],
-                y=[pos[node][1] for node in G.nodes()],
+            node_xy = node_positions(pos, G.nodes())
+            node_trace = (go.Scattergl if webgl else go.Scatter)(
+                x=node_xy[:, 0],
+                y=node_xy[:, 1],
                 mode='markers+text',
                 text=[node[:15] + '...' if len(node) > 15 else node for node in G.nodes()],
                 textposition="middle center",
@@ -653,58 +672,32 @@ def analyze_authors(df):
             st.plotly_chart(fig, use_container_width=True)
         else:
             st.warning("作者合作网络数据不足")
+        
+        show_network_metrics(corpus, 'authors', "📐 Author Collaboration Network Metrics", "author_network_metrics",
+                             top_n=top_n_authors, mode=counting_mode, max_authors=max_authors or None)
     
     # 被引耦合网络图
     st.subheader("🔗 Citation Coupling Network")
     if 'References' in df.columns and len(all_authors) > 1:
-        # 创建被引耦合网络
+        # 创建被引耦合网络（与合作网络相同的作者集合；作者×参考文献 0/1 矩阵的 MMᵀ，即共同引用的参考文献数）
         G_coupling = nx.Graph()
-        
-        # 为每个作者收集其引用的文献
-        author_refs = defaultdict(set)
-        for idx, row in df.iterrows():
-            if pd.notna(row.get('Authors')) and pd.notna(row.get('References')):
-                for author in str(row['Authors']).split(';'):
-                    author = author.strip()
-                    if author:
-                        for ref in str(row['References']).split(';'):
-                            ref = ref.strip()
-                            if ref:
-                                author_refs[author].add(ref)
-        
-        # 计算作者间的引用耦合强度
-        authors_list = list(author_refs.keys())
-        for i in range(len(authors_list)):
-            for j in range(i+1, len(authors_list)):
-                author1, author2 = authors_list[i], authors_list[j]
-                refs1, refs2 = author_refs[author1], author_refs[author2]
-                
-                # 计算共同引用的文献数量
-                common_refs = len(refs1.intersection(refs2))
-                if common_refs > 0:
-                    G_coupling.add_edge(author1, author2, weight=common_refs)
+        coupling, coupled_authors = coupling_matrix(corpus, 'authors', entities=sorted(filtered_authors))
+        coupling = limit_edges(coupling, DEFAULT_MAX_EDGES)
+        G_coupling.add_weighted_edges_from(edge_frame(coupling, coupled_authors).itertuples(index=False, name=None))
         
         if G_coupling.number_of_edges() > 0:
             # 使用spring布局
-            pos = nx.spring_layout(G_coupling, k=1, iterations=50)
+            pos = spring_layout(G_coupling, k=1, iterations=50)
             
-            # 创建网络图
-            edge_trace = []
-            for edge in G_coupling.edges():
-                x0, y0 = pos[edge[0]]
-                x1, y1 = pos[edge[1]]
-                weight = G_coupling[edge[0]][edge[1]]['weight']
-                edge_trace.append(go.Scatter(
-                    x=[x0, x1, None],
-                    y=[y0, y1, None],
-                    mode='lines',
-                    line=dict(width=weight*0.3, color='#FF6B6B'),
-                    hoverinfo='none'
-                ))
+            # 创建网络图（全部边按线宽分组打包为少数几条折线，节点多时使用 WebGL）
+            webgl = use_webgl(G_coupling.number_of_nodes())
+            edge_trace = edge_traces(pos, G_coupling.edges(data='weight', default=1), width_scale=0.3,
+                                     color='#FF6B6B', webgl=webgl)
             
-            node_trace = go.Scatter(
-                x=[pos[node][0] for node in G_coupling.nodes()],
-                y=[pos[node][1] for node in G_coupling.nodes()],
+            node_xy = node_positions(pos, G_coupling.nodes())
+            node_trace = (go.Scattergl if webgl else go.Scatter)(
+                x=node_xy[:, 0],
+                y=node_xy[:, 1],
                 mode='markers+text',
                 text=[node[:15] + '...' if len(node) > 15 else node for node in G_coupling.nodes()],
                 textposition="middle center",
@@ -733,10 +726,67 @@ def analyze_authors(df):
     else:
         st.warning("需要参考文献数据来构建被引耦合网络")
 
+def yearly_entity_counts(corpus, field, entities):
+    """
+    按年份统计指定实体的发文量（读取语料的 实体×年份 立方体）
+    
+    Args:
+        corpus: 语料对象
+        field: 实体类型（如 'countries'）
+        entities: 需要统计的实体名称列表
+    
+    Returns:
+        defaultdict: {年份: {实体: 发文数}}，只包含这些实体有发文的年份
+    """
+    yearly_data = defaultdict(lambda: defaultdict(int))
+    series = corpus.time_cube.series(field, entities)
+    for year, counts in series[series.sum(axis=1) > 0].iterrows():
+        yearly_data[int(year)].update({entity: int(count) for entity, count in counts.items() if count > 0})
+    return yearly_data
+
+def show_network_metrics(df, field, title, key, top_n=20, **kwargs):
+    """
+    显示共现网络的节点指标表（直接在稀疏共现矩阵上计算，不依赖绘图用的networkx图）
+    
+    Args:
+        df: 数据框或语料对象
+        field: 'authors' / 'keywords' / 'countries' / 'institutions'
+        title: 小标题
+        key: 导出按钮的key
+        top_n: 按PageRank显示前N个节点
+        **kwargs: 传给 AdvancedAnalysis.calculate_network_metrics 的参数（min_weight、mode、max_authors、resolution）
+    """
+    st.subheader(title)
+    metrics = AdvancedAnalysis().calculate_network_metrics(df, field, **kwargs)
+    if metrics.empty:
+        st.info("共现网络为空，无法计算网络指标")
+        return
+    
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("网络节点数", len(metrics))
+    with col2:
+        st.metric("连通分量数", int(metrics['连通分量'].max()) + 1)
+    with col3:
+        st.metric("最大K核", int(metrics['K核'].max()))
+    with col4:
+        st.metric("聚类数", metrics['聚类'].nunique(), help=f"模块度 Q = {metrics.attrs.get('modularity', 0):.3f}")
+    
+    st.dataframe(metrics.head(top_n), use_container_width=True)
+    st.download_button(
+        label="📥 Export Network Metrics",
+        data=metrics.to_csv(index=False),
+        file_name=f"{field}_network_metrics.csv",
+        mime="text/csv",
+        key=key
+    )
+
 def analyze_countries(df):
     """国家与地区分析"""
     st.subheader("🌍 Country and Region Analysis")
     
+    corpus = as_corpus(df)
+    df = corpus.frame
     if 'Address' not in df.columns:
         st.warning("未找到地址信息列")
         return
@@ -773,33 +823,17 @@ def analyze_countries(df):
             key="country_top_n"
         )
     
-    # 提取国家信息
-    countries = []
-    for addr in safe_get_column(df, ['Address']):
-        if pd.notna(addr):
-            for country_addr in str(addr).split(';'):
-                if '[' in country_addr and ']' in country_addr:
-                    country = country_addr.split('[')[-1].split(']')[0].strip()
-                    if country:
-                        countries.append(country)
-    
-    if not countries:
+    # 提取国家信息（取自地址末段，每篇文献每个国家计一次）
+    country_links = corpus.countries
+    if len(country_links) == 0:
         st.warning("未找到国家信息")
         return
     
     # 国家发文量统计
-    country_counts = pd.Series(countries).value_counts()
+    country_counts = country_links.value_counts()
     
     # 国家引用量统计
-    country_citations = defaultdict(int)
-    for idx, row in df.iterrows():
-        if pd.notna(row.get('Address')) and pd.notna(row.get('TimesCited')):
-            citations = int(row['TimesCited']) if str(row['TimesCited']).isdigit() else 0
-            for country_addr in str(row['Address']).split(';'):
-                if '[' in country_addr and ']' in country_addr:
-                    country = country_addr.split('[')[-1].split(']')[0].strip()
-                    if country:
-                        country_citations[country] += citations
+    country_citations = dict(zip(country_links.labels, country_links.sum_by_entity(corpus.citations).astype(int)))
     
     # 应用筛选条件
     filtered_countries = []
@@ -847,46 +881,24 @@ def analyze_countries(df):
             G_country.add_node(country)
         
         # 添加边（同一篇文章的国家之间建立连接）
-        for addr in safe_get_column(df, ['Address']):
-            if pd.notna(addr):
-                country_list = []
-                for country_addr in str(addr).split(';'):
-                    if '[' in country_addr and ']' in country_addr:
-                        country = country_addr.split('[')[-1].split(']')[0].strip()
-                        if country:
-                            country_list.append(country)
-                
-                for i in range(len(country_list)):
-                    for j in range(i+1, len(country_list)):
-                        if G_country.has_edge(country_list[i], country_list[j]):
-                            G_country[country_list[i]][country_list[j]]['weight'] += 1
-                        else:
-                            G_country.add_edge(country_list[i], country_list[j], weight=1)
+        G_country.add_weighted_edges_from(country_links.pair_counts().itertuples(index=False, name=None))
         
         if G_country.number_of_edges() > 0:
             # 使用spring布局
-            pos = nx.spring_layout(G_country, k=1, iterations=50)
+            pos = spring_layout(G_country, k=1, iterations=50)
             
-            # 创建网络图
-            edge_trace = []
-            for edge in G_country.edges():
-                x0, y0 = pos[edge[0]]
-                x1, y1 = pos[edge[1]]
-                weight = G_country[edge[0]][edge[1]]['weight']
-                edge_trace.append(go.Scatter(
-                    x=[x0, x1, None],
-                    y=[y0, y1, None],
-                    mode='lines',
-                    line=dict(width=weight*0.5, color='#4ECDC4'),
-                    hoverinfo='none'
-                ))
+            # 创建网络图（全部边按线宽分组打包为少数几条折线，节点多时使用 WebGL）
+            webgl = use_webgl(G_country.number_of_nodes())
+            edge_trace = edge_traces(pos, G_country.edges(data='weight', default=1), width_scale=0.5,
+                                     color='#4ECDC4', webgl=webgl)
             
             # 节点大小基于发文量
             node_sizes = [country_counts[node] * 15 for node in G_country.nodes()]
             
-            node_trace = go.Scatter(
-                x=[pos[node][0] for node in G_country.nodes()],
-                y=[pos[node][1] for node in G_country.nodes()],
+            node_xy = node_positions(pos, G_country.nodes())
+            node_trace = (go.Scattergl if webgl else go.Scatter)(
+                x=node_xy[:, 0],
+                y=node_xy[:, 1],
                 mode='markers+text',
                 text=list(G_country.nodes()),
                 textposition="middle center",
@@ -920,15 +932,7 @@ def analyze_countries(df):
         top_countries = country_counts.head(5).index.tolist()
         
         # 按年份和国家统计
-        yearly_country_data = defaultdict(lambda: defaultdict(int))
-        for idx, row in df.iterrows():
-            if pd.notna(row.get('Year')) and pd.notna(row.get('Address')):
-                year = int(row['Year'])
-                for country_addr in str(row['Address']).split(';'):
-                    if '[' in country_addr and ']' in country_addr:
-                        country = country_addr.split('[')[-1].split(']')[0].strip()
-                        if country in top_countries:
-                            yearly_country_data[year][country] += 1
+        yearly_country_data = yearly_entity_counts(corpus, 'countries', top_countries)
         
         # 创建折线图
         fig = go.Figure()
@@ -979,6 +983,8 @@ def analyze_institutions(df):
     """机构分析"""
     st.subheader("🏛️ Institution Analysis")
     
+    corpus = as_corpus(df)
+    df = corpus.frame
     if 'Address' not in df.columns:
         st.warning("未找到地址信息列")
         return
@@ -1015,34 +1021,17 @@ def analyze_institutions(df):
             key="institution_top_n"
         )
     
-    # 提取机构信息
-    institutions = []
-    for addr in safe_get_column(df, ['Address']):
-        if pd.notna(addr):
-            for institution_addr in str(addr).split(';'):
-                # 提取机构名称（在方括号前）
-                if '[' in institution_addr:
-                    institution = institution_addr.split('[')[0].strip()
-                    if institution:
-                        institutions.append(institution)
-    
-    if not institutions:
+    # 提取机构信息（取自地址首段，每篇文献每个机构计一次）
+    institution_links = corpus.institutions
+    if len(institution_links) == 0:
         st.warning("未找到机构信息")
         return
     
     # 机构发文量统计
-    institution_counts = pd.Series(institutions).value_counts()
+    institution_counts = institution_links.value_counts()
     
     # 机构引用量统计
-    institution_citations = defaultdict(int)
-    for idx, row in df.iterrows():
-        if pd.notna(row.get('Address')) and pd.notna(row.get('TimesCited')):
-            citations = int(row['TimesCited']) if str(row['TimesCited']).isdigit() else 0
-            for institution_addr in str(row['Address']).split(';'):
-                if '[' in institution_addr:
-                    institution = institution_addr.split('[')[0].strip()
-                    if institution:
-                        institution_citations[institution] += citations
+    institution_citations = dict(zip(institution_links.labels, institution_links.sum_by_entity(corpus.citations).astype(int)))
     
     # 应用筛选条件
     filtered_institutions = []
@@ -1090,46 +1079,24 @@ def analyze_institutions(df):
             G.add_node(institution)
         
         # 添加边（同一篇文章的机构之间建立连接）
-        for addr in safe_get_column(df, ['Address']):
-            if pd.notna(addr):
-                institution_list = []
-                for institution_addr in str(addr).split(';'):
-                    if '[' in institution_addr:
-                        institution = institution_addr.split('[')[0].strip()
-                        if institution:
-                            institution_list.append(institution)
-                
-                for i in range(len(institution_list)):
-                    for j in range(i+1, len(institution_list)):
-                        if G.has_edge(institution_list[i], institution_list[j]):
-                            G[institution_list[i]][institution_list[j]]['weight'] += 1
-                        else:
-                            G.add_edge(institution_list[i], institution_list[j], weight=1)
+        G.add_weighted_edges_from(institution_links.pair_counts().itertuples(index=False, name=None))
         
         if G.number_of_edges() > 0:
             # 使用spring布局
-            pos = nx.spring_layout(G, k=1, iterations=50)
+            pos = spring_layout(G, k=1, iterations=50)
             
-            # 创建网络图
-            edge_trace = []
-            for edge in G.edges():
-                x0, y0 = pos[edge[0]]
-                x1, y1 = pos[edge[1]]
-                weight = G[edge[0]][edge[1]]['weight']
-                edge_trace.append(go.Scatter(
-                    x=[x0, x1, None],
-                    y=[y0, y1, None],
-                    mode='lines',
-                    line=dict(width=weight*0.3, color='#888'),
-                    hoverinfo='none'
-                ))
+            # 创建网络图（全部边按线宽分组打包为少数几条折线，节点多时使用 WebGL）
+            webgl = use_webgl(G.number_of_nodes())
+            edge_trace = edge_traces(pos, G.edges(data='weight', default=1), width_scale=0.3,
+                                     color='#888', webgl=webgl)
             
             # 节点大小基于发文量
             node_sizes = [institution_counts[node] * 10 for node in G.nodes()]
             
-            node_trace = go.Scatter(
-                x=[pos[node][0] for node in G.nodes()],
-                y=[pos[node][1] for node in G.nodes()],
+            node_xy = node_positions(pos, G.nodes())
+            node_trace = (go.Scattergl if webgl else go.Scatter)(
+                x=node_xy[:, 0],
+                y=node_xy[:, 1],
                 mode='markers+text',
                 text=[node[:20] + '...' if len(node) > 20 else node for node in G.nodes()],
                 textposition="middle center",
@@ -1163,15 +1130,7 @@ def analyze_institutions(df):
         top_institutions = institution_counts.head(10).index.tolist()
         
         # 按年份和机构统计
-        yearly_institution_data = defaultdict(lambda: defaultdict(int))
-        for idx, row in df.iterrows():
-            if pd.notna(row.get('Year')) and pd.notna(row.get('Address')):
-                year = int(row['Year'])
-                for institution_addr in str(row['Address']).split(';'):
-                    if '[' in institution_addr:
-                        institution = institution_addr.split('[')[0].strip()
-                        if institution in top_institutions:
-                            yearly_institution_data[year][institution] += 1
+        yearly_institution_data = yearly_entity_counts(corpus, 'institutions', top_institutions)
         
         # 创建折线图
         fig = go.Figure()
@@ -1222,32 +1181,25 @@ def analyze_cited_references(df):
     """被引文献分析"""
     st.subheader("📚 Cited References Analysis")
     
-    if 'References' not in df.columns:
+    corpus = as_corpus(df)
+    df = corpus.frame
+    if not corpus.has('references'):
         st.warning("未找到参考文献列")
         return
     
     # 统计被引文献
-    all_refs = []
-    for refs in safe_get_column(df, ['References']):
-        if pd.notna(refs):
-            for ref in str(refs).split(';'):
-                ref = ref.strip()
-                if ref:
-                    all_refs.append(ref)
-    
-    if not all_refs:
+    reference_links = corpus.references
+    if len(reference_links) == 0:
         st.warning("暂无参考文献数据")
         return
     
     # 被引文献统计
-    ref_counts = pd.Series(all_refs).value_counts()
+    ref_counts = reference_links.value_counts()
     
     # 显示高被引文献表格
     st.subheader("⭐ Highly Cited References")
-    ref_stats = pd.DataFrame({
-        'Reference': ref_counts.index,
-        'Citation Count': ref_counts.values
-    })
+    ref_stats = extract_reference_info(corpus).rename(columns={
+        'CitedAuthor': 'Cited Author', 'LocalCitations': 'Citation Count'})
     ref_stats['Rank'] = range(1, len(ref_stats) + 1)
     
     st.dataframe(ref_stats.head(20), use_container_width=True)
@@ -1263,9 +1215,12 @@ def analyze_cited_references(df):
     
     # 共被引网络图
     st.subheader("🕸️ Co-citation Network")
-    if len(all_refs) > 1:
-        # 选择高频被引文献
-        top_refs = ref_counts.head(30).index.tolist()
+    if len(reference_links) > 1:
+        cocitation_level = st.selectbox("共被引层级", options=list(COCITATION_LEVELS),
+                                        format_func=COCITATION_LEVELS.get, key="cocitation_level")
+        # 选择高频被引对象
+        level_counts = ref_counts if cocitation_level == 'references' else cited_counts(corpus, cocitation_level)
+        top_refs = level_counts.head(30).index.tolist()
         
         # 创建共被引网络
         G_cocitation = nx.Graph()
@@ -1274,46 +1229,27 @@ def analyze_cited_references(df):
         for ref in top_refs:
             G_cocitation.add_node(ref)
         
-        # 添加边（同一篇文章引用的文献之间建立连接）
-        for refs in safe_get_column(df, ['References']):
-            if pd.notna(refs):
-                ref_list = []
-                for ref in str(refs).split(';'):
-                    ref = ref.strip()
-                    if ref in top_refs:
-                        ref_list.append(ref)
-                
-                for i in range(len(ref_list)):
-                    for j in range(i+1, len(ref_list)):
-                        if G_cocitation.has_edge(ref_list[i], ref_list[j]):
-                            G_cocitation[ref_list[i]][ref_list[j]]['weight'] += 1
-                        else:
-                            G_cocitation.add_edge(ref_list[i], ref_list[j], weight=1)
+        # 添加边（同一篇文章引用的对象之间建立连接：文献×被引对象矩阵的 XᵀX）
+        matrix, labels = cocitation_matrix(corpus, cocitation_level, entities=top_refs)
+        cocitation_edges = edge_frame(matrix, labels)
+        G_cocitation.add_weighted_edges_from(cocitation_edges.itertuples(index=False, name=None))
         
         if G_cocitation.number_of_edges() > 0:
             # 使用spring布局
-            pos = nx.spring_layout(G_cocitation, k=1, iterations=50)
+            pos = spring_layout(G_cocitation, k=1, iterations=50)
             
-            # 创建网络图
-            edge_trace = []
-            for edge in G_cocitation.edges():
-                x0, y0 = pos[edge[0]]
-                x1, y1 = pos[edge[1]]
-                weight = G_cocitation[edge[0]][edge[1]]['weight']
-                edge_trace.append(go.Scatter(
-                    x=[x0, x1, None],
-                    y=[y0, y1, None],
-                    mode='lines',
-                    line=dict(width=weight*0.3, color='#E0BBD0'),
-                    hoverinfo='none'
-                ))
+            # 创建网络图（全部边按线宽分组打包为少数几条折线，节点多时使用 WebGL）
+            webgl = use_webgl(G_cocitation.number_of_nodes())
+            edge_trace = edge_traces(pos, G_cocitation.edges(data='weight', default=1), width_scale=0.3,
+                                     color='#E0BBD0', webgl=webgl)
             
-            # 节点大小基于被引次数
-            node_sizes = [ref_counts[node] * 5 for node in G_cocitation.nodes()]
+            # 节点大小基于被引次数（被引作者/来源的次数远高于单篇文献，按最高次数缩放）
+            node_sizes = [10 + 40 * level_counts[node] / level_counts.iloc[0] for node in G_cocitation.nodes()]
             
-            node_trace = go.Scatter(
-                x=[pos[node][0] for node in G_cocitation.nodes()],
-                y=[pos[node][1] for node in G_cocitation.nodes()],
+            node_xy = node_positions(pos, G_cocitation.nodes())
+            node_trace = (go.Scattergl if webgl else go.Scatter)(
+                x=node_xy[:, 0],
+                y=node_xy[:, 1],
                 mode='markers+text',
                 text=[node[:30] + '...' if len(node) > 30 else node for node in G_cocitation.nodes()],
                 textposition="middle center",
@@ -1339,12 +1275,65 @@ def analyze_cited_references(df):
             st.plotly_chart(fig, use_container_width=True)
         else:
             st.warning("共被引网络数据不足")
+    
+    # 历史引文图（本地引用网络）
+    st.subheader("📜 Historiograph (Local Citation Network)")
+    citation_network = local_citations(corpus)
+    summary = citation_network.match_summary()
+    st.caption(f"参考文献与本数据集记录匹配：DOI {summary['doi']} 条，书目键 {summary['key']} 条，"
+               f"本地引用 {summary['links']} 次")
+    if summary['links'] == 0:
+        st.warning("参考文献中没有引用本数据集内的文献，无法绘制历史引文图")
+        return
+    
+    history_size = st.slider("历史引文图文献数（按本地被引次数 LCS）", 5, 50, DEFAULT_HISTORIOGRAPH_SIZE,
+                             key="historiograph_top_n")
+    lcs_table = local_citation_scores(corpus)
+    st.dataframe(lcs_table.head(history_size).reset_index(drop=True), use_container_width=True)
+    
+    nodes, edges = historiograph(corpus, history_size)
+    if not edges.empty:
+        pos = dict(zip(nodes['doc'], nodes[['x', 'y']].to_numpy()))
+        edge_trace = edge_traces(pos, ((source, target, 1) for source, target in edges.itertuples(index=False)),
+                                 color='#B0B0B0', width=1)
+        node_trace = go.Scatter(
+            x=nodes['x'],
+            y=nodes['y'],
+            mode='markers+text',
+            text=nodes['Document'],
+            textposition="top center",
+            hovertext=[f"{title}<br>LCS: {lcs}, GCS: {gcs}"
+                       for title, lcs, gcs in zip(nodes['Title'], nodes['LCS'], nodes['GCS'])],
+            hoverinfo='text',
+            marker=dict(
+                size=10 + 30 * nodes['LCS'] / nodes['LCS'].max(),
+                color='#7EB6D9',
+                line=dict(width=1, color='#4A90C2')
+            )
+        )
+        
+        fig = go.Figure(data=edge_trace + [node_trace])
+        fig.update_layout(
+            title="Historiograph",
+            showlegend=False,
+            hovermode='closest',
+            margin=dict(b=20,l=5,r=5,t=40),
+            xaxis=dict(title="Year", showgrid=True, zeroline=False, dtick=1),
+            yaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
+            height=600
+        )
+        
+        st.plotly_chart(fig, use_container_width=True)
+    else:
+        st.warning("所选文献之间没有直接引用关系")
 
 def analyze_keywords(df):
     """关键词共现分析"""
     st.subheader("🔑 Keywords Co-occurrence Analysis")
     
-    if 'Keywords' not in df.columns:
+    corpus = as_corpus(df)
+    df = corpus.frame
+    if not corpus.has('keywords'):
         st.warning("未找到关键词列")
         return
     
@@ -1380,21 +1369,56 @@ def analyze_keywords(df):
             key="keyword_top_n"
         )
     
-    # 提取关键词
-    all_keywords = []
-    for keywords in safe_get_column(df, ['Keywords']):
-        if pd.notna(keywords):
-            for kw in str(keywords).split(';'):
-                kw = kw.strip().lower()
-                if kw and len(kw) > 2:  # 过滤太短的关键词
-                    all_keywords.append(kw)
+    cluster_resolution = st.slider(
+        "聚类分辨率",
+        min_value=0.1,
+        max_value=3.0,
+        value=DEFAULT_RESOLUTION,
+        step=0.1,
+        help="模块度优化的分辨率参数，越大聚类越多越小",
+        key="keyword_cluster_resolution"
+    )
+    
+    col4, col5, col6 = st.columns(3)
+    
+    with col4:
+        pruning_method = st.selectbox(
+            "网络剪枝方式",
+            options=list(PRUNING_METHODS),
+            index=list(PRUNING_METHODS).index('pathfinder'),
+            format_func=PRUNING_METHODS.get,
+            help="绘图前精简共现网络的边：Pathfinder 与最大生成树只保留骨架结构，top-k 保留每个关键词最强的 k 条连接",
+            key="keyword_pruning"
+        )
+    
+    with col5:
+        pruning_top_k = st.number_input(
+            "每个关键词保留的边数 (top-k)",
+            min_value=1,
+            value=DEFAULT_TOP_K,
+            help="仅在剪枝方式为 top-k 时生效",
+            key="keyword_pruning_top_k"
+        )
+    
+    with col6:
+        max_edges = st.number_input(
+            "最多绘制的边数",
+            min_value=10,
+            value=DEFAULT_MAX_EDGES,
+            help="剪枝后边数仍超过该值时，保留最大生成树并按权重补足",
+            key="keyword_max_edges"
+        )
+    
+    # 提取关键词（过滤太短的关键词）
+    keyword_links = corpus.keywords
+    keyword_links = keyword_links.select_entities(keyword_links.labels.str.len() > 2)
     
-    if not all_keywords:
+    if len(keyword_links) == 0:
         st.warning("暂无关键词数据")
         return
     
     # 关键词频率统计
-    kw_counts = pd.Series(all_keywords).value_counts()
+    kw_counts = keyword_links.value_counts()
     
     # 应用频次筛选
     filtered_kw_counts = kw_counts[kw_counts >= min_keyword_frequency]
@@ -1429,69 +1453,42 @@ def analyze_keywords(df):
         # 选择高频关键词
         top_keywords = filtered_kw_counts.head(top_n_keywords).index.tolist()
         
-        # 创建共现网络
-        G = nx.Graph()
-        
-        # 添加节点
-        for kw in top_keywords:
-            G.add_node(kw)
-        
-        # 添加边（同一篇文章的关键词之间建立连接）
-        for keywords in safe_get_column(df, ['Keywords']):
-            if pd.notna(keywords):
-                kw_list = []
-                for kw in str(keywords).split(';'):
-                    kw = kw.strip().lower()
-                    if kw in top_keywords:
-                        kw_list.append(kw)
-                
-                for i in range(len(kw_list)):
-                    for j in range(i+1, len(kw_list)):
-                        if G.has_edge(kw_list[i], kw_list[j]):
-                            G[kw_list[i]][kw_list[j]]['weight'] += 1
-                        else:
-                            G.add_edge(kw_list[i], kw_list[j], weight=1)
-        
-        # 应用共现次数筛选
-        edges_to_remove = []
-        for edge in G.edges():
-            if G[edge[0]][edge[1]]['weight'] < min_cooccurrence:
-                edges_to_remove.append(edge)
-        
-        for edge in edges_to_remove:
-            G.remove_edge(edge[0], edge[1])
-        
-        if G.number_of_edges() > 0:
-            # 使用spring布局
-            pos = nx.spring_layout(G, k=1, iterations=50)
+        # 共现网络（筛选、聚类与布局按网络指纹缓存，调整共现次数时复用已有坐标）
+        top_links = keyword_links.select_entities(keyword_links.labels.isin(top_keywords))
+        view = cached_network(top_links.pair_matrix(), top_links.labels, min_weight=min_cooccurrence,
+                              resolution=cluster_resolution, drop_isolates=False, k=1,
+                              pruning=pruning_method, top_k=pruning_top_k, max_edges=max_edges)
+        
+        if view is not None:
+            G = view.graph
+            pos = view.pos
+            keyword_cluster = view.cluster_of
+            modularity_score = view.modularity
             
-            # 创建网络图
-            edge_trace = []
-            for edge in G.edges():
-                x0, y0 = pos[edge[0]]
-                x1, y1 = pos[edge[1]]
-                weight = G[edge[0]][edge[1]]['weight']
-                edge_trace.append(go.Scatter(
-                    x=[x0, x1, None],
-                    y=[y0, y1, None],
-                    mode='lines',
-                    line=dict(width=weight*0.5, color='#888'),
-                    hoverinfo='none'
-                ))
+            # 创建网络图（全部边按线宽分组打包为少数几条折线，节点多时使用 WebGL）
+            webgl = use_webgl(G.number_of_nodes())
+            edge_trace = edge_traces(pos, G.edges(data='weight', default=1), width_scale=0.5,
+                                     color='#888', webgl=webgl)
             
             # 节点大小基于频率
             node_sizes = [filtered_kw_counts[node] * 10 for node in G.nodes()]
             
-            node_trace = go.Scatter(
-                x=[pos[node][0] for node in G.nodes()],
-                y=[pos[node][1] for node in G.nodes()],
+            # 节点颜色基于聚类
+            palette = px.colors.qualitative.Plotly
+            node_colors = [palette[keyword_cluster[node] % len(palette)] for node in G.nodes()]
+            
+            node_xy = node_positions(pos, G.nodes())
+            node_trace = (go.Scattergl if webgl else go.Scatter)(
+                x=node_xy[:, 0],
+                y=node_xy[:, 1],
                 mode='markers+text',
                 text=list(G.nodes()),
+                hovertext=[f"{node}<br>Cluster {keyword_cluster[node] + 1}" for node in G.nodes()],
                 textposition="middle center",
                 hoverinfo='text',
                 marker=dict(
                     size=node_sizes,
-                    color='#B5A8CA',
+                    color=node_colors,
                     line=dict(width=2, color='#C0D6EA')
                 )
             )
@@ -1508,44 +1505,265 @@ def analyze_keywords(df):
             )
             
             st.plotly_chart(fig, use_container_width=True)
+            shown_clusters = len({keyword_cluster[node] for node in G.nodes()})
+            shown_edges = view.matrix.nnz // 2
+            total_edges = threshold_edges(top_links.pair_matrix(), min_cooccurrence).nnz // 2
+            st.caption(f"聚类数: {shown_clusters}，模块度 Q = {modularity_score:.3f}；"
+                       f"显示边数 {shown_edges} / {total_edges}（{PRUNING_METHODS[pruning_method]}）")
         else:
             st.warning("关键词共现网络数据不足")
+        
+        show_network_metrics(corpus, 'keywords', "📐 Keyword Network Metrics", "keyword_network_metrics",
+                             top_n=top_n_keywords, min_weight=min_cooccurrence, resolution=cluster_resolution)
+
+def analyze_thematic_map(df):
+    """主题图（Callon 中心度/密度四象限）与主题演化（桑基图）"""
+    st.subheader("🗺️ Thematic Map")
+    
+    corpus = as_corpus(df)
+    if not corpus.has('keywords'):
+        st.warning("未找到关键词列")
+        return
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        theme_keywords = st.number_input(
+            "参与聚类的关键词数",
+            min_value=20,
+            max_value=1000,
+            value=DEFAULT_THEME_KEYWORDS,
+            help="按出现频次选取的高频关键词数",
+            key="theme_n_keywords"
+        )
+    with col2:
+        theme_min_frequency = st.number_input(
+            "关键词最小频次",
+            min_value=1,
+            value=DEFAULT_THEME_MIN_FREQUENCY,
+            help="在时间切片内出现次数低于该值的关键词不参与聚类",
+            key="theme_min_frequency"
+        )
+    with col3:
+        theme_resolution = st.slider(
+            "聚类分辨率",
+            min_value=0.1,
+            max_value=3.0,
+            value=DEFAULT_RESOLUTION,
+            step=0.1,
+            help="越大主题越多越小",
+            key="theme_resolution"
+        )
+    params = dict(n_keywords=int(theme_keywords), min_frequency=int(theme_min_frequency),
+                  resolution=theme_resolution)
+    
+    themes = thematic_map(corpus, **params).themes
+    if themes.empty:
+        st.warning("关键词共现不足，无法形成主题")
+        return
+    
+    fig = go.Figure()
+    colors = {'motor': '#FF6B6B', 'niche': '#4ECDC4', 'emerging': '#B5A8CA', 'basic': '#45B7D1'}
+    for quadrant, description in THEMATIC_QUADRANTS.items():
+        members = themes[themes['Quadrant'] == quadrant]
+        if members.empty:
+            continue
+        fig.add_trace(go.Scatter(
+            x=members['Centrality'],
+            y=members['Density'],
+            mode='markers+text',
+            name=description,
+            text=members['Label'],
+            textposition="top center",
+            hovertext=members['Keywords'],
+            hoverinfo='text',
+            marker=dict(
+                size=15 + 45 * np.sqrt(members['Frequency'] / themes['Frequency'].max()),
+                color=colors[quadrant],
+                opacity=0.7,
+                line=dict(width=1, color='#666')
+            )
+        ))
+    fig.add_vline(x=themes['Centrality'].median(), line_dash="dash", line_color="#999")
+    fig.add_hline(y=themes['Density'].median(), line_dash="dash", line_color="#999")
+    fig.update_layout(
+        title="Thematic Map",
+        xaxis_title="Centrality (Relevance degree)",
+        yaxis_title="Density (Development degree)",
+        template="plotly_white",
+        height=600
+    )
+    st.plotly_chart(fig, use_container_width=True)
+    st.dataframe(themes.assign(Quadrant=themes['Quadrant'].map(THEMATIC_QUADRANTS)), use_container_width=True)
+    
+    # 主题演化
+    st.subheader("🔀 Thematic Evolution")
+    years = corpus.time_cube.years
+    if len(years) < 2:
+        st.warning("年份数据不足，无法进行主题演化分析")
+        return
+    default_cuts = [int(year) for year in np.quantile(years, [1 / 3, 2 / 3]).round()]
+    cuts = st.multiselect(
+        "切分年份（每个年份为一个时间段的最后一年）",
+        options=[int(year) for year in years[:-1]],
+        default=sorted(set(default_cuts) & set(int(year) for year in years[:-1])),
+        key="theme_cuts"
+    )
+    min_inclusion = st.slider("最小包含指数", 0.0, 1.0, DEFAULT_MIN_INCLUSION, 0.05, key="theme_min_inclusion")
+    if not cuts:
+        st.info("请至少选择一个切分年份")
+        return
+    
+    _, nodes, links = thematic_evolution(corpus, cuts, min_inclusion=min_inclusion, **params)
+    if links.empty:
+        st.warning("相邻时间段的主题之间没有达到包含指数阈值的联系")
+        return
+    
+    fig = go.Figure(go.Sankey(
+        arrangement='snap',
+        node=dict(
+            label=[f"{label} ({period})" for label, period in zip(nodes['Label'], nodes['Period'])],
+            pad=15,
+            thickness=15,
+            color='#7EB6D9'
+        ),
+        link=dict(
+            source=links['source'],
+            target=links['target'],
+            value=links['Inclusion'],
+            customdata=links['Keywords'],
+            hovertemplate='Inclusion: %{value:.2f}<br>%{customdata}<extra></extra>',
+            color='rgba(180, 180, 180, 0.4)'
+        )
+    ))
+    fig.update_layout(title="Thematic Evolution", height=600)
+    st.plotly_chart(fig, use_container_width=True)
+    
+    names = nodes.set_index('Node')
+    st.dataframe(pd.DataFrame({
+        'From': names.loc[links['source'], 'Label'].to_numpy() + ' (' + names.loc[links['source'], 'Period'].to_numpy() + ')',
+        'To': names.loc[links['target'], 'Label'].to_numpy() + ' (' + names.loc[links['target'], 'Period'].to_numpy() + ')',
+        'Inclusion': links['Inclusion'],
+        'Shared': links['Shared'],
+        'Keywords': links['Keywords'],
+    }), use_container_width=True)
+
+def analyze_terms(df):
+    """标题与摘要术语抽取（TF-IDF），术语接入共现、突现与主题图分析"""
+    st.subheader("📝 Title and Abstract Terms")
+    
+    corpus = as_corpus(df)
+    available = [field for field in TERM_FIELDS if corpus.has(field)]
+    if not available:
+        st.warning("未找到标题或摘要列")
+        return
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        term_fields = st.multiselect(
+            "文本字段",
+            options=available,
+            default=available,
+            format_func=TERM_FIELDS.get,
+            key="term_fields"
+        )
+        max_ngram = st.slider("术语最大词数", 1, 3, DEFAULT_MAX_NGRAM, key="term_max_ngram")
+    with col2:
+        min_df = st.number_input(
+            "最少文献频次",
+            min_value=1,
+            value=DEFAULT_MIN_DF,
+            help="出现在少于该数量文献中的术语被剪掉",
+            key="term_min_df"
+        )
+        max_df = st.slider(
+            "最大文献频次比例",
+            min_value=0.05,
+            max_value=1.0,
+            value=DEFAULT_MAX_DF,
+            step=0.05,
+            help="出现在超过该比例文献中的术语视为通用词",
+            key="term_max_df"
+        )
+    with col3:
+        max_terms = st.number_input(
+            "保留的术语数",
+            min_value=50,
+            value=DEFAULT_MAX_TERMS,
+            help="按 TF-IDF 总分保留",
+            key="term_max_terms"
+        )
+        top_n_terms = st.number_input("显示前N个术语", min_value=10, max_value=100, value=30, key="term_top_n")
+    if not term_fields:
+        st.info("请至少选择一个文本字段")
+        return
+    
+    with st.spinner("🔄 正在抽取术语..."):
+        term_links, terms = corpus_terms(corpus, term_fields, max_ngram, int(min_df), max_df, int(max_terms))
+    if terms.empty:
+        st.warning("没有术语满足文献频次条件")
+        return
+    
+    top_terms = terms.head(int(top_n_terms))
+    fig = px.bar(
+        top_terms.iloc[::-1],
+        x='TF-IDF',
+        y='Term',
+        orientation='h',
+        hover_data=['Documents', 'Frequency'],
+        title="Top Terms by TF-IDF",
+        template="plotly_white"
+    )
+    fig.update_layout(height=max(400, 20 * len(top_terms)))
+    st.plotly_chart(fig, use_container_width=True)
+    st.dataframe(top_terms, use_container_width=True)
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        st.markdown("#### 🔗 术语共现")
+        pairs = term_links.pair_counts(int(min_df))
+        if pairs.empty:
+            st.info("没有达到最少文献频次的术语共现对")
+        else:
+            st.dataframe(pairs.sort_values('weight', ascending=False).head(int(top_n_terms)), use_container_width=True)
+    with col2:
+        st.markdown("#### 💥 术语突现")
+        bursts = entity_bursts(corpus, 'terms', min_frequency=int(min_df))
+        if bursts.empty:
+            st.info("未检测到突现术语")
+        else:
+            st.dataframe(bursts.head(int(top_n_terms)), use_container_width=True)
+    
+    st.markdown("#### 🗺️ 术语主题图")
+    themes = thematic_map(corpus, min_frequency=int(min_df), field='terms').themes
+    if themes.empty:
+        st.info("术语共现不足，无法形成主题")
+    else:
+        st.dataframe(themes.assign(Quadrant=themes['Quadrant'].map(THEMATIC_QUADRANTS)), use_container_width=True)
 
 def analyze_trends(df):
     """研究趋势与热点分析"""
     st.subheader("📈 Research Trends and Hot Topics Analysis")
     
-    if 'Year' not in df.columns or 'Keywords' not in df.columns:
+    corpus = as_corpus(df)
+    df = corpus.frame
+    if 'Year' not in df.columns or not corpus.has('keywords'):
         st.warning("需要年份和关键词数据进行分析")
         return
     
-    # 按年份分析关键词趋势
-    yearly_keywords = defaultdict(list)
-    for idx, row in df.iterrows():
-        if pd.notna(row.get('Year')) and pd.notna(row.get('Keywords')):
-            year = int(row['Year'])
-            for kw in str(row['Keywords']).split(';'):
-                kw = kw.strip().lower()
-                if kw and len(kw) > 2:
-                    yearly_keywords[year].append(kw)
-    
-    if not yearly_keywords:
+    # 按年份分析关键词趋势（从 关键词×年份 立方体切片）
+    cube = corpus.time_cube
+    keyword_mask = np.asarray(cube.labels['keywords'].str.len() > 2)
+    keyword_year_totals = pd.Series(
+        np.asarray(cube.matrix('keywords')[keyword_mask].sum(axis=0)).ravel(), index=cube.years)
+    keyword_years = keyword_year_totals[keyword_year_totals > 0].index.tolist()
+    
+    if not keyword_years:
         st.warning("暂无趋势数据")
         return
     
-    # 计算每个关键词的年度频率
-    kw_yearly_freq = defaultdict(lambda: defaultdict(int))
-    for year, keywords in yearly_keywords.items():
-        for kw in keywords:
-            kw_yearly_freq[kw][year] += 1
-    
     # 选择高频关键词进行趋势分析
-    all_keywords = []
-    for keywords in yearly_keywords.values():
-        all_keywords.extend(keywords)
-    
-    kw_counts = pd.Series(all_keywords).value_counts()
-    top_keywords = kw_counts.head(10).index.tolist()
+    top_keywords = cube.top('keywords', 10, mask=keyword_mask).index.tolist()
+    keyword_series = cube.series('keywords', top_keywords)
     
     # 创建趋势图
     st.subheader("📊 Keyword Trends Over Time")
@@ -1553,12 +1771,11 @@ def analyze_trends(df):
     colors = ['#B5A8CA', '#C0D6EA', '#E0BBD0', '#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4', '#FFEAA7', '#A8E6CF', '#FFD3A5']
     
     for i, kw in enumerate(top_keywords):
-        years = sorted(kw_yearly_freq[kw].keys())
-        freqs = [kw_yearly_freq[kw][year] for year in years]
+        kw_counts = keyword_series[kw][keyword_series[kw] > 0]
         
         fig.add_trace(go.Scatter(
-            x=years,
-            y=freqs,
+            x=kw_counts.index,
+            y=kw_counts.values,
             mode='lines+markers',
             name=kw,
             line=dict(color=colors[i % len(colors)], width=3),
@@ -1575,33 +1792,14 @@ def analyze_trends(df):
     
     st.plotly_chart(fig, use_container_width=True)
     
-    # 突现词分析（简化版）
+    # 突现词分析（Kleinberg 两状态模型）
     st.subheader("🚀 Burst Keywords Analysis")
     
-    # 计算关键词的突现强度（简化版）
-    burst_keywords = []
-    for kw in top_keywords:
-        years = sorted(kw_yearly_freq[kw].keys())
-        if len(years) >= 3:
-            # 计算增长趋势
-            freqs = [kw_yearly_freq[kw][year] for year in years]
-            if len(freqs) >= 3:
-                # 计算最近几年的平均频率与早期几年的平均频率的比值
-                early_avg = np.mean(freqs[:len(freqs)//2])
-                recent_avg = np.mean(freqs[len(freqs)//2:])
-                if early_avg > 0:
-                    burst_strength = recent_avg / early_avg
-                    if burst_strength > 1.5:  # 突现强度阈值
-                        burst_keywords.append({
-                            'Keyword': kw,
-                            'Burst Strength': burst_strength,
-                            'Early Avg': early_avg,
-                            'Recent Avg': recent_avg
-                        })
+    burst_df = entity_bursts(corpus, 'keywords', min_frequency=3)
+    burst_df = burst_df[burst_df['Term'].str.len() > 2].reset_index(drop=True)
+    burst_df = burst_df.rename(columns={'Term': 'Keyword', 'Strength': 'Burst Strength'})
     
-    if burst_keywords:
-        burst_df = pd.DataFrame(burst_keywords)
-        burst_df = burst_df.sort_values('Burst Strength', ascending=False)
+    if not burst_df.empty:
         burst_df['Rank'] = range(1, len(burst_df) + 1)
         
         st.dataframe(burst_df, use_container_width=True)
@@ -1619,9 +1817,9 @@ def analyze_trends(df):
     
     # 主题演化趋势
     st.subheader("📊 Topic Evolution Trends")
-    if len(yearly_keywords) > 0:
+    if len(keyword_years) > 0:
         # 按时间段分析主题演化
-        all_years = sorted(yearly_keywords.keys())
+        all_years = keyword_years
         if len(all_years) >= 4:
             # 将年份分为几个时间段
             time_periods = []
@@ -1634,13 +1832,9 @@ def analyze_trends(df):
             # 分析每个时间段的热门关键词
             period_topics = {}
             for i, period in enumerate(time_periods):
-                period_keywords = []
-                for year in period:
-                    period_keywords.extend(yearly_keywords[year])
-                
-                if period_keywords:
-                    period_kw_counts = pd.Series(period_keywords).value_counts()
-                    period_topics[f"Period {i+1} ({min(period)}-{max(period)})"] = period_kw_counts.head(5)
+                period_kw_counts = cube.top('keywords', 5, min(period), max(period), mask=keyword_mask)
+                if not period_kw_counts.empty:
+                    period_topics[f"Period {i+1} ({min(period)}-{max(period)})"] = period_kw_counts
             
             # 创建主题演化表格
             if period_topics:
@@ -1700,6 +1894,98 @@ def analyze_trends(df):
     else:
         st.warning("暂无主题演化数据")
 
+def analyze_main_path(df):
+    """主路径分析：本地引用网络上的 SPC/SPLC/SPNP 遍历权重与主路径"""
+    st.subheader("🧭 Main Path Analysis")
+    
+    corpus = as_corpus(df)
+    if not corpus.has('references'):
+        st.warning("未找到参考文献列，无法进行主路径分析")
+        return
+    
+    dag, removed = citation_dag(corpus)
+    if dag.nnz == 0:
+        st.warning("参考文献中没有引用本数据集内的文献，无法进行主路径分析")
+        return
+    linked = (np.diff(dag.indptr) > 0) | (np.bincount(dag.indices, minlength=dag.shape[0]) > 0)
+    caption = f"本地引用网络：{int(linked.sum())} 篇文献，{dag.nnz} 条引用"
+    if removed:
+        caption += f"（为消除引用环删除 {removed} 条）"
+    st.caption(caption)
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        path_weight = st.selectbox(
+            "遍历权重",
+            options=list(SEARCH_PATH_WEIGHTS),
+            format_func=SEARCH_PATH_WEIGHTS.get,
+            key="main_path_weight"
+        )
+    with col2:
+        path_method = st.selectbox(
+            "主路径",
+            options=list(MAIN_PATH_METHODS),
+            format_func=MAIN_PATH_METHODS.get,
+            key="main_path_method"
+        )
+    with col3:
+        key_routes = st.number_input(
+            "关键路线数 (key-route)",
+            min_value=1,
+            max_value=100,
+            value=DEFAULT_KEY_ROUTES,
+            help="仅在关键路线主路径时生效",
+            key="main_path_key_routes"
+        )
+    
+    nodes, edges = main_path(corpus, path_weight, path_method, int(key_routes))
+    if edges.empty:
+        st.warning("未找到主路径")
+        return
+    
+    pos = dict(zip(nodes['doc'], nodes[['x', 'y']].to_numpy()))
+    max_weight = edges['weight'].max()
+    edge_trace = edge_traces(pos, ((source, target, 1 + 4 * weight / max_weight)
+                                   for source, target, weight in edges.itertuples(index=False)),
+                             color='#B0B0B0')
+    node_trace = go.Scatter(
+        x=nodes['x'],
+        y=nodes['y'],
+        mode='markers+text',
+        text=nodes['Document'],
+        textposition="top center",
+        hovertext=[f"{title}<br>LCS: {lcs}, GCS: {gcs}"
+                   for title, lcs, gcs in zip(nodes['Title'], nodes['LCS'], nodes['GCS'])],
+        hoverinfo='text',
+        marker=dict(
+            size=12,
+            color='#F4A460',
+            line=dict(width=1, color='#D2691E')
+        )
+    )
+    
+    fig = go.Figure(data=edge_trace + [node_trace])
+    fig.update_layout(
+        title=f"Main Path ({path_weight.upper()})",
+        showlegend=False,
+        hovermode='closest',
+        margin=dict(b=20,l=5,r=5,t=40),
+        xaxis=dict(title="Year", showgrid=True, zeroline=False, dtick=1),
+        yaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
+        height=600
+    )
+    st.plotly_chart(fig, use_container_width=True)
+    
+    names = dict(zip(nodes['doc'], nodes['Document']))
+    path_table = pd.DataFrame({
+        'Cited': edges['source'].map(names),
+        'Citing': edges['target'].map(names),
+        'Weight': edges['weight'],
+    })
+    st.dataframe(path_table, use_container_width=True)
+    st.dataframe(nodes.drop(columns=['doc', 'x', 'y']).sort_values('Year', kind='stable').reset_index(drop=True),
+                 use_container_width=True)
+
 def Save_Form_to_Csv(df_name, df,autotext,csv_path=csv_path):
     user_input_path =csv_path
     user_input_name = st.text_input("请输入" + df_name + "保存文件名",label_visibility="collapsed",value=autotext,).title()
@@ -2264,15 +2550,22 @@ elif page == "📊 WOS文件解析":
     
     # 文件上传
     st.subheader("📁 数据上传")
-    uploaded_file = st_file_uploader("上传文献数据文件", type=["txt", "csv", "bib"], label_visibility='collapsed')
+    uploaded_files = st_file_uploader("上传文献数据文件", type=["txt", "csv", "bib"], label_visibility='collapsed',
+                                      accept_multiple_files=True)
     
-    if uploaded_file is not None:
+    if uploaded_files:
         # 显示文件信息
-        st.info(f"📁 {uploaded_file.name} ({uploaded_file.size / 1024:.1f} KB)")
+        for uploaded_file in uploaded_files:
+            st.info(f"📁 {uploaded_file.name} ({uploaded_file.size / 1024:.1f} KB)")
         
-        # 加载数据
+        # 加载数据：多个WOS导出文件并行解析并按UT/DOI去重合并
         with st.spinner("🔄 正在解析文件..."):
-            df = load_data(uploaded_file)
+            if len(uploaded_files) > 1:
+                df, upload_key = load_data_batch(uploaded_files)
+            else:
+                df, upload_key = load_data(uploaded_files[0])
+            if df is not None and not df.empty and upload_key is not None:
+                bind_corpus(df, load_corpus(upload_key, df))
         
         if df is not None and not df.empty:
             # 显示数据概览
@@ -2281,7 +2574,7 @@ elif page == "📊 WOS文件解析":
             with col1:
                 st.metric("总文献数", len(df))
             with col2:
-                st.metric("总作者数", len(set([author for authors in safe_get_column(df, ['Authors']) if pd.notna(authors) for author in str(authors).split(';')])))
+                st.metric("总作者数", int((as_corpus(df).authors.doc_counts() > 0).sum()))
             with col3:
                 st.metric("总期刊数", len(set(safe_get_column(df, ['Source']).dropna())))
             with col4:
@@ -2298,9 +2591,10 @@ elif page == "📊 WOS文件解析":
             
             # 分析选项
             st.subheader("🔍 分析选项")
+            configure_keyword_normalization(df)
             analysis_type = st.selectbox(
                 "选择分析类型",
-                ["总体信息概览", "作者分析", "国家地区分析", "机构分析", "被引文献分析", "关键词共现分析", "研究趋势分析"],
+                ["总体信息概览", "作者分析", "国家地区分析", "机构分析", "被引文献分析", "关键词共现分析", "标题摘要术语分析", "研究趋势分析"],
                 key="analysis_type"
             )
             
@@ -2316,8 +2610,12 @@ elif page == "📊 WOS文件解析":
                 analyze_cited_references(df)
             elif analysis_type == "关键词共现分析":
                 analyze_keywords(df)
+                analyze_thematic_map(df)
+            elif analysis_type == "标题摘要术语分析":
+                analyze_terms(df)
             elif analysis_type == "研究趋势分析":
                 analyze_trends(df)
+                analyze_main_path(df)
         else:
             st.error("❌ 数据加载失败，请检查文件格式")
     